@@ -129,6 +129,10 @@ def create_app():
     # Initialize extensions
     db.init_app(app)
     migrate = Migrate(app, db)
+
+    # Organization writes from any process drop the shared feature snapshots.
+    from feature_flags import register_invalidation_listeners
+    register_invalidation_listeners()
     
     login_manager = LoginManager()
     login_manager.init_app(app)
@@ -397,7 +401,8 @@ def create_app():
                 pass
 
         # Retention: count an authenticated session on any app surface, not
-        # only /dashboard. Best-effort; never fail the request.
+        # only /dashboard. Queued off-request after the first hit of the UTC
+        # day, so the steady state costs no queries. Never fail the request.
         try:
             endpoint = request.endpoint or ''
             if (
@@ -406,9 +411,9 @@ def create_app():
                 and not request.path.startswith('/static')
                 and not request.path.startswith('/api/notifications')
             ):
-                from services.activation_service import record_daily_session
+                from services.session_tracking import note_session
                 surface = endpoint.split('.')[0] if endpoint else 'app'
-                record_daily_session(current_user, surface=surface)
+                note_session(current_user, surface=surface)
         except Exception:
             pass
 
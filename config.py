@@ -56,6 +56,20 @@ class Config:
     EXTRACTION_AUTO_APPLY = (
         os.getenv('EXTRACTION_AUTO_APPLY', 'false').lower() == 'true'
     )
+    # Reuse a prior completed extraction run for identical PDF bytes (or
+    # shared pages) under the same schema, prompt and model.
+    EXTRACTION_CACHE_ENABLED = (
+        os.getenv('EXTRACTION_CACHE_ENABLED', 'true').lower() == 'true'
+    )
+    # Cap on rendered page-image bytes per extraction request; lower-priority
+    # pages are downgraded, then left to the text layer.
+    EXTRACTION_IMAGE_BUDGET_BYTES = int(
+        os.getenv('EXTRACTION_IMAGE_BUDGET_BYTES', str(15 * 1024 * 1024))
+    )
+    # Longer documents are extracted as concurrent windows of this many
+    # pages, merged on each field's page/confidence provenance.
+    EXTRACTION_WINDOW_PAGES = int(os.getenv('EXTRACTION_WINDOW_PAGES', '10'))
+    EXTRACTION_WINDOW_WORKERS = int(os.getenv('EXTRACTION_WINDOW_WORKERS', '4'))
 
     # Phase 3 narrow autonomy thresholds (only with org flags on).
     BOB_VTC_AUTONOMY_CONFIDENCE_MAX = float(
@@ -67,6 +81,10 @@ class Config:
 
     # SendGrid configuration
     SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
+    # Overridable so tests and staging can point marketing sends at a fake.
+    SENDGRID_API_BASE = os.getenv(
+        'SENDGRID_API_BASE', 'https://api.sendgrid.com'
+    ).rstrip('/')
 
     # Marketing campaigns send from their own authenticated subdomain so a
     # campaign that draws complaints cannot take password resets and org
@@ -77,6 +95,11 @@ class Config:
     MARKETING_FROM_NAME = os.getenv('MARKETING_FROM_NAME', 'AgentFlow')
     # Address in the List-Unsubscribe header for clients that prefer mailto.
     MARKETING_UNSUBSCRIBE_MAILTO = os.getenv('MARKETING_UNSUBSCRIBE_MAILTO')
+    # Marketing outbox worker sends a campaign step as SendGrid batches of up
+    # to 1,000 personalizations instead of one request per recipient.
+    MARKETING_BATCH_SEND = (
+        os.getenv('MARKETING_BATCH_SEND', 'false').lower() == 'true'
+    )
     # Bounce rate that auto-pauses a running campaign, as a fraction of
     # attempted sends. Above roughly 5% mailbox providers start filtering.
     MARKETING_BOUNCE_PAUSE_RATE = float(
@@ -110,6 +133,34 @@ class Config:
 
     # Redis / RQ task queue
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    # worker.py processes per queue, e.g. "doc_extraction=4,bob_telegram=2";
+    # queues left out keep worker.DEFAULT_CONCURRENCY.
+    WORKER_CONCURRENCY = os.getenv('WORKER_CONCURRENCY', '')
+    # Seconds between per-queue wait/throughput log lines from the supervisor.
+    WORKER_METRICS_INTERVAL = int(os.getenv('WORKER_METRICS_INTERVAL', 60))
+
+    # Lookup cache (services/cache_helpers). The local tier is bounded per
+    # process; the Redis tier is shared across web and worker processes and
+    # is only on when REDIS_URL is actually set.
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 2048))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 8 * 1024 * 1024))
+    CACHE_REDIS_ENABLED = os.getenv(
+        'CACHE_REDIS_ENABLED', 'true' if os.getenv('REDIS_URL') else 'false'
+    ).lower() == 'true'
+
+    # Tax protest export bundles (subject, comparables, stats, chart PNG)
+    # reused by CSV/XLSX downloads until the next tax data import.
+    TAX_EXPORT_CACHE_MAX_ENTRIES = int(os.getenv('TAX_EXPORT_CACHE_MAX_ENTRIES', 256))
+    TAX_EXPORT_CACHE_MAX_BYTES = int(os.getenv('TAX_EXPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+    # Read-only market-value snapshots written by scripts/import_tax_data.py
+    # and memory-mapped by every web worker (services/tax_snapshot). Written
+    # on the importer's host: multi-host deploys must point this at a volume
+    # shared by every web host, otherwise stats fall back to the database.
+    TAX_SNAPSHOT_DIR = os.getenv(
+        'TAX_SNAPSHOT_DIR',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tax_data', 'snapshots'),
+    )
 
     # RentCast API configuration
     RENTCAST_API_KEY = os.getenv('RENTCAST_API_KEY')
@@ -5,8 +5,16 @@ Features are controlled by:
 1. Tier defaults (free, pro, enterprise)
 2. Per-org overrides stored in Organization.feature_flags JSON
 3. Platform admin orgs get everything
+
+Lookups that resolve the org implicitly (templates, ``feature_required``,
+B.O.B. tool selection) go through an ``OrgFeatureSnapshot``: resolved once
+per request or job and memoized on ``g``, and shared across requests through
+services/cache_helpers until the org row changes.
 """
 
+import hashlib
+import json
+from dataclasses import dataclass, field
 from typing import Optional
 
 # =============================================================================
@@ -136,15 +144,9 @@ def org_has_feature(feature_name: str, org=None) -> bool:
     Returns:
         True if the organization has access to this feature
     """
-    from flask_login import current_user
-    
     if org is None:
-        if not current_user.is_authenticated:
-            return False
-        org = current_user.organization
-    
-    if not org:
-        return False
+        snapshot = current_org_snapshot()
+        return snapshot.has(feature_name) if snapshot else False
 
     if feature_name in GLOBAL_FEATURE_OVERRIDES:
         return GLOBAL_FEATURE_OVERRIDES[feature_name]
@@ -166,6 +168,186 @@ def org_has_feature(feature_name: str, org=None) -> bool:
     return TIER_FEATURES.get(tier, TIER_FEATURES['free']).get(feature_name, False)
 
 
+# =============================================================================
+# RESOLVED ORG SNAPSHOTS
+# =============================================================================
+
+# Changes whenever the tier definitions change, so a deploy that edits
+# TIER_FEATURES never reads snapshots cached by the previous release.
+_DEFINITIONS_VERSION = hashlib.sha1(
+    json.dumps(TIER_FEATURES, sort_keys=True).encode()
+).hexdigest()[:10]
+_SNAPSHOT_TIMEOUT = 120  # seconds; writes also invalidate explicitly
+_G_SNAPSHOTS = '_org_feature_snapshots'
+
+
+@dataclass(frozen=True)
+class OrgFeatureSnapshot:
+    """Tier defaults plus org overrides for one org, resolved once.
+
+    Global kill switches and the super-admin marketing grant are applied at
+    read time: the first is a deploy-time constant and the second depends on
+    who is asking, so neither belongs in a snapshot shared across requests.
+    """
+
+    org_id: int
+    tier: str
+    is_platform_admin: bool
+    features: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_org(cls, org) -> 'OrgFeatureSnapshot':
+        tier = org.subscription_tier or 'free'
+        features = dict(TIER_FEATURES.get(tier, TIER_FEATURES['free']))
+        features.update(org.feature_flags or {})
+        return cls(
+            org_id=org.id,
+            tier=tier,
+            is_platform_admin=bool(org.is_platform_admin),
+            features=features,
+        )
+
+    def has(self, feature_name: str) -> bool:
+        """Same answer as ``org_has_feature(feature_name, org)``."""
+        if feature_name in GLOBAL_FEATURE_OVERRIDES:
+            return GLOBAL_FEATURE_OVERRIDES[feature_name]
+        if feature_name == 'EMAIL_CAMPAIGNS' and _current_user_is_super_admin():
+            return True
+        if self.is_platform_admin:
+            return True
+        return self.features.get(feature_name, False)
+
+    def as_dict(self) -> dict:
+        """Same shape as ``get_org_features(org)``."""
+        if self.is_platform_admin:
+            features = {k: True for k in TIER_FEATURES['enterprise'].keys()}
+        else:
+            features = dict(self.features)
+        features.update(GLOBAL_FEATURE_OVERRIDES)
+        if (
+            'EMAIL_CAMPAIGNS' not in GLOBAL_FEATURE_OVERRIDES
+            and _current_user_is_super_admin()
+        ):
+            features['EMAIL_CAMPAIGNS'] = True
+        return features
+
+    def to_cache(self) -> dict:
+        return {
+            'org_id': self.org_id,
+            'tier': self.tier,
+            'is_platform_admin': self.is_platform_admin,
+            'features': self.features,
+        }
+
+
+def _snapshot_cache_key(org_id: int) -> str:
+    return f'org_features_{org_id}_{_DEFINITIONS_VERSION}'
+
+
+def _request_snapshots() -> Optional[dict]:
+    """Per-request (or per-job app context) memo, or None outside one."""
+    try:
+        from flask import g, has_app_context
+    except Exception:
+        return None
+    if not has_app_context():
+        return None
+    memo = g.get(_G_SNAPSHOTS)
+    if memo is None:
+        memo = {}
+        setattr(g, _G_SNAPSHOTS, memo)
+    return memo
+
+
+def org_feature_snapshot(org_id, org=None) -> Optional[OrgFeatureSnapshot]:
+    """Resolved features for ``org_id``: request memo, shared cache, then DB.
+
+    Pass ``org`` when the caller already holds the row so a miss costs no
+    query. Returns None when the org does not exist.
+    """
+    if not org_id:
+        return None
+    memo = _request_snapshots()
+    if memo is not None and org_id in memo:
+        return memo[org_id]
+
+    from services.cache_helpers import _get_cached, _set_cached
+
+    cache_key = _snapshot_cache_key(org_id)
+    cached = _get_cached(cache_key)
+    if cached is not None:
+        snapshot = OrgFeatureSnapshot(**cached)
+    else:
+        if org is None:
+            from models import Organization, db
+            org = db.session.get(Organization, org_id)
+        if org is None:
+            return None
+        snapshot = OrgFeatureSnapshot.from_org(org)
+        _set_cached(cache_key, snapshot.to_cache(), timeout=_SNAPSHOT_TIMEOUT)
+
+    if memo is not None:
+        memo[org_id] = snapshot
+    return snapshot
+
+
+def current_org_snapshot() -> Optional[OrgFeatureSnapshot]:
+    """Snapshot for the logged-in user's org, or None when anonymous."""
+    try:
+        from flask_login import current_user
+    except Exception:
+        return None
+    if not getattr(current_user, 'is_authenticated', False):
+        return None
+    return org_feature_snapshot(getattr(current_user, 'organization_id', None))
+
+
+def clear_org_feature_snapshot(org_id) -> None:
+    """Drop the cached snapshot for one org in every process."""
+    from services.cache_helpers import _delete_cached
+
+    memo = _request_snapshots()
+    if memo is not None:
+        memo.pop(org_id, None)
+    _delete_cached(_snapshot_cache_key(org_id))
+
+
+_listeners_registered = False
+
+
+def register_invalidation_listeners() -> None:
+    """Invalidate snapshots whenever an Organization row is written.
+
+    Clears at flush so this request stops reading the old values, and again
+    after commit so another process cannot re-cache the pre-commit row in
+    between. Registered at app setup in every process: snapshots live in the
+    shared Redis tier, so a process that never builds one (a worker reading
+    cached snapshots, an admin script flipping flags) still has to clear
+    them when it writes.
+    """
+    global _listeners_registered
+    if _listeners_registered:
+        return
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    from models import Organization
+
+    def _after_update(mapper, connection, target):
+        clear_org_feature_snapshot(target.id)
+        session = Session.object_session(target)
+        if session is not None:
+            session.info.setdefault('_feature_snapshot_orgs', set()).add(target.id)
+
+    def _after_commit(session):
+        for org_id in session.info.pop('_feature_snapshot_orgs', ()):
+            clear_org_feature_snapshot(org_id)
+
+    event.listen(Organization, 'after_update', _after_update)
+    event.listen(Organization, 'after_delete', _after_update)
+    event.listen(Session, 'after_commit', _after_commit)
+    _listeners_registered = True
+
+
 # Shown in the platform admin UI instead of raw SCREAMING_SNAKE keys.
 FEATURE_LABELS = {
     'CONTACTS': 'Contacts',
@@ -269,14 +451,10 @@ def get_org_features(org=None) -> dict:
     Returns:
         Dict of feature_name -> enabled boolean
     """
-    from flask_login import current_user
-    
     if org is None:
-        if not current_user.is_authenticated:
-            features = TIER_FEATURES['free'].copy()
-            features.update(GLOBAL_FEATURE_OVERRIDES)
-            return features
-        org = current_user.organization
+        snapshot = current_org_snapshot()
+        if snapshot is not None:
+            return snapshot.as_dict()
     
     if not org:
         features = TIER_FEATURES['free'].copy()
@@ -366,16 +544,16 @@ def can_access_transactions(user) -> bool:
         return False
     
     # Check org has the feature
-    org = user.organization
-    if not org:
+    features = org_feature_snapshot(user.organization_id)
+    if not features:
         return False
     
     # Check feature is enabled for this org
-    if not org_has_feature('TRANSACTIONS', org):
+    if not features.has('TRANSACTIONS'):
         return False
     
     # Platform admin org: any admin/owner can access
-    if org.is_platform_admin:
+    if features.is_platform_admin:
         return user.org_role in ('owner', 'admin') or user.role == 'admin'
     
     # Regular orgs: if they have the feature, all members can access
@@ -389,15 +567,15 @@ def can_access_ai_features(user) -> bool:
     if not user or not user.is_authenticated:
         return False
     
-    org = user.organization
-    if not org:
+    features = org_feature_snapshot(user.organization_id)
+    if not features:
         return False
     
     # Check if any AI feature is enabled
     return (
-        org_has_feature('AI_CHAT', org) or
-        org_has_feature('AI_DAILY_TODO', org) or
-        org_has_feature('AI_ACTION_PLAN', org)
+        features.has('AI_CHAT') or
+        features.has('AI_DAILY_TODO') or
+        features.has('AI_ACTION_PLAN')
     )
 
 
@@ -408,11 +586,11 @@ def can_access_documents(user) -> bool:
     if not user or not user.is_authenticated:
         return False
     
-    org = user.organization
-    if not org:
+    features = org_feature_snapshot(user.organization_id)
+    if not features:
         return False
     
-    return org_has_feature('DOCUMENT_GENERATION', org)
+    return features.has('DOCUMENT_GENERATION')
 
 
 def can_access_reports(user) -> bool:
@@ -372,7 +372,10 @@ export default class extends Controller {
         method: "POST",
         body: formData
       });
-      const data = await response.json();
+      let data = await response.json();
+      if (data.status_url) {
+        data = await this.pollImportJob(data);
+      }
       this.renderImportStatus(data);
     } catch (error) {
       console.error(error);
@@ -387,6 +390,28 @@ export default class extends Controller {
     }
   }
 
+  async pollImportJob(data) {
+    while (data.status === "queued" || data.status === "running") {
+      this.renderImportProgress(data);
+      await new Promise((resolve) => setTimeout(resolve, 1500));
+      const response = await fetch(data.status_url || `/import-contacts/${data.job_id}`);
+      const next = await response.json();
+      data = { ...next, status_url: data.status_url };
+    }
+    return data;
+  }
+
+  renderImportProgress(data) {
+    if (!this.hasImportStatusTarget || !this.hasStatusMessageTarget) return;
+    const done = data.processed_rows || 0;
+    this.statusMessageTarget.textContent = data.total_rows
+      ? `Importing contacts... ${done} of ${data.total_rows} rows processed.`
+      : data.status === "queued"
+        ? "Import queued..."
+        : `Importing contacts... ${done} rows processed.`;
+    this.importStatusTarget.classList.remove("hidden");
+  }
+
   setImportState(loading) {
     if (this.hasImportButtonTarget) {
       this.importButtonTarget.disabled = loading;
@@ -108,7 +108,9 @@ def process_contract_bootstrap_job(
     """
     from models import ContractBootstrapSession, User, db
     from services import contract_bootstrap
+    from services.pdf_pages import PdfPageSet
 
+    pages = None
     try:
         set_job_org_context(org_id)
         session = ContractBootstrapSession.query.filter_by(
@@ -137,6 +139,8 @@ def process_contract_bootstrap_job(
                 time.sleep(0.4 * (attempt + 1))
         if not file_bytes:
             raise ValueError('The uploaded contract could not be read from storage.')
+        # Identity, side inference and extraction all read this one parse.
+        pages = PdfPageSet(file_bytes)
 
         session.status = ContractBootstrapSession.STATUS_PROCESSING
         classification['processing_started_at'] = (
@@ -173,7 +177,7 @@ def process_contract_bootstrap_job(
         set_job_org_context(org_id)
 
         identity = contract_bootstrap.classify_upload_identity(
-            file_bytes=file_bytes,
+            file_bytes=pages,
             filename=session.original_filename,
         )
         classification = dict(session.classification or {})
@@ -187,7 +191,7 @@ def process_contract_bootstrap_job(
             ).first()
             inference = contract_bootstrap.infer_side_for_upload(
                 identity=identity,
-                file_bytes=file_bytes,
+                file_bytes=pages,
                 user=user,
             )
             classification['representation_inference'] = inference.to_dict()
@@ -218,7 +222,7 @@ def process_contract_bootstrap_job(
             db.session.commit()
 
         field_data = contract_bootstrap.extract_contract_fields(
-            file_bytes=file_bytes,
+            file_bytes=pages,
             identity=identity,
             filename=session.original_filename,
         )
@@ -287,5 +291,7 @@ def process_contract_bootstrap_job(
                 session_id,
             )
     finally:
+        if pages is not None:
+            pages.close()
         if not _inline:
             db.session.remove()
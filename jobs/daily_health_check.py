@@ -242,15 +242,10 @@ def check_redis_and_rq() -> CheckResult:
                 meaning='Background work like document extraction may be stuck.',
             )
 
-        queue_names = [
-            'default',
-            'documents',
-            'document_extraction',
-            'high',
-            'low',
-        ]
+        from jobs.dispatch import QUEUE_NAMES
+
         depths = {}
-        for name in queue_names:
+        for name in QUEUE_NAMES:
             try:
                 depths[name] = Queue(name, connection=conn).count
             except Exception:
@@ -0,0 +1,275 @@
+"""
+One entry point for putting background work on a queue.
+
+Producers used to open (and ping) a fresh Redis connection on every enqueue
+and fall back to a new daemon thread per job whenever Redis was missing.
+They now go through :func:`enqueue` and :func:`submit_local`:
+
+- One Redis client per process and URL, so every enqueue shares its
+  connection pool. A failed enqueue marks Redis unavailable for
+  ``UNAVAILABLE_RETRY_SECONDS`` instead of paying the connect timeout on
+  every request.
+- ``QUEUE_NAMES`` is in priority order. The worker drains earlier queues
+  first, so interactive Telegram replies never wait behind bulk extraction.
+- An ``idempotency_key`` collapses an enqueue into a still-pending job with
+  the same key (the same document re-extracted twice, a Telegram webhook
+  retry).
+- Without Redis, jobs run on a small per-queue thread pool. When its backlog
+  is full the caller runs the job itself, so a burst slows the request down
+  instead of piling up threads.
+
+Job kwargs are always handed to RQ as ``kwargs=``; a job argument named
+``job_id`` or ``job_timeout`` would otherwise be taken as an RQ option.
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import threading
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first; worker.py listens in this order.
+QUEUE_NAMES = (
+    'bob_telegram',
+    'apns',
+    'contract_bootstrap',
+    'doc_extraction',
+    'contact_import',
+    'tax_protest',
+)
+
+DEFAULT_JOB_TIMEOUT = 300
+UNAVAILABLE_RETRY_SECONDS = 30
+IDEMPOTENCY_KEY_PREFIX = 'dispatch:idempotency'
+
+# Local fallback pool sizes. contract_bootstrap stays serial so multi-file
+# inbox uploads do not stampede the SQLite file ("database is locked").
+LOCAL_WORKERS = {'contract_bootstrap': 1}
+DEFAULT_LOCAL_WORKERS = 2
+LOCAL_BACKLOG = 16
+
+# submit_local outcomes.
+STARTED = 'started'
+DUPLICATE = 'duplicate'
+INLINE = 'inline'
+
+_lock = threading.Lock()
+_clients: dict[str, Any] = {}
+_unavailable_until: dict[str, float] = {}
+_executors: dict[str, 'LocalExecutor'] = {}
+
+
+def _check_queue(queue: str) -> None:
+    # A name the worker does not listen on leaves jobs Queued forever.
+    if queue not in QUEUE_NAMES:
+        raise ValueError(f'Unknown job queue: {queue}')
+
+
+def redis_connection(url: Optional[str] = None):
+    """Shared Redis client for ``url``, or None while it is marked unavailable."""
+    from config import Config
+
+    url = url or Config.REDIS_URL
+    with _lock:
+        if _unavailable_until.get(url, 0.0) > time.monotonic():
+            return None
+        client = _clients.get(url)
+        if client is None:
+            from redis import Redis
+
+            client = Redis.from_url(
+                url,
+                socket_connect_timeout=2,
+                socket_timeout=2,
+                health_check_interval=30,
+            )
+            _clients[url] = client
+        return client
+
+
+def _mark_unavailable(url: str) -> None:
+    with _lock:
+        _unavailable_until[url] = time.monotonic() + UNAVAILABLE_RETRY_SECONDS
+
+
+def reset() -> None:
+    """Forget shared clients and availability (tests, and after a fork)."""
+    with _lock:
+        _clients.clear()
+        _unavailable_until.clear()
+
+
+def _pending_job_id(conn, marker: str) -> Optional[str]:
+    from rq.exceptions import NoSuchJobError
+    from rq.job import Job, JobStatus
+
+    job_id = conn.get(marker)
+    if not job_id:
+        return None
+    if isinstance(job_id, bytes):
+        job_id = job_id.decode('utf-8')
+    try:
+        status = Job.fetch(job_id, connection=conn).get_status()
+    except NoSuchJobError:
+        return None
+    if status in (JobStatus.QUEUED, JobStatus.DEFERRED, JobStatus.SCHEDULED):
+        return job_id
+    return None
+
+
+def enqueue(
+    queue: str,
+    job_path: str,
+    *,
+    idempotency_key: Optional[str] = None,
+    job_timeout: int = DEFAULT_JOB_TIMEOUT,
+    retry=None,
+    **kwargs: Any,
+) -> Optional[str]:
+    """Put ``job_path(**kwargs)`` on ``queue``.
+
+    Returns the RQ job id (the pending job's id when ``idempotency_key``
+    collapses this enqueue), or None when Redis is unreachable and the
+    caller should fall back.
+    """
+    _check_queue(queue)
+    from config import Config
+
+    url = Config.REDIS_URL
+    try:
+        conn = redis_connection(url)
+        if conn is None:
+            return None
+        from rq import Queue
+
+        job_id = str(uuid.uuid4())
+        if idempotency_key:
+            marker = f'{IDEMPOTENCY_KEY_PREFIX}:{queue}:{idempotency_key}'
+            if not conn.set(marker, job_id, nx=True, ex=job_timeout):
+                pending = _pending_job_id(conn, marker)
+                if pending:
+                    logger.info(
+                        'Collapsed duplicate %s enqueue %s into job %s',
+                        queue, idempotency_key, pending,
+                    )
+                    return pending
+                conn.set(marker, job_id, ex=job_timeout)
+
+        options: dict[str, Any] = {'job_timeout': job_timeout, 'job_id': job_id}
+        if retry is not None:
+            options['retry'] = retry
+        Queue(queue, connection=conn).enqueue(job_path, kwargs=kwargs, **options)
+        return job_id
+    except Exception as exc:
+        _mark_unavailable(url)
+        logger.warning('Queue %s unavailable for %s: %s', queue, job_path, exc)
+        return None
+
+
+class LocalExecutor:
+    """Bounded in-process fallback for one queue.
+
+    At most ``workers`` jobs run at once and ``backlog`` more wait for a
+    slot. Past that, :meth:`submit` runs the job on the calling thread.
+    """
+
+    def __init__(self, name: str, *, workers: int, backlog: int):
+        self.name = name
+        self._running = threading.Semaphore(workers)
+        self._slots = threading.BoundedSemaphore(workers + backlog)
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[], Any], *, idempotency_key: Optional[str] = None) -> str:
+        if idempotency_key:
+            with self._lock:
+                if idempotency_key in self._pending:
+                    return DUPLICATE
+                self._pending.add(idempotency_key)
+
+        if not self._slots.acquire(blocking=False):
+            logger.warning('%s local backlog is full; running job inline', self.name)
+            self._run(fn, idempotency_key)
+            return INLINE
+        try:
+            threading.Thread(
+                target=self._work,
+                args=(fn, idempotency_key),
+                name=f'{self.name}-job',
+                daemon=True,
+            ).start()
+        except Exception:
+            self._slots.release()
+            self._forget(idempotency_key)
+            raise
+        return STARTED
+
+    def _forget(self, idempotency_key: Optional[str]) -> None:
+        if idempotency_key:
+            with self._lock:
+                self._pending.discard(idempotency_key)
+
+    def _run(self, fn: Callable[[], Any], idempotency_key: Optional[str]) -> None:
+        with self._running:
+            self._forget(idempotency_key)
+            try:
+                fn()
+            except Exception:
+                logger.exception('Local %s job failed', self.name)
+
+    def _work(self, fn: Callable[[], Any], idempotency_key: Optional[str]) -> None:
+        try:
+            self._run(fn, idempotency_key)
+        finally:
+            self._slots.release()
+
+
+def _executor(queue: str) -> LocalExecutor:
+    with _lock:
+        executor = _executors.get(queue)
+        if executor is None:
+            executor = LocalExecutor(
+                queue,
+                workers=LOCAL_WORKERS.get(queue, DEFAULT_LOCAL_WORKERS),
+                backlog=LOCAL_BACKLOG,
+            )
+            _executors[queue] = executor
+        return executor
+
+
+def _resolve(job_path: str) -> Callable[..., Any]:
+    module_name, _, attr = job_path.rpartition('.')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def submit_local(
+    queue: str,
+    job_path: str,
+    *,
+    idempotency_key: Optional[str] = None,
+    **kwargs: Any,
+) -> str:
+    """Run ``job_path(**kwargs)`` on ``queue``'s local pool.
+
+    The job runs inside the caller's app context, when there is one.
+    Returns ``STARTED``, ``DUPLICATE`` (an identical job is still waiting)
+    or ``INLINE`` (the backlog was full and the job already ran).
+    """
+    _check_queue(queue)
+    from flask import current_app, has_app_context
+
+    func = _resolve(job_path)
+    app = current_app._get_current_object() if has_app_context() else None
+
+    def run():
+        if app is None:
+            func(**kwargs)
+            return
+        with app.app_context():
+            func(**kwargs)
+
+    return _executor(queue).submit(run, idempotency_key=idempotency_key)
@@ -4,6 +4,12 @@ Usage:
     python jobs/marketing_outbox_worker.py
     python jobs/marketing_outbox_worker.py --org-id 1
     python jobs/marketing_outbox_worker.py --limit 50
+    python jobs/marketing_outbox_worker.py --batch --limit 5000
+
+``--batch`` (or MARKETING_BATCH_SEND=true) sends each campaign step as SendGrid
+requests of up to 1,000 personalizations. Each org's rows are committed as
+``sending`` before the first request and their outcomes in one bulk update
+after the last; rows a crashed run left in ``sending`` are failed, not resent.
 """
 from __future__ import annotations
 
@@ -27,12 +33,17 @@ def run_marketing_outbox_worker(
     org_id: Optional[int] = None,
     *,
     limit: int = 100,
+    batch: Optional[bool] = None,
 ) -> dict[str, int]:
+    from config import Config
     from jobs.base import set_job_org_context
     from models import MarketingCampaign, MarketingSend, Organization, db
     from services.marketing import launch as launchmod
     from services.marketing.send import SendError, deliver
 
+    if batch is None:
+        batch = Config.MARKETING_BATCH_SEND
+
     if org_id is not None:
         org_ids = [org_id]
     else:
@@ -63,6 +74,10 @@ def run_marketing_outbox_worker(
                 .limit(limit)
                 .all()
             )
+            if batch:
+                _deliver_org_batch(sends, totals, now=now, org_id=current_org_id)
+                totals['orgs'] += 1
+                continue
             for send in sends:
                 totals['processed'] += 1
                 try:
@@ -108,15 +123,65 @@ def run_marketing_outbox_worker(
     return totals
 
 
+def _deliver_org_batch(sends, totals, *, now, org_id) -> None:
+    """Send one org's queued rows with ``deliver_batch``, then settle campaigns."""
+    from jobs.base import set_job_org_context
+    from models import MarketingCampaign, db
+    from services.marketing import launch as launchmod
+    from services.marketing.send import deliver_batch, fail_interrupted_sends
+
+    campaigns = {}
+    interrupted = fail_interrupted_sends(org_id, now=now)
+    if interrupted:
+        totals['failed'] += sum(interrupted.values())
+        for campaign in MarketingCampaign.query.filter(
+            MarketingCampaign.id.in_(interrupted),
+        ):
+            campaigns[campaign.id] = campaign
+    for send in sends:
+        campaign = send.campaign
+        if campaign is not None:
+            if campaign.status == 'scheduled':
+                campaign.status = 'sending'
+            campaigns[campaign.id] = campaign
+
+    def checkpoint():
+        db.session.commit()
+        set_job_org_context(org_id)
+
+    try:
+        outcomes = deliver_batch(sends, now=now, checkpoint=checkpoint)
+        db.session.commit()
+        set_job_org_context(org_id)
+    except Exception:
+        totals['errors'] += 1
+        logger.exception('Marketing batch send failed for org %s', org_id)
+        db.session.rollback()
+        set_job_org_context(org_id)
+        return
+
+    totals['processed'] += len(sends)
+    for status in ('sent', 'failed', 'skipped'):
+        totals[status] += outcomes.get(status, 0)
+
+    for campaign in campaigns.values():
+        launchmod.maybe_complete(campaign)
+    db.session.commit()
+    set_job_org_context(org_id)
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--org-id', type=int)
     parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--batch', action='store_true', default=None)
     args = parser.parse_args()
     from app import create_app
     app = create_app()
     with app.app_context():
-        run_marketing_outbox_worker(org_id=args.org_id, limit=args.limit)
+        run_marketing_outbox_worker(
+            org_id=args.org_id, limit=args.limit, batch=args.batch,
+        )
 
 
 if __name__ == '__main__':
@@ -2,12 +2,19 @@
 Notification Outbox Worker - Phase 1C (E1C-5)
 
 Processes queued NotificationDelivery rows for in_app and telegram channels.
-Respects scheduled_for / not_before / snooze (via list_pending_deliveries).
+Respects scheduled_for / not_before / snooze (via claim_pending_deliveries).
+
+Deliveries are claimed in batches with FOR UPDATE SKIP LOCKED, oldest due
+first, so several copies of this worker can run at once without sending
+anything twice. Telegram sends in a batch are marked sent and committed
+first, since those messages are already out; the in_app rows are then
+inserted together, marked sent in one bulk UPDATE, and committed.
 
 Usage:
     python jobs/notification_outbox_worker.py
     python jobs/notification_outbox_worker.py --org-id 1
     python jobs/notification_outbox_worker.py --limit 50
+    python jobs/notification_outbox_worker.py --batch-size 200
 """
 from __future__ import annotations
 
@@ -15,6 +22,8 @@ import argparse
 import logging
 import os
 import sys
+import time
+from datetime import datetime
 from typing import Dict, Optional
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -32,20 +41,27 @@ _CATEGORY_FALLBACK = {
     'proposal': 'bob_action',
 }
 
+DEFAULT_BATCH_SIZE = 50
+
 
 def run_notification_outbox_worker(
     org_id: Optional[int] = None,
     *,
     limit: int = 100,
-) -> Dict[str, int]:
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, float]:
     """
-    Deliver pending outbox rows.
+    Deliver pending outbox rows, at most ``limit`` per org per run.
 
     in_app → Notification bell row
     telegram → messaging.outbound.notify (quiet hours already handled by outbox)
+
+    Besides the counts, the totals carry throughput metrics: ``rows_per_sec``
+    and the average / max lag between when a row was due and when it was
+    claimed.
     """
     from jobs.base import set_job_org_context
-    from models import NotificationDelivery, Organization, db
+    from models import Organization, db
     from services.notification_outbox import NotificationOutboxService
 
     if org_id is not None:
@@ -58,59 +74,44 @@ def run_notification_outbox_worker(
 
     totals = {
         'orgs': 0,
+        'batches': 0,
         'processed': 0,
         'delivered': 0,
         'failed': 0,
         'skipped': 0,
         'errors': 0,
     }
+    lags = []
+    started = time.monotonic()
+    batch_size = max(1, min(batch_size, limit))
 
     db.session.remove()
 
     for current_org_id in org_ids:
         try:
             set_job_org_context(current_org_id)
-            deliveries = NotificationOutboxService.list_pending_deliveries()
-            if org_id is None:
-                deliveries = [
-                    d for d in deliveries if d.organization_id == current_org_id
-                ]
-            deliveries = deliveries[:limit]
-
-            for delivery in deliveries:
-                totals['processed'] += 1
-                try:
-                    ok = _deliver_one(delivery)
-                    if ok:
-                        NotificationOutboxService.mark_delivered(delivery.id)
-                        totals['delivered'] += 1
-                    else:
-                        delivery.status = 'failed'
-                        if not delivery.error:
-                            delivery.error = 'delivery_returned_false'
-                        totals['failed'] += 1
-                    db.session.commit()
-                    # SET LOCAL is transaction-scoped; restore after every commit.
-                    set_job_org_context(current_org_id)
-                except Exception as exc:
-                    totals['errors'] += 1
-                    logger.exception(
-                        'Outbox delivery failed id=%s method=%s',
-                        delivery.id, delivery.delivery_method,
-                    )
-                    try:
-                        db.session.rollback()
-                        set_job_org_context(current_org_id)
-                        row = NotificationDelivery.query.get(delivery.id)
-                        if row and row.status == 'queued':
-                            row.status = 'failed'
-                            row.error = str(exc)[:500]
-                            db.session.commit()
-                            totals['failed'] += 1
-                            set_job_org_context(current_org_id)
-                    except Exception:
-                        db.session.rollback()
-                        set_job_org_context(current_org_id)
+            remaining = limit
+            while remaining > 0:
+                now = datetime.utcnow()
+                batch = NotificationOutboxService.claim_pending_deliveries(
+                    current_org_id,
+                    limit=min(batch_size, remaining),
+                    now=now,
+                )
+                if not batch:
+                    break
+                remaining -= len(batch)
+                lags.extend(
+                    max(0.0, (now - (d.scheduled_for or d.created_at or now)).total_seconds())
+                    for d in batch
+                )
+                _process_batch(batch, totals, now=now, org_id=current_org_id)
+                db.session.commit()
+                # SET LOCAL is transaction-scoped; restore after every commit.
+                set_job_org_context(current_org_id)
+                totals['batches'] += 1
+                if len(batch) < batch_size:
+                    break
 
             totals['orgs'] += 1
         except Exception:
@@ -121,20 +122,106 @@ def run_notification_outbox_worker(
         finally:
             db.session.remove()
 
+    elapsed = time.monotonic() - started
+    totals['elapsed_seconds'] = round(elapsed, 3)
+    totals['rows_per_sec'] = round(totals['processed'] / elapsed, 1) if elapsed else 0.0
+    totals['avg_lag_seconds'] = round(sum(lags) / len(lags), 1) if lags else 0.0
+    totals['max_lag_seconds'] = round(max(lags), 1) if lags else 0.0
+
     logger.info(
-        'Notification outbox worker complete: orgs=%s processed=%s '
-        'delivered=%s failed=%s errors=%s',
+        'Notification outbox worker complete: orgs=%s batches=%s processed=%s '
+        'delivered=%s failed=%s errors=%s rows/sec=%s lag avg=%ss max=%ss',
         totals['orgs'],
+        totals['batches'],
         totals['processed'],
         totals['delivered'],
         totals['failed'],
         totals['errors'],
+        totals['rows_per_sec'],
+        totals['avg_lag_seconds'],
+        totals['max_lag_seconds'],
     )
     return totals
 
 
-def _deliver_one(delivery) -> bool:
-    """Send a single delivery. Returns True on success."""
+def _process_batch(batch, totals, *, now=None, org_id=None) -> None:
+    """Deliver one claimed batch. Caller commits the in_app half.
+
+    Every delivery runs inside its own savepoint, so a database error in one
+    cannot abort the transaction holding the rest. Telegram goes first and
+    its sent statuses are committed before any in_app row is touched: a
+    later failure makes the caller roll back, and that must not put
+    already-sent messages back in the queue. The in_app rows are then
+    re-claimed (the commit released their locks) and delivered.
+    """
+    from jobs.base import set_job_org_context
+    from models import db
+    from services.notification_outbox import NotificationOutboxService
+
+    telegram = []
+    others = []
+    for delivery in batch:
+        method = (delivery.delivery_method or '').strip().lower()
+        (telegram if method == 'telegram' else others).append(delivery)
+
+    prefs = {}
+    if telegram:
+        _deliver_group(telegram, totals, prefs=prefs, now=now)
+        if others:
+            db.session.commit()
+            # SET LOCAL is transaction-scoped; restore after every commit.
+            if org_id is not None:
+                set_job_org_context(org_id)
+            others = NotificationOutboxService.claim_pending_deliveries(
+                org_id,
+                limit=len(others),
+                now=now,
+                delivery_ids=[delivery.id for delivery in others],
+            )
+    if others:
+        _deliver_group(others, totals, prefs=prefs, now=now)
+
+
+def _deliver_group(deliveries, totals, *, prefs, now=None) -> None:
+    """Deliver ``deliveries`` one savepoint each, then mark successes sent."""
+    from models import db
+    from services.notification_outbox import NotificationOutboxService
+
+    sent_ids = []
+    for delivery in deliveries:
+        totals['processed'] += 1
+        try:
+            with db.session.begin_nested():
+                ok = _deliver_one(delivery, prefs=prefs)
+        except Exception as exc:
+            totals['errors'] += 1
+            logger.exception(
+                'Outbox delivery failed id=%s method=%s',
+                delivery.id, delivery.delivery_method,
+            )
+            if delivery.status == 'queued':
+                delivery.status = 'failed'
+                delivery.error = str(exc)[:500]
+                totals['failed'] += 1
+            continue
+
+        if ok:
+            sent_ids.append(delivery.id)
+        else:
+            delivery.status = 'failed'
+            if not delivery.error:
+                delivery.error = 'delivery_returned_false'
+            totals['failed'] += 1
+
+    NotificationOutboxService.mark_delivered_bulk(sent_ids, now=now)
+    totals['delivered'] += len(sent_ids)
+
+
+def _deliver_one(delivery, prefs=None) -> bool:
+    """Send a single delivery. Returns True on success.
+
+    ``prefs`` memoizes in-app preference lookups across a batch.
+    """
     from models import Notification, User, db
     from services.messaging.outbound import notify as telegram_notify
     from services.notification_service import is_channel_enabled
@@ -166,13 +253,19 @@ def _deliver_one(delivery) -> bool:
         action_url = f"/transactions/{payload['transaction_id']}"
 
     if method == 'in_app':
-        if not is_channel_enabled(event.user_id, category, 'in_app'):
+        if prefs is None:
+            prefs = {}
+        pref_key = (event.user_id, category)
+        if pref_key not in prefs:
+            prefs[pref_key] = is_channel_enabled(event.user_id, category, 'in_app')
+        if not prefs[pref_key]:
             delivery.error = 'preference_disabled'
             # Preference skip is not a hard failure for the event — mark sent/skipped.
             delivery.status = 'failed'
             return False
 
         # Insert without notification_service.create_notification (it commits).
+        # The batch flushes every bell row together.
         notif = Notification(
             user_id=event.user_id,
             organization_id=event.organization_id,
@@ -183,7 +276,6 @@ def _deliver_one(delivery) -> bool:
             action_url=action_url,
         )
         db.session.add(notif)
-        db.session.flush()
         return True
 
     if method == 'telegram':
@@ -260,13 +352,18 @@ def main():
     parser = argparse.ArgumentParser(description='Process notification outbox deliveries')
     parser.add_argument('--org-id', type=int, default=None)
     parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
     args = parser.parse_args()
 
     from app import create_app
 
     app = create_app()
     with app.app_context():
-        run_notification_outbox_worker(org_id=args.org_id, limit=args.limit)
+        run_notification_outbox_worker(
+            org_id=args.org_id,
+            limit=args.limit,
+            batch_size=args.batch_size,
+        )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,28 @@
+"""Run a tax protest batch over a contact group on the tax_protest RQ queue.
+
+The request stores a TaxProtestBatchJob; this job looks up every contact,
+compares them one subdivision at a time, committing results as it goes, and
+writes the combined workbook. RQ retries skip contacts already done.
+"""
+from __future__ import annotations
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def process_tax_protest_batch_job(*, job_id: int, org_id: int):
+    """Run (or resume) TaxProtestBatchJob ``job_id`` for ``org_id``."""
+    from app import app
+    from services.tax_protest_batch import run_batch_job
+
+    with app.app_context():
+        job = run_batch_job(job_id, org_id)
+        if job is None:
+            return {'ok': False, 'reason': 'job_not_found'}
+        return {
+            'ok': job.status == job.STATUS_COMPLETED,
+            'status': job.status,
+            'processed_contacts': job.processed_contacts,
+            'found': job.found_count,
+        }
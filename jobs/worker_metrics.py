@@ -0,0 +1,84 @@
+"""
+Per-queue wait time and throughput for the RQ worker pool.
+
+Each finished job adds to a per-minute Redis hash for its queue (jobs,
+failed, total wait and run milliseconds). Wait is enqueue to start, so it
+shows a queue that needs more workers; run time shows why. Buckets expire
+after a day and :func:`snapshot` sums the most recent ones.
+"""
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+KEY_PREFIX = 'worker:metrics'
+BUCKET_SECONDS = 60
+BUCKET_TTL_SECONDS = 24 * 60 * 60
+
+
+def _bucket(at: float) -> int:
+    return int(at // BUCKET_SECONDS)
+
+
+def _key(queue: str, bucket: int) -> str:
+    return f'{KEY_PREFIX}:{queue}:{bucket}'
+
+
+def wait_seconds(enqueued_at: Optional[datetime], started_at: datetime) -> float:
+    """Seconds a job sat on its queue; RQ may hand back naive UTC times."""
+    if enqueued_at is None:
+        return 0.0
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (started_at - enqueued_at).total_seconds())
+
+
+def record_job(
+    conn,
+    queue: str,
+    *,
+    wait: float,
+    run: float,
+    ok: bool,
+    at: Optional[float] = None,
+) -> None:
+    key = _key(queue, _bucket(time.time() if at is None else at))
+    pipe = conn.pipeline()
+    pipe.hincrby(key, 'jobs', 1)
+    if not ok:
+        pipe.hincrby(key, 'failed', 1)
+    pipe.hincrby(key, 'wait_ms', int(wait * 1000))
+    pipe.hincrby(key, 'run_ms', int(run * 1000))
+    pipe.expire(key, BUCKET_TTL_SECONDS)
+    pipe.execute()
+
+
+def snapshot(
+    conn,
+    queues: Iterable[str],
+    *,
+    minutes: int = 5,
+    at: Optional[float] = None,
+) -> dict[str, dict]:
+    """Totals per queue over the last ``minutes`` buckets."""
+    current = _bucket(time.time() if at is None else at)
+    buckets = range(current - minutes + 1, current + 1)
+    summary: dict[str, dict] = {}
+    for queue in queues:
+        totals = {'jobs': 0, 'failed': 0, 'wait_ms': 0, 'run_ms': 0}
+        for bucket in buckets:
+            for field, value in (conn.hgetall(_key(queue, bucket)) or {}).items():
+                if isinstance(field, bytes):
+                    field = field.decode('utf-8')
+                if field in totals:
+                    totals[field] += int(value)
+        jobs = totals['jobs']
+        summary[queue] = {
+            'jobs': jobs,
+            'failed': totals['failed'],
+            'per_minute': round(jobs / minutes, 2),
+            'avg_wait_s': round(totals['wait_ms'] / jobs / 1000, 2) if jobs else 0.0,
+            'avg_run_s': round(totals['run_ms'] / jobs / 1000, 2) if jobs else 0.0,
+        }
+    return summary
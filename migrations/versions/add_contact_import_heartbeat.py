@@ -0,0 +1,44 @@
+"""Heartbeat on contact_import_jobs.
+
+Adds contact_import_jobs.heartbeat_at, refreshed with every committed chunk,
+so a job left running by a killed worker can be detected and requeued.
+
+Revision ID: add_contact_import_heartbeat
+Revises: add_extraction_run_page_metrics
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_contact_import_heartbeat'
+down_revision = 'add_extraction_run_page_metrics'
+branch_labels = None
+depends_on = None
+
+_TABLE = 'contact_import_jobs'
+_COLUMN = 'heartbeat_at'
+
+
+def _column_exists(conn, table_name, column_name):
+    tables = inspect(conn).get_table_names()
+    if table_name not in tables:
+        return False
+    return column_name in {
+        col['name'] for col in inspect(conn).get_columns(table_name)
+    }
+
+
+def upgrade():
+    conn = op.get_bind()
+    if _TABLE not in inspect(conn).get_table_names():
+        return
+    if not _column_exists(conn, _TABLE, _COLUMN):
+        op.add_column(_TABLE, sa.Column(_COLUMN, sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    conn = op.get_bind()
+    if _column_exists(conn, _TABLE, _COLUMN):
+        op.drop_column(_TABLE, _COLUMN)
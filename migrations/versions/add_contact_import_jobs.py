@@ -0,0 +1,114 @@
+"""Contact import jobs.
+
+Revision ID: add_contact_import_jobs
+Revises: add_notification_outbox_claim_index
+Create Date: 2026-10-16
+
+Adds:
+- contact_import_jobs (Contacts page imports processed by the contact_import
+  RQ queue, with a per-chunk checkpoint for resumable retries)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_contact_import_jobs'
+down_revision = 'add_notification_outbox_claim_index'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(conn, table_name):
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade():
+    conn = op.get_bind()
+    if not _table_exists(conn, 'contact_import_jobs'):
+        op.create_table(
+            'contact_import_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('organization_id', sa.Integer(), nullable=False),
+            sa.Column('actor_user_id', sa.Integer(), nullable=False),
+            sa.Column('owner_user_id', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('filename', sa.String(length=500), nullable=False),
+            sa.Column('mime_type', sa.String(length=100), nullable=True),
+            sa.Column('file_data', sa.LargeBinary(), nullable=True),
+            sa.Column('total_rows', sa.Integer(), nullable=True),
+            sa.Column('processed_rows', sa.Integer(), nullable=False),
+            sa.Column('created_count', sa.Integer(), nullable=False),
+            sa.Column('duplicate_count', sa.Integer(), nullable=False),
+            sa.Column('invalid_count', sa.Integer(), nullable=False),
+            sa.Column('invalid_phone_count', sa.Integer(), nullable=False),
+            sa.Column('missing_name_count', sa.Integer(), nullable=False),
+            sa.Column('error_details', sa.JSON(), nullable=True),
+            sa.Column('warnings', sa.JSON(), nullable=True),
+            sa.Column('column_mapping', sa.JSON(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id', name='pk_contact_import_jobs'),
+            sa.ForeignKeyConstraint(
+                ['organization_id'], ['organizations.id'],
+                name='fk_contact_import_jobs_org', ondelete='RESTRICT',
+            ),
+            sa.ForeignKeyConstraint(
+                ['actor_user_id'], ['user.id'],
+                name='fk_contact_import_jobs_actor', ondelete='CASCADE',
+            ),
+            sa.ForeignKeyConstraint(
+                ['owner_user_id'], ['user.id'],
+                name='fk_contact_import_jobs_owner', ondelete='CASCADE',
+            ),
+        )
+        op.create_index(
+            'ix_contact_import_jobs_organization_id',
+            'contact_import_jobs',
+            ['organization_id'],
+        )
+        op.create_index(
+            'ix_contact_import_jobs_actor_user_id',
+            'contact_import_jobs',
+            ['actor_user_id'],
+        )
+        op.create_index(
+            'ix_contact_import_jobs_org_status',
+            'contact_import_jobs',
+            ['organization_id', 'status'],
+        )
+
+    if conn.dialect.name == 'postgresql' and _table_exists(conn, 'contact_import_jobs'):
+        op.execute('ALTER TABLE contact_import_jobs ENABLE ROW LEVEL SECURITY')
+        op.execute(
+            'DROP POLICY IF EXISTS tenant_isolation_contact_import_jobs '
+            'ON contact_import_jobs'
+        )
+        op.execute("""
+            CREATE POLICY tenant_isolation_contact_import_jobs ON contact_import_jobs
+            FOR ALL
+            USING (
+                organization_id = current_setting(
+                    'app.current_org_id', true
+                )::integer
+            )
+            WITH CHECK (
+                organization_id = current_setting(
+                    'app.current_org_id', true
+                )::integer
+            )
+        """)
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql' and _table_exists(conn, 'contact_import_jobs'):
+        op.execute(
+            'DROP POLICY IF EXISTS tenant_isolation_contact_import_jobs '
+            'ON contact_import_jobs'
+        )
+    if _table_exists(conn, 'contact_import_jobs'):
+        op.drop_table('contact_import_jobs')
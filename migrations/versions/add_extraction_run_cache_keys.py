@@ -0,0 +1,78 @@
+"""Extraction cache keys on document_extraction_runs.
+
+Adds document_extraction_runs.schema_version, page_fingerprints and
+cached_from_run_id so a re-upload of the same PDF (or a packet sharing pages
+with one) can reuse a prior completed run instead of re-sending every page
+to the vision model.
+
+Revision ID: add_extraction_run_cache_keys
+Revises: add_tax_protest_batch_jobs
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_extraction_run_cache_keys'
+down_revision = 'add_tax_protest_batch_jobs'
+branch_labels = None
+depends_on = None
+
+_TABLE = 'document_extraction_runs'
+_INDEX = 'ix_document_extraction_runs_cache'
+_FK = 'fk_document_extraction_runs_cached_from'
+
+
+def _column_exists(conn, table_name, column_name):
+    tables = inspect(conn).get_table_names()
+    if table_name not in tables:
+        return False
+    return column_name in {
+        col['name'] for col in inspect(conn).get_columns(table_name)
+    }
+
+
+def _has_index(conn, table_name, index_name):
+    return any(
+        idx['name'] == index_name for idx in inspect(conn).get_indexes(table_name)
+    )
+
+
+def upgrade():
+    conn = op.get_bind()
+    if _TABLE not in inspect(conn).get_table_names():
+        return
+
+    if not _column_exists(conn, _TABLE, 'schema_version'):
+        op.add_column(_TABLE, sa.Column('schema_version', sa.String(length=64), nullable=True))
+    if not _column_exists(conn, _TABLE, 'page_fingerprints'):
+        op.add_column(_TABLE, sa.Column('page_fingerprints', sa.JSON(), nullable=True))
+    if not _column_exists(conn, _TABLE, 'cached_from_run_id'):
+        op.add_column(_TABLE, sa.Column('cached_from_run_id', sa.Integer(), nullable=True))
+        if conn.dialect.name == 'postgresql':
+            op.create_foreign_key(
+                _FK, _TABLE, _TABLE,
+                ['cached_from_run_id'], ['id'],
+                ondelete='SET NULL',
+            )
+    if not _has_index(conn, _TABLE, _INDEX):
+        op.create_index(
+            _INDEX, _TABLE,
+            ['organization_id', 'extraction_type', 'schema_version', 'model'],
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if _TABLE not in inspect(conn).get_table_names():
+        return
+    if _has_index(conn, _TABLE, _INDEX):
+        op.drop_index(_INDEX, table_name=_TABLE)
+    if _column_exists(conn, _TABLE, 'cached_from_run_id'):
+        if conn.dialect.name == 'postgresql':
+            op.drop_constraint(_FK, _TABLE, type_='foreignkey')
+        op.drop_column(_TABLE, 'cached_from_run_id')
+    for column in ('page_fingerprints', 'schema_version'):
+        if _column_exists(conn, _TABLE, column):
+            op.drop_column(_TABLE, column)
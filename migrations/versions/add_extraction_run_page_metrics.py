@@ -0,0 +1,46 @@
+"""Page-image metrics on document_extraction_runs.
+
+Adds document_extraction_runs.pages_total, pages_sent and image_bytes so the
+adaptive page renderer's savings are visible per extracted document.
+
+Revision ID: add_extraction_run_page_metrics
+Revises: add_extraction_run_cache_keys
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_extraction_run_page_metrics'
+down_revision = 'add_extraction_run_cache_keys'
+branch_labels = None
+depends_on = None
+
+_TABLE = 'document_extraction_runs'
+_COLUMNS = ('pages_total', 'pages_sent', 'image_bytes')
+
+
+def _column_exists(conn, table_name, column_name):
+    tables = inspect(conn).get_table_names()
+    if table_name not in tables:
+        return False
+    return column_name in {
+        col['name'] for col in inspect(conn).get_columns(table_name)
+    }
+
+
+def upgrade():
+    conn = op.get_bind()
+    if _TABLE not in inspect(conn).get_table_names():
+        return
+    for column in _COLUMNS:
+        if not _column_exists(conn, _TABLE, column):
+            op.add_column(_TABLE, sa.Column(column, sa.Integer(), nullable=True))
+
+
+def downgrade():
+    conn = op.get_bind()
+    for column in reversed(_COLUMNS):
+        if _column_exists(conn, _TABLE, column):
+            op.drop_column(_TABLE, column)
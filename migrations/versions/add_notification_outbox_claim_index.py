@@ -0,0 +1,37 @@
+"""Index the notification outbox claim query.
+
+Revision ID: add_notification_outbox_claim_index
+Revises: add_agent_api_tokens
+Create Date: 2026-10-16
+
+The outbox worker claims queued deliveries per org ordered by
+coalesce(scheduled_for, created_at) with FOR UPDATE SKIP LOCKED. A partial
+index over queued rows keeps that an index range scan no matter how many
+sent rows the table accumulates.
+"""
+from alembic import op
+
+
+revision = 'add_notification_outbox_claim_index'
+down_revision = 'add_agent_api_tokens'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_notification_deliveries_claim "
+        "ON notification_deliveries "
+        "(organization_id, (coalesce(scheduled_for, created_at)), id) "
+        "WHERE status = 'queued'"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_notification_deliveries_claim")
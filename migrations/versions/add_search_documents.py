@@ -0,0 +1,120 @@
+"""Search documents for contacts, transactions, and participants.
+
+Revision ID: add_search_documents
+Revises: add_contact_import_jobs
+Create Date: 2026-10-16
+
+Adds a maintained, lowercased search_document column to contact,
+transactions, and transaction_participants, backfills it, and on PostgreSQL
+indexes it with pg_trgm so global search and contact list filtering use a
+GIN index instead of ILIKE over every column.
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_search_documents'
+down_revision = 'add_contact_import_jobs'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 2000
+
+# table -> (text fields, phone fields); mirrors each model's SEARCH_FIELDS.
+SEARCH_TABLES = {
+    'contact': (
+        ('first_name', 'last_name', 'email', 'street_address', 'city',
+         'state', 'zip_code'),
+        ('phone',),
+    ),
+    'transactions': (('street_address', 'city', 'state', 'zip_code'), ()),
+    'transaction_participants': (('name', 'email', 'company'), ('phone',)),
+}
+
+
+def _column_exists(conn, table_name, column_name):
+    tables = inspect(conn).get_table_names()
+    if table_name not in tables:
+        return False
+    return column_name in {
+        col['name'] for col in inspect(conn).get_columns(table_name)
+    }
+
+
+def _document(parts, phones):
+    """Frozen copy of models.build_search_document."""
+    pieces = [str(part) for part in parts if part]
+    for phone in phones:
+        if phone:
+            pieces.append(str(phone))
+            digits = re.sub(r'\D', '', str(phone))
+            if digits:
+                pieces.append(digits)
+    return ' '.join(' '.join(pieces).lower().split()) or None
+
+
+def _backfill(conn, table_name, fields, phone_fields):
+    table = sa.table(
+        table_name,
+        sa.column('id', sa.Integer),
+        sa.column('search_document', sa.Text),
+        *(sa.column(name, sa.String) for name in fields + phone_fields),
+    )
+    update = (
+        sa.update(table)
+        .where(table.c.id == sa.bindparam('row_id'))
+        .values(search_document=sa.bindparam('doc'))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(BACKFILL_BATCH)
+        ).mappings().all()
+        if not rows:
+            return
+        conn.execute(update, [
+            {
+                'row_id': row['id'],
+                'doc': _document(
+                    [row[name] for name in fields],
+                    [row[name] for name in phone_fields],
+                ),
+            }
+            for row in rows
+        ])
+        last_id = rows[-1]['id']
+
+
+def upgrade():
+    conn = op.get_bind()
+    for table_name, (fields, phone_fields) in SEARCH_TABLES.items():
+        if not _column_exists(conn, table_name, 'id'):
+            continue
+        if not _column_exists(conn, table_name, 'search_document'):
+            op.add_column(
+                table_name, sa.Column('search_document', sa.Text(), nullable=True),
+            )
+        _backfill(conn, table_name, fields, phone_fields)
+
+    if conn.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table_name in SEARCH_TABLES:
+            op.execute(
+                f'CREATE INDEX IF NOT EXISTS ix_{table_name}_search_document_trgm '
+                f'ON {table_name} USING gin (search_document gin_trgm_ops)'
+            )
+
+
+def downgrade():
+    conn = op.get_bind()
+    for table_name in SEARCH_TABLES:
+        if conn.dialect.name == 'postgresql':
+            op.execute(f'DROP INDEX IF EXISTS ix_{table_name}_search_document_trgm')
+        if _column_exists(conn, table_name, 'search_document'):
+            op.drop_column(table_name, 'search_document')
@@ -0,0 +1,86 @@
+"""Short-query prefix indexes and SQLite FTS5 search indexes.
+
+On PostgreSQL, adds lower(...) text_pattern_ops indexes on the columns that
+queries shorter than a trigram (under three characters) prefix-match:
+contact first/last name, transaction street address, and participant name.
+
+On SQLite, adds the trigram FTS5 table and sync triggers beside contact,
+transactions, and transaction_participants (models.sqlite_search_fts_ddl
+creates them for new databases) and fills them from search_document.
+
+Revision ID: add_search_prefix_indexes
+Revises: add_tax_protest_batch_subjects
+Create Date: 2026-10-17
+"""
+from alembic import op
+from sqlalchemy import inspect
+
+
+revision = 'add_search_prefix_indexes'
+down_revision = 'add_tax_protest_batch_subjects'
+branch_labels = None
+depends_on = None
+
+# table -> PREFIX_SEARCH_FIELDS of its model.
+PREFIX_COLUMNS = {
+    'contact': ('first_name', 'last_name'),
+    'transactions': ('street_address',),
+    'transaction_participants': ('name',),
+}
+FTS_SUFFIX = '_search_fts'
+
+
+def _fts_ddl(table_name):
+    """Frozen copy of models.sqlite_search_fts_ddl."""
+    fts = f'{table_name}{FTS_SUFFIX}'
+    reindex_old = (
+        f"INSERT INTO {fts}({fts}, rowid, search_document) "
+        f"VALUES ('delete', old.id, old.search_document);"
+    )
+    index_new = (
+        f"INSERT INTO {fts}(rowid, search_document) "
+        f"VALUES (new.id, new.search_document);"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"search_document, content='{table_name}', content_rowid='id', "
+        f"tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} "
+        f"BEGIN {index_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} "
+        f"BEGIN {reindex_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF search_document "
+        f"ON {table_name} BEGIN {reindex_old} {index_new} END",
+    ]
+
+
+def upgrade():
+    conn = op.get_bind()
+    tables = set(inspect(conn).get_table_names())
+    for table_name, columns in PREFIX_COLUMNS.items():
+        if table_name not in tables:
+            continue
+        if conn.dialect.name == 'postgresql':
+            for column in columns:
+                op.execute(
+                    f'CREATE INDEX IF NOT EXISTS ix_{table_name}_{column}_prefix '
+                    f'ON {table_name} (lower({column}) text_pattern_ops)'
+                )
+        elif conn.dialect.name == 'sqlite':
+            for statement in _fts_ddl(table_name):
+                op.execute(statement)
+            fts = f'{table_name}{FTS_SUFFIX}'
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    conn = op.get_bind()
+    for table_name, columns in PREFIX_COLUMNS.items():
+        if conn.dialect.name == 'postgresql':
+            for column in columns:
+                op.execute(f'DROP INDEX IF EXISTS ix_{table_name}_{column}_prefix')
+        elif conn.dialect.name == 'sqlite':
+            fts = f'{table_name}{FTS_SUFFIX}'
+            for trigger in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {fts}_{trigger}')
+            op.execute(f'DROP TABLE IF EXISTS {fts}')
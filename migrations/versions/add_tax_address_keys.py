@@ -0,0 +1,97 @@
+"""Normalized situs address keys for HCAD and Chambers.
+
+Adds hcad_properties.normalized_site_addr and
+chambers_properties.normalized_site_addr, matching the column Liberty and
+Fort Bend already carry, so tax protest address lookup is one indexed
+equality probe per county.
+
+On PostgreSQL the keys are backfilled in place with a SQL twin of
+services.tax_protest_service.normalize_address; elsewhere they are filled by
+the next scripts/import_tax_data.py run. Until then the lookup falls back to
+the per-county street/number searches.
+
+Revision ID: add_tax_address_keys
+Revises: add_tax_dataset_versions
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_tax_address_keys'
+down_revision = 'add_tax_dataset_versions'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of normalize_address's suffix table, in its replacement order.
+_SUFFIX_REPLACEMENTS = (
+    (' STREET', ' ST'), (' DRIVE', ' DR'), (' AVENUE', ' AVE'),
+    (' BOULEVARD', ' BLVD'), (' LANE', ' LN'), (' COURT', ' CT'),
+    (' CIRCLE', ' CIR'), (' PLACE', ' PL'), (' ROAD', ' RD'),
+    (' HIGHWAY', ' HWY'), (' PARKWAY', ' PKWY'),
+    ('FARM TO MARKET', 'FM'),
+)
+
+_KEYS = (
+    ('hcad_properties', 'ix_hcad_normalized_site_addr', 'site_addr_1'),
+    (
+        'chambers_properties', 'ix_chambers_normalized_site_addr',
+        "concat_ws(' ', prop_street_number, prop_street_dir, prop_street)",
+    ),
+)
+
+
+def _address_key_sql(expr):
+    expr = f"UPPER(BTRIM({expr}))"
+    for old, new in _SUFFIX_REPLACEMENTS:
+        expr = f"REPLACE({expr}, '{old}', '{new}')"
+    expr = f"REGEXP_REPLACE({expr}, '\\s*(APT|UNIT|STE|SUITE|#)\\s*\\S*$', '')"
+    expr = f"BTRIM(REGEXP_REPLACE({expr}, '\\s+', ' ', 'g'))"
+    return f"NULLIF({expr}, '')"
+
+
+def _column_exists(conn, table_name, column_name):
+    tables = inspect(conn).get_table_names()
+    if table_name not in tables:
+        return False
+    return column_name in {
+        col['name'] for col in inspect(conn).get_columns(table_name)
+    }
+
+
+def _has_index(conn, table_name, index_name):
+    return any(
+        idx['name'] == index_name for idx in inspect(conn).get_indexes(table_name)
+    )
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    for table_name, index_name, source_expr in _KEYS:
+        if table_name not in inspect(conn).get_table_names():
+            continue
+        if not _column_exists(conn, table_name, 'normalized_site_addr'):
+            op.add_column(
+                table_name,
+                sa.Column('normalized_site_addr', sa.String(length=200), nullable=True),
+            )
+            if conn.dialect.name == 'postgresql':
+                op.execute(
+                    f"UPDATE {table_name} "
+                    f"SET normalized_site_addr = {_address_key_sql(source_expr)}"
+                )
+        if not _has_index(conn, table_name, index_name):
+            op.create_index(index_name, table_name, ['normalized_site_addr'])
+
+
+def downgrade():
+    conn = op.get_bind()
+    for table_name, index_name, _source_expr in _KEYS:
+        if not _column_exists(conn, table_name, 'normalized_site_addr'):
+            continue
+        if _has_index(conn, table_name, index_name):
+            op.drop_index(index_name, table_name=table_name)
+        op.drop_column(table_name, 'normalized_site_addr')
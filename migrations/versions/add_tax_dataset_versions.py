@@ -0,0 +1,45 @@
+"""Per-county tax dataset versions for export bundle invalidation.
+
+Revision ID: add_tax_dataset_versions
+Revises: add_tax_subdivision_comparables
+Create Date: 2026-10-16
+
+scripts/import_tax_data.py bumps a county's version after every load; tax
+protest export bundles cached under an older version are simply never read
+again.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_tax_dataset_versions'
+down_revision = 'add_tax_subdivision_comparables'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(conn, table_name):
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade():
+    conn = op.get_bind()
+    if _table_exists(conn, 'tax_dataset_versions'):
+        return
+    op.create_table(
+        'tax_dataset_versions',
+        sa.Column('source', sa.String(length=20), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column(
+            'loaded_at', sa.DateTime(), nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.PrimaryKeyConstraint('source', name='pk_tax_dataset_versions'),
+    )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if _table_exists(conn, 'tax_dataset_versions'):
+        op.drop_table('tax_dataset_versions')
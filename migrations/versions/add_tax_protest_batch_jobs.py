@@ -0,0 +1,109 @@
+"""Tax protest batch jobs.
+
+Revision ID: add_tax_protest_batch_jobs
+Revises: add_tax_address_keys
+Create Date: 2026-10-16
+
+Adds:
+- tax_protest_batch_jobs (tax protest runs over a contact group, processed
+  by the tax_protest RQ queue, with per-contact results for resumable
+  retries and the combined XLSX workbook)
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_tax_protest_batch_jobs'
+down_revision = 'add_tax_address_keys'
+branch_labels = None
+depends_on = None
+
+
+def _table_exists(conn, table_name):
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade():
+    conn = op.get_bind()
+    if not _table_exists(conn, 'tax_protest_batch_jobs'):
+        op.create_table(
+            'tax_protest_batch_jobs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('organization_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('group_id', sa.Integer(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('contact_ids', sa.JSON(), nullable=False),
+            sa.Column('total_contacts', sa.Integer(), nullable=False),
+            sa.Column('processed_contacts', sa.Integer(), nullable=False),
+            sa.Column('found_count', sa.Integer(), nullable=False),
+            sa.Column('error_count', sa.Integer(), nullable=False),
+            sa.Column('results', sa.JSON(), nullable=True),
+            sa.Column('workbook_data', sa.LargeBinary(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=True),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id', name='pk_tax_protest_batch_jobs'),
+            sa.ForeignKeyConstraint(
+                ['organization_id'], ['organizations.id'],
+                name='fk_tax_protest_batch_jobs_org', ondelete='RESTRICT',
+            ),
+            sa.ForeignKeyConstraint(
+                ['user_id'], ['user.id'],
+                name='fk_tax_protest_batch_jobs_user', ondelete='CASCADE',
+            ),
+            sa.ForeignKeyConstraint(
+                ['group_id'], ['contact_group.id'],
+                name='fk_tax_protest_batch_jobs_group', ondelete='SET NULL',
+            ),
+        )
+        op.create_index(
+            'ix_tax_protest_batch_jobs_organization_id',
+            'tax_protest_batch_jobs',
+            ['organization_id'],
+        )
+        op.create_index(
+            'ix_tax_protest_batch_jobs_user_id',
+            'tax_protest_batch_jobs',
+            ['user_id'],
+        )
+        op.create_index(
+            'ix_tax_protest_batch_jobs_org_status',
+            'tax_protest_batch_jobs',
+            ['organization_id', 'status'],
+        )
+
+    if conn.dialect.name == 'postgresql' and _table_exists(conn, 'tax_protest_batch_jobs'):
+        op.execute('ALTER TABLE tax_protest_batch_jobs ENABLE ROW LEVEL SECURITY')
+        op.execute(
+            'DROP POLICY IF EXISTS tenant_isolation_tax_protest_batch_jobs '
+            'ON tax_protest_batch_jobs'
+        )
+        op.execute("""
+            CREATE POLICY tenant_isolation_tax_protest_batch_jobs ON tax_protest_batch_jobs
+            FOR ALL
+            USING (
+                organization_id = current_setting(
+                    'app.current_org_id', true
+                )::integer
+            )
+            WITH CHECK (
+                organization_id = current_setting(
+                    'app.current_org_id', true
+                )::integer
+            )
+        """)
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name == 'postgresql' and _table_exists(conn, 'tax_protest_batch_jobs'):
+        op.execute(
+            'DROP POLICY IF EXISTS tenant_isolation_tax_protest_batch_jobs '
+            'ON tax_protest_batch_jobs'
+        )
+    if _table_exists(conn, 'tax_protest_batch_jobs'):
+        op.drop_table('tax_protest_batch_jobs')
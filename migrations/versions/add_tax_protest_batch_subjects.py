@@ -0,0 +1,45 @@
+"""Resolved subjects on tax_protest_batch_jobs.
+
+Adds tax_protest_batch_jobs.subjects, the contacts whose property lookup and
+subdivision extraction are done but whose subdivision group has not been
+compared yet, so a retried batch does not repeat that work.
+
+Revision ID: add_tax_protest_batch_subjects
+Revises: add_contact_import_heartbeat
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_tax_protest_batch_subjects'
+down_revision = 'add_contact_import_heartbeat'
+branch_labels = None
+depends_on = None
+
+_TABLE = 'tax_protest_batch_jobs'
+_COLUMN = 'subjects'
+
+
+def _column_exists(conn, table_name, column_name):
+    tables = inspect(conn).get_table_names()
+    if table_name not in tables:
+        return False
+    return column_name in {
+        col['name'] for col in inspect(conn).get_columns(table_name)
+    }
+
+
+def upgrade():
+    conn = op.get_bind()
+    if _TABLE not in inspect(conn).get_table_names():
+        return
+    if not _column_exists(conn, _TABLE, _COLUMN):
+        op.add_column(_TABLE, sa.Column(_COLUMN, sa.JSON(), nullable=True))
+
+
+def downgrade():
+    conn = op.get_bind()
+    if _column_exists(conn, _TABLE, _COLUMN):
+        op.drop_column(_TABLE, _COLUMN)
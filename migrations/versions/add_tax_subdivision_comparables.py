@@ -0,0 +1,90 @@
+"""Precomputed subdivision comparables store for tax protest.
+
+Adds:
+- hcad_properties.max_sq_ft (max building im_sq_ft per acct)
+- tax_subdivision_comparables (HCAD + Chambers comparable-eligible homes
+  keyed by normalized subdivision text, zip, and market value)
+
+The store starts empty and the service keeps using the legacy queries until
+it is filled. Populate it without re-importing the county files with:
+    python3 scripts/import_tax_data.py comparables
+
+Revision ID: add_tax_subdivision_comparables
+Revises: add_transaction_address_index
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_tax_subdivision_comparables'
+down_revision = 'add_transaction_address_index'
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(conn, table_name, column_name):
+    tables = inspect(conn).get_table_names()
+    if table_name not in tables:
+        return False
+    return column_name in {
+        col['name'] for col in inspect(conn).get_columns(table_name)
+    }
+
+
+def _table_exists(conn, table_name):
+    return table_name in inspect(conn).get_table_names()
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    if _table_exists(conn, 'hcad_properties') and not _column_exists(
+        conn, 'hcad_properties', 'max_sq_ft'
+    ):
+        op.add_column(
+            'hcad_properties', sa.Column('max_sq_ft', sa.Integer(), nullable=True),
+        )
+
+    if not _table_exists(conn, 'tax_subdivision_comparables'):
+        op.create_table(
+            'tax_subdivision_comparables',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('source', sa.String(length=20), nullable=False),
+            sa.Column('subdivision_key', sa.String(length=500), nullable=False),
+            sa.Column('zip_code', sa.String(length=10), nullable=True),
+            sa.Column('market_value', sa.Integer(), nullable=False),
+            sa.Column('sq_ft', sa.Integer(), nullable=True),
+            sa.Column('property_id', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id', name='pk_tax_subdivision_comparables'),
+        )
+        op.create_index(
+            'ix_tax_subdivision_comparables_lookup',
+            'tax_subdivision_comparables',
+            ['source', 'subdivision_key', 'zip_code', 'market_value'],
+        )
+        op.create_index(
+            'ix_tax_subdivision_comparables_value',
+            'tax_subdivision_comparables',
+            ['source', 'subdivision_key', 'market_value'],
+        )
+
+    if conn.dialect.name == 'postgresql':
+        # Fuzzy HCAD subdivisions and Chambers match terms are substring
+        # matches; trigram keeps those indexed on the compact table.
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute(
+            'CREATE INDEX IF NOT EXISTS ix_tax_subdivision_comparables_key_trgm '
+            'ON tax_subdivision_comparables USING gin (subdivision_key gin_trgm_ops)'
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    if _table_exists(conn, 'tax_subdivision_comparables'):
+        if conn.dialect.name == 'postgresql':
+            op.execute('DROP INDEX IF EXISTS ix_tax_subdivision_comparables_key_trgm')
+        op.drop_table('tax_subdivision_comparables')
+    if _column_exists(conn, 'hcad_properties', 'max_sq_ft'):
+        op.drop_column('hcad_properties', 'max_sq_ft')
@@ -0,0 +1,188 @@
+"""Persisted address key and token index for contract matching.
+
+Revision ID: add_transaction_address_index
+Revises: add_search_documents
+Create Date: 2026-10-16
+
+Adds:
+- transactions.address_match_key (+ org/key index)
+- transaction_address_tokens (one row per normalized address token)
+
+Both are backfilled here; scripts/backfill_transaction_address_index.py
+rebuilds them if the normalization rules ever change.
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+revision = 'add_transaction_address_index'
+down_revision = 'add_search_documents'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 2000
+
+
+def _column_exists(conn, table_name, column_name):
+    tables = inspect(conn).get_table_names()
+    if table_name not in tables:
+        return False
+    return column_name in {
+        col['name'] for col in inspect(conn).get_columns(table_name)
+    }
+
+
+def _table_exists(conn, table_name):
+    return table_name in inspect(conn).get_table_names()
+
+
+def _norm_address(address):
+    """Frozen copy of models.normalize_match_address."""
+    if not address:
+        return ''
+    s = address.lower().strip()
+    s = re.sub(r'\b(street|st|avenue|ave|road|rd|drive|dr|lane|ln|court|ct|boulevard|blvd)\b', '', s)
+    s = re.sub(r'[^\w\s]', '', s)
+    s = re.sub(r'\s+', ' ', s).strip()
+    return s
+
+
+def _backfill(conn):
+    transactions = sa.table(
+        'transactions',
+        sa.column('id', sa.Integer),
+        sa.column('organization_id', sa.Integer),
+        sa.column('street_address', sa.String),
+        sa.column('address_match_key', sa.String),
+    )
+    tokens = sa.table(
+        'transaction_address_tokens',
+        sa.column('transaction_id', sa.Integer),
+        sa.column('token', sa.String),
+        sa.column('organization_id', sa.Integer),
+    )
+    update = (
+        sa.update(transactions)
+        .where(transactions.c.id == sa.bindparam('row_id'))
+        .values(address_match_key=sa.bindparam('key'))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(
+                transactions.c.id,
+                transactions.c.organization_id,
+                transactions.c.street_address,
+            )
+            .where(transactions.c.id > last_id)
+            .order_by(transactions.c.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            return
+        keys = []
+        token_rows = []
+        for row_id, org_id, street_address in rows:
+            key = _norm_address(street_address)
+            keys.append({'row_id': row_id, 'key': key or None})
+            if org_id is None:
+                continue
+            token_rows.extend(
+                {'transaction_id': row_id, 'token': token, 'organization_id': org_id}
+                for token in sorted(set(key.split()))
+            )
+        conn.execute(update, keys)
+        conn.execute(
+            sa.delete(tokens).where(
+                tokens.c.transaction_id.in_([row[0] for row in rows])
+            )
+        )
+        if token_rows:
+            conn.execute(sa.insert(tokens), token_rows)
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    conn = op.get_bind()
+    if not _table_exists(conn, 'transactions'):
+        return
+
+    if not _column_exists(conn, 'transactions', 'address_match_key'):
+        op.add_column(
+            'transactions',
+            sa.Column('address_match_key', sa.String(length=200), nullable=True),
+        )
+        op.create_index(
+            'ix_transactions_org_address_match_key',
+            'transactions',
+            ['organization_id', 'address_match_key'],
+        )
+
+    if not _table_exists(conn, 'transaction_address_tokens'):
+        op.create_table(
+            'transaction_address_tokens',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('transaction_id', sa.Integer(), nullable=False),
+            sa.Column('token', sa.String(length=100), nullable=False),
+            sa.Column('organization_id', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('id', name='pk_transaction_address_tokens'),
+            sa.ForeignKeyConstraint(
+                ['transaction_id'], ['transactions.id'],
+                name='fk_transaction_address_tokens_tx', ondelete='CASCADE',
+            ),
+            sa.ForeignKeyConstraint(
+                ['organization_id'], ['organizations.id'],
+                name='fk_transaction_address_tokens_org', ondelete='RESTRICT',
+            ),
+        )
+        op.create_index(
+            'ix_transaction_address_tokens_org_token',
+            'transaction_address_tokens',
+            ['organization_id', 'token'],
+        )
+        op.create_index(
+            'ix_transaction_address_tokens_transaction',
+            'transaction_address_tokens',
+            ['transaction_id'],
+        )
+
+    _backfill(conn)
+
+    if conn.dialect.name == 'postgresql':
+        op.execute('ALTER TABLE transaction_address_tokens ENABLE ROW LEVEL SECURITY')
+        op.execute(
+            'DROP POLICY IF EXISTS tenant_isolation_transaction_address_tokens '
+            'ON transaction_address_tokens'
+        )
+        op.execute("""
+            CREATE POLICY tenant_isolation_transaction_address_tokens
+            ON transaction_address_tokens
+            FOR ALL
+            USING (
+                organization_id = current_setting(
+                    'app.current_org_id', true
+                )::integer
+            )
+            WITH CHECK (
+                organization_id = current_setting(
+                    'app.current_org_id', true
+                )::integer
+            )
+        """)
+
+
+def downgrade():
+    conn = op.get_bind()
+    if _table_exists(conn, 'transaction_address_tokens'):
+        if conn.dialect.name == 'postgresql':
+            op.execute(
+                'DROP POLICY IF EXISTS tenant_isolation_transaction_address_tokens '
+                'ON transaction_address_tokens'
+            )
+        op.drop_table('transaction_address_tokens')
+    if _column_exists(conn, 'transactions', 'address_match_key'):
+        op.drop_index('ix_transactions_org_address_match_key', table_name='transactions')
+        op.drop_column('transactions', 'address_match_key')
@@ -1,5 +1,7 @@
 # models.py
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event, inspect
+from sqlalchemy.orm import Session
 from flask_login import UserMixin
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -289,6 +291,108 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+def build_search_document(*parts, phones=()):
+    """Lowercased, whitespace-collapsed text matched by global/list search.
+
+    Phones contribute their formatted value and their bare digits, so both
+    "(832) 555" and "8325550199" find the same contact.
+    """
+    pieces = [str(part) for part in parts if part]
+    for phone in phones:
+        if phone:
+            pieces.append(str(phone))
+            digits = re.sub(r'\D', '', str(phone))
+            if digits:
+                pieces.append(digits)
+    return ' '.join(' '.join(pieces).lower().split()) or None
+
+
+class SearchDocumentMixin:
+    """Keeps ``search_document`` in sync with the model's SEARCH_FIELDS.
+
+    A mapper event refreshes it on every ORM insert/update. Core and bulk
+    INSERTs bypass mapper events and must set it with ``search_document_for``.
+    PostgreSQL indexes the column with pg_trgm (see
+    add_search_documents migration) so substring search stays indexed;
+    SQLite keeps a trigram FTS5 table beside each model's table, filled by
+    triggers (see sqlite_search_fts_ddl). Queries too short for a trigram
+    index match PREFIX_SEARCH_FIELDS instead (services/search_index).
+    """
+    SEARCH_FIELDS = ()
+    SEARCH_PHONE_FIELDS = ()
+    PREFIX_SEARCH_FIELDS = ()
+
+    search_document = db.Column(db.Text)
+
+    @classmethod
+    def search_document_for(cls, values):
+        return build_search_document(
+            *(values.get(name) for name in cls.SEARCH_FIELDS
+              if name not in cls.SEARCH_PHONE_FIELDS),
+            phones=[values.get(name) for name in cls.SEARCH_PHONE_FIELDS],
+        )
+
+    def sync_search_document(self):
+        self.search_document = self.search_document_for({
+            name: getattr(self, name) for name in self.SEARCH_FIELDS
+        })
+
+
+def _sync_search_document(mapper, connection, target):
+    target.sync_search_document()
+
+
+event.listen(SearchDocumentMixin, 'before_insert', _sync_search_document, propagate=True)
+event.listen(SearchDocumentMixin, 'before_update', _sync_search_document, propagate=True)
+
+SEARCH_FTS_SUFFIX = '_search_fts'
+
+
+def sqlite_search_fts_ddl(table_name):
+    """SQLite statements for ``table_name``'s FTS5 search_document index.
+
+    An external-content FTS5 table with the trigram tokenizer gives the same
+    substring semantics as pg_trgm; triggers keep it in step with the rows,
+    including Core and bulk writes.
+    """
+    fts = f'{table_name}{SEARCH_FTS_SUFFIX}'
+    reindex_old = (
+        f"INSERT INTO {fts}({fts}, rowid, search_document) "
+        f"VALUES ('delete', old.id, old.search_document);"
+    )
+    index_new = (
+        f"INSERT INTO {fts}(rowid, search_document) "
+        f"VALUES (new.id, new.search_document);"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"search_document, content='{table_name}', content_rowid='id', "
+        f"tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} "
+        f"BEGIN {index_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} "
+        f"BEGIN {reindex_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF search_document "
+        f"ON {table_name} BEGIN {reindex_old} {index_new} END",
+    ]
+
+
+def _attach_search_fts(mapper, class_):
+    table = mapper.local_table
+    for statement in sqlite_search_fts_ddl(table.name):
+        event.listen(table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(
+        table,
+        'before_drop',
+        DDL(f'DROP TABLE IF EXISTS {table.name}{SEARCH_FTS_SUFFIX}').execute_if(
+            dialect='sqlite'
+        ),
+    )
+
+
+event.listen(SearchDocumentMixin, 'after_mapper_constructed', _attach_search_fts, propagate=True)
+
+
 class ContactGroup(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     
@@ -322,7 +426,17 @@ class ContactGroup(db.Model):
                  'organization_id', 'user_id', 'sort_order'),
     )
 
-class Contact(db.Model):
+class Contact(SearchDocumentMixin, db.Model):
+    SEARCH_FIELDS = (
+        'first_name', 'last_name', 'email', 'phone',
+        'street_address', 'city', 'state', 'zip_code',
+    )
+    SEARCH_PHONE_FIELDS = ('phone',)
+    PREFIX_SEARCH_FIELDS = ('first_name', 'last_name')
+    # The contact list, export and agent API search names, email and phone
+    # only; global search also matches addresses.
+    LIST_SEARCH_FIELDS = ('first_name', 'last_name', 'email', 'phone')
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -458,6 +572,127 @@ def normalize_partner_address(street_address, city=None, state=None, zip_code=No
     return ' '.join(part for part in parts if part) or None
 
 
+def normalize_match_address(address):
+    """Street address key used to match contracts to transactions.
+
+    Lowercased, street-type words and punctuation dropped, whitespace
+    collapsed. Persisted as ``Transaction.address_match_key``.
+    """
+    if not address:
+        return ''
+    s = address.lower().strip()
+    s = re.sub(r'\b(street|st|avenue|ave|road|rd|drive|dr|lane|ln|court|ct|boulevard|blvd)\b', '', s)
+    s = re.sub(r'[^\w\s]', '', s)
+    s = re.sub(r'\s+', ' ', s).strip()
+    return s
+
+
+class ContactImportJob(db.Model):
+    """A Contacts page CSV/Excel import processed by the contact_import worker.
+
+    ``processed_rows`` is the checkpoint: it only advances in the same commit
+    as the chunk of contacts it covers, so a retried job skips exactly the
+    rows already written. ``heartbeat_at`` moves with it; a running job whose
+    heartbeat goes stale lost its worker and is requeued. ``file_data`` is
+    cleared once the job finishes.
+    """
+    __tablename__ = 'contact_import_jobs'
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    FINISHED_STATUSES = {STATUS_COMPLETED, STATUS_FAILED}
+
+    id = db.Column(db.Integer, primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id',
+                                ondelete='RESTRICT'), nullable=False, index=True)
+    actor_user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'),
+                              nullable=False, index=True)
+    owner_user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'),
+                              nullable=False)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_QUEUED)
+    filename = db.Column(db.String(500), nullable=False)
+    mime_type = db.Column(db.String(100))
+    file_data = db.Column(db.LargeBinary)
+
+    total_rows = db.Column(db.Integer)
+    processed_rows = db.Column(db.Integer, nullable=False, default=0)
+    created_count = db.Column(db.Integer, nullable=False, default=0)
+    duplicate_count = db.Column(db.Integer, nullable=False, default=0)
+    invalid_count = db.Column(db.Integer, nullable=False, default=0)
+    invalid_phone_count = db.Column(db.Integer, nullable=False, default=0)
+    missing_name_count = db.Column(db.Integer, nullable=False, default=0)
+    error_details = db.Column(db.JSON)
+    warnings = db.Column(db.JSON)
+    column_mapping = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_contact_import_jobs_org_status', 'organization_id', 'status'),
+    )
+
+    def __repr__(self):
+        return f'<ContactImportJob {self.id} {self.status} {self.processed_rows}/{self.total_rows}>'
+
+
+class TaxProtestBatchJob(db.Model):
+    """A tax protest run over a contact group, processed by the tax_protest worker.
+
+    ``results`` holds one entry per processed contact and only grows in the
+    same commit as the subdivision group it covers, so a retried job skips
+    contacts already done. ``subjects`` holds contacts whose property and
+    subdivision were resolved but whose group is not compared yet, committed
+    with each lookup chunk so a retry skips their lookups and extraction; it
+    is cleared when the job finishes. ``workbook_data`` is the combined XLSX,
+    written when the job completes.
+    """
+    __tablename__ = 'tax_protest_batch_jobs'
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    FINISHED_STATUSES = {STATUS_COMPLETED, STATUS_FAILED}
+
+    id = db.Column(db.Integer, primary_key=True)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id',
+                                ondelete='RESTRICT'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'),
+                        nullable=False, index=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('contact_group.id',
+                         ondelete='SET NULL'))
+    status = db.Column(db.String(20), nullable=False, default=STATUS_QUEUED)
+
+    contact_ids = db.Column(db.JSON, nullable=False)
+    total_contacts = db.Column(db.Integer, nullable=False, default=0)
+    processed_contacts = db.Column(db.Integer, nullable=False, default=0)
+    found_count = db.Column(db.Integer, nullable=False, default=0)
+    error_count = db.Column(db.Integer, nullable=False, default=0)
+    results = db.Column(db.JSON)
+    subjects = db.Column(db.JSON)
+    workbook_data = db.Column(db.LargeBinary)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_tax_protest_batch_jobs_org_status', 'organization_id', 'status'),
+    )
+
+    def __repr__(self):
+        return f'<TaxProtestBatchJob {self.id} {self.status} {self.processed_contacts}/{self.total_contacts}>'
+
+
 class PartnerOrganization(db.Model):
     """Org-wide company/vendor record used by transaction participants."""
     __tablename__ = 'partner_organizations'
@@ -955,12 +1190,14 @@ class TransactionType(db.Model):
         return f'<TransactionType {self.name}>'
 
 
-class Transaction(db.Model):
+class Transaction(SearchDocumentMixin, db.Model):
     """
     Represents a real estate transaction (listing, purchase, lease, referral).
     Can have multiple participants (sellers, buyers, agents, etc.).
     """
     __tablename__ = 'transactions'
+    SEARCH_FIELDS = ('street_address', 'city', 'state', 'zip_code')
+    PREFIX_SEARCH_FIELDS = ('street_address',)
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -980,6 +1217,10 @@ class Transaction(db.Model):
     state = db.Column(db.String(50), default='TX')
     zip_code = db.Column(db.String(20))
     county = db.Column(db.String(100))
+
+    # normalize_match_address(street_address); kept in sync with
+    # address_tokens before every flush. See find_transaction_matches.
+    address_match_key = db.Column(db.String(200))
     
     # Seller-specific: ownership status (only relevant for seller transactions)
     # Values: conventional, builder, reo, short_sale
@@ -1036,6 +1277,25 @@ class Transaction(db.Model):
         cascade='all, delete-orphan',
         uselist=False,
     )
+    address_tokens = db.relationship('TransactionAddressToken', backref='transaction',
+                                     cascade='all, delete-orphan')
+
+    __table_args__ = (
+        db.Index('ix_transactions_org_address_match_key',
+                 'organization_id', 'address_match_key'),
+    )
+
+    def sync_address_index(self):
+        """Refresh address_match_key and the token rows from street_address."""
+        key = normalize_match_address(self.street_address)
+        self.address_match_key = key or None
+        existing = {row.token: row for row in self.address_tokens}
+        self.address_tokens = [
+            existing.get(token) or TransactionAddressToken(
+                organization_id=self.organization_id, token=token,
+            )
+            for token in sorted(set(key.split()))
+        ]
     
     @property
     def full_address(self):
@@ -1105,12 +1365,48 @@ class Transaction(db.Model):
         return f'<Transaction {self.id}: {self.street_address}>'
 
 
-class TransactionParticipant(db.Model):
+class TransactionAddressToken(db.Model):
+    """One token of a transaction's normalized street address.
+
+    Contract matching looks up candidates by the house-number tokens of the
+    contract address through (organization_id, token) instead of scanning
+    every transaction in the org.
+    """
+    __tablename__ = 'transaction_address_tokens'
+
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id', ondelete='CASCADE'),
+                               nullable=False)
+    token = db.Column(db.String(100), nullable=False)
+    organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='RESTRICT'),
+                                nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_transaction_address_tokens_org_token', 'organization_id', 'token'),
+        db.Index('ix_transaction_address_tokens_transaction', 'transaction_id'),
+    )
+
+
+def _sync_transaction_address_index(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Transaction):
+            continue
+        if obj in session.new or inspect(obj).attrs.street_address.history.has_changes():
+            obj.sync_address_index()
+
+
+event.listen(Session, 'before_flush', _sync_transaction_address_index)
+
+
+class TransactionParticipant(SearchDocumentMixin, db.Model):
     """
     Links contacts/users to transactions with specific roles.
     Supports multiple participants per transaction (e.g., multiple sellers).
     """
     __tablename__ = 'transaction_participants'
+    SEARCH_FIELDS = ('name', 'email', 'phone', 'company')
+    SEARCH_PHONE_FIELDS = ('phone',)
+    PREFIX_SEARCH_FIELDS = ('name',)
     
     id = db.Column(db.Integer, primary_key=True)
     organization_id = db.Column(db.Integer, db.ForeignKey('organizations.id', ondelete='RESTRICT'), nullable=False, index=True)
@@ -2418,6 +2714,22 @@ class DocumentExtractionRun(db.Model):
     # SHA-256 of the source file bytes when available
     file_sha256 = db.Column(db.String(64), nullable=True, index=True)
 
+    # Extraction cache keys: hash of the exact prompts sent (schema fields,
+    # instructions, review context) and per-page content fingerprints.
+    schema_version = db.Column(db.String(64), nullable=True)
+    page_fingerprints = db.Column(db.JSON, nullable=True)
+    # Prior run whose result was reused (whole file or shared pages).
+    cached_from_run_id = db.Column(
+        db.Integer,
+        db.ForeignKey('document_extraction_runs.id', ondelete='SET NULL'),
+        nullable=True,
+    )
+
+    # Page images actually sent to the model (0 when fully served from cache).
+    pages_total = db.Column(db.Integer, nullable=True)
+    pages_sent = db.Column(db.Integer, nullable=True)
+    image_bytes = db.Column(db.Integer, nullable=True)
+
     error = db.Column(db.Text)
 
     started_at = db.Column(db.DateTime)
@@ -2441,6 +2753,13 @@ class DocumentExtractionRun(db.Model):
         ),
     )
 
+    __table_args__ = (
+        db.Index(
+            'ix_document_extraction_runs_cache',
+            'organization_id', 'extraction_type', 'schema_version', 'model',
+        ),
+    )
+
     def __repr__(self):
         return f'<DocumentExtractionRun doc={self.document_id} type={self.extraction_type} status={self.status}>'
 
@@ -3595,6 +3914,8 @@ class ChambersProperty(db.Model):
     prop_street_dir = db.Column(db.String(10))
     prop_city = db.Column(db.String(100))
     prop_zip5 = db.Column(db.String(10), index=True)
+    # normalize_address('<number> <dir> <street>'), filled in by the import.
+    normalized_site_addr = db.Column(db.String(200), index=True)
     legal1 = db.Column(db.String(500))
     legal2 = db.Column(db.String(500))
     legal3 = db.Column(db.String(500))
@@ -3624,6 +3945,8 @@ class HcadProperty(db.Model):
     site_addr_1 = db.Column(db.String(200))
     site_addr_2 = db.Column(db.String(100))
     site_addr_3 = db.Column(db.String(30), index=True)
+    # normalize_address(site_addr_1), filled in by the import.
+    normalized_site_addr = db.Column(db.String(200), index=True)
     acreage = db.Column(db.Numeric(14, 4))
     assessed_val = db.Column(db.Integer)
     tot_appr_val = db.Column(db.Integer)
@@ -3634,6 +3957,8 @@ class HcadProperty(db.Model):
     lgl_4 = db.Column(db.String(500))
 
     neighborhood_code = db.Column(db.String(20), index=True)
+    # max(hcad_buildings.im_sq_ft) for this acct, filled in by the import.
+    max_sq_ft = db.Column(db.Integer)
 
     buildings = db.relationship('HcadBuilding', backref='property', lazy='dynamic')
 
@@ -3787,6 +4112,61 @@ class FortBendProperty(db.Model):
         return f'<FortBendProperty {self.site_addr_1 or self.property_number}>'
 
 
+def normalize_subdivision_key(text):
+    """Uppercased, whitespace-collapsed subdivision/legal text used as the
+    TaxSubdivisionComparable key. scripts/import_tax_data.py applies the same
+    rule in SQL."""
+    if not text:
+        return None
+    return ' '.join(str(text).upper().split()) or None
+
+
+class TaxSubdivisionComparable(db.Model):
+    """Precomputed comparable-eligible homes for HCAD and Chambers.
+
+    Rebuilt by scripts/import_tax_data.py after each county import. Every row
+    already passed the home filters (market value, situs address, building or
+    improvement), so comparables and subdivision stats are range scans on
+    (source, subdivision_key, zip_code, market_value) rather than ILIKE scans
+    over legal descriptions joined to building aggregates.
+    """
+    __tablename__ = 'tax_subdivision_comparables'
+
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(20), nullable=False)
+    subdivision_key = db.Column(db.String(500), nullable=False)
+    zip_code = db.Column(db.String(10))
+    market_value = db.Column(db.Integer, nullable=False)
+    sq_ft = db.Column(db.Integer)
+    property_id = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_tax_subdivision_comparables_lookup',
+                 'source', 'subdivision_key', 'zip_code', 'market_value'),
+        db.Index('ix_tax_subdivision_comparables_value',
+                 'source', 'subdivision_key', 'market_value'),
+    )
+
+    def __repr__(self):
+        return f'<TaxSubdivisionComparable {self.source} {self.subdivision_key} {self.property_id}>'
+
+
+class TaxDatasetVersion(db.Model):
+    """Per-county dataset version, bumped by each scripts/import_tax_data.py run.
+
+    Tax protest export bundles are keyed by it, so they stay valid until new
+    county data is loaded.
+    """
+    __tablename__ = 'tax_dataset_versions'
+
+    source = db.Column(db.String(20), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    loaded_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<TaxDatasetVersion {self.source} v{self.version}>'
+
+
 # =============================================================================
 # IN-APP NOTIFICATIONS
 # =============================================================================
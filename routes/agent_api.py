@@ -58,6 +58,7 @@ from services.contact_group_service import (
 from services.controlling_contracts import get_active_primary_contract
 from services.device_push import enqueue_portal_push, register_device
 from services.portal_service import CLIENT_PORTAL_ROLES, list_client_messages, portal_tracker
+from services.search_index import search_filter, search_terms
 from services.tenant_service import org_query_for_id
 from services.transaction_auth import (
     CAP_EDIT,
@@ -481,15 +482,11 @@ def get_dashboard(user):
 @agent_jwt_required
 def list_contacts(user):
     query = _contacts_query(user).options(selectinload(Contact.groups))
-    q = (request.args.get('q') or '').strip()
-    if q:
-        like = f'%{q}%'
-        query = query.filter(or_(
-            Contact.first_name.ilike(like),
-            Contact.last_name.ilike(like),
-            Contact.email.ilike(like),
-            Contact.phone.ilike(like),
-        ))
+    terms = search_terms(request.args.get('q') or '')
+    if terms:
+        query = query.filter(
+            search_filter(Contact, terms, fields=Contact.LIST_SEARCH_FIELDS)
+        )
     group_id = request.args.get('group_id', type=int)
     if group_id:
         query = query.join(Contact.groups).filter(ContactGroup.id == group_id)
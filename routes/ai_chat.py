@@ -12,8 +12,9 @@ from services.bob_tools import (
     BobContext,
     confirm_action,
     dispatch as bob_dispatch,
-    openai_tool_schemas,
+    parallel_safe as bob_parallel_safe,
     reject_action,
+    tool_bundle,
     undo_action,
 )
 from services.bob_tools.notifications import ActionCollector
@@ -38,7 +39,7 @@ from services.bob_attachments import (
 from sqlalchemy import or_, func
 from tier_config.tier_limits import get_tier_defaults
 import logging
-import openai
+from services.openai_clients import get_client
 import re
 import json
 from pprint import pprint
@@ -878,14 +879,18 @@ def chat_stream():
                 )
                 return result.for_model(), result.for_client()
 
+            bundle = tool_bundle(bob_ctx)
             try:
                 events = run_tool_conversation(
                     system_prompt=SYSTEM_PROMPT,
                     messages=messages,
-                    tools=openai_tool_schemas(bob_ctx),
+                    tools=bundle.schemas,
                     execute_tool=execute_tool,
                     input_files=input_files,
                     safety_identifier=f'org:{current_user.organization_id}:user:{current_user.id}',
+                    parallel_safe=bob_parallel_safe,
+                    prompt_cache_key=bundle.cache_key,
+                    org_id=current_user.organization_id,
                 )
                 for event, payload in events:
                     if event == 'text':
@@ -1117,7 +1122,7 @@ def save_chat_history():
 def _generate_chat_title(first_message):
     """Generate a short title for the conversation using AI"""
     try:
-        client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+        client = get_client()
         
         response = client.chat.completions.create(
             model="gpt-4.1-mini",
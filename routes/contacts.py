@@ -1,10 +1,11 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, Response, jsonify, current_app
 from flask_login import login_required, current_user
-from models import db, Contact, User, Transaction, TransactionParticipant, ContactFile, Interaction, Task, TaskType, TaskSubtype, ContactEmail, ContactVoiceMemo, MarketingSend
+from models import db, Contact, ContactImportJob, User, Transaction, TransactionParticipant, ContactFile, Interaction, Task, TaskType, TaskSubtype, ContactEmail, ContactVoiceMemo, MarketingSend
 from feature_flags import can_access_transactions, feature_required, org_has_feature
 from forms import ContactForm
 from services import supabase_storage
 from services.tenant_service import org_query, can_view_all_org_data, org_can_add_contact
+from services.search_index import search_filter, search_terms
 from services.contact_group_service import (
     ContactGroupError,
     assign_groups_to_contact,
@@ -780,10 +781,17 @@ def get_interactions(contact_id):
 @contacts_bp.route('/import-contacts', methods=['POST'])
 @login_required
 def import_contacts():
-    from services.contact_import import (
-        ContactImportError,
-        execute_contact_import,
-        parse_contact_rows,
+    """Store the upload as a ContactImportJob and queue it.
+
+    Returns 202 with a ``status_url`` to poll. When no queue is reachable the
+    job runs inline and the finished import result is returned directly.
+    """
+    from services.contact_import import ContactImportError
+    from services.contact_import_jobs import (
+        create_import_job,
+        enqueue_import_job,
+        import_job_payload,
+        run_import_job,
     )
 
     # Determine target user id (admins may upload on behalf of another user)
@@ -848,20 +856,13 @@ def import_contacts():
     )
 
     try:
-        file_bytes = file.stream.read()
-        rows, meta = parse_contact_rows(
-            file_bytes,
-            file.filename,
-            file.mimetype or '',
-            max_rows=None,
-            use_ai_headers=True,
-        )
-        result = execute_contact_import(
-            rows,
+        job = create_import_job(
+            file.stream.read(),
+            filename=file.filename,
+            mime=file.mimetype or '',
             actor_user_id=current_user.id,
             owner_user_id=target_user_id,
             org_id=current_user.organization_id,
-            source='csv_import',
         )
     except ContactImportError as exc:
         record_event(
@@ -878,65 +879,40 @@ def import_contacts():
             'message': f'Error processing import file: {str(e)}',
         }, 500
 
-    success_count = len(result.created)
-    error_count = result.invalid_count
-    duplicates_skipped = result.skipped_duplicates
-
-    if success_count > 0:
-        from services.activation_service import (
-            count_bucket, record_meaningful_action,
-        )
-        record_event(
-            ActivationEvent.CONTACT_CREATED,
-            user=current_user,
-            data={
-                'source': 'csv_import',
-                'contact_count': success_count,
-                'contact_count_bucket': count_bucket(success_count),
-            },
-            surface='contacts',
-        )
-        record_event(
-            ActivationEvent.CSV_IMPORT_COMPLETED
-            if error_count == 0
-            else ActivationEvent.CSV_IMPORT_PARTIAL,
-            user=current_user,
-            data={
-                'source': 'csv_import',
-                'contact_count_bucket': count_bucket(success_count),
-                'error_count_bucket': count_bucket(error_count),
-                'duplicates_skipped_bucket': count_bucket(duplicates_skipped),
-            },
-            surface='contacts',
-        )
-        record_meaningful_action(
-            current_user,
-            action='csv_import_completed',
-            surface='contacts',
-            data={'contact_count_bucket': count_bucket(success_count)},
+    if enqueue_import_job(job):
+        payload = import_job_payload(job)
+        payload['status_url'] = url_for(
+            'contacts.import_contacts_status', job_id=job.id,
         )
+        return payload, 202
 
-    if error_count > 0:
+    try:
+        job = run_import_job(job.id, current_user.organization_id)
+    except Exception as e:
         return {
-            'status': 'partial_success' if success_count > 0 else 'error',
-            'success_count': success_count,
-            'error_count': error_count,
-            'error_details': result.error_details,
-            'duplicates_skipped': duplicates_skipped,
-            'invalid_phone_count': result.invalid_phone_count,
-            'missing_name_count': result.missing_name_count,
-            'warnings': (meta.get('warnings') or []) + result.warnings,
-        }
+            'status': 'error',
+            'message': f'Error processing import file: {str(e)}',
+        }, 500
+    payload = import_job_payload(job)
+    if job.status == ContactImportJob.STATUS_FAILED:
+        return payload, 400
+    return payload
 
-    return {
-        'status': 'success',
-        'success_count': success_count,
-        'message': f'Successfully imported {success_count} contacts',
-        'duplicates_skipped': duplicates_skipped,
-        'invalid_phone_count': result.invalid_phone_count,
-        'missing_name_count': result.missing_name_count,
-        'warnings': (meta.get('warnings') or []) + result.warnings,
-    }
+
+@contacts_bp.route('/import-contacts/<int:job_id>')
+@login_required
+def import_contacts_status(job_id):
+    from services.contact_import_jobs import import_job_payload, recover_stalled_import
+
+    job = ContactImportJob.query.filter_by(
+        id=job_id,
+        organization_id=current_user.organization_id,
+    ).first_or_404()
+    if not can_view_all_org_data() and job.actor_user_id != current_user.id:
+        return jsonify({'status': 'error', 'message': 'Permission denied'}), 403
+    # Polling doubles as the watchdog for a worker killed mid-import.
+    recover_stalled_import(job)
+    return import_job_payload(job)
 
 
 @contacts_bp.route('/export-contacts')
@@ -951,14 +927,11 @@ def export_contacts():
     else:
         query = org_query(Contact).filter_by(user_id=current_user.id)
 
-    if search_query:
-        search_filter = (
-                (Contact.first_name.ilike(f'%{search_query}%')) |
-                (Contact.last_name.ilike(f'%{search_query}%')) |
-                (Contact.email.ilike(f'%{search_query}%')) |
-                (Contact.phone.ilike(f'%{search_query}%'))
+    terms = search_terms(search_query)
+    if terms:
+        query = query.filter(
+            search_filter(Contact, terms, fields=Contact.LIST_SEARCH_FIELDS)
         )
-        query = query.filter(search_filter)
 
     contacts = query.all()
 
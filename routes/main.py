@@ -8,16 +8,17 @@ from feature_flags import can_access_transactions, feature_required
 from services.activation_service import (
     is_user_activated,
     record_event,
-    record_daily_session,
     record_surface_viewed,
     FOLLOW_UP_SUBTYPE_NAMES,
 )
+from services.session_tracking import note_session
 from services.retention_tokens import (
     CHURN_REASONS,
     parse_churn_reason_token,
     parse_email_click_token,
 )
 from services.tenant_service import org_query, can_view_all_org_data
+from services.search_index import MIN_QUERY_LENGTH, rank_terms, search_filter, search_terms
 from services.contact_group_service import (
     aggregate_filter_groups,
     aggregate_group_stats,
@@ -309,6 +310,20 @@ def health_check():
         "flask_env": os.environ.get('FLASK_ENV', 'production'),
     }
 
+    # Lookup cache counters for this process (services/cache_helpers)
+    try:
+        from services.cache_helpers import cache_stats
+        checks['cache'] = cache_stats()
+    except Exception as e:
+        checks['cache'] = {"status": "error", "message": str(e)}
+
+    # OpenAI connect / first-byte / total latency per model (services/openai_clients)
+    try:
+        from services.openai_clients import client_stats
+        checks['openai'] = client_stats()
+    except Exception as e:
+        checks['openai'] = {"status": "error", "message": str(e)}
+
     # External dependencies (cached - only refresh every 60s to avoid excessive API calls)
     now = time.time()
     if (_external_cache["last_check"] is None or
@@ -479,14 +494,11 @@ def contacts():
         # Show only current user's contacts
         query = org_query(Contact).filter_by(user_id=current_user.id)
 
-    if search_query:
-        search_filter = (
-                (Contact.first_name.ilike(f'%{search_query}%')) |
-                (Contact.last_name.ilike(f'%{search_query}%')) |
-                (Contact.email.ilike(f'%{search_query}%')) |
-                (Contact.phone.ilike(f'%{search_query}%'))
+    terms = search_terms(search_query)
+    if terms:
+        query = query.filter(
+            search_filter(Contact, terms, fields=Contact.LIST_SEARCH_FIELDS)
         )
-        query = query.filter(search_filter)
 
     owners = request.args.get('owners')
     if show_all and owners:
@@ -602,7 +614,7 @@ def contacts():
 @main_bp.route('/dashboard')
 @login_required
 def dashboard():
-    record_daily_session(current_user, surface='dashboard')
+    note_session(current_user, surface='dashboard')
     record_surface_viewed(current_user, 'dashboard')
     lifecycle_stage = request.args.get('lifecycle')
     if lifecycle_stage in {'no_contact_2h', 'no_follow_up_24h', 'stalled_3d'}:
@@ -1277,11 +1289,11 @@ def global_search():
     """
     query = (request.args.get('q') or '').strip()
 
-    # Require at least 2 characters before hitting the DB.
-    if len(query) < 2:
+    # Require a few characters before hitting the DB.
+    if len(query) < MIN_QUERY_LENGTH:
         return jsonify({'query': query, 'groups': []})
 
-    like = f'%{query}%'
+    terms = search_terms(query)
     show_all = can_view_all_org_data()
     results = {'contacts': [], 'transactions': []}
 
@@ -1290,20 +1302,13 @@ def global_search():
     if not show_all:
         contact_query = contact_query.filter_by(user_id=current_user.id)
 
-    contact_filters = or_(
-        Contact.first_name.ilike(like),
-        Contact.last_name.ilike(like),
-        Contact.email.ilike(like),
-        Contact.phone.ilike(like),
-        Contact.street_address.ilike(like),
-        Contact.city.ilike(like),
-        Contact.state.ilike(like),
-        Contact.zip_code.ilike(like),
-        func.concat(Contact.first_name, ' ', Contact.last_name).ilike(like),
-    )
     contacts = (
-        contact_query.filter(contact_filters)
-        .order_by(Contact.first_name.asc(), Contact.last_name.asc())
+        contact_query.filter(search_filter(Contact, terms))
+        .order_by(
+            rank_terms(Contact.search_document, terms),
+            Contact.first_name.asc(),
+            Contact.last_name.asc(),
+        )
         .limit(6)
         .all()
     )
@@ -1336,31 +1341,23 @@ def global_search():
             db.session.query(TransactionParticipant.transaction_id)
             .outerjoin(Contact, TransactionParticipant.contact_id == Contact.id)
             .filter(
+                TransactionParticipant.organization_id == current_user.organization_id,
                 or_(
-                    Contact.first_name.ilike(like),
-                    Contact.last_name.ilike(like),
-                    func.concat(Contact.first_name, ' ', Contact.last_name).ilike(like),
-                    TransactionParticipant.name.ilike(like),
-                )
+                    search_filter(Contact, terms),
+                    search_filter(TransactionParticipant, terms),
+                ),
             )
-            .distinct()
         )
-        participant_ids = [row[0] for row in participant_tx_ids.all()]
-
-        address_filters = or_(
-            Transaction.street_address.ilike(like),
-            Transaction.city.ilike(like),
-            Transaction.state.ilike(like),
-            Transaction.zip_code.ilike(like),
-        )
-        if participant_ids:
-            tx_filter = or_(address_filters, Transaction.id.in_(participant_ids))
-        else:
-            tx_filter = address_filters
 
         transactions = (
-            tx_query.filter(tx_filter)
-            .order_by(Transaction.updated_at.desc())
+            tx_query.filter(or_(
+                search_filter(Transaction, terms),
+                Transaction.id.in_(participant_tx_ids),
+            ))
+            .order_by(
+                rank_terms(Transaction.search_document, terms),
+                Transaction.updated_at.desc(),
+            )
             .limit(6)
             .all()
         )
@@ -21,6 +21,7 @@ from flask import (
     abort,
     send_file,
     session,
+    url_for,
 )
 from flask_login import login_required, current_user
 from openpyxl import Workbook
@@ -35,10 +36,22 @@ except ImportError:  # pragma: no cover - psutil is available in production
     psutil = None
 
 from forms import ContactForm
-from models import db, Contact
+from models import db, Contact, TaxProtestBatchJob, contact_groups
 from feature_flags import feature_required
 from services.tenant_service import org_query, can_view_all_org_data
+from services.tax_protest_batch import (
+    RESULT_FOUND,
+    TaxProtestBatchError,
+    batch_job_payload,
+    batch_result,
+    create_batch_job,
+    enqueue_batch_job,
+    run_batch_job,
+)
 from services.tax_protest_service import (
+    COUNTY_LABELS,
+    EXPORT_HEADERS,
+    build_export_rows,
     find_property_in_tax_data,
     extract_chambers_subdivision,
     extract_subdivision_llm,
@@ -48,19 +61,14 @@ from services.tax_protest_service import (
     cache_search_result,
     get_cached_search_result,
     get_main_property_by_id,
-    _is_valid_subdivision,
-    build_chambers_subdivision_match_terms,
+    get_result_bundle,
+    resolve_subdivision,
+    store_result_bundle,
 )
 
 tax_protest_bp = Blueprint("tax_protest", __name__, url_prefix="/tax-protest")
 logger = logging.getLogger(__name__)
 
-COUNTY_LABELS = {
-    "chambers": "Chambers",
-    "hcad": "Harris",
-    "liberty": "Liberty",
-    "fort_bend": "Fort Bend",
-}
 EXPORT_XLSX_MIMETYPE = (
     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 )
@@ -193,74 +201,59 @@ def _draw_dashed_line(draw, x, y1, y2, dash_length=10, gap=7, fill="#f59e0b", wi
         y = dash_end + gap
 
 
-def _has_positive_market_value(prop):
-    value = prop.get("market_value")
-    try:
-        return float(value) > 0
-    except (TypeError, ValueError):
-        return False
-
-
-def _build_export_rows(main_property, comparables, subdivision, county):
-    rows = []
-
-    def build_row(prop, row_type):
-        if not _has_positive_market_value(prop):
-            return
-        rows.append(
-            [
-                row_type,
-                prop.get("full_address", ""),
-                prop.get("city", ""),
-                prop.get("zip", ""),
-                prop.get("market_value", ""),
-                prop.get("sq_ft", ""),
-                prop.get("acreage", ""),
-                subdivision,
-                prop.get("legal1", ""),
-                prop.get("account", ""),
-                county,
-            ]
-        )
-
-    build_row(main_property, "Subject Property")
-    for comp in comparables:
-        build_row(comp, "Comparable")
-    return rows
-
-
 def _load_cached_export_data():
     cached = get_cached_search_result()
     if not cached:
         abort(400, description="No search results to download. Run a search first.")
+    return _export_data_for(cached)
 
+
+def _export_data_for(cached):
+    """Export inputs for one set of search params, filling the result bundle."""
     contact = _authorized_contact(cached["contact_id"])
-    main_property = get_main_property_by_id(
-        cached["main_property_id"], cached["source"]
-    )
+    bundle = get_result_bundle(cached) or {}
+    missing = {}
+
+    main_property = bundle.get("main_property")
     if not main_property:
-        abort(404, description="Main property no longer found in tax data")
-
-    comparables = find_comparables(
-        cached["subdivision"],
-        cached["zip_code"],
-        main_property["market_value"],
-        cached["source"],
-        main_sq_ft=cached.get("main_sq_ft"),
-        fuzzy_subdivision=cached.get("fuzzy_subdivision", False),
-        subdivision_code=cached.get("subdivision_code"),
-        main_acreage=cached.get("main_acreage"),
-        subdivision_match_terms=cached.get("subdivision_match_terms"),
-    )
-    subdivision_stats = get_subdivision_stats(
-        cached["subdivision"],
-        cached["zip_code"],
-        main_property["market_value"],
-        cached["source"],
-        fuzzy_subdivision=cached.get("fuzzy_subdivision", False),
-        subdivision_code=cached.get("subdivision_code"),
-        subdivision_match_terms=cached.get("subdivision_match_terms"),
-    )
+        main_property = get_main_property_by_id(
+            cached["main_property_id"], cached["source"]
+        )
+        if not main_property:
+            abort(404, description="Main property no longer found in tax data")
+        missing["main_property"] = main_property
+
+    comparables = bundle.get("comparables")
+    if comparables is None:
+        comparables = find_comparables(
+            cached["subdivision"],
+            cached["zip_code"],
+            main_property["market_value"],
+            cached["source"],
+            main_sq_ft=cached.get("main_sq_ft"),
+            fuzzy_subdivision=cached.get("fuzzy_subdivision", False),
+            subdivision_code=cached.get("subdivision_code"),
+            main_acreage=cached.get("main_acreage"),
+            subdivision_match_terms=cached.get("subdivision_match_terms"),
+        )
+        missing["comparables"] = comparables
+
+    if "subdivision_stats" in bundle:
+        subdivision_stats = bundle["subdivision_stats"]
+    else:
+        subdivision_stats = get_subdivision_stats(
+            cached["subdivision"],
+            cached["zip_code"],
+            main_property["market_value"],
+            cached["source"],
+            fuzzy_subdivision=cached.get("fuzzy_subdivision", False),
+            subdivision_code=cached.get("subdivision_code"),
+            subdivision_match_terms=cached.get("subdivision_match_terms"),
+        )
+        missing["subdivision_stats"] = subdivision_stats
+
+    if missing:
+        store_result_bundle(cached, **missing)
 
     county = COUNTY_LABELS.get(cached["source"], cached["source"].title())
     subdivision = cached.get("subdivision", "")
@@ -273,10 +266,30 @@ def _load_cached_export_data():
         "subdivision_stats": subdivision_stats,
         "county": county,
         "subdivision": subdivision,
-        "rows": _build_export_rows(main_property, comparables, subdivision, county),
+        "rows": build_export_rows(main_property, comparables, subdivision, county),
+        "bundle": bundle,
     }
 
 
+def _export_chart_image(export_data):
+    """Chart PNG for the export, rendered once per result bundle."""
+    bundle = export_data.get("bundle") or {}
+    if "chart_png" in bundle:
+        png = bundle["chart_png"]
+        return BytesIO(png) if png else None
+
+    chart_image = _build_chart_image(
+        export_data["subdivision_stats"],
+        export_data["subdivision"],
+        export_data["main_property"].get("market_value"),
+    )
+    store_result_bundle(
+        export_data["cached"],
+        chart_png=chart_image.getvalue() if chart_image else None,
+    )
+    return chart_image
+
+
 def _build_chart_image(stats, subdivision, subject_value):
     if (
         not stats
@@ -560,31 +573,14 @@ def _build_xlsx_report(export_data):
     summary["A9"] = "This chart is embedded as an image so the exported workbook preserves the same visual story as the app."
     summary["A9"].font = Font(name="Aptos", size=10, color="64748B")
 
-    chart_image = _build_chart_image(
-        export_data["subdivision_stats"],
-        export_data["subdivision"],
-        export_data["main_property"].get("market_value"),
-    )
+    chart_image = _export_chart_image(export_data)
     if chart_image:
         xl_image = XLImage(chart_image)
         xl_image.width = 1100
         xl_image.height = 654
         summary.add_image(xl_image, "A11")
 
-    headers = [
-        "Type",
-        "Address",
-        "City",
-        "Zip",
-        "Market Value",
-        "Sq Ft",
-        "Acreage",
-        "Subdivision",
-        "Legal Description",
-        "Account",
-        "County",
-    ]
-    comparables_sheet.append(headers)
+    comparables_sheet.append(EXPORT_HEADERS)
     for row in export_data["rows"]:
         comparables_sheet.append(row)
 
@@ -742,97 +738,35 @@ def search_property():
         subdivision_code = property_record.get("subdivision_code")
         main_sq_ft = property_record.get("sq_ft")
         main_acreage = property_record.get("acreage")
-        subdivision = None
-        fuzzy = False
-        subdivision_match_terms = None
         llm_ms = 0.0
-
-        if source == "hcad":
-            lgl_2 = property_record.get("legal2") or ""
-            if _is_valid_subdivision(lgl_2):
-                subdivision = lgl_2.strip()
-            else:
-                _log_tax_event("search_llm_started", **log_context, source=source)
-                llm_started = time.perf_counter()
-                subdivision = extract_subdivision_llm(property_record.get("legal1", ""))
-                llm_ms = _elapsed_ms(llm_started)
-                fuzzy = True
-                _log_tax_event(
-                    "search_llm_complete",
-                    **log_context,
-                    source=source,
-                    llm_ms=llm_ms,
-                    subdivision_found=bool(subdivision),
-                    rss_mb=_current_rss_mb(),
-                )
-            if not subdivision:
-                return jsonify(
-                    {
-                        "error": "Could not determine subdivision from property legal description",
-                        "main_property": property_record,
-                        "source": source,
-                    }
-                ), 422
-        elif source == "liberty":
-            subdivision = property_record.get("subdivision")
-            if not subdivision or not subdivision_code:
-                return jsonify(
-                    {
-                        "error": "Could not determine Liberty subdivision from tax data",
-                        "main_property": property_record,
-                        "source": source,
-                    }
-                ), 422
-        elif source == "fort_bend":
-            subdivision = property_record.get("subdivision")
-            if not subdivision or not subdivision_code:
-                return jsonify(
-                    {
-                        "error": "Could not determine Fort Bend neighborhood from tax data",
-                        "main_property": property_record,
-                        "source": source,
-                    }
-                ), 422
-        else:
-            legal_desc = property_record.get("legal1", "")
-            if source == "chambers":
-                _log_tax_event("search_llm_started", **log_context, source=source)
-                llm_started = time.perf_counter()
-                subdivision = extract_chambers_subdivision(legal_desc)
-                llm_ms = _elapsed_ms(llm_started)
-                subdivision_match_terms = build_chambers_subdivision_match_terms(
-                    subdivision,
-                    legal_desc,
-                )
-                _log_tax_event(
-                    "search_llm_complete",
-                    **log_context,
-                    source=source,
-                    llm_ms=llm_ms,
-                    subdivision_found=bool(subdivision),
-                    rss_mb=_current_rss_mb(),
-                )
-            else:
-                _log_tax_event("search_llm_started", **log_context, source=source)
-                llm_started = time.perf_counter()
-                subdivision = extract_subdivision_llm(legal_desc)
-                llm_ms = _elapsed_ms(llm_started)
-                _log_tax_event(
-                    "search_llm_complete",
-                    **log_context,
-                    source=source,
-                    llm_ms=llm_ms,
-                    subdivision_found=bool(subdivision),
-                    rss_mb=_current_rss_mb(),
-                )
-            if not subdivision:
-                return jsonify(
-                    {
-                        "error": "Could not extract subdivision from property legal description",
-                        "main_property": property_record,
-                        "source": source,
-                    }
-                ), 422
+        llm_started = time.perf_counter()
+        resolution = resolve_subdivision(
+            property_record,
+            source,
+            extract_llm=extract_subdivision_llm,
+            extract_chambers=extract_chambers_subdivision,
+        )
+        subdivision = resolution["subdivision"]
+        fuzzy = resolution["fuzzy"]
+        subdivision_match_terms = resolution["match_terms"]
+        if resolution["used_llm"]:
+            llm_ms = _elapsed_ms(llm_started)
+            _log_tax_event(
+                "search_llm_complete",
+                **log_context,
+                source=source,
+                llm_ms=llm_ms,
+                subdivision_found=bool(subdivision),
+                rss_mb=_current_rss_mb(),
+            )
+        if resolution["error"]:
+            return jsonify(
+                {
+                    "error": resolution["error"],
+                    "main_property": property_record,
+                    "source": source,
+                }
+            ), 422
 
         _log_tax_event(
             "search_comparables_started",
@@ -869,7 +803,7 @@ def search_property():
             rss_mb=_current_rss_mb(),
         )
 
-        cache_search_result(
+        search_params = cache_search_result(
             source=source,
             subdivision=subdivision,
             main_property_id=property_record["id"],
@@ -900,6 +834,16 @@ def search_property():
             subdivision_match_terms=subdivision_match_terms,
         )
         stats_ms = _elapsed_ms(stats_started)
+        if search_params:
+            # Exports reuse what this search already computed; a truncated
+            # comparables list is recomputed in full on the first download.
+            bundle_parts = {
+                "main_property": property_record,
+                "subdivision_stats": subdivision_stats,
+            }
+            if not comparables_truncated:
+                bundle_parts["comparables"] = comparables
+            store_result_bundle(search_params, **bundle_parts)
         _log_tax_event(
             "search_stats_complete",
             **log_context,
@@ -950,30 +894,10 @@ def search_property():
         raise
 
 
-@tax_protest_bp.route("/download-csv")
-@login_required
-@feature_required("TAX_PROTEST")
-def download_csv():
-    """Download CSV of comparables using cached search result."""
-    started_at = time.perf_counter()
-    export_data = _load_cached_export_data()
+def _csv_response(export_data, started_at):
     output = StringIO()
     writer = csv.writer(output)
-
-    headers = [
-        "Type",
-        "Address",
-        "City",
-        "Zip",
-        "Market Value",
-        "Sq Ft",
-        "Acreage",
-        "Subdivision",
-        "Legal Description",
-        "Account",
-        "County",
-    ]
-    writer.writerow(headers)
+    writer.writerow(EXPORT_HEADERS)
     writer.writerows(export_data["rows"])
 
     output.seek(0)
@@ -999,13 +923,7 @@ def download_csv():
     )
 
 
-@tax_protest_bp.route("/download-xlsx")
-@login_required
-@feature_required("TAX_PROTEST")
-def download_xlsx():
-    """Download an Excel report with a summary sheet and embedded chart."""
-    started_at = time.perf_counter()
-    export_data = _load_cached_export_data()
+def _xlsx_response(export_data, started_at):
     _log_tax_event(
         "download_xlsx_started",
         contact_id=export_data["contact"].id,
@@ -1036,3 +954,169 @@ def download_xlsx():
         as_attachment=True,
         download_name=filename,
     )
+
+
+@tax_protest_bp.route("/download-csv")
+@login_required
+@feature_required("TAX_PROTEST")
+def download_csv():
+    """Download CSV of comparables using cached search result."""
+    started_at = time.perf_counter()
+    return _csv_response(_load_cached_export_data(), started_at)
+
+
+@tax_protest_bp.route("/download-xlsx")
+@login_required
+@feature_required("TAX_PROTEST")
+def download_xlsx():
+    """Download an Excel report with a summary sheet and embedded chart."""
+    started_at = time.perf_counter()
+    return _xlsx_response(_load_cached_export_data(), started_at)
+
+
+def _authorized_batch_job(job_id):
+    """Load a batch job with org + ownership checks. Returns job or aborts."""
+    job = TaxProtestBatchJob.query.filter_by(
+        id=job_id,
+        organization_id=current_user.organization_id,
+    ).first()
+    if not job:
+        abort(404, description="Batch run not found")
+    if not can_view_all_org_data() and job.user_id != current_user.id:
+        abort(403, description="You can only view your own batch runs")
+    return job
+
+
+def _batch_response_payload(job):
+    payload = batch_job_payload(job)
+    payload["status_url"] = url_for("tax_protest.batch_status", job_id=job.id)
+    if payload.get("has_workbook"):
+        payload["download_url"] = url_for(
+            "tax_protest.download_batch_xlsx", job_id=job.id
+        )
+    for result in payload.get("results", []):
+        if result["status"] != RESULT_FOUND:
+            continue
+        result["download_xlsx_url"] = url_for(
+            "tax_protest.download_batch_contact_xlsx",
+            job_id=job.id,
+            contact_id=result["contact_id"],
+        )
+        result["download_csv_url"] = url_for(
+            "tax_protest.download_batch_contact_csv",
+            job_id=job.id,
+            contact_id=result["contact_id"],
+        )
+    return payload
+
+
+def _batch_contact_export_data(job_id, contact_id):
+    job = _authorized_batch_job(job_id)
+    result = batch_result(job, contact_id)
+    if not result or result["status"] != RESULT_FOUND:
+        abort(404, description="No tax protest result for this contact in the batch")
+    return _export_data_for(result["params"])
+
+
+@tax_protest_bp.route("/batch", methods=["POST"])
+@login_required
+@feature_required("TAX_PROTEST")
+def start_batch():
+    """Run tax protest searches for every contact in a contact group."""
+    from services.contact_group_service import ContactGroupError, get_owned_group
+
+    data = request.get_json() or {}
+    try:
+        group = get_owned_group(
+            current_user.organization_id,
+            current_user.id,
+            int(data.get("group_id")),
+        )
+    except (TypeError, ValueError):
+        return jsonify({"error": "group_id required"}), 400
+    except ContactGroupError as exc:
+        return jsonify({"error": exc.message}), exc.status_code
+
+    query = (
+        org_query(Contact)
+        .join(contact_groups, contact_groups.c.contact_id == Contact.id)
+        .filter(contact_groups.c.group_id == group.id)
+    )
+    if not can_view_all_org_data():
+        query = query.filter(Contact.user_id == current_user.id)
+    contact_ids = [
+        row.id
+        for row in query.with_entities(Contact.id).order_by(
+            Contact.last_name.asc(), Contact.first_name.asc(), Contact.id.asc()
+        )
+    ]
+
+    try:
+        job = create_batch_job(
+            contact_ids,
+            group_id=group.id,
+            user_id=current_user.id,
+            org_id=current_user.organization_id,
+        )
+    except TaxProtestBatchError as exc:
+        return jsonify({"error": exc.message}), 400
+    _log_tax_event(
+        "batch_started",
+        job_id=job.id,
+        group_id=group.id,
+        user_id=current_user.id,
+        org_id=current_user.organization_id,
+        contacts=len(contact_ids),
+    )
+
+    if enqueue_batch_job(job):
+        return jsonify(_batch_response_payload(job)), 202
+
+    try:
+        job = run_batch_job(job.id, current_user.organization_id)
+    except Exception:
+        logger.exception("tax_protest_batch_failed job_id=%s", job.id)
+        return jsonify({"error": "Batch run failed"}), 500
+    return jsonify(_batch_response_payload(job))
+
+
+@tax_protest_bp.route("/batch/<int:job_id>")
+@login_required
+@feature_required("TAX_PROTEST")
+def batch_status(job_id):
+    """Progress of a batch run; finished runs include per-contact results."""
+    return jsonify(_batch_response_payload(_authorized_batch_job(job_id)))
+
+
+@tax_protest_bp.route("/batch/<int:job_id>/download-xlsx")
+@login_required
+@feature_required("TAX_PROTEST")
+def download_batch_xlsx(job_id):
+    """Download the combined workbook of a finished batch run."""
+    job = _authorized_batch_job(job_id)
+    if not job.workbook_data:
+        abort(409, description="The batch run has not finished yet")
+    return send_file(
+        BytesIO(job.workbook_data),
+        mimetype=EXPORT_XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name=f"tax_protest_batch_{job.id}.xlsx",
+    )
+
+
+@tax_protest_bp.route("/batch/<int:job_id>/contacts/<int:contact_id>/download-xlsx")
+@login_required
+@feature_required("TAX_PROTEST")
+def download_batch_contact_xlsx(job_id, contact_id):
+    """Download one batch contact's Excel report."""
+    started_at = time.perf_counter()
+    return _xlsx_response(_batch_contact_export_data(job_id, contact_id), started_at)
+
+
+@tax_protest_bp.route("/batch/<int:job_id>/contacts/<int:contact_id>/download-csv")
+@login_required
+@feature_required("TAX_PROTEST")
+def download_batch_contact_csv(job_id, contact_id):
+    """Download one batch contact's comparables CSV."""
+    started_at = time.perf_counter()
+    return _csv_response(_batch_contact_export_data(job_id, contact_id), started_at)
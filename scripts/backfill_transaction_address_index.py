@@ -0,0 +1,99 @@
+"""
+Rebuild transactions.address_match_key and transaction_address_tokens.
+
+The add_transaction_address_index migration backfills both once, and every
+ORM write keeps them current afterwards. Run this after changing
+models.normalize_match_address, or to repair rows written outside the ORM.
+
+By default this is a dry run that reports how many transactions would
+change. Pass ``--commit`` to write.
+
+Usage:
+    python3 scripts/backfill_transaction_address_index.py
+    python3 scripts/backfill_transaction_address_index.py --commit
+    python3 scripts/backfill_transaction_address_index.py --commit --org-id 12
+
+Safety:
+- Commits once per batch, so an interrupted run keeps finished batches
+  and re-running is safe.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy.orm import selectinload  # noqa: E402
+
+from app import app  # noqa: E402  -- needs sys.path patched first.
+from models import Transaction, db, normalize_match_address  # noqa: E402
+
+
+logger = logging.getLogger('backfill_transaction_address_index')
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s %(levelname)s %(name)s — %(message)s',
+)
+
+
+def _is_stale(tx: Transaction) -> bool:
+    key = normalize_match_address(tx.street_address)
+    return (
+        (tx.address_match_key or '') != key
+        or sorted(row.token for row in tx.address_tokens) != sorted(set(key.split()))
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commit', action='store_true',
+                        help='Actually write to the database. '
+                             'Default is dry-run.')
+    parser.add_argument('--org-id', type=int,
+                        help='Only rebuild one organization.')
+    parser.add_argument('--batch-size', type=int, default=500,
+                        help='Transactions loaded and committed per batch.')
+    args = parser.parse_args()
+
+    with app.app_context():
+        last_id = 0
+        scanned = 0
+        stale = 0
+        while True:
+            q = (
+                Transaction.query.options(selectinload(Transaction.address_tokens))
+                .filter(Transaction.id > last_id)
+            )
+            if args.org_id:
+                q = q.filter(Transaction.organization_id == args.org_id)
+            batch = q.order_by(Transaction.id.asc()).limit(args.batch_size).all()
+            if not batch:
+                break
+            for tx in batch:
+                scanned += 1
+                if not _is_stale(tx):
+                    continue
+                stale += 1
+                if args.commit:
+                    tx.sync_address_index()
+            last_id = batch[-1].id
+            if args.commit:
+                db.session.commit()
+            else:
+                db.session.rollback()
+            logger.info('  through transaction_id=%s scanned=%d stale=%d',
+                        last_id, scanned, stale)
+
+        logger.info('Done. scanned=%d %s=%d', scanned,
+                    'rebuilt' if args.commit else 'would_rebuild', stale)
+        if not args.commit:
+            logger.warning('Dry run only. No database writes were made.')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
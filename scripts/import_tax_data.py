@@ -7,6 +7,8 @@ Usage:
     .venv/bin/python3 scripts/import_tax_data.py hcad             # HCAD only
     .venv/bin/python3 scripts/import_tax_data.py liberty          # Liberty only
     .venv/bin/python3 scripts/import_tax_data.py fort_bend        # Fort Bend only
+    .venv/bin/python3 scripts/import_tax_data.py comparables      # Rebuild comparables store + snapshots
+    .venv/bin/python3 scripts/import_tax_data.py snapshots        # Rebuild memory-mapped snapshots only
 
 Data files:
     tax_data/chambers.csv           - Chambers County (CSV, ~43k rows)
@@ -14,13 +16,19 @@ Data files:
     tax_data/building_res.txt       - Harris County buildings (TAB-separated, ~1.3M rows)
     tax_data/liberty_county.txt     - Liberty County property file (fixed-width)
     tax_data/fort_bend_county_tax_data/... - Fort Bend County export bundle (CSV)
+
+Each county is COPYed into staging tables (HCAD files are parsed by a
+process pool), indexed, and swapped over the live tables in one transaction
+together with its comparables store and dataset version. See load_staged.
 """
 import csv
+import multiprocessing
 import sys
 import os
 import re
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import islice
 
 sys.stdout.reconfigure(line_buffering=True)
 csv.field_size_limit(sys.maxsize)
@@ -125,15 +133,451 @@ def _get_raw_conn(app):
         return engine.raw_connection()
 
 
-def _bulk_insert(cursor, table, columns, rows):
-    """Fast bulk insert using psycopg2 execute_values."""
-    from psycopg2.extras import execute_values
-    cols = ', '.join(columns)
-    template = '(' + ', '.join(['%s'] * len(columns)) + ')'
-    sql = f"INSERT INTO {table} ({cols}) VALUES %s"
-    if table == 'hcad_properties':
-        sql += " ON CONFLICT (acct) DO NOTHING"
-    execute_values(cursor, sql, rows, template=template, page_size=BATCH_SIZE)
+# --- Staged COPY loading ---
+#
+# Every county loads into "<table>__new" twins with no indexes, through
+# COPY FROM STDIN, then gets its indexes and constraints rebuilt from the
+# live table's own definitions and is renamed over the live table in one
+# transaction. Searches keep reading the previous data until that commit and
+# never see a half-loaded county; a failed load leaves the live tables alone.
+
+STAGING_SUFFIX = '__new'
+RETIRED_SUFFIX = '__old'
+PARSE_CHUNK_LINES = 20000
+PARSE_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+COPY_READ_SIZE = 1024 * 1024
+
+
+def _staged(name):
+    """Staging twin of a table, index, or constraint name (63-byte limit)."""
+    return f"{name[:63 - len(STAGING_SUFFIX)]}{STAGING_SUFFIX}"
+
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if value is True:
+        return 't'
+    if value is False:
+        return 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copy_block(rows):
+    """Encode row tuples as one block of PostgreSQL COPY text format."""
+    return ''.join(
+        '\t'.join(_copy_value(value) for value in row) + '\n' for row in rows
+    ).encode('utf-8')
+
+
+def _row_blocks(rows, size=BATCH_SIZE):
+    """COPY blocks of ``size`` rows from an iterator of row tuples."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield copy_block(batch)
+            batch = []
+    if batch:
+        yield copy_block(batch)
+
+
+def _parse_chunk(job):
+    """Pool worker: run ``build_row`` over one chunk of delimited lines.
+
+    Returns the COPY block plus the number of rows the builder skipped.
+    """
+    build_row, fieldnames, delimiter, lines = job
+    rows = []
+    skipped = 0
+    for record in csv.DictReader(lines, fieldnames=fieldnames, delimiter=delimiter):
+        row = build_row(record)
+        if row is None:
+            skipped += 1
+        else:
+            rows.append(row)
+    return copy_block(rows), skipped
+
+
+def _parallel_row_blocks(path, build_row, delimiter='\t', stats=None):
+    """COPY blocks for a large delimited county file, parsed by a process pool.
+
+    The parent only reads raw lines and hands out ``PARSE_CHUNK_LINES``
+    chunks; parsing, cleaning and COPY encoding run in the workers. Blocks
+    come back in file order and at most two chunks per worker are in flight,
+    so memory stays flat however large the file is. County exports are one
+    record per line, which is what makes line chunking safe.
+    """
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        fieldnames = next(csv.reader([f.readline()], delimiter=delimiter))
+        with multiprocessing.Pool(PARSE_WORKERS) as pool:
+            pending = deque()
+
+            def finish_oldest():
+                block, skipped = pending.popleft().get()
+                if stats is not None:
+                    stats['skipped'] = stats.get('skipped', 0) + skipped
+                return block
+
+            for lines in iter(lambda: list(islice(f, PARSE_CHUNK_LINES)), []):
+                job = (build_row, fieldnames, delimiter, lines)
+                pending.append(pool.apply_async(_parse_chunk, (job,)))
+                if len(pending) >= PARSE_WORKERS * 2:
+                    yield finish_oldest()
+            while pending:
+                yield finish_oldest()
+
+
+class _BlockReader:
+    """File-like view over an iterator of byte blocks for copy_expert."""
+
+    def __init__(self, blocks):
+        self._blocks = iter(blocks)
+        self._buffer = b''
+        self._pos = 0
+
+    def read(self, size=-1):
+        parts = []
+        while size:
+            if self._pos >= len(self._buffer):
+                # A parse chunk whose records were all skipped yields an
+                # empty block; only exhaustion ends the stream.
+                self._buffer = next(self._blocks, None)
+                self._pos = 0
+                if self._buffer is None:
+                    self._buffer = b''
+                    break
+                continue
+            end = len(self._buffer) if size < 0 else self._pos + size
+            part = self._buffer[self._pos:end]
+            self._pos += len(part)
+            parts.append(part)
+            if size > 0:
+                size -= len(part)
+        return b''.join(parts)
+
+
+def _create_staging_table(cursor, table):
+    staging = _staged(table)
+    cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+    cursor.execute(
+        f"CREATE TABLE {staging} "
+        f"(LIKE {table} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS)"
+    )
+    return staging
+
+
+def _build_staging_indexes(cursor, table, staged_tables):
+    """Recreate the live table's keys, indexes and foreign keys on its twin.
+
+    Definitions come from the catalog, so indexes added by later migrations
+    (trigram, expression, partial) carry over without being listed here.
+    Foreign keys to a table staged in the same load point at its twin.
+    Returns (kind, live table, staged name, live name) renames for the swap.
+    """
+    staging = _staged(table)
+    renames = []
+
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c
+              WHERE c.conrelid = x.indrelid AND c.conindid = x.indexrelid
+          )
+        ORDER BY i.relname
+        """,
+        (table,),
+    )
+    for name, definition in cursor.fetchall():
+        definition = re.sub(
+            rf'^(CREATE (?:UNIQUE )?INDEX ){re.escape(name)} ON (ONLY )?(\w+\.)?{re.escape(table)} ',
+            rf'\g<1>{_staged(name)} ON {staging} ',
+            definition,
+        )
+        cursor.execute(definition)
+        renames.append(('index', table, _staged(name), name))
+
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'x', 'f')
+        ORDER BY contype = 'f', conname
+        """,
+        (table,),
+    )
+    for name, definition in cursor.fetchall():
+        for parent in staged_tables:
+            definition = re.sub(
+                rf'REFERENCES (\w+\.)?{re.escape(parent)}\(',
+                f'REFERENCES {_staged(parent)}(',
+                definition,
+            )
+        cursor.execute(f"ALTER TABLE {staging} ADD CONSTRAINT {_staged(name)} {definition}")
+        renames.append(('constraint', table, _staged(name), name))
+    return renames
+
+
+def _swap_staged_tables(cursor, tables, renames):
+    """Rename loaded twins over the live tables inside the caller's transaction.
+
+    Serial id sequences stay shared: the twins were created with the live
+    column defaults, so ownership moves to them before the old tables drop.
+    """
+    cursor.execute(
+        """
+        SELECT seq.relname, tbl.relname, att.attname
+        FROM pg_depend d
+        JOIN pg_class seq ON seq.oid = d.objid AND seq.relkind = 'S'
+        JOIN pg_class tbl ON tbl.oid = d.refobjid
+        JOIN pg_attribute att ON att.attrelid = d.refobjid AND att.attnum = d.refobjsubid
+        WHERE d.deptype = 'a' AND tbl.relname = ANY(%s)
+        """,
+        (list(tables),),
+    )
+    owned_sequences = cursor.fetchall()
+
+    for table in tables:
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {table}{RETIRED_SUFFIX}")
+        cursor.execute(f"ALTER TABLE {_staged(table)} RENAME TO {table}")
+    for sequence, table, column in owned_sequences:
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{column}")
+    for table in reversed(tables):
+        cursor.execute(f"DROP TABLE {table}{RETIRED_SUFFIX}")
+
+    for kind, table, staged_name, live_name in renames:
+        if kind == 'index':
+            cursor.execute(f"ALTER INDEX {staged_name} RENAME TO {live_name}")
+        else:
+            cursor.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {staged_name} TO {live_name}")
+
+
+def load_staged(app, loads, prepare=None, after_swap=None):
+    """COPY ``loads`` into staging twins and swap them in atomically.
+
+    ``loads`` is a list of (table, columns, blocks), parents before children;
+    each ``blocks`` iterable yields COPY text blocks and is consumed in order.
+    ``prepare(cursor)`` runs on the loaded twins before indexes are built
+    (dedupe, orphan cleanup, derived columns). ``after_swap(cursor)`` runs in
+    the swap transaction, so derived stores and the dataset version commit
+    together with the new rows. Returns {table: rows loaded}.
+    """
+    tables = [table for table, _, _ in loads]
+    counts = {}
+    conn = _get_raw_conn(app)
+    cursor = conn.cursor()
+    try:
+        for table, columns, blocks in loads:
+            start = time.time()
+            staging = _create_staging_table(cursor, table)
+            cursor.copy_expert(
+                f"COPY {staging} ({', '.join(columns)}) FROM STDIN",
+                _BlockReader(blocks),
+                size=COPY_READ_SIZE,
+            )
+            counts[table] = cursor.rowcount
+            conn.commit()
+            print(f"  {table}: copied {counts[table]:,} rows in {time.time() - start:.1f}s")
+
+        if prepare:
+            prepare(cursor)
+            conn.commit()
+
+        renames = []
+        for table in tables:
+            start = time.time()
+            renames.extend(_build_staging_indexes(cursor, table, tables))
+            cursor.execute(f"ANALYZE {_staged(table)}")
+            conn.commit()
+            print(f"  {table}: indexes built in {time.time() - start:.1f}s")
+
+        _swap_staged_tables(cursor, tables, renames)
+        if after_swap:
+            after_swap(cursor)
+        conn.commit()
+        print(f"  Swapped in {', '.join(tables)}")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+    return counts
+
+
+# SQL twin of models.normalize_subdivision_key: uppercase, collapse whitespace.
+SUBDIVISION_KEY_SQL = "NULLIF(UPPER(BTRIM(REGEXP_REPLACE({col}, '\\s+', ' ', 'g'))), '')"
+
+
+def fill_hcad_max_sq_ft(cursor, properties='hcad_properties', buildings='hcad_buildings'):
+    """Set each property's max_sq_ft from its largest building."""
+    cursor.execute(f"UPDATE {properties} SET max_sq_ft = NULL WHERE max_sq_ft IS NOT NULL")
+    cursor.execute(f"""
+        UPDATE {properties} p
+        SET max_sq_ft = b.max_sq_ft
+        FROM (
+            SELECT acct, MAX(im_sq_ft) AS max_sq_ft
+            FROM {buildings}
+            GROUP BY acct
+        ) b
+        WHERE p.acct = b.acct
+    """)
+
+
+def build_hcad_comparables(cursor, fill_sq_ft=True):
+    """Fill hcad_properties.max_sq_ft and the HCAD comparables store.
+
+    Mirrors the filters find_comparables/get_subdivision_stats used to apply
+    per request: a situs address, a positive market value, and at least one
+    building with positive square footage. The staged import fills max_sq_ft
+    before its swap and passes ``fill_sq_ft=False``.
+    """
+    if fill_sq_ft:
+        fill_hcad_max_sq_ft(cursor)
+    cursor.execute("DELETE FROM tax_subdivision_comparables WHERE source = 'hcad'")
+    key = SUBDIVISION_KEY_SQL.format(col='lgl_2')
+    cursor.execute(f"""
+        INSERT INTO tax_subdivision_comparables
+            (source, subdivision_key, zip_code, market_value, sq_ft, property_id)
+        SELECT 'hcad', {key}, site_addr_3, tot_mkt_val, max_sq_ft, id
+        FROM hcad_properties
+        WHERE {key} IS NOT NULL
+          AND tot_mkt_val > 0
+          AND site_addr_1 IS NOT NULL AND site_addr_1 != ''
+          AND str_num IS NOT NULL AND str_num != '0'
+          AND max_sq_ft > 0
+        ORDER BY 2, 3, 4
+    """)
+    return cursor.rowcount
+
+
+def build_chambers_comparables(cursor):
+    """Fill the Chambers comparables store with homes that have improvements."""
+    cursor.execute("DELETE FROM tax_subdivision_comparables WHERE source = 'chambers'")
+    key = SUBDIVISION_KEY_SQL.format(col='legal1')
+    cursor.execute(f"""
+        INSERT INTO tax_subdivision_comparables
+            (source, subdivision_key, zip_code, market_value, sq_ft, property_id)
+        SELECT 'chambers', {key}, prop_zip5, market_value, NULL, id
+        FROM chambers_properties
+        WHERE {key} IS NOT NULL
+          AND market_value > 0
+          AND prop_street_number IS NOT NULL AND prop_street_number != '0'
+          AND prop_street IS NOT NULL
+          AND (improvement_hs_val > 0 OR improvement_nhs_val > 0)
+        ORDER BY 2, 3, 4
+    """)
+    return cursor.rowcount
+
+
+def build_comparables(app, sources=('hcad', 'chambers')):
+    """Precompute the subdivision comparables store from imported county rows."""
+    builders = {'hcad': build_hcad_comparables, 'chambers': build_chambers_comparables}
+    conn = _get_raw_conn(app)
+    cursor = conn.cursor()
+    for source in sources:
+        start = time.time()
+        print(f"Building {source} subdivision comparables...")
+        count = builders[source](cursor)
+        conn.commit()
+        print(f"  {source} comparables: {count:,} rows in {time.time() - start:.1f}s")
+    cursor.execute("ANALYZE tax_subdivision_comparables")
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+
+SNAPSHOT_QUERIES = {
+    'hcad': (
+        "SELECT subdivision_key, market_value FROM tax_subdivision_comparables "
+        "WHERE source = 'hcad' ORDER BY subdivision_key, market_value"
+    ),
+    'chambers': (
+        "SELECT subdivision_key, market_value FROM tax_subdivision_comparables "
+        "WHERE source = 'chambers' ORDER BY subdivision_key, market_value"
+    ),
+    'liberty': (
+        "SELECT abs_subdv_cd, market_value FROM liberty_properties "
+        "WHERE is_residential_home AND market_value > 0 AND abs_subdv_cd IS NOT NULL "
+        "ORDER BY abs_subdv_cd, market_value"
+    ),
+    'fort_bend': (
+        "SELECT nbhd_code, market_value FROM fort_bend_properties "
+        "WHERE is_residential_home AND market_value > 0 AND nbhd_code IS NOT NULL "
+        "ORDER BY nbhd_code, market_value"
+    ),
+}
+
+
+def build_snapshots(app, sources=tuple(SNAPSHOT_QUERIES)):
+    """Write the memory-mapped market-value snapshots read by web workers.
+
+    Streams each county through a server-side cursor into
+    services/tax_snapshot.write_snapshot, which swaps the file in atomically;
+    running workers pick the new file up on their next stats request. Each
+    file is stamped with the county's tax_dataset_versions version, so
+    workers ignore it once a later import bumps the version. Files land on
+    this host's TAX_SNAPSHOT_DIR; other web hosts only see them through a
+    shared volume.
+    """
+    from services.tax_snapshot import snapshot_path, write_snapshot
+
+    directory = app.config.get('TAX_SNAPSHOT_DIR')
+    if not directory:
+        print("TAX_SNAPSHOT_DIR is not set; skipping snapshots")
+        return
+    conn = _get_raw_conn(app)
+    for source in sources:
+        start = time.time()
+        with conn.cursor() as version_cursor:
+            version_cursor.execute(
+                "SELECT version FROM tax_dataset_versions WHERE source = %s",
+                (source,),
+            )
+            row = version_cursor.fetchone()
+        dataset_version = row[0] if row else 0
+        cursor = conn.cursor(name=f'{source}_snapshot')
+        cursor.itersize = 50000
+        cursor.execute(SNAPSHOT_QUERIES[source])
+        count = write_snapshot(
+            snapshot_path(source, directory), source, cursor, dataset_version,
+        )
+        cursor.close()
+        conn.commit()
+        print(
+            f"  {source} snapshot v{dataset_version}: {count:,} values "
+            f"in {time.time() - start:.1f}s"
+        )
+    conn.close()
+
+
+def record_dataset_version(cursor, source):
+    """Record a new dataset load and return its version; cached tax protest
+    export bundles for the county are keyed by this version and stop being
+    read once it commits."""
+    cursor.execute(
+        """
+        INSERT INTO tax_dataset_versions (source, version, loaded_at)
+        VALUES (%s, 1, NOW())
+        ON CONFLICT (source) DO UPDATE
+        SET version = tax_dataset_versions.version + 1, loaded_at = NOW()
+        RETURNING version
+        """,
+        (source,),
+    )
+    version = cursor.fetchone()[0]
+    print(f"  {source} dataset version -> {version}")
+    return version
 
 
 def _load_liberty_subdivision_lookup(filepath):
@@ -298,36 +742,25 @@ def _fort_bend_site_addr(row):
     )
 
 
-def import_chambers(app):
-    filepath = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tax_data', 'chambers.csv')
-    if not os.path.exists(filepath):
-        print(f"ERROR: {filepath} not found")
-        return
-
-    print("=== Importing Chambers County data ===")
-    start = time.time()
-
-    conn = _get_raw_conn(app)
-    cursor = conn.cursor()
-
-    print("Truncating chambers_properties...")
-    cursor.execute("DELETE FROM chambers_properties")
-    conn.commit()
-
-    columns = [
-        'parcel_id', 'account', 'street', 'street_overflow', 'city', 'zip5',
-        'prop_street_number', 'prop_street', 'prop_street_dir', 'prop_city', 'prop_zip5',
-        'legal1', 'legal2', 'legal3', 'legal4', 'acres', 'market_value',
-        'improvement_hs_val', 'improvement_nhs_val',
-    ]
+CHAMBERS_COLUMNS = [
+    'parcel_id', 'account', 'street', 'street_overflow', 'city', 'zip5',
+    'prop_street_number', 'prop_street', 'prop_street_dir', 'prop_city', 'prop_zip5',
+    'legal1', 'legal2', 'legal3', 'legal4', 'acres', 'market_value',
+    'improvement_hs_val', 'improvement_nhs_val', 'normalized_site_addr',
+]
 
-    batch = []
-    count = 0
 
+def _chambers_rows(filepath):
     with open(filepath, 'r', encoding='utf-8-sig') as f:
         reader = csv.DictReader(f)
         for row in reader:
-            batch.append((
+            situs = build_site_address(
+                clean(row.get('Prop_Street_Number')),
+                clean(row.get('Prop_Street_Dir')),
+                clean(row.get('Prop_Street')),
+                None,
+            )
+            yield (
                 clean(row.get('Parcel_ID')),
                 clean(row.get('Account')),
                 clean(row.get('Street')),
@@ -347,25 +780,44 @@ def import_chambers(app):
                 safe_int(row.get('Market_Value')),
                 safe_int(row.get('Improvement_Hs')),
                 safe_int(row.get('Improvement_Nhs')),
-            ))
+                normalize_address_text(situs),
+            )
 
-            if len(batch) >= BATCH_SIZE:
-                _bulk_insert(cursor, 'chambers_properties', columns, batch)
-                conn.commit()
-                count += len(batch)
-                print(f"  Chambers: {count:,} rows...")
-                batch = []
 
-    if batch:
-        _bulk_insert(cursor, 'chambers_properties', columns, batch)
-        conn.commit()
-        count += len(batch)
+def import_chambers(app):
+    filepath = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'tax_data', 'chambers.csv')
+    if not os.path.exists(filepath):
+        print(f"ERROR: {filepath} not found")
+        return
 
-    cursor.close()
-    conn.close()
+    print("=== Importing Chambers County data ===")
+    start = time.time()
+
+    def after_swap(cursor):
+        count = build_chambers_comparables(cursor)
+        print(f"  chambers comparables: {count:,} rows")
+        cursor.execute("ANALYZE tax_subdivision_comparables")
+        record_dataset_version(cursor, 'chambers')
+
+    counts = load_staged(
+        app,
+        [('chambers_properties', CHAMBERS_COLUMNS, _row_blocks(_chambers_rows(filepath)))],
+        after_swap=after_swap,
+    )
+    build_snapshots(app, sources=('chambers',))
 
     elapsed = time.time() - start
-    print(f"  Chambers complete: {count:,} rows in {elapsed:.1f}s")
+    print(f"  Chambers complete: {counts['chambers_properties']:,} rows in {elapsed:.1f}s")
+
+
+def _hcad_neighborhood_rows(filepath):
+    with open(filepath, 'r', encoding='utf-8-sig', errors='replace') as f:
+        reader = csv.DictReader(f, delimiter='\t')
+        for row in reader:
+            cd = clean(row.get('cd'))
+            if not cd:
+                continue
+            yield (cd, clean(row.get('grp_cd')), clean(row.get('dscr')))
 
 
 def import_hcad_neighborhoods(app):
@@ -376,38 +828,57 @@ def import_hcad_neighborhoods(app):
         return
 
     print("=== Importing HCAD neighborhood codes ===")
-    conn = _get_raw_conn(app)
-    cursor = conn.cursor()
+    counts = load_staged(
+        app,
+        [('hcad_neighborhood_codes', ['cd', 'grp_cd', 'dscr'], _row_blocks(_hcad_neighborhood_rows(nc_path)))],
+    )
+    print(f"  Neighborhood codes complete: {counts['hcad_neighborhood_codes']:,} rows")
 
-    cursor.execute("DELETE FROM hcad_neighborhood_codes")
-    conn.commit()
 
-    cols = ['cd', 'grp_cd', 'dscr']
-    batch = []
-    count = 0
+HCAD_MAIN_COLUMNS = [
+    'acct', 'str_num', 'str_num_sfx', 'str', 'str_sfx', 'str_sfx_dir', 'str_unit',
+    'site_addr_1', 'site_addr_2', 'site_addr_3',
+    'acreage', 'assessed_val', 'tot_appr_val', 'tot_mkt_val',
+    'lgl_1', 'lgl_2', 'lgl_3', 'lgl_4',
+    'neighborhood_code', 'normalized_site_addr',
+]
+HCAD_BUILDING_COLUMNS = ['acct', 'im_sq_ft']
 
-    with open(nc_path, 'r', encoding='utf-8-sig', errors='replace') as f:
-        reader = csv.DictReader(f, delimiter='\t')
-        for row in reader:
-            cd = clean(row.get('cd'))
-            if not cd:
-                continue
-            batch.append((cd, clean(row.get('grp_cd')), clean(row.get('dscr'))))
 
-            if len(batch) >= BATCH_SIZE:
-                _bulk_insert(cursor, 'hcad_neighborhood_codes', cols, batch)
-                conn.commit()
-                count += len(batch)
-                batch = []
+def _hcad_property_row(row):
+    acct = clean(row.get('acct'))
+    if not acct:
+        return None
+    site_addr_1 = clean(row.get('site_addr_1'))
+    return (
+        acct,
+        clean(row.get('str_num')),
+        clean(row.get('str_num_sfx')),
+        clean(row.get('str')),
+        clean(row.get('str_sfx')),
+        clean(row.get('str_sfx_dir')),
+        clean(row.get('str_unit')),
+        site_addr_1,
+        clean(row.get('site_addr_2')),
+        clean(row.get('site_addr_3')),
+        safe_decimal(row.get('acreage')),
+        safe_int(row.get('assessed_val')),
+        safe_int(row.get('tot_appr_val')),
+        safe_int(row.get('tot_mkt_val')),
+        clean(row.get('lgl_1')),
+        clean(row.get('lgl_2')),
+        clean(row.get('lgl_3')),
+        clean(row.get('lgl_4')),
+        clean(row.get('Neighborhood_Code')),
+        normalize_address_text(site_addr_1),
+    )
 
-    if batch:
-        _bulk_insert(cursor, 'hcad_neighborhood_codes', cols, batch)
-        conn.commit()
-        count += len(batch)
 
-    cursor.close()
-    conn.close()
-    print(f"  Neighborhood codes complete: {count:,} rows")
+def _hcad_building_row(row):
+    acct = clean(row.get('acct'))
+    if not acct:
+        return None
+    return (acct, safe_int(row.get('im_sq_ft')))
 
 
 def import_hcad(app):
@@ -421,215 +892,78 @@ def import_hcad(app):
         print(f"ERROR: {bld_path} not found")
         return
 
-    print("=== Importing Harris County (HCAD) data ===")
+    print(f"=== Importing Harris County (HCAD) data ({PARSE_WORKERS} parse workers) ===")
     start = time.time()
-
-    conn = _get_raw_conn(app)
-    cursor = conn.cursor()
-
-    print("Truncating hcad_buildings and hcad_properties...")
-    cursor.execute("DELETE FROM hcad_buildings")
-    cursor.execute("DELETE FROM hcad_properties")
-    conn.commit()
-
-
-    # --- Main properties ---
-    print("Importing HCAD main properties (real_acct.txt)...")
-    main_cols = [
-        'acct', 'str_num', 'str_num_sfx', 'str', 'str_sfx', 'str_sfx_dir', 'str_unit',
-        'site_addr_1', 'site_addr_2', 'site_addr_3',
-        'acreage', 'assessed_val', 'tot_appr_val', 'tot_mkt_val',
-        'lgl_1', 'lgl_2', 'lgl_3', 'lgl_4',
-        'neighborhood_code',
-    ]
-
-    batch = []
-    count = 0
-
-    with open(main_path, 'r', encoding='utf-8-sig', errors='replace') as f:
-        reader = csv.DictReader(f, delimiter='\t')
-        for row in reader:
-            acct = clean(row.get('acct'))
-            if not acct:
-                continue
-
-            batch.append((
-                acct,
-                clean(row.get('str_num')),
-                clean(row.get('str_num_sfx')),
-                clean(row.get('str')),
-                clean(row.get('str_sfx')),
-                clean(row.get('str_sfx_dir')),
-                clean(row.get('str_unit')),
-                clean(row.get('site_addr_1')),
-                clean(row.get('site_addr_2')),
-                clean(row.get('site_addr_3')),
-                safe_decimal(row.get('acreage')),
-                safe_int(row.get('assessed_val')),
-                safe_int(row.get('tot_appr_val')),
-                safe_int(row.get('tot_mkt_val')),
-                clean(row.get('lgl_1')),
-                clean(row.get('lgl_2')),
-                clean(row.get('lgl_3')),
-                clean(row.get('lgl_4')),
-                clean(row.get('Neighborhood_Code')),
-            ))
-
-            if len(batch) >= BATCH_SIZE:
-                _bulk_insert(cursor, 'hcad_properties', main_cols, batch)
-                conn.commit()
-                count += len(batch)
-                if count % 50000 < BATCH_SIZE:
-                    elapsed = time.time() - start
-                    print(f"  HCAD main: {count:,} rows... ({elapsed:.0f}s)")
-                batch = []
-
-    if batch:
-        _bulk_insert(cursor, 'hcad_properties', main_cols, batch)
-        conn.commit()
-        count += len(batch)
-
-    main_elapsed = time.time() - start
-    print(f"  HCAD main complete: {count:,} rows in {main_elapsed:.1f}s")
-
-    # --- Buildings ---
-    print("Importing HCAD buildings (building_res.txt)...")
-    bld_start = time.time()
-    bld_cols = ['acct', 'im_sq_ft']
-    batch = []
-    bld_count = 0
-    bld_skipped = 0
-
-    with open(bld_path, 'r', encoding='utf-8-sig', errors='replace') as f:
-        reader = csv.DictReader(f, delimiter='\t')
-        for row in reader:
-            acct = clean(row.get('acct'))
-            if not acct:
-                bld_skipped += 1
-                continue
-
-            batch.append((acct, safe_int(row.get('im_sq_ft'))))
-
-            if len(batch) >= BATCH_SIZE:
-                try:
-                    _bulk_insert(cursor, 'hcad_buildings', bld_cols, batch)
-                    conn.commit()
-                except Exception as e:
-                    conn.rollback()
-                    print(f"  Warning: batch insert failed ({e}), inserting individually...")
-                    for item in batch:
-                        try:
-                            cursor.execute(
-                                "INSERT INTO hcad_buildings (acct, im_sq_ft) VALUES (%s, %s)",
-                                item,
-                            )
-                            conn.commit()
-                        except Exception:
-                            conn.rollback()
-                            bld_skipped += 1
-                bld_count += len(batch)
-                if bld_count % 50000 < BATCH_SIZE:
-                    elapsed = time.time() - bld_start
-                    print(f"  HCAD buildings: {bld_count:,} rows... ({elapsed:.0f}s)")
-                batch = []
-
-    if batch:
-        try:
-            _bulk_insert(cursor, 'hcad_buildings', bld_cols, batch)
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            for item in batch:
-                try:
-                    cursor.execute(
-                        "INSERT INTO hcad_buildings (acct, im_sq_ft) VALUES (%s, %s)",
-                        item,
-                    )
-                    conn.commit()
-                except Exception:
-                    conn.rollback()
-                    bld_skipped += 1
-        bld_count += len(batch)
-
-    bld_elapsed = time.time() - bld_start
-    print(f"  HCAD buildings complete: {bld_count:,} rows in {bld_elapsed:.1f}s (skipped {bld_skipped:,})")
-
-    cursor.close()
-    conn.close()
-
-    total_elapsed = time.time() - start
-    print(f"=== HCAD import complete: {count:,} properties + {bld_count:,} buildings in {total_elapsed:.1f}s ===")
-
-
-def import_liberty(app):
-    repo_root = os.path.dirname(os.path.dirname(__file__))
-    downloads_dir = os.path.join(os.path.expanduser('~'), 'Downloads', '2026 PRELIMARY APPRAISAL ROLL')
-
-    property_path = resolve_existing_path(
-        os.path.join(repo_root, 'tax_data', 'liberty_county.txt'),
-        os.path.join(downloads_dir, '2026-03-31_002100_APPRAISAL_ENTITY_INFO.TXT'),
-    )
-    subdv_path = resolve_existing_path(
-        os.path.join(repo_root, 'tax_data', '2026-03-31_002100_APPRAISAL_ABSTRACT_SUBDV.TXT'),
-        os.path.join(downloads_dir, '2026-03-31_002100_APPRAISAL_ABSTRACT_SUBDV.TXT'),
-    )
-    imprv_info_path = resolve_existing_path(
-        os.path.join(repo_root, 'tax_data', '2026-03-31_002100_APPRAISAL_IMPROVEMENT_INFO.TXT'),
-        os.path.join(downloads_dir, '2026-03-31_002100_APPRAISAL_IMPROVEMENT_INFO.TXT'),
+    bld_stats = {}
+    cleanup = {}
+
+    def prepare(cursor):
+        properties = _staged('hcad_properties')
+        buildings = _staged('hcad_buildings')
+        # real_acct.txt repeats some accounts; keep the first, as the old
+        # ON CONFLICT (acct) DO NOTHING insert did.
+        cursor.execute(
+            f"DELETE FROM {properties} a USING {properties} b "
+            f"WHERE a.acct = b.acct AND a.id > b.id"
+        )
+        cleanup['duplicates'] = cursor.rowcount
+        cursor.execute(
+            f"DELETE FROM {buildings} b "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {properties} p WHERE p.acct = b.acct)"
+        )
+        cleanup['orphans'] = cursor.rowcount
+        fill_hcad_max_sq_ft(cursor, properties, buildings)
+
+    def after_swap(cursor):
+        count = build_hcad_comparables(cursor, fill_sq_ft=False)
+        print(f"  hcad comparables: {count:,} rows")
+        cursor.execute("ANALYZE tax_subdivision_comparables")
+        record_dataset_version(cursor, 'hcad')
+
+    counts = load_staged(
+        app,
+        [
+            ('hcad_properties', HCAD_MAIN_COLUMNS, _parallel_row_blocks(main_path, _hcad_property_row)),
+            ('hcad_buildings', HCAD_BUILDING_COLUMNS, _parallel_row_blocks(bld_path, _hcad_building_row, stats=bld_stats)),
+        ],
+        prepare=prepare,
+        after_swap=after_swap,
     )
-    imprv_detail_path = resolve_existing_path(
-        os.path.join(repo_root, 'tax_data', '2026-03-31_002100_APPRAISAL_IMPROVEMENT_DETAIL.TXT'),
-        os.path.join(downloads_dir, '2026-03-31_002100_APPRAISAL_IMPROVEMENT_DETAIL.TXT'),
-    )
-
-    missing = [
-        path for path in [property_path, subdv_path, imprv_info_path, imprv_detail_path]
-        if not path
-    ]
-    if missing:
-        print("ERROR: Liberty County source files not found")
-        return
+    build_snapshots(app, sources=('hcad',))
 
-    print("=== Importing Liberty County home data ===")
-    start = time.time()
-
-    subdv_lookup = _load_liberty_subdivision_lookup(subdv_path)
-    home_prop_ids, property_sq_ft, improvement_rows = _load_liberty_home_improvements(
-        imprv_info_path, imprv_detail_path
+    count = counts['hcad_properties'] - cleanup['duplicates']
+    bld_count = counts['hcad_buildings'] - cleanup['orphans']
+    bld_skipped = bld_stats.get('skipped', 0) + cleanup['orphans']
+    total_elapsed = time.time() - start
+    print(
+        f"=== HCAD import complete: {count:,} properties + {bld_count:,} buildings "
+        f"in {total_elapsed:.1f}s (skipped {bld_skipped:,} buildings) ==="
     )
 
-    print(f"  Liberty home properties identified: {len(home_prop_ids):,}")
-    print(f"  Liberty residential/mobile improvements: {len(improvement_rows):,}")
 
-    conn = _get_raw_conn(app)
-    cursor = conn.cursor()
+LIBERTY_PROPERTY_COLUMNS = [
+    'prop_id', 'geo_id', 'prop_type_cd',
+    'situs_num', 'situs_street_prefx', 'situs_street', 'situs_street_suffix', 'situs_unit',
+    'situs_city', 'situs_zip', 'site_addr_1', 'normalized_site_addr',
+    'legal_desc', 'legal_desc2', 'legal_acreage',
+    'abs_subdv_cd', 'abs_subdv_desc',
+    'appraised_val', 'assessed_val', 'market_value',
+    'imprv_hstd_val', 'imprv_non_hstd_val',
+    'sq_ft', 'is_residential_home',
+]
+LIBERTY_IMPROVEMENT_COLUMNS = [
+    'prop_id', 'imprv_id', 'imprv_type_cd', 'imprv_type_desc',
+    'imprv_homesite', 'imprv_val', 'residential_sq_ft', 'is_residential',
+]
 
-    print("Truncating liberty_improvements and liberty_properties...")
-    cursor.execute("DELETE FROM liberty_improvements")
-    cursor.execute("DELETE FROM liberty_properties")
-    conn.commit()
 
-    prop_cols = [
-        'prop_id', 'geo_id', 'prop_type_cd',
-        'situs_num', 'situs_street_prefx', 'situs_street', 'situs_street_suffix', 'situs_unit',
-        'situs_city', 'situs_zip', 'site_addr_1', 'normalized_site_addr',
-        'legal_desc', 'legal_desc2', 'legal_acreage',
-        'abs_subdv_cd', 'abs_subdv_desc',
-        'appraised_val', 'assessed_val', 'market_value',
-        'imprv_hstd_val', 'imprv_non_hstd_val',
-        'sq_ft', 'is_residential_home',
-    ]
-
-    batch = []
-    count = 0
-    imported_prop_ids = set()
+def _liberty_property_rows(property_path, home_prop_ids, subdv_lookup, property_sq_ft):
     with open(property_path, 'r', encoding='utf-8-sig', errors='replace') as f:
         for raw_line in f:
             line = raw_line.rstrip('\r\n')
             prop_id = fixed_text(line, 1, 12)
             if not prop_id or prop_id not in home_prop_ids:
                 continue
-            imported_prop_ids.add(prop_id)
 
             situs_num = fixed_text(line, 4460, 4474)
             situs_prefx = fixed_text(line, 1040, 1049)
@@ -641,7 +975,7 @@ def import_liberty(app):
             abs_subdv_cd = fixed_text(line, 1676, 1685)
             abs_subdv_desc = subdv_lookup.get(abs_subdv_cd) if abs_subdv_cd else None
 
-            batch.append((
+            yield (
                 prop_id,
                 fixed_text(line, 547, 596),
                 fixed_text(line, 13, 17),
@@ -666,101 +1000,95 @@ def import_liberty(app):
                 fixed_int(line, 1841, 1855),
                 property_sq_ft.get(prop_id),
                 True,
-            ))
-
-            if len(batch) >= BATCH_SIZE:
-                _bulk_insert(cursor, 'liberty_properties', prop_cols, batch)
-                conn.commit()
-                count += len(batch)
-                if count % 25000 < BATCH_SIZE:
-                    elapsed = time.time() - start
-                    print(f"  Liberty properties: {count:,} rows... ({elapsed:.0f}s)")
-                batch = []
-
-    if batch:
-        _bulk_insert(cursor, 'liberty_properties', prop_cols, batch)
-        conn.commit()
-        count += len(batch)
-
-    print(f"  Liberty properties complete: {count:,} rows")
-
-    imprv_cols = [
-        'prop_id', 'imprv_id', 'imprv_type_cd', 'imprv_type_desc',
-        'imprv_homesite', 'imprv_val', 'residential_sq_ft', 'is_residential',
-    ]
-    batch = []
-    imprv_count = 0
-    skipped_improvements = 0
-    for row in improvement_rows:
-        if row[0] not in imported_prop_ids:
-            skipped_improvements += 1
-            continue
-        batch.append(row)
-        if len(batch) >= BATCH_SIZE:
-            _bulk_insert(cursor, 'liberty_improvements', imprv_cols, batch)
-            conn.commit()
-            imprv_count += len(batch)
-            batch = []
-
-    if batch:
-        _bulk_insert(cursor, 'liberty_improvements', imprv_cols, batch)
-        conn.commit()
-        imprv_count += len(batch)
-
-    cursor.close()
-    conn.close()
-
-    elapsed = time.time() - start
-    print(
-        f"=== Liberty import complete: {count:,} properties + {imprv_count:,} improvements "
-        f"in {elapsed:.1f}s (skipped {skipped_improvements:,} orphan improvements) ==="
-    )
+            )
 
 
-def import_fort_bend(app):
+def import_liberty(app):
     repo_root = os.path.dirname(os.path.dirname(__file__))
-    base_dir = os.path.join(repo_root, 'tax_data', 'fort_bend_county_tax_data')
+    downloads_dir = os.path.join(os.path.expanduser('~'), 'Downloads', '2026 PRELIMARY APPRAISAL ROLL')
 
-    property_path = os.path.join(base_dir, 'PropertyProperty-E', 'PropertyDataExport4558080.txt')
-    improvement_path = os.path.join(base_dir, 'PropertyImprovement-E', 'PropertyDataExport4558083.txt')
-    land_path = os.path.join(base_dir, 'PropertyLand-E', 'PropertyDataExport4558082.txt')
+    property_path = resolve_existing_path(
+        os.path.join(repo_root, 'tax_data', 'liberty_county.txt'),
+        os.path.join(downloads_dir, '2026-03-31_002100_APPRAISAL_ENTITY_INFO.TXT'),
+    )
+    subdv_path = resolve_existing_path(
+        os.path.join(repo_root, 'tax_data', '2026-03-31_002100_APPRAISAL_ABSTRACT_SUBDV.TXT'),
+        os.path.join(downloads_dir, '2026-03-31_002100_APPRAISAL_ABSTRACT_SUBDV.TXT'),
+    )
+    imprv_info_path = resolve_existing_path(
+        os.path.join(repo_root, 'tax_data', '2026-03-31_002100_APPRAISAL_IMPROVEMENT_INFO.TXT'),
+        os.path.join(downloads_dir, '2026-03-31_002100_APPRAISAL_IMPROVEMENT_INFO.TXT'),
+    )
+    imprv_detail_path = resolve_existing_path(
+        os.path.join(repo_root, 'tax_data', '2026-03-31_002100_APPRAISAL_IMPROVEMENT_DETAIL.TXT'),
+        os.path.join(downloads_dir, '2026-03-31_002100_APPRAISAL_IMPROVEMENT_DETAIL.TXT'),
+    )
 
-    missing = [path for path in [property_path, improvement_path, land_path] if not os.path.exists(path)]
+    missing = [
+        path for path in [property_path, subdv_path, imprv_info_path, imprv_detail_path]
+        if not path
+    ]
     if missing:
-        print("ERROR: Fort Bend County source files not found")
+        print("ERROR: Liberty County source files not found")
         return
 
-    print("=== Importing Fort Bend County home data ===")
+    print("=== Importing Liberty County home data ===")
     start = time.time()
 
-    home_prop_ids = _load_fort_bend_home_property_ids(improvement_path)
-    acreage_by_prop = _load_fort_bend_acreage(land_path)
+    subdv_lookup = _load_liberty_subdivision_lookup(subdv_path)
+    home_prop_ids, property_sq_ft, improvement_rows = _load_liberty_home_improvements(
+        imprv_info_path, imprv_detail_path
+    )
 
-    print(f"  Fort Bend home properties identified: {len(home_prop_ids):,}")
-    print(f"  Fort Bend properties with acreage: {len(acreage_by_prop):,}")
+    print(f"  Liberty home properties identified: {len(home_prop_ids):,}")
+    print(f"  Liberty residential/mobile improvements: {len(improvement_rows):,}")
 
-    conn = _get_raw_conn(app)
-    cursor = conn.cursor()
+    cleanup = {}
+
+    def prepare(cursor):
+        properties = _staged('liberty_properties')
+        improvements = _staged('liberty_improvements')
+        cursor.execute(
+            f"DELETE FROM {improvements} i "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {properties} p WHERE p.prop_id = i.prop_id)"
+        )
+        cleanup['orphans'] = cursor.rowcount
+
+    property_rows = _liberty_property_rows(property_path, home_prop_ids, subdv_lookup, property_sq_ft)
+    counts = load_staged(
+        app,
+        [
+            ('liberty_properties', LIBERTY_PROPERTY_COLUMNS, _row_blocks(property_rows)),
+            ('liberty_improvements', LIBERTY_IMPROVEMENT_COLUMNS, _row_blocks(improvement_rows)),
+        ],
+        prepare=prepare,
+        after_swap=lambda cursor: record_dataset_version(cursor, 'liberty'),
+    )
+    build_snapshots(app, sources=('liberty',))
 
-    print("Truncating fort_bend_properties...")
-    cursor.execute("DELETE FROM fort_bend_properties")
-    conn.commit()
+    count = counts['liberty_properties']
+    imprv_count = counts['liberty_improvements'] - cleanup['orphans']
+    elapsed = time.time() - start
+    print(
+        f"=== Liberty import complete: {count:,} properties + {imprv_count:,} improvements "
+        f"in {elapsed:.1f}s (skipped {cleanup['orphans']:,} orphan improvements) ==="
+    )
 
-    prop_cols = [
-        'property_id', 'quick_ref_id', 'property_number',
-        'legal_desc', 'legal_location_code', 'legal_location_desc', 'legal_acres',
-        'market_value', 'assessed_value', 'land_value', 'improvement_value',
-        'sq_ft', 'nbhd_code', 'nbhd_desc',
-        'situs', 'site_addr_1', 'normalized_site_addr',
-        'situs_pre_directional', 'situs_street_number', 'situs_street_name',
-        'situs_street_suffix', 'situs_post_directional',
-        'situs_city', 'situs_state', 'situs_zip',
-        'acreage', 'is_residential_home',
-    ]
 
-    batch = []
-    count = 0
+FORT_BEND_PROPERTY_COLUMNS = [
+    'property_id', 'quick_ref_id', 'property_number',
+    'legal_desc', 'legal_location_code', 'legal_location_desc', 'legal_acres',
+    'market_value', 'assessed_value', 'land_value', 'improvement_value',
+    'sq_ft', 'nbhd_code', 'nbhd_desc',
+    'situs', 'site_addr_1', 'normalized_site_addr',
+    'situs_pre_directional', 'situs_street_number', 'situs_street_name',
+    'situs_street_suffix', 'situs_post_directional',
+    'situs_city', 'situs_state', 'situs_zip',
+    'acreage', 'is_residential_home',
+]
 
+
+def _fort_bend_property_rows(property_path, home_prop_ids, acreage_by_prop):
     with open(property_path, 'r', newline='', encoding='utf-8-sig', errors='replace') as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -789,7 +1117,7 @@ def import_fort_bend(app):
             if improvement_value is None:
                 improvement_value = safe_int(row.get('ImprovmentValue'))
 
-            batch.append((
+            yield (
                 property_id,
                 clean(row.get('QuickRefID')),
                 clean(row.get('PropertyNumber')),
@@ -817,27 +1145,41 @@ def import_fort_bend(app):
                 clean(row.get('SitusZip')),
                 acreage,
                 True,
-            ))
+            )
 
-            if len(batch) >= BATCH_SIZE:
-                _bulk_insert(cursor, 'fort_bend_properties', prop_cols, batch)
-                conn.commit()
-                count += len(batch)
-                if count % 25000 < BATCH_SIZE:
-                    elapsed = time.time() - start
-                    print(f"  Fort Bend properties: {count:,} rows... ({elapsed:.0f}s)")
-                batch = []
 
-    if batch:
-        _bulk_insert(cursor, 'fort_bend_properties', prop_cols, batch)
-        conn.commit()
-        count += len(batch)
+def import_fort_bend(app):
+    repo_root = os.path.dirname(os.path.dirname(__file__))
+    base_dir = os.path.join(repo_root, 'tax_data', 'fort_bend_county_tax_data')
 
-    cursor.close()
-    conn.close()
+    property_path = os.path.join(base_dir, 'PropertyProperty-E', 'PropertyDataExport4558080.txt')
+    improvement_path = os.path.join(base_dir, 'PropertyImprovement-E', 'PropertyDataExport4558083.txt')
+    land_path = os.path.join(base_dir, 'PropertyLand-E', 'PropertyDataExport4558082.txt')
+
+    missing = [path for path in [property_path, improvement_path, land_path] if not os.path.exists(path)]
+    if missing:
+        print("ERROR: Fort Bend County source files not found")
+        return
+
+    print("=== Importing Fort Bend County home data ===")
+    start = time.time()
+
+    home_prop_ids = _load_fort_bend_home_property_ids(improvement_path)
+    acreage_by_prop = _load_fort_bend_acreage(land_path)
+
+    print(f"  Fort Bend home properties identified: {len(home_prop_ids):,}")
+    print(f"  Fort Bend properties with acreage: {len(acreage_by_prop):,}")
+
+    property_rows = _fort_bend_property_rows(property_path, home_prop_ids, acreage_by_prop)
+    counts = load_staged(
+        app,
+        [('fort_bend_properties', FORT_BEND_PROPERTY_COLUMNS, _row_blocks(property_rows))],
+        after_swap=lambda cursor: record_dataset_version(cursor, 'fort_bend'),
+    )
+    build_snapshots(app, sources=('fort_bend',))
 
     elapsed = time.time() - start
-    print(f"=== Fort Bend import complete: {count:,} properties in {elapsed:.1f}s ===")
+    print(f"=== Fort Bend import complete: {counts['fort_bend_properties']:,} properties in {elapsed:.1f}s ===")
 
 
 if __name__ == '__main__':
@@ -854,5 +1196,9 @@ if __name__ == '__main__':
         import_liberty(app)
     if target in ('all', 'fort_bend', 'fortbend'):
         import_fort_bend(app)
+    if target == 'comparables':
+        build_comparables(app)
+    if target in ('comparables', 'snapshots'):
+        build_snapshots(app)
 
     print("\nDone!")
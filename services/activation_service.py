@@ -345,8 +345,12 @@ def _activated_within_hours(user, hours):
 
 def record_event(event, *, user=None, organization_id=None, user_id=None,
                  data=None, commit=True, once=False, once_stage=None,
-                 surface=None, source=None, sync_person=True):
-    """Append an activation/retention event. Never raises."""
+                 surface=None, source=None, sync_person=True, mirror=True):
+    """Append an activation/retention event. Never raises.
+
+    ``mirror=False`` skips PostHog; callers that commit later call
+    :func:`mirror_event` once the row is stored.
+    """
     try:
         if user is not None:
             organization_id = organization_id or getattr(user, 'organization_id', None)
@@ -375,24 +379,12 @@ def record_event(event, *, user=None, organization_id=None, user_id=None,
         db.session.add(entry)
         if commit:
             db.session.commit()
-
-        try:
-            from services.product_analytics import capture
-            capture(
-                event,
-                user=user,
-                user_id=user_id,
-                organization_id=organization_id,
-                properties=payload,
+        if mirror:
+            mirror_event(
+                event, user=user, user_id=user_id,
+                organization_id=organization_id, properties=payload,
+                sync_person=sync_person,
             )
-        except Exception:
-            logger.exception('PostHog mirror failed for activation event %s', event)
-
-        if sync_person and user is not None:
-            try:
-                sync_person_properties(user)
-            except Exception:
-                logger.exception('Person property sync failed for %s', event)
         return entry
     except Exception:
         logger.exception('Failed to record activation event %s (org=%s user=%s)',
@@ -404,6 +396,28 @@ def record_event(event, *, user=None, organization_id=None, user_id=None,
         return None
 
 
+def mirror_event(event, *, user=None, user_id=None, organization_id=None,
+                 properties=None, sync_person=True):
+    """Mirror a stored activation event to PostHog. Never raises."""
+    try:
+        from services.product_analytics import capture
+        capture(
+            event,
+            user=user,
+            user_id=user_id,
+            organization_id=organization_id,
+            properties=properties,
+        )
+    except Exception:
+        logger.exception('PostHog mirror failed for activation event %s', event)
+
+    if sync_person and user is not None:
+        try:
+            sync_person_properties(user)
+        except Exception:
+            logger.exception('Person property sync failed for %s', event)
+
+
 def record_daily_session(user, *, surface=None):
     """Record at most one authenticated session event per user per UTC day."""
     if user is None or not is_customer_user(user):
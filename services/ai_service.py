@@ -27,6 +27,7 @@ import os
 import openai
 import logging
 from config import Config
+from services.openai_clients import BACKGROUND, get_client
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -183,7 +184,7 @@ def generate_ai_response(
         raise ValueError("OpenAI API key is not configured")
     
     # Initialize client
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key)
     
     # Log masked API key for debugging
     masked_key = f"{key[:8]}...{key[-4:]}" if len(key) > 12 else "***"
@@ -284,7 +285,7 @@ def generate_structured_response(
         raise ValueError("OpenAI API key is not configured")
 
     chain = tuple(model_chain) if model_chain else MODEL_CHAIN
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key)
     last_error = None
     text_format = {
         "type": "json_schema",
@@ -412,7 +413,7 @@ def generate_chat_response(
         raise ValueError("OpenAI API key is not configured")
     
     # Initialize client
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key)
     
     # Extract system prompt and build user context for Responses API
     system_prompt = ""
@@ -498,7 +499,7 @@ def stream_chat_response(
         yield "Sorry, the AI service is not configured. Please try again later."
         return
 
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key)
 
     def _build_user_content(prompt, img):
         if img:
@@ -578,6 +579,9 @@ MAX_TOOL_ROUNDS = 5
 TOOL_REASONING_EFFORT = "low"
 TOOL_REASONING_EFFORT_FILES = "medium"
 
+# Read tools from one round that may run at the same time.
+TOOL_PARALLELISM = 4
+
 
 def run_tool_conversation(
     system_prompt: str,
@@ -590,6 +594,9 @@ def run_tool_conversation(
     input_files: list[dict] | None = None,
     reasoning_effort: str | None = None,
     safety_identifier: str | None = None,
+    parallel_safe=None,
+    prompt_cache_key: str | None = None,
+    org_id: int | None = None,
 ):
     """Run a tool-calling conversation via the Responses API.
 
@@ -599,7 +606,7 @@ def run_tool_conversation(
         ('tool_result', {'name', 'result'})     that tool returned
         ('text', str)                           a chunk of the final answer
         ('messages', list)                      full transcript incl. tool turns
-        ('telemetry', dict)                     model/usage/trace for OBS-1
+        ('telemetry', dict)                     model/usage/cache/trace for OBS-1
         ('error', str)                          fatal; no answer was produced
 
     ``execute_tool(name, arguments)`` must return a ``(model_payload, meta)``
@@ -607,6 +614,14 @@ def run_tool_conversation(
     the 'tool_result' event. It must not raise; a failure should come back as a
     payload the model can read and recover from.
 
+    ``parallel_safe(name)`` marks tools (reads) that may run concurrently when
+    the model asks for several of them back to back in one round. Those calls
+    run on a small thread pool, each in its own app context (and so its own
+    database session, scoped to ``org_id`` for row-level security), so
+    ``execute_tool`` must be thread-safe for them.
+    Everything else runs one at a time in the order requested. Events and
+    transcript rows always come back in call order.
+
     Args:
         messages: Prior turns as OpenAI message dicts (no system message).
         tools: OpenAI function-tool schemas (Completions nested shape OK;
@@ -615,6 +630,11 @@ def run_tool_conversation(
         input_files: Optional trusted file payloads (PDFs as complete docs).
         reasoning_effort: Override Responses reasoning effort for this turn.
         safety_identifier: Privacy-preserving end-user identifier for OpenAI.
+        parallel_safe: Optional predicate on tool name; see above.
+        prompt_cache_key: Provider prompt-cache routing key; pass the tool
+            bundle's key so turns with the same tools share a cached prefix.
+        org_id: Organization whose RLS context parallel tool calls set on
+            their own database sessions.
         temperature: Retained for API compatibility; Responses path ignores it.
     """
     del temperature  # Responses tool loop does not use Completions temperature.
@@ -623,7 +643,7 @@ def run_tool_conversation(
         yield ('error', 'Sorry, the AI service is not configured. Please try again later.')
         return
 
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key)
     files = list(input_files or [])
     effort = reasoning_effort or (
         TOOL_REASONING_EFFORT_FILES if files else TOOL_REASONING_EFFORT
@@ -638,6 +658,9 @@ def run_tool_conversation(
         max_rounds=max_rounds,
         reasoning_effort=effort,
         safety_identifier=safety_identifier,
+        parallel_safe=parallel_safe,
+        prompt_cache_key=prompt_cache_key,
+        org_id=org_id,
     )
 
 
@@ -652,6 +675,9 @@ def _run_responses_tool_conversation(
     max_rounds: int,
     reasoning_effort: str = TOOL_REASONING_EFFORT,
     safety_identifier: str | None = None,
+    parallel_safe=None,
+    prompt_cache_key: str | None = None,
+    org_id: int | None = None,
 ):
     """Unified Responses API tool loop for CRM and Telegram turns."""
     input_items = _responses_input_items(messages, input_files)
@@ -660,6 +686,8 @@ def _run_responses_tool_conversation(
     last_model = None
     last_usage = None
     last_response_id = None
+    prompt_cache = {'key': prompt_cache_key, 'rounds': 0,
+                    'input_tokens': 0, 'cached_tokens': 0}
 
     for round_index in range(max_rounds):
         is_final_round = round_index == max_rounds - 1
@@ -671,6 +699,7 @@ def _run_responses_tool_conversation(
             allow_tools=not is_final_round,
             reasoning_effort=reasoning_effort,
             safety_identifier=safety_identifier,
+            prompt_cache_key=prompt_cache_key,
         )
         if response is None:
             yield ('error', 'Sorry, I encountered an error. Please try again.')
@@ -679,6 +708,7 @@ def _run_responses_tool_conversation(
         last_model = getattr(response, 'model', None) or last_model
         last_usage = getattr(response, 'usage', None) or last_usage
         last_response_id = getattr(response, 'id', None) or last_response_id
+        _add_prompt_cache_usage(prompt_cache, getattr(response, 'usage', None))
 
         output_items = list(getattr(response, 'output', None) or [])
         input_items.extend(output_items)
@@ -696,6 +726,7 @@ def _run_responses_tool_conversation(
                 'model': last_model,
                 'response_trace_id': last_response_id,
                 'usage': _usage_to_dict(last_usage),
+                'prompt_cache': _prompt_cache_summary(prompt_cache),
                 'reasoning_effort': reasoning_effort,
             })
             yield ('messages', transcript)
@@ -718,25 +749,30 @@ def _run_responses_tool_conversation(
             ],
         })
 
-        for call in tool_calls:
-            name = call.name
-            arguments = _parse_tool_arguments(call.arguments)
-            yield ('tool_start', {'name': name, 'arguments': arguments})
-
-            payload, meta = execute_tool(name, arguments)
-            yield ('tool_result', {'name': name, 'result': meta})
-            output_text = json.dumps(payload, default=str)
-            transcript.append({
-                'role': 'tool',
-                'tool_call_id': call.call_id,
-                'name': name,
-                'content': output_text,
-            })
-            input_items.append({
-                'type': 'function_call_output',
-                'call_id': call.call_id,
-                'output': output_text,
-            })
+        for batch in _tool_call_batches(tool_calls, parallel_safe):
+            parsed = [(call, _parse_tool_arguments(call.arguments)) for call in batch]
+            for call, arguments in parsed:
+                yield ('tool_start', {'name': call.name, 'arguments': arguments})
+
+            outcomes = _execute_tool_batch(
+                execute_tool, [(call.name, arguments) for call, arguments in parsed],
+                org_id=org_id,
+            )
+            for (call, _arguments), (payload, meta) in zip(parsed, outcomes):
+                name = call.name
+                yield ('tool_result', {'name': name, 'result': meta})
+                output_text = json.dumps(payload, default=str)
+                transcript.append({
+                    'role': 'tool',
+                    'tool_call_id': call.call_id,
+                    'name': name,
+                    'content': output_text,
+                })
+                input_items.append({
+                    'type': 'function_call_output',
+                    'call_id': call.call_id,
+                    'output': output_text,
+                })
 
     yield ('text', (
         'I got partway through that but ran out of steps before I could wrap up. '
@@ -747,23 +783,95 @@ def _run_responses_tool_conversation(
         'model': last_model,
         'response_trace_id': last_response_id,
         'usage': _usage_to_dict(last_usage),
+        'prompt_cache': _prompt_cache_summary(prompt_cache),
         'reasoning_effort': reasoning_effort,
     })
     yield ('messages', transcript)
 
 
+def _tool_call_batches(tool_calls: list, parallel_safe) -> list[list]:
+    """Group back-to-back parallel-safe calls; every other call stands alone."""
+    batches: list[list] = []
+    previous_safe = False
+    for call in tool_calls:
+        safe = parallel_safe is not None and bool(parallel_safe(call.name))
+        if safe and previous_safe:
+            batches[-1].append(call)
+        else:
+            batches.append([call])
+        previous_safe = safe
+    return batches
+
+
+def _execute_tool_batch(execute_tool, calls: list[tuple[str, dict]], *,
+                        org_id: int | None = None) -> list:
+    """Run ``calls``, concurrently when there is more than one.
+
+    Each thread gets a fresh session, which has none of the request's
+    ``SET LOCAL app.current_org_id``; without it FORCE ROW LEVEL SECURITY
+    tables read back empty on Postgres.
+    """
+    from flask import current_app, has_app_context
+    from jobs.base import set_job_org_context
+    from models import db
+
+    if len(calls) < 2 or not has_app_context():
+        return [execute_tool(name, arguments) for name, arguments in calls]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    app = current_app._get_current_object()
+
+    def run(call):
+        name, arguments = call
+        with app.app_context():
+            try:
+                if org_id is not None:
+                    set_job_org_context(org_id)
+                return execute_tool(name, arguments)
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(
+        max_workers=min(len(calls), TOOL_PARALLELISM),
+        thread_name_prefix='bob-tool',
+    ) as pool:
+        return list(pool.map(run, calls))
+
+
 def _usage_to_dict(usage) -> dict | None:
     if usage is None:
         return None
     if isinstance(usage, dict):
         return usage
+    details = getattr(usage, 'input_tokens_details', None)
     return {
         'input_tokens': getattr(usage, 'input_tokens', None),
+        'cached_tokens': getattr(details, 'cached_tokens', None),
         'output_tokens': getattr(usage, 'output_tokens', None),
         'total_tokens': getattr(usage, 'total_tokens', None),
     }
 
 
+def _add_prompt_cache_usage(totals: dict, usage) -> None:
+    """Fold one round's input and cached-input tokens into ``totals``."""
+    counts = _usage_to_dict(usage)
+    if not counts:
+        return
+    totals['rounds'] += 1
+    totals['input_tokens'] += counts.get('input_tokens') or 0
+    totals['cached_tokens'] += counts.get('cached_tokens') or 0
+
+
+def _prompt_cache_summary(totals: dict) -> dict:
+    """Input tokens across every round and the share served from cache."""
+    input_tokens = totals['input_tokens']
+    return {
+        **totals,
+        'hit_rate': round(totals['cached_tokens'] / input_tokens, 3) if input_tokens else None,
+    }
+
+
 def _responses_input_items(messages: list, input_files: list[dict]) -> list:
     """Convert chat messages and append native files to the current user turn."""
     items = []
@@ -836,6 +944,7 @@ def _responses_tool_round_with_fallback(
     allow_tools: bool,
     reasoning_effort: str = TOOL_REASONING_EFFORT,
     safety_identifier: str | None = None,
+    prompt_cache_key: str | None = None,
 ):
     """One Responses API round, walking the standard model fallback chain."""
     for i, model in enumerate(MODEL_CHAIN):
@@ -851,6 +960,8 @@ def _responses_tool_round_with_fallback(
                 kwargs['tool_choice'] = 'auto'
             if safety_identifier:
                 kwargs['safety_identifier'] = safety_identifier
+            if prompt_cache_key:
+                kwargs['prompt_cache_key'] = prompt_cache_key
 
             logger.info(
                 f"[{i+1}/{len(MODEL_CHAIN)}] Responses tool round: "
@@ -996,7 +1107,7 @@ def transcribe_audio(audio_data: bytes, filename: str = "audio.webm", api_key: s
         raise ValueError("OpenAI API key is not configured")
     
     # Initialize client
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key)
     
     try:
         logger.info(f"Transcribing audio file: {filename} ({len(audio_data)} bytes)")
@@ -1053,7 +1164,7 @@ def generate_vision_response(
         raise ValueError("OpenAI API key is not configured")
     
     # Initialize client
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key, timeout_class=BACKGROUND)
     
     # Build content array with text and images
     user_content = [{"type": "text", "text": user_prompt}]
@@ -1275,7 +1386,7 @@ def generate_contact_extraction(
     if not key:
         raise ValueError("OpenAI API key is not configured")
 
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key, timeout_class=BACKGROUND)
 
     img_count = len(image_blocks or [])
     text_len = len(text or '')
@@ -1362,7 +1473,9 @@ def generate_document_extraction(
     Args:
         system_prompt: Instructions for the extraction task
         user_prompt: Field definitions and format instructions
-        images: List of base64-encoded PNG image strings (one per page)
+        images: One entry per page: a base64-encoded PNG string, or a dict
+            with base64 ``data`` plus optional ``mime`` and ``detail``
+            (see services.page_render_plan)
         api_key: Optional API key override
 
     Returns:
@@ -1372,13 +1485,20 @@ def generate_document_extraction(
     if not key:
         raise ValueError("OpenAI API key is not configured")
 
-    client = openai.OpenAI(api_key=key)
+    client = get_client(key, timeout_class=BACKGROUND)
 
     user_content = [{"type": "text", "text": user_prompt}]
-    for img_b64 in images or []:
+    for image in images or []:
+        if isinstance(image, dict):
+            mime = image.get("mime") or "image/png"
+            url = f"data:{mime};base64,{image['data']}"
+            detail = image.get("detail") or "high"
+        else:
+            url = f"data:image/png;base64,{image}"
+            detail = "high"
         user_content.append({
             "type": "image_url",
-            "image_url": {"url": f"data:image/png;base64,{img_b64}", "detail": "high"}
+            "image_url": {"url": url, "detail": detail}
         })
 
     models = [EXTRACTION_MODEL, EXTRACTION_FALLBACK_MODEL, EXTRACTION_LEGACY_MODEL]
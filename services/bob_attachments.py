@@ -184,13 +184,13 @@ def _classify_intent_with_model(text: str, attachment_kind: str) -> str:
     """Small structured classifier for ambiguous action-like phrasing."""
     try:
         import json
-        import openai
+        from services.openai_clients import get_client
         from config import Config
 
         if not Config.OPENAI_API_KEY:
             return INTENT_AMBIGUOUS
 
-        client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+        client = get_client()
         response = client.chat.completions.create(
             model='gpt-4.1-mini',
             messages=[
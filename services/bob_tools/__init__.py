@@ -18,11 +18,14 @@ from services.bob_tools.context import (
 from services.bob_tools.registry import (
     TOOLS,
     TOOLS_BY_NAME,
+    ToolBundle,
     confirm_action,
     dispatch,
     openai_tool_schemas,
+    parallel_safe,
     reject_action,
     select_tools,
+    tool_bundle,
     undo_action,
 )
 
@@ -38,10 +41,13 @@ __all__ = [
     'CONFIRM_PRECLEARED',
     'TOOLS',
     'TOOLS_BY_NAME',
+    'ToolBundle',
     'dispatch',
     'confirm_action',
     'reject_action',
     'undo_action',
     'openai_tool_schemas',
+    'parallel_safe',
     'select_tools',
+    'tool_bundle',
 ]
@@ -3,11 +3,14 @@
 The schemas here are the only place per-tool instruction lives. The model reads
 them on every call, so they carry the "how to use" detail; the system prompt
 carries cross-tool policy only. Keeping one source of truth means adding a tool
-cannot silently desync from the prompt.
+cannot silently desync from the prompt. Each tool set a turn can get is a
+``ToolBundle`` built at import in a fixed order, so repeated turns send
+byte-identical schemas and hit the provider's prompt cache.
 
 Dispatch owns the safety policy:
 
-- Reads and low-risk writes execute immediately.
+- Reads and low-risk writes execute immediately. Reads listed in
+  ``PARALLEL_READ_TOOL_NAMES`` may run concurrently within one model round.
 - High-risk writes are previewed, persisted as a pending ``BobAction``, and only
   executed after the agent confirms.
 - Arguments are filtered to declared parameters, so a hallucinated
@@ -1850,17 +1853,117 @@ TX_WRITE_TOOL_NAMES = frozenset({
 })
 MARKETING_TOOL_NAMES = frozenset(t.name for t in MARKETING_TOOLS)
 
+# Reads that may run concurrently within one model round. Selecting a
+# transaction is read-risk but rebinds the Telegram session context, so it
+# stays in order with everything else.
+PARALLEL_READ_TOOL_NAMES = frozenset(
+    t.name for t in TOOLS if t.risk == RISK_READ
+) - {'select_transaction_context'}
+
+
+def parallel_safe(name: str) -> bool:
+    """True when ``name`` may run alongside other reads from the same round."""
+    return name in PARALLEL_READ_TOOL_NAMES
+
+
+# Tool order inside every ``tools=`` payload. The tools block leads each
+# request, so the provider's prompt cache only reuses the part of it that
+# matches byte for byte from the start. Groups run from most to least stable:
+# CRM core (every turn), marketing (fixed per org), then transaction search,
+# reads and writes (Telegram adds these once a transaction is selected).
+# Registry order is kept within a group.
+_ATTACHMENT_TOOL_NAMES = frozenset({'inspect_attachment', 'import_contacts'})
+_TX_SEARCH_TOOL_NAMES = frozenset({'search_transactions', 'select_transaction_context'})
+_PROMPT_GROUPS = (
+    CORE_TOOL_NAMES | _ATTACHMENT_TOOL_NAMES,
+    MARKETING_TOOL_NAMES,
+    _TX_SEARCH_TOOL_NAMES,
+    TX_READ_TOOL_NAMES - _TX_SEARCH_TOOL_NAMES,
+    TX_WRITE_TOOL_NAMES,
+)
+
+
+def _prompt_rank(tool: Tool) -> int:
+    for rank, group in enumerate(_PROMPT_GROUPS):
+        if tool.name in group:
+            return rank
+    return len(_PROMPT_GROUPS)
 
-def select_tools(ctx: BobContext | None = None) -> tuple[Tool, ...]:
-    """Dynamic tool bundle by surface / entity / attachment state."""
-    if ctx is None:
-        return TOOLS
 
+TOOLS_IN_PROMPT_ORDER: tuple[Tool, ...] = tuple(sorted(TOOLS, key=_prompt_rank))
+
+# Transaction tool access, from select_tools.
+TX_NONE = 'none'
+TX_SEARCH = 'search'
+TX_READ = 'read'
+TX_READ_WRITE = 'read_write'
+
+
+@dataclass(frozen=True)
+class ToolBundle:
+    """One precomputed ``tools=`` payload.
+
+    ``schemas`` are built once and shared, so every turn with the same tool
+    set sends identical bytes. ``cache_key`` is a digest of them, passed as the
+    provider's ``prompt_cache_key`` so those turns land on the same cache.
+    """
+    tools: tuple[Tool, ...]
+    schemas: tuple[dict, ...]
+    cache_key: str
+
+
+def _variant_names(*, attachment: bool, marketing: bool, tx_access: str) -> frozenset[str]:
     names = set(CORE_TOOL_NAMES)
+    if attachment:
+        names.update(_ATTACHMENT_TOOL_NAMES)
+    if marketing:
+        names.update(MARKETING_TOOL_NAMES)
+    if tx_access != TX_NONE:
+        names.update(TX_READ_TOOL_NAMES)
+    if tx_access == TX_SEARCH:
+        names -= (TX_READ_TOOL_NAMES - _TX_SEARCH_TOOL_NAMES)
+        names -= TX_WRITE_TOOL_NAMES
+    elif tx_access == TX_READ_WRITE:
+        names.update(TX_WRITE_TOOL_NAMES)
+    return frozenset(names)
+
+
+def _build_bundle(names: frozenset[str]) -> ToolBundle:
+    tools = tuple(t for t in TOOLS_IN_PROMPT_ORDER if t.name in names)
+    schemas = tuple(
+        {
+            'type': 'function',
+            'function': {
+                'name': tool.name,
+                'description': tool.description,
+                'parameters': tool.parameters,
+            },
+        }
+        for tool in tools
+    )
+    payload = json.dumps(schemas, separators=(',', ':'), ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    return ToolBundle(tools=tools, schemas=schemas, cache_key=f'bob-tools-{digest}')
+
+
+# Every (attachment, marketing, transaction access) variant tool_bundle can
+# produce, keyed by tool-name set, built once at import.
+_BUNDLES: dict[frozenset[str], ToolBundle] = {
+    names: _build_bundle(names)
+    for names in {
+        _variant_names(attachment=attachment, marketing=marketing, tx_access=tx_access)
+        for attachment in (False, True)
+        for marketing in (False, True)
+        for tx_access in (TX_NONE, TX_SEARCH, TX_READ, TX_READ_WRITE)
+    }
+}
+FULL_BUNDLE = _build_bundle(frozenset(TOOLS_BY_NAME))
+
 
-    # Attachment tools when a file is present.
-    if ctx.attachment:
-        names.update({'inspect_attachment', 'import_contacts'})
+def tool_bundle(ctx: BobContext | None = None) -> ToolBundle:
+    """Precomputed tool bundle by surface / entity / attachment state."""
+    if ctx is None:
+        return FULL_BUNDLE
 
     has_tx = bool(ctx.active_transaction_id)
     is_telegram = ctx.surface in ('telegram', 'bob_telegram')
@@ -1869,49 +1972,47 @@ def select_tools(ctx: BobContext | None = None) -> tuple[Tool, ...]:
     # Telegram / pilot orgs get them too; non-pilot Telegram stays CRM-only
     # unless a transaction is already selected in session context.
     vtc_enabled = has_tx or ctx.surface == 'bob_chat'
+    marketing = False
     try:
-        from feature_flags import org_has_feature
-        from models import Organization
-        org = Organization.query.get(ctx.organization_id)
-        if org and (
-            org_has_feature('BOB_VTC_PILOT', org)
-            or org_has_feature('TRANSACTIONS', org)
+        from feature_flags import org_feature_snapshot
+        features = org_feature_snapshot(ctx.organization_id)
+        if features and (
+            features.has('BOB_VTC_PILOT')
+            or features.has('TRANSACTIONS')
         ):
             vtc_enabled = True
-        if org and org_has_feature('EMAIL_CAMPAIGNS', org):
-            names.update(MARKETING_TOOL_NAMES)
+        if features and features.has('EMAIL_CAMPAIGNS'):
+            marketing = True
     except Exception:
         # Outside a request/app context (unit tests): keep CRM chat + selected tx.
         pass
 
-    if vtc_enabled:
-        names.update(TX_READ_TOOL_NAMES)
+    if not vtc_enabled:
+        tx_access = TX_NONE
+    elif is_telegram and not has_tx:
         # Telegram without a selected transaction: allow search/select only.
-        if is_telegram and not has_tx:
-            names -= (TX_READ_TOOL_NAMES - {
-                'search_transactions', 'select_transaction_context',
-            })
-            names -= TX_WRITE_TOOL_NAMES
-        elif has_tx or ctx.surface in ('bob_chat', 'mcp'):
-            names.update(TX_WRITE_TOOL_NAMES)
+        tx_access = TX_SEARCH
+    elif has_tx or ctx.surface in ('bob_chat', 'mcp'):
+        tx_access = TX_READ_WRITE
+    else:
+        tx_access = TX_READ
 
-    return tuple(t for t in TOOLS if t.name in names)
+    names = _variant_names(
+        attachment=bool(ctx.attachment), marketing=marketing, tx_access=tx_access,
+    )
+    return _BUNDLES[names]
+
+
+def select_tools(ctx: BobContext | None = None) -> tuple[Tool, ...]:
+    """Dynamic tool set by surface / entity / attachment state."""
+    if ctx is None:
+        return TOOLS
+    return tool_bundle(ctx).tools
 
 
 def openai_tool_schemas(ctx: BobContext | None = None) -> list[dict]:
     """The ``tools=`` payload for the model (nested Completions shape)."""
-    selected = select_tools(ctx)
-    return [
-        {
-            'type': 'function',
-            'function': {
-                'name': tool.name,
-                'description': tool.description,
-                'parameters': tool.parameters,
-            },
-        }
-        for tool in selected
-    ]
+    return list(tool_bundle(ctx).schemas)
 
 
 def sanitize_arguments(tool: Tool, raw_args: dict) -> dict:
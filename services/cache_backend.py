@@ -0,0 +1,372 @@
+"""Bounded, multi-process cache used by ``services/cache_helpers``.
+
+Two tiers sit behind one ``TieredCache``:
+
+- ``LocalLRUCache`` lives in each process and is bounded by entry count and
+  approximate payload bytes, evicting least recently used entries first.
+- An optional Redis tier (on when ``REDIS_URL`` is configured) is shared by
+  every gunicorn worker and the RQ worker.
+
+Invalidation deletes the key from Redis and publishes it on a pub/sub
+channel. Every process runs a daemon subscriber that drops the key from its
+local tier, so a ``clear_*`` in one process reaches the others in
+milliseconds instead of after the TTL runs out.
+
+Keys are prefixed with ``CACHE_KEY_VERSION``. Bump it whenever the shape of
+a cached value changes so a rolling deploy never reads entries written by
+the previous release.
+
+Values must be JSON-serializable (cache IDs, never ORM instances). Redis
+errors never reach the caller: the tier backs off and the cache degrades to
+local-only until Redis answers again.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_VERSION = 'v1'
+KEY_PREFIX = f'crm:cache:{CACHE_KEY_VERSION}:'
+INVALIDATION_CHANNEL = 'crm:cache:invalidate'
+
+# Seconds to stop talking to Redis after a failure, so an outage costs one
+# timeout per window instead of one per lookup.
+_REDIS_RETRY_AFTER = 30
+
+_MISSING = object()
+
+
+def _payload_size(value: Any) -> tuple[str | None, int]:
+    """Return (json payload, approximate byte size) for a cached value."""
+    try:
+        payload = json.dumps(value, separators=(',', ':'))
+    except (TypeError, ValueError):
+        return None, sys.getsizeof(value)
+    return payload, len(payload)
+
+
+class CacheStats:
+    """Thread-safe hit/miss/eviction counters for one cache."""
+
+    FIELDS = (
+        'hits',
+        'misses',
+        'local_hits',
+        'redis_hits',
+        'sets',
+        'evictions',
+        'expirations',
+        'invalidations',
+        'remote_invalidations',
+        'redis_errors',
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+
+class LocalLRUCache:
+    """In-process LRU bounded by entry count and approximate bytes."""
+
+    def __init__(self, max_entries: int = 2048, max_bytes: int = 8 * 1024 * 1024,
+                 stats: CacheStats | None = None):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.stats = stats or CacheStats()
+        self._lock = threading.Lock()
+        # key -> (value, expiry_timestamp, size)
+        self._entries: OrderedDict[str, tuple[Any, float, int]] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expiry, size = entry
+            if time.time() >= expiry:
+                del self._entries[key]
+                self._bytes -= size
+                self.stats.incr('expirations')
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: float, size: int | None = None) -> None:
+        if size is None:
+            size = _payload_size(value)[1]
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            # A single value larger than the whole budget is not worth holding.
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, time.time() + timeout, size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats.incr('evictions')
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry[2]
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class TieredCache:
+    """Local LRU in front of an optional shared Redis tier."""
+
+    def __init__(self, local: LocalLRUCache, redis_url: str | None = None,
+                 channel: str = INVALIDATION_CHANNEL, key_prefix: str = KEY_PREFIX):
+        self.local = local
+        self.stats = local.stats
+        self.redis_url = redis_url
+        self.channel = channel
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_down_until = 0.0
+        self._subscriber: threading.Thread | None = None
+        self._pid = os.getpid()
+
+    # -- public API ---------------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.stats.incr('hits')
+            self.stats.incr('local_hits')
+            return value
+
+        conn = self._connection()
+        if conn is not None:
+            try:
+                pipe = conn.pipeline(transaction=False)
+                pipe.get(self.key_prefix + key)
+                pipe.pttl(self.key_prefix + key)
+                raw, pttl = pipe.execute()
+            except Exception as exc:
+                self._redis_failed(exc)
+            else:
+                if raw is not None:
+                    value = json.loads(raw)
+                    remaining = (pttl or 0) / 1000.0
+                    if remaining > 0:
+                        self.local.set(key, value, remaining, size=len(raw))
+                    self.stats.incr('hits')
+                    self.stats.incr('redis_hits')
+                    return value
+
+        self.stats.incr('misses')
+        return default
+
+    def set(self, key: str, value: Any, timeout: float) -> None:
+        payload, size = _payload_size(value)
+        self.local.set(key, value, timeout, size=size)
+        self.stats.incr('sets')
+        if payload is None:
+            return
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.set(self.key_prefix + key, payload, px=max(1, int(timeout * 1000)))
+        except Exception as exc:
+            self._redis_failed(exc)
+
+    def delete(self, *keys: str) -> None:
+        """Drop keys here, in Redis, and in every subscribed process."""
+        if not keys:
+            return
+        for key in keys:
+            self.local.delete(key)
+        self.stats.incr('invalidations', len(keys))
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            pipe = conn.pipeline(transaction=False)
+            pipe.delete(*[self.key_prefix + key for key in keys])
+            pipe.publish(self.channel, json.dumps(list(keys)))
+            pipe.execute()
+        except Exception as exc:
+            self._redis_failed(exc)
+
+    def redis(self):
+        """The shared Redis connection, or None when off or unreachable."""
+        return self._connection()
+
+    def clear(self) -> None:
+        """Empty this process's local tier. Redis entries are left to expire."""
+        self.local.clear()
+
+    def stats_snapshot(self) -> dict[str, Any]:
+        counts = self.stats.snapshot()
+        lookups = counts['hits'] + counts['misses']
+        counts.update({
+            'entries': len(self.local),
+            'bytes': self.local.size_bytes,
+            'max_entries': self.local.max_entries,
+            'max_bytes': self.local.max_bytes,
+            'hit_rate': round(counts['hits'] / lookups, 4) if lookups else None,
+            'redis_enabled': bool(self.redis_url),
+            'redis_connected': self._redis is not None
+                and time.time() >= self._redis_down_until,
+        })
+        return counts
+
+    # -- Redis plumbing -----------------------------------------------------
+
+    def _connection(self):
+        if not self.redis_url:
+            return None
+        if os.getpid() != self._pid:
+            # Forked (gunicorn/RQ work horse): sockets and the subscriber
+            # thread belong to the parent.
+            self._reset_after_fork()
+        if time.time() < self._redis_down_until:
+            return None
+        if self._redis is not None:
+            return self._redis
+        with self._lock:
+            if self._redis is None:
+                try:
+                    from redis import Redis
+
+                    conn = Redis.from_url(
+                        self.redis_url,
+                        socket_connect_timeout=2,
+                        socket_timeout=2,
+                    )
+                    conn.ping()
+                except Exception as exc:
+                    self._redis_failed(exc)
+                    return None
+                self._redis = conn
+                self._start_subscriber()
+        return self._redis
+
+    def _redis_failed(self, exc: Exception) -> None:
+        self.stats.incr('redis_errors')
+        self._redis_down_until = time.time() + _REDIS_RETRY_AFTER
+        logger.warning(
+            'Cache Redis tier unavailable (%s); local-only for %ss',
+            exc, _REDIS_RETRY_AFTER,
+        )
+
+    def _reset_after_fork(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._subscriber = None
+        self.local.clear()
+
+    def _start_subscriber(self) -> None:
+        if self._subscriber is not None and self._subscriber.is_alive():
+            return
+        self._subscriber = threading.Thread(
+            target=self._listen, name='cache-invalidation', daemon=True,
+        )
+        self._subscriber.start()
+
+    def _listen(self) -> None:
+        from redis import Redis
+
+        pid = self._pid
+        while os.getpid() == pid:
+            try:
+                conn = Redis.from_url(
+                    self.redis_url,
+                    socket_connect_timeout=2,
+                    health_check_interval=30,
+                )
+                pubsub = conn.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Anything published while we were disconnected is lost, so
+                # start from an empty local tier after every (re)subscribe.
+                self.local.clear()
+                for message in pubsub.listen():
+                    self.handle_invalidation(message)
+            except Exception as exc:
+                logger.warning('Cache invalidation listener dropped (%s); retrying', exc)
+                self.local.clear()
+                time.sleep(_REDIS_RETRY_AFTER / 6)
+
+    def handle_invalidation(self, message: dict) -> None:
+        """Apply one pub/sub invalidation message to the local tier."""
+        if not message or message.get('type') != 'message':
+            return
+        data = message.get('data')
+        if isinstance(data, bytes):
+            data = data.decode('utf-8', 'replace')
+        try:
+            keys = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if isinstance(keys, str):
+            keys = [keys]
+        for key in keys:
+            self.local.delete(key)
+        self.stats.incr('remote_invalidations', len(keys))
+
+
+def build_cache(max_entries: int | None = None, max_bytes: int | None = None,
+                key_prefix: str = KEY_PREFIX) -> TieredCache:
+    """Build a process-wide cache from Config.
+
+    Callers holding large values (tax protest export bundles) pass their own
+    bounds and key prefix so they cannot evict the small lookup entries.
+    """
+    from config import Config
+
+    stats = CacheStats()
+    local = LocalLRUCache(
+        max_entries=Config.CACHE_MAX_ENTRIES if max_entries is None else max_entries,
+        max_bytes=Config.CACHE_MAX_BYTES if max_bytes is None else max_bytes,
+        stats=stats,
+    )
+    redis_url = Config.REDIS_URL if Config.CACHE_REDIS_ENABLED else None
+    return TieredCache(local, redis_url=redis_url, key_prefix=key_prefix)
@@ -1,39 +1,43 @@
 # services/cache_helpers.py
 """
 Cached query helpers for frequently accessed, rarely changing data.
-Uses simple dict-based caching to reduce database queries for org-scoped lookup tables.
 
-Note: Using a simple dict cache instead of Flask-Caching due to initialization timing issues.
-This cache is cleared on app restart which is acceptable for this use case.
+Backed by the bounded, multi-process cache in services/cache_backend: a
+per-process LRU in front of an optional Redis tier, with pub/sub
+invalidation so a clear in one gunicorn worker also drops the entry in the
+other workers and the RQ worker. Only IDs are cached, never ORM instances.
 """
 
-import time
+from services.cache_backend import build_cache
 
-# Simple in-memory cache: {key: (value, expiry_timestamp)}
-_cache = {}
+# Process-wide cache. ``_cache.clear()`` empties the local tier (tests use it).
+_cache = build_cache()
 _CACHE_TIMEOUT = 300  # 5 minutes
 
 
 def _get_cached(key):
     """Get value from cache if not expired."""
-    if key in _cache:
-        value, expiry = _cache[key]
-        if time.time() < expiry:
-            return value
-        else:
-            del _cache[key]
-    return None
+    return _cache.get(key)
 
 
 def _set_cached(key, value, timeout=_CACHE_TIMEOUT):
     """Set value in cache with expiry."""
-    _cache[key] = (value, time.time() + timeout)
+    _cache.set(key, value, timeout)
 
 
-def _delete_cached(key):
-    """Delete value from cache."""
-    if key in _cache:
-        del _cache[key]
+def _delete_cached(*keys):
+    """Delete keys from this process, Redis, and every subscribed process."""
+    _cache.delete(*keys)
+
+
+def shared_redis():
+    """Redis connection shared with the cache tier, or None without Redis."""
+    return _cache.redis()
+
+
+def cache_stats():
+    """Hit/miss/eviction counters and sizes for monitoring (see /health)."""
+    return _cache.stats_snapshot()
 
 
 def get_user_contact_groups(org_id: int, user_id: int, active_only: bool = True):
@@ -138,23 +142,27 @@ def get_org_transaction_types(org_id: int):
 
 def clear_user_contact_groups_cache(org_id: int, user_id: int):
     """Clear the contact groups cache for a specific user."""
-    _delete_cached(f'contact_groups_{org_id}_{user_id}_active')
-    _delete_cached(f'contact_groups_{org_id}_{user_id}_all')
+    _delete_cached(
+        f'contact_groups_{org_id}_{user_id}_active',
+        f'contact_groups_{org_id}_{user_id}_all',
+    )
 
 
 def clear_org_contact_groups_cache(org_id: int):
     """Clear contact group caches for every user in an organization."""
     from models import User
 
-    # Drop any leftover org-level key
-    _delete_cached(f'contact_groups_{org_id}')
-
     user_ids = [
         row[0]
         for row in User.query.filter_by(organization_id=org_id).with_entities(User.id).all()
     ]
+    # One round trip and one invalidation message for the whole org, plus
+    # any leftover org-level key.
+    keys = [f'contact_groups_{org_id}']
     for user_id in user_ids:
-        clear_user_contact_groups_cache(org_id, user_id)
+        keys.append(f'contact_groups_{org_id}_{user_id}_active')
+        keys.append(f'contact_groups_{org_id}_{user_id}_all')
+    _delete_cached(*keys)
 
 
 def clear_org_transaction_types_cache(org_id: int):
@@ -6,22 +6,25 @@ normalize/dedupe/capacity rules.
 """
 from __future__ import annotations
 
+import codecs
 import csv
 import io
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 
-from sqlalchemy import func
+from sqlalchemy import insert
 
-from models import Contact, Organization, db
+from models import Contact, Organization, contact_groups, db
 from services.bob_attachments import (
     KIND_CSV,
     KIND_XLS,
     KIND_XLSX,
+    MAX_SPREADSHEET_COLUMNS,
     MAX_SPREADSHEET_ROWS,
     MAX_UPLOAD_BYTES,
     AttachmentParseError,
+    _guard_zip_bomb,
     classify_kind,
     parse_attachment,
 )
@@ -30,6 +33,16 @@ from utils import format_phone_number
 
 logger = logging.getLogger(__name__)
 
+# Contacts written per INSERT during execute; also the progress granularity
+# and, for background jobs, the commit/checkpoint interval.
+IMPORT_CHUNK_SIZE = 500
+
+# Contacts page uploads. Background jobs stream rows, so the row cap is far
+# above what the in-memory attachment parser allows.
+IMPORT_MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+JOB_MAX_ROWS = 100_000
+_DECODE_CHUNK_BYTES = 1024 * 1024
+
 CANONICAL_FIELDS = (
     'first_name', 'last_name', 'email', 'phone', 'street_address',
     'city', 'state', 'zip_code', 'notes', 'groups',
@@ -164,13 +177,13 @@ def map_contact_columns_with_ai(headers: list[str]) -> dict[str, str]:
 
     try:
         import json
-        import openai
+        from services.openai_clients import get_client
         from config import Config
 
         if not Config.OPENAI_API_KEY:
             return mapping
 
-        client = openai.OpenAI(api_key=Config.OPENAI_API_KEY)
+        client = get_client()
         response = client.chat.completions.create(
             model='gpt-4.1-mini',
             messages=[
@@ -224,7 +237,7 @@ def parse_contact_rows(
 
     # Contacts page (max_rows=None) allows larger files; B.O.B. passes 500.
     row_cap = 20_000 if max_rows is None else max_rows
-    upload_cap = 50 * 1024 * 1024 if max_rows is None else MAX_UPLOAD_BYTES
+    upload_cap = IMPORT_MAX_UPLOAD_BYTES if max_rows is None else MAX_UPLOAD_BYTES
 
     try:
         parsed = parse_attachment(
@@ -243,7 +256,21 @@ def parse_contact_rows(
     rows = parsed.rows
     headers = parsed.headers
     warnings = list(parsed.warnings)
+    mapping = _resolve_mapping(headers, use_ai_headers)
+    normalized = [
+        _normalize_row(row, mapping, idx) for idx, row in enumerate(rows, start=1)
+    ]
+
+    meta = {
+        'headers': headers,
+        'column_mapping': mapping,
+        'warnings': warnings,
+        'total_rows': len(normalized),
+    }
+    return normalized, meta
+
 
+def _resolve_mapping(headers: list[str], use_ai_headers: bool) -> dict[str, str]:
     mapping = (
         map_contact_columns_with_ai(headers)
         if use_ai_headers else map_contact_columns(headers)
@@ -253,46 +280,226 @@ def parse_contact_rows(
             'Could not find name columns. Include First Name / Last Name, '
             'or a full Name column.'
         )
+    return mapping
+
+
+def _normalize_row(
+    row: dict[str, Any],
+    mapping: dict[str, str],
+    row_number: int,
+) -> dict[str, Any]:
+    values: dict[str, Any] = {field: None for field in CANONICAL_FIELDS}
+    extras = []
+    full_name = ''
+    for header, value in row.items():
+        target = mapping.get(header)
+        text = '' if value is None else str(value).strip()
+        if not target:
+            if text:
+                extras.append(f'{header}: {text}')
+            continue
+        if target == 'full_name':
+            full_name = text
+        else:
+            values[target] = text or None
+    if full_name and not values.get('first_name') and not values.get('last_name'):
+        parts = full_name.split(maxsplit=1)
+        values['first_name'] = parts[0]
+        values['last_name'] = parts[1] if len(parts) > 1 else ''
+    if extras:
+        existing_notes = values.get('notes') or ''
+        joined = '; '.join(extras)
+        values['notes'] = (
+            f'{existing_notes}; {joined}'.strip('; ').strip()
+            if existing_notes else joined
+        )
+    if values.get('groups'):
+        values['groups'] = str(values['groups']).replace(',', ';')
+    values['_row_number'] = row_number
+    return values
 
-    normalized = []
-    for idx, row in enumerate(rows, start=1):
-        values: dict[str, Any] = {field: None for field in CANONICAL_FIELDS}
-        extras = []
-        full_name = ''
-        for header, value in row.items():
-            target = mapping.get(header)
-            text = '' if value is None else str(value).strip()
-            if not target:
-                if text:
-                    extras.append(f'{header}: {text}')
-                continue
-            if target == 'full_name':
-                full_name = text
-            else:
-                values[target] = text or None
-        if full_name and not values.get('first_name') and not values.get('last_name'):
-            parts = full_name.split(maxsplit=1)
-            values['first_name'] = parts[0]
-            values['last_name'] = parts[1] if len(parts) > 1 else ''
-        if extras:
-            existing_notes = values.get('notes') or ''
-            joined = '; '.join(extras)
-            values['notes'] = (
-                f'{existing_notes}; {joined}'.strip('; ').strip()
-                if existing_notes else joined
-            )
-        if values.get('groups'):
-            values['groups'] = str(values['groups']).replace(',', ';')
-        values['_row_number'] = idx
-        normalized.append(values)
+
+def open_contact_rows(
+    data: bytes,
+    filename: str,
+    mime: str = '',
+    *,
+    max_rows: int = JOB_MAX_ROWS,
+    column_mapping: dict[str, str] | None = None,
+    use_ai_headers: bool = True,
+) -> tuple[Iterator[dict[str, Any]], dict[str, Any]]:
+    """Stream normalized contact rows without materializing the sheet.
+
+    Only the header row is read up front, so this doubles as a cheap request-
+    time validation of the file and its columns. Pass the ``column_mapping``
+    from an earlier call to skip header mapping (a resumed job must not
+    re-ask the AI mapper and risk a different answer). A row-cap warning is
+    appended to ``meta['warnings']`` once the iterator reaches it.
+    """
+    kind = classify_kind(filename, mime)
+    if kind not in {KIND_CSV, KIND_XLSX, KIND_XLS}:
+        raise ContactImportError(
+            'Contact import supports CSV and Excel (.xlsx/.xls) files.'
+        )
+    if not data:
+        raise ContactImportError('That file looked empty.')
+    if len(data) > IMPORT_MAX_UPLOAD_BYTES:
+        raise ContactImportError(
+            f'That file is larger than {IMPORT_MAX_UPLOAD_BYTES // (1024 * 1024)}MB.'
+        )
+
+    try:
+        raw = _raw_rows(data, kind)
+        headers = next(raw, None) or []
+    except AttachmentParseError as exc:
+        raise ContactImportError(exc.message) from exc
+    if len(headers) > MAX_SPREADSHEET_COLUMNS:
+        raw.close()
+        raise ContactImportError(
+            f'That spreadsheet has more than {MAX_SPREADSHEET_COLUMNS} columns.'
+        )
+    try:
+        mapping = (
+            dict(column_mapping) if column_mapping
+            else _resolve_mapping(headers, use_ai_headers)
+        )
+    except ContactImportError:
+        raw.close()
+        raise
 
     meta = {
         'headers': headers,
         'column_mapping': mapping,
-        'warnings': warnings,
-        'total_rows': len(normalized),
+        'warnings': [],
+        'kind': kind,
     }
-    return normalized, meta
+
+    def rows() -> Iterator[dict[str, Any]]:
+        try:
+            for idx, values in enumerate(raw, start=1):
+                if idx > max_rows:
+                    meta['warnings'].append(
+                        f'Only the first {max_rows:,} rows were imported.'
+                    )
+                    break
+                row = {
+                    header: values[col] if col < len(values) else ''
+                    for col, header in enumerate(headers)
+                }
+                yield _normalize_row(row, mapping, idx)
+        except AttachmentParseError as exc:
+            raise ContactImportError(exc.message) from exc
+        finally:
+            raw.close()
+
+    return rows(), meta
+
+
+def count_contact_rows(data: bytes, filename: str, mime: str = '') -> int | None:
+    """Data rows in the file, for progress reporting; ``None`` when unknown.
+
+    CSV is counted exactly with a second C-level parse. Excel reports the
+    sheet dimensions, which may include trailing blank rows.
+    """
+    kind = classify_kind(filename, mime)
+    try:
+        if kind == KIND_CSV:
+            reader = csv.reader(_csv_text(data))
+            return max(0, sum(1 for values in reader if _has_values(values)) - 1)
+        if kind == KIND_XLSX:
+            from openpyxl import load_workbook
+            wb = load_workbook(
+                io.BytesIO(data), read_only=True, data_only=True, keep_links=False,
+            )
+            try:
+                max_row = wb.active.max_row
+            finally:
+                wb.close()
+            return max(0, max_row - 1) if max_row else None
+        if kind == KIND_XLS:
+            import xlrd
+            sheet = xlrd.open_workbook(file_contents=data, on_demand=True).sheet_by_index(0)
+            return max(0, sheet.nrows - 1)
+    except Exception:
+        logger.warning('Could not count rows in %s', filename, exc_info=True)
+    return None
+
+
+def _has_values(values) -> bool:
+    return any(value is not None and str(value).strip() != '' for value in values)
+
+
+def _csv_text(data: bytes) -> io.TextIOWrapper:
+    """Decode lazily: UTF-8 (with or without BOM) when valid, else Latin-1."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    view = memoryview(data)
+    encoding = 'utf-8-sig'
+    try:
+        for start in range(0, len(view), _DECODE_CHUNK_BYTES):
+            decoder.decode(view[start:start + _DECODE_CHUNK_BYTES])
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        encoding = 'latin-1'
+    return io.TextIOWrapper(io.BytesIO(data), encoding=encoding, newline='')
+
+
+def _raw_rows(data: bytes, kind: str) -> Iterator[list[str]]:
+    """Yield the header row, then each non-blank data row, as stripped strings."""
+    if kind == KIND_CSV:
+        for values in csv.reader(_csv_text(data)):
+            if _has_values(values):
+                yield [str(value).strip() for value in values]
+        return
+
+    if kind == KIND_XLSX:
+        if data[:2] != b'PK':
+            raise AttachmentParseError('That does not look like an .xlsx file.')
+        _guard_zip_bomb(data)
+        try:
+            from openpyxl import load_workbook
+        except ImportError as exc:
+            raise AttachmentParseError('Excel support is unavailable right now.') from exc
+        try:
+            wb = load_workbook(
+                io.BytesIO(data), read_only=True, data_only=True, keep_links=False,
+            )
+        except Exception as exc:
+            raise AttachmentParseError('That Excel file could not be opened.') from exc
+        try:
+            rows_iter = wb.active.iter_rows(values_only=True)
+            header_row = next(rows_iter, None)
+            if header_row is None:
+                return
+            yield [
+                (str(cell).strip() if cell is not None else '') or f'column_{idx + 1}'
+                for idx, cell in enumerate(header_row)
+            ]
+            for values in rows_iter:
+                if values and _has_values(values):
+                    yield ['' if value is None else str(value).strip() for value in values]
+        finally:
+            wb.close()
+        return
+
+    try:
+        import xlrd
+    except ImportError as exc:
+        raise AttachmentParseError('Legacy Excel support is unavailable.') from exc
+    try:
+        book = xlrd.open_workbook(file_contents=data)
+    except Exception as exc:
+        raise AttachmentParseError('That .xls file could not be opened.') from exc
+    sheet = book.sheet_by_index(0)
+    if sheet.nrows == 0:
+        return
+    yield [
+        str(value).strip() if value not in (None, '') else f'column_{col + 1}'
+        for col, value in enumerate(sheet.row_values(0))
+    ]
+    for row_idx in range(1, sheet.nrows):
+        values = sheet.row_values(row_idx)
+        if _has_values(values):
+            yield ['' if value in (None, '') else str(value).strip() for value in values]
 
 
 def _normalize_phone(raw: str | None) -> tuple[str | None, bool]:
@@ -306,26 +513,52 @@ def _normalize_phone(raw: str | None) -> tuple[str | None, bool]:
     return format_phone_number(digits), False
 
 
-def _existing_contact(owner_user_id: int, *, email, phone, first_name, last_name):
-    base = Contact.query.filter(Contact.user_id == owner_user_id)
-    if email:
-        dup = base.filter(func.lower(Contact.email) == email).first()
-        if dup:
-            return dup
-    if phone:
-        dup = base.filter(Contact.phone == phone).first()
-        if dup:
-            return dup
-    if not email and not phone and (first_name or last_name):
-        dup = (
-            base
-            .filter(func.lower(Contact.first_name) == (first_name or '').lower())
-            .filter(func.lower(Contact.last_name) == (last_name or '').lower())
-            .first()
+class ContactDedupeIndex:
+    """An owner's existing dedupe keys, loaded once per import.
+
+    Same rules the per-row lookups used to apply: a row matches on email
+    (case-insensitive), then phone, and only when it has neither, on first and
+    last name. Holding the keys in sets turns a 20,000-row file into one scan
+    of the owner's contacts instead of up to three queries per row.
+    """
+
+    def __init__(self):
+        self.emails: set[str] = set()
+        self.phones: set[str] = set()
+        self.names: set[tuple[str, str]] = set()
+
+    @classmethod
+    def load(cls, owner_user_id: int) -> 'ContactDedupeIndex':
+        index = cls()
+        rows = (
+            db.session.query(
+                Contact.email, Contact.phone, Contact.first_name, Contact.last_name,
+            )
+            .filter(Contact.user_id == owner_user_id)
+            .yield_per(5000)
         )
-        if dup:
-            return dup
-    return None
+        for email, phone, first_name, last_name in rows:
+            index.add(
+                email=email, phone=phone,
+                first_name=first_name, last_name=last_name,
+            )
+        return index
+
+    def add(self, *, email, phone, first_name, last_name) -> None:
+        if email:
+            self.emails.add(email.lower())
+        if phone:
+            self.phones.add(phone)
+        self.names.add(((first_name or '').lower(), (last_name or '').lower()))
+
+    def matches(self, *, email, phone, first_name, last_name) -> bool:
+        if email and email.lower() in self.emails:
+            return True
+        if phone and phone in self.phones:
+            return True
+        if not email and not phone and (first_name or last_name):
+            return ((first_name or '').lower(), (last_name or '').lower()) in self.names
+        return False
 
 
 def _capacity_remaining(org_id: int) -> tuple[bool, int | None, str]:
@@ -342,25 +575,18 @@ def _capacity_remaining(org_id: int) -> tuple[bool, int | None, str]:
     return True, remaining, ''
 
 
-def preview_contact_import(
-    rows: list[dict[str, Any]],
+def classify_contact_rows(
+    rows: Iterable[dict[str, Any]],
+    preview: ImportPreview,
     *,
-    actor_user_id: int,
-    owner_user_id: int,
-    org_id: int,
-    warnings: list[str] | None = None,
-    column_mapping: dict[str, str] | None = None,
-) -> ImportPreview:
-    preview = ImportPreview(
-        total_rows=len(rows),
-        warnings=list(warnings or []),
-        column_mapping=dict(column_mapping or {}),
-    )
-    seen_keys: set[str] = set()
-    capacity_ok, remaining, capacity_reason = _capacity_remaining(org_id)
-    preview.capacity_remaining = remaining
-    preview.capacity_ok = capacity_ok
+    seen_keys: set[str],
+    existing: ContactDedupeIndex,
+) -> None:
+    """Sort normalized rows into ``preview`` as invalid, duplicate, or to-create.
 
+    ``seen_keys`` carries within-file dedupe across calls, so a chunked import
+    classifies each chunk against everything before it.
+    """
     for row in rows:
         row_num = int(row.get('_row_number') or 0)
         first = (row.get('first_name') or '').strip()
@@ -385,14 +611,7 @@ def preview_contact_import(
             continue
         seen_keys.add(key)
 
-        existing = _existing_contact(
-            owner_user_id,
-            email=email,
-            phone=phone,
-            first_name=first,
-            last_name=last,
-        )
-        if existing is not None:
+        if existing.matches(email=email, phone=phone, first_name=first, last_name=last):
             preview.duplicate_count += 1
             continue
 
@@ -410,6 +629,9 @@ def preview_contact_import(
             '_row_number': row_num,
         }
         preview.rows_to_create.append(candidate)
+        # Later rows in the file dedupe against this one on every key (a new
+        # email with an already-imported phone is still the same person).
+        existing.add(email=email, phone=phone, first_name=first, last_name=last)
         if len(preview.sample) < 5:
             preview.sample.append({
                 'name': f"{candidate['first_name']} {candidate['last_name']}".strip(),
@@ -417,6 +639,28 @@ def preview_contact_import(
                 'phone': candidate['phone'],
             })
 
+
+def preview_contact_import(
+    rows: list[dict[str, Any]],
+    *,
+    actor_user_id: int,
+    owner_user_id: int,
+    org_id: int,
+    warnings: list[str] | None = None,
+    column_mapping: dict[str, str] | None = None,
+) -> ImportPreview:
+    preview = ImportPreview(
+        total_rows=len(rows),
+        warnings=list(warnings or []),
+        column_mapping=dict(column_mapping or {}),
+    )
+    seen_keys: set[str] = set()
+    existing = ContactDedupeIndex.load(owner_user_id)
+    capacity_ok, remaining, capacity_reason = _capacity_remaining(org_id)
+    preview.capacity_remaining = remaining
+    preview.capacity_ok = capacity_ok
+    classify_contact_rows(rows, preview, seen_keys=seen_keys, existing=existing)
+
     preview.create_count = len(preview.rows_to_create)
     if remaining is not None and preview.create_count > remaining:
         preview.capacity_ok = False
@@ -431,6 +675,96 @@ def preview_contact_import(
     return preview
 
 
+def _group_names(raw) -> list[str]:
+    return [name.strip() for name in str(raw or '').split(';') if name.strip()]
+
+
+def resolve_import_groups(
+    candidates: Iterable[dict[str, Any]],
+    *,
+    org_id: int,
+    owner_user_id: int,
+    groups_by_name: dict[str, int] | None = None,
+    looked_up: set[str] | None = None,
+) -> dict[str, int]:
+    """Map group names used by ``candidates`` to the owner's active group ids.
+
+    Pass the previous ``groups_by_name`` and ``looked_up`` set to resolve only
+    names not seen in earlier chunks.
+    """
+    groups_by_name = {} if groups_by_name is None else groups_by_name
+    looked_up = set() if looked_up is None else looked_up
+    wanted = sorted({
+        name
+        for candidate in candidates
+        for name in _group_names(candidate.get('groups'))
+        if name not in looked_up
+    })
+    if wanted:
+        groups, _missing = resolve_groups_by_name(
+            org_id, owner_user_id, wanted, active_only=True,
+        )
+        groups_by_name.update({group.name: group.id for group in groups})
+        looked_up.update(wanted)
+    return groups_by_name
+
+
+def insert_contact_chunk(
+    chunk: list[dict[str, Any]],
+    *,
+    org_id: int,
+    owner_user_id: int,
+    actor_user_id: int,
+    groups_by_name: dict[str, int],
+    error_details: list[str],
+) -> list[Contact]:
+    """INSERT one chunk of classified candidates and their group links.
+
+    Flushes but does not commit. Unknown group names are reported into
+    ``error_details``.
+    """
+    values = []
+    for candidate in chunk:
+        row = {
+            'organization_id': org_id,
+            'user_id': owner_user_id,
+            'created_by_id': actor_user_id,
+            'first_name': candidate.get('first_name') or '',
+            'last_name': candidate.get('last_name') or '',
+            'email': candidate.get('email'),
+            'phone': candidate.get('phone'),
+            'street_address': candidate.get('street_address'),
+            'city': candidate.get('city'),
+            'state': candidate.get('state'),
+            'zip_code': candidate.get('zip_code'),
+            'notes': candidate.get('notes'),
+        }
+        # Bulk INSERT skips mapper events, so set the search document here.
+        row['search_document'] = Contact.search_document_for(row)
+        values.append(row)
+    contacts = db.session.scalars(
+        insert(Contact).returning(Contact, sort_by_parameter_order=True),
+        values,
+    ).unique().all()
+
+    links = []
+    for candidate, contact in zip(chunk, contacts):
+        names = _group_names(candidate.get('groups'))
+        missing = [name for name in names if name not in groups_by_name]
+        if missing:
+            error_details.append(
+                f"Row {candidate.get('_row_number')}: "
+                f"Some groups not found: {', '.join(missing)}"
+            )
+        for group_id in dict.fromkeys(
+            groups_by_name[name] for name in names if name in groups_by_name
+        ):
+            links.append({'contact_id': contact.id, 'group_id': group_id})
+    if links:
+        db.session.execute(contact_groups.insert(), links)
+    return contacts
+
+
 def execute_contact_import(
     rows: list[dict[str, Any]],
     *,
@@ -438,8 +772,15 @@ def execute_contact_import(
     owner_user_id: int,
     org_id: int,
     source: str = 'csv_import',
+    progress: Optional[Callable[[int, int], None]] = None,
 ) -> ImportResult:
-    """Create contacts in one transaction from already-normalized rows."""
+    """Create contacts in one transaction from already-normalized rows.
+
+    The preview pass is the only dedupe pass. Group names are resolved once
+    for the whole file, and contacts and their group links are written with
+    one INSERT per ``IMPORT_CHUNK_SIZE`` rows. ``progress(done, total)`` runs
+    after each chunk is flushed.
+    """
     preview = preview_contact_import(
         rows,
         actor_user_id=actor_user_id,
@@ -459,65 +800,28 @@ def execute_contact_import(
         raise ContactImportError(
             preview.warnings[0] if preview.warnings else 'Contact limit reached.'
         )
-    if not preview.rows_to_create:
+    candidates = preview.rows_to_create
+    if not candidates:
         return result
 
-    # Re-check capacity against the exact create set.
-    capacity_ok, remaining, reason = _capacity_remaining(org_id)
-    if not capacity_ok or (remaining is not None and len(preview.rows_to_create) > remaining):
-        raise ContactImportError(reason or 'Contact limit reached.')
-
+    groups_by_name = resolve_import_groups(
+        candidates, org_id=org_id, owner_user_id=owner_user_id,
+    )
+    total = len(candidates)
     created: list[Contact] = []
     try:
-        for candidate in preview.rows_to_create:
-            # Re-dedupe at write time in case the CRM changed since preview.
-            existing = _existing_contact(
-                owner_user_id,
-                email=(candidate.get('email') or '').lower() or None,
-                phone=candidate.get('phone'),
-                first_name=candidate.get('first_name') or '',
-                last_name=candidate.get('last_name') or '',
-            )
-            if existing is not None:
-                result.skipped_duplicates += 1
-                continue
-
-            contact = Contact(
-                organization_id=org_id,
-                user_id=owner_user_id,
-                created_by_id=actor_user_id,
-                first_name=candidate.get('first_name') or '',
-                last_name=candidate.get('last_name') or '',
-                email=candidate.get('email'),
-                phone=candidate.get('phone'),
-                street_address=candidate.get('street_address'),
-                city=candidate.get('city'),
-                state=candidate.get('state'),
-                zip_code=candidate.get('zip_code'),
-                notes=candidate.get('notes'),
-            )
-            if candidate.get('groups'):
-                group_names = [
-                    name.strip()
-                    for name in str(candidate['groups']).split(';')
-                    if name.strip()
-                ]
-                if group_names:
-                    groups, missing = resolve_groups_by_name(
-                        org_id, owner_user_id, group_names, active_only=True,
-                    )
-                    if missing:
-                        result.error_details.append(
-                            f"Row {candidate.get('_row_number')}: "
-                            f"Some groups not found: {', '.join(missing)}"
-                        )
-                    contact.groups = groups
-            db.session.add(contact)
-            created.append(contact)
-
-        if not created:
-            db.session.rollback()
-            return result
+        for start in range(0, total, IMPORT_CHUNK_SIZE):
+            chunk = candidates[start:start + IMPORT_CHUNK_SIZE]
+            created.extend(insert_contact_chunk(
+                chunk,
+                org_id=org_id,
+                owner_user_id=owner_user_id,
+                actor_user_id=actor_user_id,
+                groups_by_name=groups_by_name,
+                error_details=result.error_details,
+            ))
+            if progress is not None:
+                progress(len(created), total)
 
         db.session.commit()
         result.created = created
@@ -0,0 +1,413 @@
+"""Background Contacts page imports.
+
+The request stores the upload as a ContactImportJob and enqueues it on the
+``contact_import`` RQ queue. The worker streams rows out of the file and
+commits every ``IMPORT_CHUNK_SIZE`` rows together with the job's
+``processed_rows`` checkpoint, so a retried job resumes after the last
+committed chunk instead of starting over. Every chunk also refreshes the
+job's heartbeat: RQ retries never fire for a worker that was hard-killed
+(OOM, deploy), so :func:`recover_stalled_import` requeues a running job
+whose heartbeat is older than ``STALLED_AFTER``. Without Redis (local
+SQLite) the job runs inline in the request, exactly as the import used to.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, Iterator
+
+from jobs.base import set_job_org_context
+from models import ActivationEvent, ContactImportJob, User, db
+from services.contact_import import (
+    IMPORT_CHUNK_SIZE,
+    ContactDedupeIndex,
+    ContactImportError,
+    ImportPreview,
+    _capacity_remaining,
+    classify_contact_rows,
+    count_contact_rows,
+    insert_contact_chunk,
+    open_contact_rows,
+    resolve_import_groups,
+)
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = 'contact_import'
+JOB_TIMEOUT_SECONDS = 1800
+MAX_ATTEMPTS = 3
+# Row-level messages kept on the job for the status payload.
+MAX_ERROR_DETAILS = 200
+# A chunk takes seconds; this much heartbeat silence means the worker died.
+STALLED_AFTER = timedelta(minutes=10)
+
+
+def create_import_job(
+    data: bytes,
+    *,
+    filename: str,
+    mime: str,
+    actor_user_id: int,
+    owner_user_id: int,
+    org_id: int,
+) -> ContactImportJob:
+    """Validate the header row and persist a queued job.
+
+    Only the header is parsed here, so unsupported files and unmappable
+    columns still fail fast in the request. The resolved column mapping is
+    stored so retries do not re-run AI header mapping.
+    """
+    rows, meta = open_contact_rows(data, filename, mime, use_ai_headers=True)
+    rows.close()
+
+    job = ContactImportJob(
+        organization_id=org_id,
+        actor_user_id=actor_user_id,
+        owner_user_id=owner_user_id,
+        status=ContactImportJob.STATUS_QUEUED,
+        filename=filename,
+        mime_type=mime or None,
+        file_data=data,
+        total_rows=count_contact_rows(data, filename, mime),
+        column_mapping=meta['column_mapping'],
+        error_details=[],
+        warnings=[],
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def enqueue_import_job(job: ContactImportJob) -> bool:
+    """Queue ``job`` for the contact_import worker.
+
+    Returns False when no queue is reachable; the caller then runs the job
+    inline with :func:`run_import_job`.
+    """
+    from config import Config
+    from jobs import dispatch
+    from rq import Retry
+
+    if Config.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        return False
+    return bool(dispatch.enqueue(
+        QUEUE_NAME,
+        'jobs.contact_import.process_contact_import_job',
+        idempotency_key=f'job:{job.id}',
+        job_id=job.id,
+        org_id=job.organization_id,
+        job_timeout=JOB_TIMEOUT_SECONDS,
+        retry=Retry(max=MAX_ATTEMPTS - 1, interval=[15, 60]),
+    ))
+
+
+def _chunks(rows: Iterator[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_import_job(job_id: int, org_id: int) -> ContactImportJob | None:
+    """Process (or resume) one import job. Safe to call more than once.
+
+    Rows before ``processed_rows`` are skipped; the contacts they created are
+    already committed, so the freshly loaded dedupe index treats any later
+    repeat of them as a duplicate, just as an uninterrupted run would.
+    Unexpected errors re-raise with the checkpoint intact so RQ can retry;
+    the final attempt marks the job failed.
+    """
+    set_job_org_context(org_id)
+    job = ContactImportJob.query.filter_by(
+        id=job_id, organization_id=org_id,
+    ).first()
+    if job is None:
+        logger.error('Contact import job %s was not found', job_id)
+        return None
+    if job.status in ContactImportJob.FINISHED_STATUSES:
+        return job
+
+    job.status = ContactImportJob.STATUS_RUNNING
+    job.attempts = (job.attempts or 0) + 1
+    job.started_at = job.started_at or datetime.utcnow()
+    job.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+    set_job_org_context(org_id)
+
+    try:
+        _process(job)
+    except ContactImportError as exc:
+        db.session.rollback()
+        set_job_org_context(org_id)
+        _finish(job, failed=True, error=exc.message)
+    except Exception:
+        db.session.rollback()
+        set_job_org_context(org_id)
+        logger.exception(
+            'Contact import job %s failed at row %s (attempt %s)',
+            job.id, job.processed_rows, job.attempts,
+        )
+        if job.attempts < MAX_ATTEMPTS:
+            raise
+        _finish(job, failed=True, error='Database error while importing contacts.')
+    return job
+
+
+def recover_stalled_import(job: ContactImportJob, *, now: datetime | None = None) -> bool:
+    """Requeue ``job`` if it is running but its worker stopped beating.
+
+    The heartbeat is claimed with a conditional UPDATE first, so concurrent
+    callers requeue it once. A job already out of attempts is failed; the
+    contacts from its committed chunks stay. Returns True when ``job`` was
+    requeued or failed.
+    """
+    now = now or datetime.utcnow()
+    beat = job.heartbeat_at or job.started_at
+    if job.status != ContactImportJob.STATUS_RUNNING or (beat and beat > now - STALLED_AFTER):
+        return False
+
+    org_id = job.organization_id
+    if (job.attempts or 0) >= MAX_ATTEMPTS:
+        logger.warning('Contact import job %s stalled on its last attempt', job.id)
+        _finish(job, failed=True, error='The import stopped before it finished.')
+        return True
+
+    claimed = ContactImportJob.query.filter(
+        ContactImportJob.id == job.id,
+        ContactImportJob.status == ContactImportJob.STATUS_RUNNING,
+        ContactImportJob.heartbeat_at.is_(None) if job.heartbeat_at is None
+        else ContactImportJob.heartbeat_at == job.heartbeat_at,
+    ).update({'heartbeat_at': now}, synchronize_session=False)
+    db.session.commit()
+    set_job_org_context(org_id)
+    if not claimed:
+        return False
+    # Still "running" to the UI; a failed enqueue is retried once the fresh
+    # heartbeat goes stale again.
+    if not enqueue_import_job(job):
+        logger.warning('Could not requeue stalled contact import job %s', job.id)
+        return False
+    logger.warning(
+        'Requeued stalled contact import job %s at row %s', job.id, job.processed_rows,
+    )
+    return True
+
+
+def recover_stalled_imports(org_id: int, *, now: datetime | None = None) -> int:
+    """Run :func:`recover_stalled_import` over ``org_id``'s running jobs."""
+    set_job_org_context(org_id)
+    running = ContactImportJob.query.filter_by(
+        organization_id=org_id, status=ContactImportJob.STATUS_RUNNING,
+    ).all()
+    return sum(1 for job in running if recover_stalled_import(job, now=now))
+
+
+def _process(job: ContactImportJob) -> None:
+    org_id = job.organization_id
+    rows, meta = open_contact_rows(
+        job.file_data or b'',
+        job.filename,
+        job.mime_type or '',
+        column_mapping=job.column_mapping,
+    )
+    if job.processed_rows == 0:
+        _check_capacity(job)
+    existing = ContactDedupeIndex.load(job.owner_user_id)
+    seen_keys: set[str] = set()
+    groups_by_name: dict[str, int] = {}
+    looked_up: set[str] = set()
+
+    for chunk in _chunks(islice(rows, job.processed_rows, None), IMPORT_CHUNK_SIZE):
+        preview = ImportPreview()
+        classify_contact_rows(chunk, preview, seen_keys=seen_keys, existing=existing)
+        candidates = preview.rows_to_create
+
+        created = []
+        if candidates:
+            capacity_ok, remaining, reason = _capacity_remaining(org_id)
+            if not capacity_ok or (remaining is not None and len(candidates) > remaining):
+                raise ContactImportError(
+                    reason or (
+                        f'Contact limit reached after importing {job.created_count} '
+                        'contact(s). Upgrade to Pro for unlimited contacts.'
+                    )
+                )
+            resolve_import_groups(
+                candidates,
+                org_id=org_id,
+                owner_user_id=job.owner_user_id,
+                groups_by_name=groups_by_name,
+                looked_up=looked_up,
+            )
+            created = insert_contact_chunk(
+                candidates,
+                org_id=org_id,
+                owner_user_id=job.owner_user_id,
+                actor_user_id=job.actor_user_id,
+                groups_by_name=groups_by_name,
+                error_details=preview.error_details,
+            )
+
+        # The checkpoint moves in the same commit as the rows it covers.
+        job.processed_rows += len(chunk)
+        job.heartbeat_at = datetime.utcnow()
+        job.created_count += len(created)
+        job.duplicate_count += preview.duplicate_count
+        job.invalid_count += preview.invalid_count
+        job.invalid_phone_count += preview.invalid_phone_count
+        job.missing_name_count += preview.missing_name_count
+        if preview.error_details and len(job.error_details or []) < MAX_ERROR_DETAILS:
+            job.error_details = (
+                list(job.error_details or []) + preview.error_details
+            )[:MAX_ERROR_DETAILS]
+        db.session.commit()
+        set_job_org_context(org_id)
+
+    job.warnings = list(job.warnings or []) + meta['warnings']
+    _finish(job)
+
+
+def _check_capacity(job: ContactImportJob) -> None:
+    """Refuse the whole file up front when it would pass the plan limit.
+
+    Chunks commit as they go, so finding out at chunk N would leave a partial
+    import behind. Counting costs a second parse, and only orgs with a
+    contact cap pay it. The per-chunk check stays as a guard against
+    contacts added elsewhere while the job runs.
+    """
+    capacity_ok, remaining, reason = _capacity_remaining(job.organization_id)
+    if capacity_ok and remaining is None:
+        return
+    rows, _meta = open_contact_rows(
+        job.file_data or b'',
+        job.filename,
+        job.mime_type or '',
+        column_mapping=job.column_mapping,
+    )
+    existing = ContactDedupeIndex.load(job.owner_user_id)
+    seen_keys: set[str] = set()
+    needed = 0
+    for chunk in _chunks(rows, IMPORT_CHUNK_SIZE):
+        preview = ImportPreview()
+        classify_contact_rows(chunk, preview, seen_keys=seen_keys, existing=existing)
+        needed += len(preview.rows_to_create)
+    if needed and (not capacity_ok or needed > remaining):
+        raise ContactImportError(
+            reason or (
+                f'Only {remaining} contact slot(s) remain; this import needs '
+                f'{needed}. No contacts were imported.'
+            )
+        )
+
+
+def _finish(job: ContactImportJob, *, failed: bool = False, error: str | None = None) -> None:
+    org_id = job.organization_id
+    job.status = (
+        ContactImportJob.STATUS_FAILED if failed else ContactImportJob.STATUS_COMPLETED
+    )
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    job.file_data = None
+    if not failed:
+        job.total_rows = job.processed_rows
+    db.session.commit()
+    set_job_org_context(org_id)
+    _record_activation(job)
+
+
+def _record_activation(job: ContactImportJob) -> None:
+    from services.activation_service import (
+        count_bucket, record_event, record_meaningful_action,
+    )
+
+    user = User.query.filter_by(
+        id=job.actor_user_id, organization_id=job.organization_id,
+    ).first()
+    if user is None:
+        return
+    if job.status == ContactImportJob.STATUS_FAILED:
+        record_event(
+            ActivationEvent.CSV_IMPORT_FAILED,
+            user=user,
+            data={'error_code': 'parse_or_limit'},
+            surface='contacts',
+            sync_person=False,
+        )
+    if job.created_count <= 0:
+        return
+
+    record_event(
+        ActivationEvent.CONTACT_CREATED,
+        user=user,
+        data={
+            'source': 'csv_import',
+            'contact_count': job.created_count,
+            'contact_count_bucket': count_bucket(job.created_count),
+        },
+        surface='contacts',
+    )
+    if job.status == ContactImportJob.STATUS_COMPLETED:
+        record_event(
+            ActivationEvent.CSV_IMPORT_COMPLETED
+            if job.invalid_count == 0
+            else ActivationEvent.CSV_IMPORT_PARTIAL,
+            user=user,
+            data={
+                'source': 'csv_import',
+                'contact_count_bucket': count_bucket(job.created_count),
+                'error_count_bucket': count_bucket(job.invalid_count),
+                'duplicates_skipped_bucket': count_bucket(job.duplicate_count),
+            },
+            surface='contacts',
+        )
+        record_meaningful_action(
+            user,
+            action='csv_import_completed',
+            surface='contacts',
+            data={'contact_count_bucket': count_bucket(job.created_count)},
+        )
+
+
+def import_job_payload(job: ContactImportJob) -> dict[str, Any]:
+    """Status payload for polling; finished jobs use the import response shape."""
+    payload: dict[str, Any] = {
+        'job_id': job.id,
+        'state': job.status,
+        'processed_rows': job.processed_rows or 0,
+        'total_rows': job.total_rows,
+    }
+    if job.status not in ContactImportJob.FINISHED_STATUSES:
+        payload['status'] = job.status
+        return payload
+
+    counts = {
+        'success_count': job.created_count,
+        'duplicates_skipped': job.duplicate_count,
+        'invalid_phone_count': job.invalid_phone_count,
+        'missing_name_count': job.missing_name_count,
+        'warnings': list(job.warnings or []),
+    }
+    if job.status == ContactImportJob.STATUS_FAILED:
+        payload.update(counts)
+        payload.update({
+            'status': 'error',
+            'message': job.error or 'Import failed.',
+            'error_details': list(job.error_details or []),
+        })
+        return payload
+
+    payload.update(counts)
+    if job.invalid_count > 0:
+        payload.update({
+            'status': 'partial_success' if job.created_count > 0 else 'error',
+            'error_count': job.invalid_count,
+            'error_details': list(job.error_details or []),
+        })
+        return payload
+    payload.update({
+        'status': 'success',
+        'message': f'Successfully imported {job.created_count} contacts',
+    })
+    return payload
@@ -19,6 +19,8 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Any
 
+from sqlalchemy import case, or_, select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.orm.attributes import flag_modified
 
 from models import (
@@ -27,6 +29,7 @@ from models import (
     ContactGroup,
     ContractBootstrapSession,
     Transaction,
+    TransactionAddressToken,
     TransactionAssignment,
     TransactionChangeProposal,
     TransactionDocument,
@@ -35,13 +38,18 @@ from models import (
     TransactionType,
     User,
     db,
+    normalize_match_address,
 )
 from services.deadline_rules import DeadlineRulesService
+from services.pdf_pages import PdfPageSet, PdfSource, pdf_bytes, pdf_pages
 from services.proposal_service import ProposalService
 from services.requirements_service import RequirementsService
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on transactions scored per contract address.
+MATCH_CANDIDATE_LIMIT = 200
+
 # Bootstrap extraction fields — observations only; never auto-applied.
 BOOTSTRAP_EXTRACTION_FIELDS = {
     'property_address': 'Full property street address from Paragraph 2 or the header (street, city, state, ZIP if present).',
@@ -759,28 +767,16 @@ def _normalize_side(value: Any) -> str:
 
 def _norm_address(address: str | None) -> str:
     """Normalize address for matching: lowercase, collapse whitespace, strip punctuation."""
-    if not address:
-        return ''
-    s = address.lower().strip()
-    s = re.sub(r'\b(street|st|avenue|ave|road|rd|drive|dr|lane|ln|court|ct|boulevard|blvd)\b', '', s)
-    s = re.sub(r'[^\w\s]', '', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    return s
+    return normalize_match_address(address)
 
 
-def _page_count_from_bytes(file_bytes: bytes, mime_type: str) -> int:
-    """Attempt to get page count using PyMuPDF if available, else 0."""
+def _page_count_from_bytes(file_bytes: PdfSource, mime_type: str) -> int:
+    """Attempt to get page count using PyMuPDF, else 0."""
     if 'pdf' not in (mime_type or '').lower():
         return 0
     try:
-        import fitz  # PyMuPDF
-        doc = fitz.open(stream=file_bytes, filetype='pdf')
-        count = len(doc)
-        doc.close()
-        return count
-    except ImportError:
-        logger.warning('PyMuPDF not available, cannot count pages')
-        return 0
+        with pdf_pages(file_bytes) as pages:
+            return pages.page_count
     except Exception as e:
         logger.warning('Failed to count PDF pages: %s', e)
         return 0
@@ -962,7 +958,7 @@ def read_bootstrap_file(session: ContractBootstrapSession) -> bytes | None:
 
 def record_upload_metadata(
     *,
-    file_bytes: bytes,
+    file_bytes: PdfSource,
     filename: str,
     mime_type: str,
     source: str,
@@ -971,7 +967,10 @@ def record_upload_metadata(
     document_id: int | None = None,
 ) -> ContractBootstrapSession:
     """Record upload metadata for a contract document."""
-    sha256 = hashlib.sha256(file_bytes).hexdigest()
+    if isinstance(file_bytes, PdfPageSet) and file_bytes:
+        sha256 = file_bytes.sha256
+    else:
+        sha256 = hashlib.sha256(pdf_bytes(file_bytes)).hexdigest()
     page_count = _page_count_from_bytes(file_bytes, mime_type)
 
     session = ContractBootstrapSession(
@@ -998,7 +997,7 @@ def record_upload_metadata(
 
 def classify_upload_identity(
     *,
-    file_bytes: bytes,
+    file_bytes: PdfSource,
     filename: str | None = None,
     field_hints: dict[str, Any] | None = None,
 ):
@@ -1015,7 +1014,7 @@ def classify_upload_identity(
 def infer_side_for_upload(
     *,
     identity,
-    file_bytes: bytes | None = None,
+    file_bytes: PdfSource = None,
     user: Any = None,
     field_data: dict[str, Any] | None = None,
     text: str | None = None,
@@ -1089,7 +1088,7 @@ def _extraction_field_map_for_identity(identity) -> tuple[dict[str, str], str]:
 
 def extract_contract_fields(
     *,
-    file_bytes: bytes,
+    file_bytes: PdfSource,
     identity=None,
     filename: str | None = None,
 ) -> dict[str, Any]:
@@ -1368,15 +1367,37 @@ def find_transaction_matches(
     if not norm_addr:
         return []
 
-    transactions = Transaction.query.filter_by(
-        organization_id=org_id,
-    ).filter(
-        Transaction.street_address.isnot(None),
-    ).all()
+    # Candidates share the address key or one of its house-number tokens (any
+    # token when the address has no digits). The containment checks below
+    # stay authoritative; the token index only bounds what they scan.
+    tokens = norm_addr.split()
+    anchors = [t for t in tokens if any(ch.isdigit() for ch in t)] or tokens
+    token_matches = select(TransactionAddressToken.transaction_id).where(
+        TransactionAddressToken.organization_id == org_id,
+        TransactionAddressToken.token.in_(anchors),
+    )
+    transactions = (
+        Transaction.query.options(joinedload(Transaction.transaction_type))
+        .filter(
+            Transaction.organization_id == org_id,
+            or_(
+                Transaction.address_match_key == norm_addr,
+                Transaction.id.in_(token_matches),
+            ),
+        )
+        # Exact key matches first, then the newest token matches, so the cap
+        # never drops the strongest candidates in favor of old near misses.
+        .order_by(
+            case((Transaction.address_match_key == norm_addr, 0), else_=1),
+            Transaction.id.desc(),
+        )
+        .limit(MATCH_CANDIDATE_LIMIT)
+        .all()
+    )
 
     matches = []
     for tx in transactions:
-        tx_norm = _norm_address(tx.street_address)
+        tx_norm = tx.address_match_key
         if not tx_norm:
             continue
 
@@ -1618,155 +1639,102 @@ def process_inbox_upload(
     side = _normalize_side(confirmed_side)
     side_confirmed_by_user = side in ('buyer', 'seller')
 
-    session = record_upload_metadata(
-        file_bytes=file_bytes,
-        filename=filename,
-        mime_type=mime_type or 'application/pdf',
-        source='inbox',
-        user=user,
-        org_id=org_id,
-    )
-    store_bootstrap_file(session=session, file_bytes=file_bytes)
-
-    identity = classify_upload_identity(
-        file_bytes=file_bytes,
-        filename=filename,
-    )
-
-    inference = infer_side_for_upload(
-        identity=identity,
-        file_bytes=file_bytes,
-        user=user,
-    )
-    if not side_confirmed_by_user and inference.is_confident:
-        side = inference.side
-
-    upload_classification = dict(session.classification or {})
-    upload_classification.update({
-        'side': side or None,
-        'side_confirmed_by_user': side_confirmed_by_user,
-        'side_inferred_from_document': (
-            None if side_confirmed_by_user else inference.side
-        ),
-        'representation_inference': inference.to_dict(),
-        'processing_started_at': datetime.utcnow().isoformat(),
-        'document_identity': identity.to_dict(),
-    })
-    if upload_batch_id:
-        upload_classification['upload_batch_id'] = upload_batch_id
-    session.classification = upload_classification
-    # Defer status to "uploaded" (queued) when extraction runs in the
-    # background so the batch wait list can show Queued → Reading → Identified
-    # one PDF at a time instead of "Reading…" on every row at once.
-    session.status = ContractBootstrapSession.STATUS_UPLOADED
-    flag_modified(session, 'classification')
-    db.session.flush()
+    # Metadata, identity, side inference and extraction share one parse.
+    with PdfPageSet(file_bytes) as pages:
+        session = record_upload_metadata(
+            file_bytes=pages,
+            filename=filename,
+            mime_type=mime_type or 'application/pdf',
+            source='inbox',
+            user=user,
+            org_id=org_id,
+        )
+        store_bootstrap_file(session=session, file_bytes=file_bytes)
 
-    if run_extraction:
-        field_data = extract_contract_fields(
-            file_bytes=file_bytes,
-            identity=identity,
+        identity = classify_upload_identity(
+            file_bytes=pages,
             filename=filename,
         )
-        classify_and_extract(
-            session=session,
-            field_data=field_data,
+
+        inference = infer_side_for_upload(
             identity=identity,
+            file_bytes=pages,
+            user=user,
         )
-        run_match_discovery(session)
-    db.session.commit()
-    return session
-
-
-# Serialize local SQLite bootstrap jobs. Multi-file inbox uploads otherwise
-# stampede the same DB file and fail with "database is locked" / empty reads.
-_bootstrap_local_lock = None
-_bootstrap_local_queue: list[tuple[int, int, object]] = []
-_bootstrap_local_worker_started = False
-
-
-def _bootstrap_local_lock_obj():
-    global _bootstrap_local_lock
-    if _bootstrap_local_lock is None:
-        import threading
-        _bootstrap_local_lock = threading.Lock()
-    return _bootstrap_local_lock
-
-
-def _run_local_bootstrap_queue() -> None:
-    """Drain serially so multi-upload jobs do not fight SQLite."""
-    global _bootstrap_local_worker_started
-    from jobs.contract_bootstrap import process_contract_bootstrap_job
-
-    while True:
-        with _bootstrap_local_lock_obj():
-            if not _bootstrap_local_queue:
-                _bootstrap_local_worker_started = False
-                return
-            session_id, org_id, app = _bootstrap_local_queue.pop(0)
+        if not side_confirmed_by_user and inference.is_confident:
+            side = inference.side
+
+        upload_classification = dict(session.classification or {})
+        upload_classification.update({
+            'side': side or None,
+            'side_confirmed_by_user': side_confirmed_by_user,
+            'side_inferred_from_document': (
+                None if side_confirmed_by_user else inference.side
+            ),
+            'representation_inference': inference.to_dict(),
+            'processing_started_at': datetime.utcnow().isoformat(),
+            'document_identity': identity.to_dict(),
+        })
+        if upload_batch_id:
+            upload_classification['upload_batch_id'] = upload_batch_id
+        session.classification = upload_classification
+        # Defer status to "uploaded" (queued) when extraction runs in the
+        # background so the batch wait list can show Queued → Reading → Identified
+        # one PDF at a time instead of "Reading…" on every row at once.
+        session.status = ContractBootstrapSession.STATUS_UPLOADED
+        flag_modified(session, 'classification')
+        db.session.flush()
 
-        try:
-            with app.app_context():
-                process_contract_bootstrap_job(
-                    session_id=session_id,
-                    org_id=org_id,
-                    _inline=True,
-                )
-        except Exception:
-            logger.exception(
-                'Local bootstrap worker failed for session %s',
-                session_id,
+        if run_extraction:
+            field_data = extract_contract_fields(
+                file_bytes=pages,
+                identity=identity,
+                filename=filename,
             )
+            classify_and_extract(
+                session=session,
+                field_data=field_data,
+                identity=identity,
+            )
+            run_match_discovery(session)
+        db.session.commit()
+    return session
 
 
 def enqueue_bootstrap_processing(*, session_id: int, org_id: int) -> None:
-    """Queue contract extraction, with a local background-thread fallback."""
-    from flask import current_app
+    """Queue contract extraction, with a local job-pool fallback.
 
-    app = current_app._get_current_object()
-
-    try:
-        from config import Config
-        from redis import Redis
-        from rq import Queue
-
-        if not Config.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
-            conn = Redis.from_url(
-                Config.REDIS_URL,
-                socket_connect_timeout=2,
-                socket_timeout=2,
-            )
-            conn.ping()
-            Queue('contract_bootstrap', connection=conn).enqueue(
-                'jobs.contract_bootstrap.process_contract_bootstrap_job',
-                session_id=session_id,
-                org_id=org_id,
-                job_timeout=300,
-            )
+    The local contract_bootstrap pool runs one job at a time: multi-file
+    inbox uploads otherwise stampede the same SQLite file and fail with
+    "database is locked" / empty reads.
+    """
+    from config import Config
+    from jobs import dispatch
+
+    job_path = 'jobs.contract_bootstrap.process_contract_bootstrap_job'
+    idempotency_key = f'session:{session_id}'
+    if not Config.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        if dispatch.enqueue(
+            'contract_bootstrap',
+            job_path,
+            idempotency_key=idempotency_key,
+            session_id=session_id,
+            org_id=org_id,
+            job_timeout=300,
+        ):
             return
-    except Exception as exc:
         logger.warning(
-            'Contract bootstrap queue unavailable for session %s: %s',
-            session_id,
-            exc,
+            'Contract bootstrap queue unavailable for session %s', session_id,
         )
 
-    import threading
-
-    global _bootstrap_local_worker_started
-    start_worker = False
-    with _bootstrap_local_lock_obj():
-        _bootstrap_local_queue.append((session_id, org_id, app))
-        if not _bootstrap_local_worker_started:
-            _bootstrap_local_worker_started = True
-            start_worker = True
-
-    if start_worker:
-        threading.Thread(
-            target=_run_local_bootstrap_queue,
-            name='contract-bootstrap-worker',
-            daemon=True,
-        ).start()
+    dispatch.submit_local(
+        'contract_bootstrap',
+        job_path,
+        idempotency_key=idempotency_key,
+        session_id=session_id,
+        org_id=org_id,
+        _inline=True,
+    )
 
 
 def resolve_match(
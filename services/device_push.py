@@ -73,27 +73,18 @@ def enqueue_portal_push(message):
         )
         return {'ok': False, 'reason': 'apns_unconfigured'}
 
-    try:
-        from redis import Redis
-        from rq import Queue
-        from config import Config
+    from jobs import dispatch
 
-        conn = Redis.from_url(
-            Config.REDIS_URL,
-            socket_connect_timeout=2,
-            socket_timeout=2,
-        )
-        conn.ping()
-        Queue(QUEUE_NAME, connection=conn).enqueue(
-            'jobs.apns_push.send_portal_push',
-            message_id=message.id,
-            org_id=message.organization_id,
-            job_timeout=60,
-        )
+    if dispatch.enqueue(
+        QUEUE_NAME,
+        'jobs.apns_push.send_portal_push',
+        idempotency_key=f'message:{message.id}',
+        message_id=message.id,
+        org_id=message.organization_id,
+        job_timeout=60,
+    ):
         return {'ok': True, 'queued': True}
-    except Exception:
-        logger.exception(
-            'APNs enqueue failed for message %s; skipping push',
-            message.id,
-        )
-        return {'ok': False, 'reason': 'enqueue_failed'}
+    logger.warning(
+        'APNs enqueue failed for message %s; skipping push', message.id,
+    )
+    return {'ok': False, 'reason': 'enqueue_failed'}
@@ -11,21 +11,23 @@ to populate UI sections (e.g., LISTING INFO) without manual form entry.
 
 from __future__ import annotations
 
-import base64
 import hashlib
 import json
 import logging
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Optional
 
-import fitz  # PyMuPDF
+from services.pdf_pages import PdfPageSet, PdfSource, pdf_pages
 
 logger = logging.getLogger(__name__)
 
 
-def _file_sha256(file_data: Optional[bytes]) -> Optional[str]:
+def _file_sha256(file_data: PdfSource) -> Optional[str]:
     if not file_data:
         return None
+    if isinstance(file_data, PdfPageSet):
+        return file_data.sha256
     return hashlib.sha256(file_data).hexdigest()
 
 
@@ -130,6 +132,12 @@ def _create_extraction_run(
     raw_output=None,
     error: str | None = None,
     extraction_type: str | None = None,
+    schema_version: str | None = None,
+    page_fingerprints: list | None = None,
+    cached_from_run_id: int | None = None,
+    pages_total: int | None = None,
+    pages_sent: int | None = None,
+    image_bytes: int | None = None,
 ):
     """Persist DocumentExtractionRun + ExtractedField rows for a settled extraction."""
     from models import DocumentExtractionRun, ExtractedField, db
@@ -145,6 +153,12 @@ def _create_extraction_run(
         extracted_data=field_data or {},
         confidence_scores={},
         file_sha256=file_sha256,
+        schema_version=schema_version,
+        page_fingerprints=page_fingerprints,
+        cached_from_run_id=cached_from_run_id,
+        pages_total=pages_total,
+        pages_sent=pages_sent,
+        image_bytes=image_bytes,
         error=error,
         started_at=datetime.utcnow(),
         completed_at=datetime.utcnow(),
@@ -691,34 +705,289 @@ def get_extraction_schema(template_slug: str | None) -> dict:
     return EXTRACTION_SCHEMAS.get(template_slug) or UNIVERSAL_EXTRACTION_SCHEMA
 
 
-def _render_pdf_to_images(file_data: bytes) -> list:
-    """Render all PDF pages to base64-encoded PNG images."""
-    images = []
-    doc = fitz.open(stream=file_data, filetype="pdf")
-    try:
-        for page in doc:
-            pix = page.get_pixmap(dpi=150)
-            png_bytes = pix.tobytes("png")
-            images.append(base64.b64encode(png_bytes).decode('ascii'))
-    finally:
-        doc.close()
+def _image_budget_bytes() -> int:
+    from flask import current_app, has_app_context
+    from services.page_render_plan import DEFAULT_IMAGE_BUDGET_BYTES
+
+    if not has_app_context():
+        return DEFAULT_IMAGE_BUDGET_BYTES
+    return int(current_app.config.get(
+        'EXTRACTION_IMAGE_BUDGET_BYTES', DEFAULT_IMAGE_BUDGET_BYTES,
+    ))
+
+
+def _render_pdf_to_images(file_data: PdfSource, page_indices=None, schema_slug=None) -> list:
+    """Render the pages worth sending (all, or 0-based ``page_indices``).
+
+    Returns one image item per page sent (see services.page_render_plan):
+    pages are chosen and sized for ``schema_slug`` and held to the image
+    budget.
+    """
+    from services.page_render_plan import plan_page_renders, render_planned_pages
+
+    with pdf_pages(file_data) as pages:
+        plan = plan_page_renders(
+            pages, schema_slug=schema_slug, page_indices=page_indices,
+        )
+        images = render_planned_pages(pages, plan, budget_bytes=_image_budget_bytes())
+    if plan.text_only or plan.omitted:
+        logger.info(
+            'Page images: sent %d of %d pages (%d bytes); text only %s, over budget %s',
+            plan.pages_sent, plan.page_count, plan.image_bytes,
+            [index + 1 for index in plan.text_only],
+            [index + 1 for index in plan.omitted],
+        )
     return images
 
 
-def _extract_pdf_text(file_data: bytes) -> str:
-    """Extract selectable PDF text to help AI handle combined packets."""
+def _image_pages(images: list) -> set[int]:
+    return {
+        image['page'] for image in images
+        if isinstance(image, dict) and image.get('page')
+    }
+
+
+def _image_bytes(images: list) -> int:
+    total = 0
+    for image in images:
+        data = image.get('data') if isinstance(image, dict) else image
+        if isinstance(data, str):
+            total += len(data) * 3 // 4
+    return total
+
+
+def _extract_pdf_text(file_data: PdfSource, page_indices=None) -> str:
+    """Extract selectable PDF text to help AI handle combined packets.
+
+    Pages keep their original numbering when only ``page_indices`` are read.
+    """
     chunks = []
-    doc = fitz.open(stream=file_data, filetype="pdf")
-    try:
-        for index, page in enumerate(doc, start=1):
-            page_text = (page.get_text("text") or "").strip()
+    with pdf_pages(file_data) as pages:
+        if page_indices is None:
+            page_indices = range(pages.page_count)
+        for index in page_indices:
+            page_text = pages.page_text(index).strip()
             if page_text:
-                chunks.append(f"--- Page {index} ---\n{page_text}")
-    finally:
-        doc.close()
+                chunks.append(f"--- Page {index + 1} ---\n{page_text}")
     return "\n\n".join(chunks)
 
 
+@dataclass
+class _ExtractionRunInfo:
+    """Cache keys, provenance and page-image metrics for the extraction run."""
+
+    extraction_type: str
+    version: str
+    fingerprints: Optional[list] = None
+    source_run_id: Optional[int] = None
+    pages_total: Optional[int] = None
+    pages_sent: int = 0
+    image_bytes: int = 0
+
+
+def _cache_enabled() -> bool:
+    from flask import current_app
+
+    return bool(current_app.config.get('EXTRACTION_CACHE_ENABLED', True))
+
+
+def _run_vision_extraction(
+    *,
+    doc_id: int,
+    org_id: int,
+    file_data: PdfPageSet,
+    file_sha: Optional[str],
+    extraction_type: str,
+    system_prompt: str,
+    user_prompt: str,
+) -> tuple[dict, _ExtractionRunInfo]:
+    """Return the raw model result for the file, reusing earlier runs.
+
+    An earlier completed run over the same bytes, extraction type, prompts and
+    model is reused outright. Otherwise, pages shared with a recent run keep
+    that run's page-attributed fields and only the other pages are sent.
+    More than EXTRACTION_WINDOW_PAGES pages are sent as concurrent page
+    windows and merged on their ``_meta`` page/confidence provenance.
+    """
+    from services import extraction_cache
+    from services.ai_service import EXTRACTION_MODEL
+
+    info = _ExtractionRunInfo(
+        extraction_type=extraction_type,
+        version=extraction_cache.schema_version(system_prompt, user_prompt),
+    )
+    enabled = _cache_enabled()
+    key = {
+        'org_id': org_id,
+        'extraction_type': extraction_type,
+        'version': info.version,
+        'model': EXTRACTION_MODEL,
+    }
+
+    cached_run = extraction_cache.find_cached_run(file_sha256=file_sha, **key) if enabled else None
+    if cached_run is not None:
+        logger.info(
+            'Reusing extraction run %s for doc %s (identical file)', cached_run.id, doc_id,
+        )
+        info.fingerprints = cached_run.page_fingerprints
+        info.source_run_id = cached_run.id
+        info.pages_total = len(info.fingerprints or []) or None
+        return dict(cached_run.raw_output), info
+
+    info.fingerprints = extraction_cache.page_fingerprints(file_data)
+    info.pages_total = len(info.fingerprints) if info.fingerprints else None
+    reuse = (
+        extraction_cache.find_page_donor(fingerprints=info.fingerprints, **key)
+        if enabled else None
+    )
+    send_pages = reuse.missing_pages if reuse else None
+    if reuse:
+        info.source_run_id = reuse.run.id
+        logger.info(
+            'Doc %s shares %d pages with extraction run %s; sending pages %s',
+            doc_id, len(reuse.page_map), reuse.run.id, send_pages,
+        )
+        if not send_pages:
+            return reuse.result(), info
+
+    pending = send_pages
+    if pending is None and info.pages_total:
+        pending = list(range(1, info.pages_total + 1))
+    window_size = _window_pages()
+    if pending and len(pending) > window_size:
+        windows = [
+            pending[start:start + window_size]
+            for start in range(0, len(pending), window_size)
+        ]
+    else:
+        windows = [send_pages]
+
+    requests = [
+        _prepare_page_request(
+            file_data,
+            page_numbers=window,
+            pages_total=info.pages_total,
+            schema_slug=extraction_type,
+            user_prompt=user_prompt,
+        )
+        for window in windows
+    ]
+    info.pages_sent = sum(len(images) for images, _prompt in requests)
+    info.image_bytes = sum(_image_bytes(images) for images, _prompt in requests)
+    logger.info(
+        'Doc %s: sending %d page images (%d bytes) in %d request(s)',
+        doc_id, info.pages_sent, info.image_bytes, len(requests),
+    )
+
+    results = _generate_window_extractions(system_prompt, requests)
+    if len(windows) == 1 and not reuse:
+        return results[0], info
+
+    from services.extraction_merge import merge_results, remap_result
+
+    parts = [reuse.result()] if reuse else []
+    parts.extend(
+        remap_result(result, extraction_cache.sent_page_map(window), strict=False)
+        for result, window in zip(results, windows)
+    )
+    result = merge_results(parts, join_at=[window[0] for window in windows[1:]])
+    return result, info
+
+
+def _window_pages() -> int:
+    from flask import current_app
+
+    return max(1, int(current_app.config.get('EXTRACTION_WINDOW_PAGES', 10)))
+
+
+def _prepare_page_request(
+    file_data: PdfPageSet,
+    *,
+    page_numbers: Optional[list[int]],
+    pages_total: Optional[int],
+    schema_slug: str,
+    user_prompt: str,
+) -> tuple[list, str]:
+    """Render ``page_numbers`` (1-based; None for all) and build their prompt."""
+    page_indices = [page - 1 for page in page_numbers] if page_numbers else None
+    images = _render_pdf_to_images(
+        file_data, page_indices=page_indices, schema_slug=schema_slug,
+    )
+    pdf_text = _extract_pdf_text(file_data, page_indices=page_indices)
+
+    if page_numbers:
+        user_prompt = (
+            f"{user_prompt}\n\n"
+            f"This upload has {pages_total} pages. Only pages "
+            f"{', '.join(str(page) for page in page_numbers)} are attached, in that "
+            "order; the other pages are reviewed separately. Extract only from the "
+            "attached pages and use these original page numbers in _meta and every "
+            "page reference."
+        )
+    imaged = _image_pages(images)
+    if imaged and pages_total:
+        text_pages = [
+            page for page in (page_numbers or range(1, pages_total + 1))
+            if page not in imaged
+        ]
+        if text_pages:
+            user_prompt = (
+                f"{user_prompt}\n\n"
+                f"Pages {', '.join(str(page) for page in text_pages)} have no image "
+                "attached; read them from the selectable text below. Attached images "
+                f"are pages {', '.join(str(page) for page in sorted(imaged))}, in that order."
+            )
+    if pdf_text:
+        user_prompt = (
+            f"{user_prompt}\n\n"
+            "Selectable PDF text extracted from the uploaded file follows. "
+            "Use this text together with the page images; the images are authoritative for checkbox marks and layout.\n\n"
+            f"{pdf_text[:60000]}"
+        )
+    return images, user_prompt
+
+
+def _generate_window_extractions(system_prompt: str, requests: list) -> list[dict]:
+    """Run one model call per (images, user_prompt) request.
+
+    Several windows run concurrently on a bounded pool, so a long packet
+    takes about as long as its slowest window and each window falls back
+    through the model list on its own. Any window that still fails fails
+    the extraction.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from flask import current_app
+    from services.ai_service import generate_document_extraction
+
+    if len(requests) == 1:
+        images, user_prompt = requests[0]
+        return [generate_document_extraction(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            images=images,
+        )]
+
+    workers = max(1, int(current_app.config.get('EXTRACTION_WINDOW_WORKERS', 4)))
+    pool = ThreadPoolExecutor(
+        max_workers=min(workers, len(requests)),
+        thread_name_prefix='extraction-window',
+    )
+    futures = [
+        pool.submit(
+            generate_document_extraction,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            images=images,
+        )
+        for images, user_prompt in requests
+    ]
+    try:
+        return [future.result() for future in futures]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 def _build_extraction_prompt(schema: dict) -> str:
     """Build the user prompt with field definitions and format instructions."""
     lines = [
@@ -759,7 +1028,15 @@ def extract_document_data(doc_id: int, org_id: int, file_data: bytes):
     Runs inside a background thread with its own DB session and RLS context.
     The caller is responsible for setting up app context before calling.
     org_id is required to re-set RLS after each commit.
+
+    The PDF is opened once; identity, rendering, text and package splitting
+    all read the same page set.
     """
+    with PdfPageSet(file_data) as pages:
+        return _extract_document_data(doc_id, org_id, pages)
+
+
+def _extract_document_data(doc_id: int, org_id: int, file_data: PdfPageSet):
     from models import db, TransactionDocument
 
     _set_rls(org_id)
@@ -880,11 +1157,7 @@ def extract_document_data(doc_id: int, org_id: int, file_data: bytes):
     try:
         _set_rls(org_id)
 
-        images = _render_pdf_to_images(file_data)
-        pdf_text = _extract_pdf_text(file_data)
-        logger.info(f"Rendered {len(images)} pages and extracted {len(pdf_text)} text chars for doc {doc_id}")
-
-        from services.ai_service import EXTRACTION_MODEL, generate_document_extraction
+        from services.ai_service import EXTRACTION_MODEL
 
         prompt_schema = dict(schema)
         prompt_schema['fields'] = {
@@ -906,18 +1179,15 @@ def extract_document_data(doc_id: int, org_id: int, file_data: bytes):
             logger.exception(
                 'Failed to attach filing-purpose review context for doc %s', doc_id,
             )
-        if pdf_text:
-            user_prompt = (
-                f"{user_prompt}\n\n"
-                "Selectable PDF text extracted from the uploaded file follows. "
-                "Use this text together with the page images; the images are authoritative for checkbox marks and layout.\n\n"
-                f"{pdf_text[:60000]}"
-            )
 
-        result = generate_document_extraction(
+        result, run_info = _run_vision_extraction(
+            doc_id=doc_id,
+            org_id=org_id,
+            file_data=file_data,
+            file_sha=file_sha,
+            extraction_type=doc.template_slug or 'document',
             system_prompt=schema['system_prompt'],
             user_prompt=user_prompt,
-            images=images,
         )
 
         logger.info(f"Raw extraction result for doc {doc_id}: {result}")
@@ -953,7 +1223,13 @@ def extract_document_data(doc_id: int, org_id: int, file_data: bytes):
             model=EXTRACTION_MODEL,
             file_sha256=file_sha,
             raw_output=result,
-            extraction_type=doc.template_slug or 'document',
+            extraction_type=run_info.extraction_type,
+            schema_version=run_info.version,
+            page_fingerprints=run_info.fingerprints,
+            cached_from_run_id=run_info.source_run_id,
+            pages_total=run_info.pages_total,
+            pages_sent=run_info.pages_sent,
+            image_bytes=run_info.image_bytes,
         )
         extraction_run_id = run.id
         db.session.commit()
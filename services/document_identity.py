@@ -13,7 +13,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import asdict, dataclass, field
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 # Reuse offer-package signal knowledge without inventing a second map.
 from services.seller_workflow import (
@@ -21,6 +21,9 @@ from services.seller_workflow import (
     infer_offer_document_type_from_text,
 )
 
+if TYPE_CHECKING:
+    from services.pdf_pages import PdfSource
+
 HIGH_CONFIDENCE = 0.85
 MEDIUM_CONFIDENCE = 0.65
 
@@ -463,23 +466,19 @@ def normalize_pdf_text(text: str) -> str:
     return re.sub(r'\s+', ' ', (text or '').lower()).strip()
 
 
-def extract_pdf_text(file_bytes: bytes, *, max_pages: int = 24) -> str:
-    """Extract selectable text from PDF pages. Fail soft to ''."""
+def extract_pdf_text(file_bytes: PdfSource, *, max_pages: int = 24) -> str:
+    """Extract selectable text from PDF pages. Fail soft to ''.
+
+    Accepts raw bytes or a shared ``PdfPageSet`` whose cached page text is
+    reused.
+    """
     if not file_bytes:
         return ''
     try:
-        import fitz
-
-        chunks: list[str] = []
-        doc = fitz.open(stream=file_bytes, filetype='pdf')
-        try:
-            for index, page in enumerate(doc):
-                if index >= max_pages:
-                    break
-                chunks.append(page.get_text('text') or '')
-        finally:
-            doc.close()
-        return '\n'.join(chunks)
+        from services.pdf_pages import pdf_pages
+
+        with pdf_pages(file_bytes) as pages:
+            return '\n'.join(pages.page_texts(max_pages=max_pages))
     except Exception:
         return ''
 
@@ -806,7 +805,7 @@ def identify_from_text(
 
 
 def identify_from_pdf(
-    file_bytes: bytes,
+    file_bytes: PdfSource,
     *,
     filename: str | None = None,
     field_hints: dict[str, Any] | None = None,
@@ -871,7 +870,7 @@ def should_content_classify_slug(template_slug: str | None) -> bool:
 def resolve_upload_identity_for_extraction(
     *,
     template_slug: str | None,
-    file_bytes: bytes,
+    file_bytes: PdfSource,
     filename: str | None = None,
     transaction_side: str | None = None,
     is_offer_scoped: bool = False,
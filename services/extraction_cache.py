@@ -0,0 +1,164 @@
+"""
+Reuse earlier extraction runs instead of re-sending pages to the vision model.
+
+Runs are keyed by (file SHA-256, extraction type, schema version, model),
+where the schema version hashes the exact system and user prompts sent, so
+any change to fields, instructions or review context misses naturally. An
+identical file reuses the prior run's result outright.
+
+Each completed run also records per-page fingerprints. A packet that shares
+pages with an earlier upload under the same key reuses the fields that run
+attributed (via ``_meta``) to those pages, and only the remaining pages are
+rendered and sent.
+
+Lookups are scoped to the organization and fail soft to a miss.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from services.pdf_pages import PdfSource, pdf_pages
+
+logger = logging.getLogger(__name__)
+
+# Most recent completed runs considered as page donors.
+PAGE_DONOR_CANDIDATES = 25
+
+
+def schema_version(system_prompt: str, user_prompt: str) -> str:
+    """Fingerprint of everything sent to the model except the pages."""
+    payload = json.dumps([system_prompt or '', user_prompt or ''])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def page_fingerprints(file_data: PdfSource) -> Optional[list[str]]:
+    """Per-page content fingerprints, or None when the PDF cannot be read."""
+    if not file_data:
+        return None
+    try:
+        with pdf_pages(file_data) as pages:
+            return pages.page_fingerprints() or None
+    except Exception:
+        logger.warning('Could not fingerprint PDF pages', exc_info=True)
+        return None
+
+
+def _completed_runs(*, org_id: int, extraction_type: str, version: str, model: str):
+    from models import DocumentExtractionRun
+
+    return DocumentExtractionRun.query.filter_by(
+        organization_id=org_id,
+        status='completed',
+        extraction_type=extraction_type,
+        schema_version=version,
+        model=model,
+    ).order_by(DocumentExtractionRun.id.desc())
+
+
+def find_cached_run(
+    *,
+    org_id: int,
+    file_sha256: Optional[str],
+    extraction_type: str,
+    version: str,
+    model: str,
+):
+    """Latest completed run over the same bytes, schema and model."""
+    if not file_sha256:
+        return None
+    try:
+        run = _completed_runs(
+            org_id=org_id,
+            extraction_type=extraction_type,
+            version=version,
+            model=model,
+        ).filter_by(file_sha256=file_sha256).first()
+    except Exception:
+        logger.warning('Extraction cache lookup failed', exc_info=True)
+        return None
+    if run is None or not isinstance(run.raw_output, dict):
+        return None
+    return run
+
+
+@dataclass
+class PageReuse:
+    """An earlier run sharing pages with this file.
+
+    ``page_map`` maps the earlier file's 1-based pages to this file's.
+    """
+
+    run: object
+    page_map: dict[int, int]
+    page_count: int
+
+    @property
+    def missing_pages(self) -> list[int]:
+        """1-based pages of this file that still need the model."""
+        covered = set(self.page_map.values())
+        return [page for page in range(1, self.page_count + 1) if page not in covered]
+
+    def result(self) -> dict:
+        """The earlier result, limited to and renumbered for shared pages."""
+        from services.extraction_merge import remap_result
+
+        return remap_result(self.run.raw_output, self.page_map, strict=True)
+
+
+def find_page_donor(
+    *,
+    org_id: int,
+    fingerprints: Optional[list[str]],
+    extraction_type: str,
+    version: str,
+    model: str,
+) -> Optional[PageReuse]:
+    """The recent run sharing the most pages with ``fingerprints``."""
+    if not fingerprints:
+        return None
+    positions: dict[str, int] = {}
+    for page, fingerprint in enumerate(fingerprints, start=1):
+        positions.setdefault(fingerprint, page)
+
+    try:
+        candidates = _completed_runs(
+            org_id=org_id,
+            extraction_type=extraction_type,
+            version=version,
+            model=model,
+        ).limit(PAGE_DONOR_CANDIDATES).all()
+    except Exception:
+        logger.warning('Extraction page cache lookup failed', exc_info=True)
+        return None
+
+    best: Optional[PageReuse] = None
+    for run in candidates:
+        if not isinstance(run.raw_output, dict) or not run.page_fingerprints:
+            continue
+        page_map: dict[int, int] = {}
+        used: set[int] = set()
+        for donor_page, fingerprint in enumerate(run.page_fingerprints, start=1):
+            page = positions.get(fingerprint)
+            if page is not None and page not in used:
+                page_map[donor_page] = page
+                used.add(page)
+        if page_map and (best is None or len(page_map) > len(best.page_map)):
+            best = PageReuse(run=run, page_map=page_map, page_count=len(fingerprints))
+    return best
+
+
+def sent_page_map(pages: list[int]) -> dict[int, int]:
+    """Map a partial call's page references back to this file's pages.
+
+    The model is told the original page numbers, but may still count the
+    attached images from 1; both readings resolve to the same page.
+    """
+    page_map = {page: page for page in pages}
+    for position, page in enumerate(pages, start=1):
+        page_map.setdefault(position, page)
+    return page_map
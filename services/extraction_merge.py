@@ -0,0 +1,241 @@
+"""
+Combine extraction results that each saw only some pages of a file.
+
+A vision extraction result is a flat dict of field values plus the ``_meta``
+provenance object ({field: {page, quote, confidence}}). When a file is
+extracted in parts — pages reused from an earlier run plus a fresh call for
+the rest — every page reference has to be translated back to the file's own
+1-based numbering before the parts can be merged.
+
+Scalar fields keep the candidate found on the earliest page, then the more
+confident one. Object fields that describe the whole packet (addenda,
+supporting documents) are merged key by key in that same order, so each leaf
+keeps its earliest non-empty value and nothing one part found is lost.
+Page-bearing lists (deadlines, sanity flags, detected
+documents, unreadable pages) are unioned and ordered by page; a page range
+cut in two by a part boundary is joined back together.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Mapping, Optional
+
+from services.document_extractor import META_FIELD_KEY
+
+PAGE_KEYS = ('page', 'start_page', 'end_page', 'page_start', 'page_end')
+_RANGE_KEYS = (('start_page', 'end_page'), ('page_start', 'page_end'))
+
+
+def _page_number(value: Any) -> Optional[int]:
+    try:
+        page = int(value)
+    except (TypeError, ValueError):
+        return None
+    return page if page > 0 else None
+
+
+def _is_page_list(key: str, value: Any) -> bool:
+    if not isinstance(value, list):
+        return False
+    if str(key).endswith('_pages'):
+        return True
+    return any(
+        isinstance(item, dict) and any(k in item for k in PAGE_KEYS)
+        for item in value
+    )
+
+
+def _remap_item(item: Any, key: str, page_map: Mapping[int, int], strict: bool):
+    """Translate one list item; None means drop it."""
+    if isinstance(item, dict):
+        present = [k for k in PAGE_KEYS if k in item and item[k] is not None]
+        if not present:
+            return None if strict else item
+        remapped = dict(item)
+        for page_key in present:
+            mapped = page_map.get(_page_number(item[page_key]))
+            if mapped is None:
+                if strict:
+                    return None
+                remapped.pop(page_key)
+                continue
+            remapped[page_key] = mapped
+        return remapped
+    if str(key).endswith('_pages'):
+        mapped = page_map.get(_page_number(item))
+        if mapped is None and strict:
+            return None
+        return mapped if mapped is not None else item
+    return None if strict else item
+
+
+def remap_result(result: Mapping[str, Any], page_map: Mapping[int, int], *, strict: bool) -> dict:
+    """Return ``result`` with page references translated through ``page_map``.
+
+    ``strict`` is for results reused from another file: anything that cannot
+    be pinned to a mapped page is dropped. Otherwise values are kept and
+    only unmappable page references are removed.
+    """
+    if not isinstance(result, Mapping):
+        return {}
+    raw_meta = result.get(META_FIELD_KEY)
+    raw_meta = raw_meta if isinstance(raw_meta, Mapping) else {}
+
+    remapped: dict[str, Any] = {}
+    meta: dict[str, Any] = {}
+    for key, value in result.items():
+        if key == META_FIELD_KEY:
+            continue
+        if _is_page_list(key, value):
+            items = [_remap_item(item, key, page_map, strict) for item in value]
+            remapped[key] = [item for item in items if item is not None]
+            continue
+
+        entry = raw_meta.get(key)
+        entry = dict(entry) if isinstance(entry, Mapping) else None
+        mapped = page_map.get(_page_number(entry.get('page'))) if entry else None
+        if strict and mapped is None:
+            continue
+        if entry is not None:
+            if mapped is None:
+                entry.pop('page', None)
+            else:
+                entry['page'] = mapped
+            meta[key] = entry
+        remapped[key] = value
+
+    if meta:
+        remapped[META_FIELD_KEY] = meta
+    return remapped
+
+
+def _rank(entry: Any) -> tuple:
+    if not isinstance(entry, Mapping):
+        return (float('inf'), 0.0)
+    page = _page_number(entry.get('page'))
+    try:
+        confidence = float(entry.get('confidence') or 0.0)
+    except (TypeError, ValueError):
+        confidence = 0.0
+    return (page if page is not None else float('inf'), -confidence)
+
+
+def _merge_objects(base: Mapping[str, Any], extra: Mapping[str, Any]) -> dict:
+    """``base`` with ``extra`` filled in wherever ``base`` has nothing."""
+    merged = dict(base)
+    for key, value in extra.items():
+        current = merged.get(key)
+        if isinstance(current, Mapping) and isinstance(value, Mapping):
+            merged[key] = _merge_objects(current, value)
+        elif current is None or current == '':
+            merged[key] = value
+    return merged
+
+
+def _item_page(item: Any) -> float:
+    if isinstance(item, dict):
+        for page_key in PAGE_KEYS:
+            page = _page_number(item.get(page_key))
+            if page is not None:
+                return page
+        return float('inf')
+    page = _page_number(item)
+    return page if page is not None else float('inf')
+
+
+def _range_keys(item: Any) -> Optional[tuple[str, str]]:
+    if not isinstance(item, dict):
+        return None
+    for start_key, end_key in _RANGE_KEYS:
+        if _page_number(item.get(start_key)) and _page_number(item.get(end_key)):
+            return start_key, end_key
+    return None
+
+
+def _join_ranges(items: list, join_at: set[int]) -> list:
+    """Join same-type page ranges that meet exactly at a part boundary."""
+    joined: list = []
+    for item in items:
+        keys = _range_keys(item)
+        previous = joined[-1] if joined else None
+        previous_keys = _range_keys(previous)
+        if (
+            keys and previous_keys == keys
+            and _page_number(item[keys[0]]) in join_at
+            and _page_number(previous[keys[1]]) == _page_number(item[keys[0]]) - 1
+            and previous.get('document_type') == item.get('document_type')
+        ):
+            previous[keys[1]] = item[keys[1]]
+            continue
+        joined.append(dict(item) if keys else item)
+    return joined
+
+
+def merge_results(
+    parts: Iterable[Mapping[str, Any]],
+    *,
+    join_at: Iterable[int] = (),
+) -> dict:
+    """Merge page-remapped results into one result for the whole file.
+
+    ``join_at`` lists the first page of each part after the first; page
+    ranges split exactly there are joined.
+    """
+    join_at = set(join_at)
+    parts = [part for part in parts if isinstance(part, Mapping)]
+    list_keys = {
+        key
+        for part in parts
+        for key, value in part.items()
+        if key != META_FIELD_KEY and _is_page_list(key, value)
+    }
+
+    merged: dict[str, Any] = {key: [] for key in list_keys}
+    meta: dict[str, Any] = {}
+    ranks: dict[str, tuple] = {}
+    objects: dict[str, list[tuple[tuple, int, Mapping]]] = {}
+    seen_items: dict[str, set[str]] = {key: set() for key in list_keys}
+
+    for order, part in enumerate(parts):
+        part_meta = part.get(META_FIELD_KEY)
+        part_meta = part_meta if isinstance(part_meta, Mapping) else {}
+        for key, value in part.items():
+            if key == META_FIELD_KEY:
+                continue
+            if key in list_keys:
+                for item in value if isinstance(value, list) else []:
+                    marker = json.dumps(item, sort_keys=True, default=str)
+                    if marker not in seen_items[key]:
+                        seen_items[key].add(marker)
+                        merged[key].append(item)
+                continue
+            if value is None or value == '':
+                merged.setdefault(key, None)
+                continue
+            entry = part_meta.get(key)
+            rank = _rank(entry)
+            if isinstance(value, Mapping):
+                objects.setdefault(key, []).append((rank, order, value))
+            if key in ranks and rank >= ranks[key]:
+                continue
+            merged[key] = value
+            ranks[key] = rank
+            if isinstance(entry, Mapping):
+                meta[key] = dict(entry)
+            else:
+                meta.pop(key, None)
+
+    for key, candidates in objects.items():
+        combined: dict[str, Any] = {}
+        for _page_rank, _order, value in sorted(candidates, key=lambda c: c[:2]):
+            combined = _merge_objects(combined, value)
+        merged[key] = combined
+
+    for key in list_keys:
+        merged[key].sort(key=_item_page)
+        if join_at:
+            merged[key] = _join_ranges(merged[key], join_at)
+    if meta:
+        merged[META_FIELD_KEY] = meta
+    return merged
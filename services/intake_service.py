@@ -699,27 +699,25 @@ def post_upload_processing(doc, file_bytes=None):
     logger = logging.getLogger(__name__)
     inline_enabled = os.getenv('DOCUMENT_EXTRACTION_INLINE', '').lower() in ('1', 'true', 'yes')
 
+    job_path = 'jobs.document_extraction.extract_document_job'
+    idempotency_key = f'doc:{doc_id}'
+
     def run_in_background_thread():
         """Fallback for local/dev when Redis is not available."""
-        import threading
-        from flask import current_app
-
-        app = current_app._get_current_object()
-
-        def runner():
-            with app.app_context():
-                from jobs.document_extraction import extract_document_job
-                extract_document_job(doc_id=doc_id, org_id=org_id)
+        from jobs import dispatch
 
-        thread = threading.Thread(
-            target=runner,
-            name=f"document-extraction-{doc_id}",
-            daemon=True,
+        dispatch.submit_local(
+            'doc_extraction',
+            job_path,
+            idempotency_key=idempotency_key,
+            doc_id=doc_id,
+            org_id=org_id,
         )
-        thread.start()
 
     try:
         from config import Config
+        from jobs import dispatch
+
         if inline_enabled:
             from jobs.document_extraction import extract_document_job
             logger.info(f"Running inline document extraction for doc {doc_id}")
@@ -736,20 +734,17 @@ def post_upload_processing(doc, file_bytes=None):
             run_in_background_thread()
             return
 
-        from redis import Redis
-        from rq import Queue
-
-        conn = Redis.from_url(
-            Config.REDIS_URL,
-            socket_connect_timeout=2,
-            socket_timeout=2,
-        )
-        q = Queue('doc_extraction', connection=conn)
-        q.enqueue(
-            'jobs.document_extraction.extract_document_job',
+        if dispatch.enqueue(
+            'doc_extraction',
+            job_path,
+            idempotency_key=idempotency_key,
             doc_id=doc_id,
             org_id=org_id,
             job_timeout=300,
+        ):
+            return
+        logger.warning(
+            f"Queue unavailable for doc {doc_id}; falling back to local background thread."
         )
     except Exception as e:
         logger.warning(
@@ -757,11 +752,11 @@ def post_upload_processing(doc, file_bytes=None):
             "Falling back to local background thread.",
             exc_info=True,
         )
-        try:
-            run_in_background_thread()
-        except Exception:
-            logger.error(
-                f"Failed to start background extraction for doc {doc_id}. "
-                "extraction_status may remain pending for manual retry.",
-                exc_info=True,
-            )
+    try:
+        run_in_background_thread()
+    except Exception:
+        logger.error(
+            f"Failed to start background extraction for doc {doc_id}. "
+            "extraction_status may remain pending for manual retry.",
+            exc_info=True,
+        )
@@ -15,8 +15,7 @@ import re
 from dataclasses import dataclass
 from typing import Any, Iterable, Optional
 
-import fitz
-
+from services.pdf_pages import PdfSource, pdf_pages
 from services.pdf_splitter import SplitSegment, get_pdf_page_count, normalize_segments
 
 
@@ -258,15 +257,12 @@ def detected_documents_from_field_data(field_data: dict | None) -> list:
     return []
 
 
-def extract_page_texts(file_data: bytes) -> list[str]:
+def extract_page_texts(file_data: PdfSource) -> list[str]:
     """Return selectable text for each PDF page (1-based index = list index + 1)."""
     if not file_data:
         return []
-    doc = fitz.open(stream=file_data, filetype='pdf')
-    try:
-        return [(page.get_text('text') or '') for page in doc]
-    finally:
-        doc.close()
+    with pdf_pages(file_data) as pages:
+        return pages.page_texts()
 
 
 def classify_page_text(text: str) -> Optional[str]:
@@ -445,7 +441,7 @@ def reconcile_listing_packet_segments(
 
 
 def build_listing_packet_plan(
-    file_data: bytes,
+    file_data: PdfSource,
     *,
     ai_segments: Iterable[dict] | None = None,
 ) -> PacketPlan:
@@ -465,7 +461,7 @@ def build_listing_packet_plan(
 
 
 def plan_listing_packet_split(
-    file_data: bytes,
+    file_data: PdfSource,
     *,
     ai_segments: Iterable[dict] | None = None,
 ) -> list[PacketSegment]:
@@ -636,5 +632,5 @@ def _segment_source(start: int, end: int, sources: list[str] | None) -> str:
     return 'fingerprint'
 
 
-def listing_packet_page_count(file_data: bytes) -> int:
+def listing_packet_page_count(file_data: PdfSource) -> int:
     return get_pdf_page_count(file_data)
@@ -11,7 +11,7 @@ recipient, in ``personalize``, so one render can serve a whole campaign step.
 from __future__ import annotations
 
 import html
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional
 
 from services.marketing import merge_fields as mf
@@ -38,6 +38,11 @@ from services.marketing.shell import (
 )
 
 
+# Stands in for the recipient's unsubscribe link in a shared render. It has no
+# dotted key, so ``substitute`` leaves it alone, and escaping does not touch it.
+UNSUBSCRIBE_SLOT = '{{@unsubscribe_url}}'
+
+
 @dataclass
 class RenderedEmail:
     html: str
@@ -490,22 +495,44 @@ def render(
     return RenderedEmail(html=body_html, text=body_text)
 
 
+def render_shared(blocks: list[dict], ctx: ShellContext) -> RenderedEmail:
+    """Render once for every recipient of a campaign step.
+
+    The only per-recipient part of the shell is the unsubscribe link, so it is
+    rendered as ``UNSUBSCRIBE_SLOT`` and filled by ``personalize`` alongside
+    the merge tokens. Blocks are assumed to be validated already.
+    """
+    return render(blocks, replace(ctx, unsubscribe_url=UNSUBSCRIBE_SLOT), validate=False)
+
+
 def personalize(
     rendered: RenderedEmail,
     subject: str,
     values: dict[str, Optional[str]],
+    *,
+    unsubscribe_url: Optional[str] = None,
 ) -> tuple[str, str, str, set[str]]:
     """Fill merge tokens for one recipient.
 
     Returns ``(subject, html, text, missing_keys)``. The HTML pass escapes
     values because rendering already escaped the surrounding copy; skipping it
     would let a contact name carrying markup into the document.
+
+    ``unsubscribe_url`` fills the slot left by ``render_shared``.
     """
+    body_html = rendered.html
+    body_text = rendered.text
+    if unsubscribe_url is not None:
+        body_html = body_html.replace(
+            UNSUBSCRIBE_SLOT, html.escape(unsubscribe_url, quote=True),
+        )
+        body_text = body_text.replace(UNSUBSCRIBE_SLOT, unsubscribe_url)
+
     filled_subject, missing_subject = mf.substitute(subject, values)
     filled_html, missing_html = mf.substitute(
-        rendered.html, values, escape=lambda v: html.escape(v, quote=True),
+        body_html, values, escape=lambda v: html.escape(v, quote=True),
     )
-    filled_text, missing_text = mf.substitute(rendered.text, values)
+    filled_text, missing_text = mf.substitute(body_text, values)
 
     return (
         filled_subject,
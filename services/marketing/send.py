@@ -1,15 +1,26 @@
-"""Deliver one marketing send through SendGrid.
+"""Deliver marketing sends through SendGrid.
 
-The layout is rendered here, per recipient, so the signature belongs to the
-sending agent and merge fields are escaped. Batching via SendGrid personalizations
-would force the same HTML for everyone; we already substitute before the wire.
+The layout is rendered once per campaign step and sending agent, then merge
+fields and the unsubscribe link are filled per recipient, so the signature
+belongs to the sending agent and merge fields are escaped. ``deliver`` fills
+them before the wire, one request per row; ``deliver_batch`` ships the shared
+body once per chunk and lets SendGrid substitute per personalization.
 """
 from __future__ import annotations
 
+import json
 import logging
 import re
-from datetime import datetime
-from typing import Optional
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import astuple, dataclass
+from datetime import datetime, timedelta
+from html import escape as html_escape
+from typing import Callable, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from sqlalchemy import update
 
 from config import Config
 from models import (
@@ -21,29 +32,101 @@ from services.marketing import sending_config
 from services.marketing import suppression as supp
 from services.marketing.context import shell_for
 from services.marketing.links import unsubscribe_url
-from services.marketing.render import personalize, render
+from services.marketing.render import (
+    UNSUBSCRIBE_SLOT, RenderedEmail, personalize, render, render_shared,
+)
 
 logger = logging.getLogger(__name__)
 
 MAX_TEST_RECIPIENTS = 5
+# Distinct (template version, sender, shell) renders kept per process. A
+# worker run touches a handful of steps, so this only bounds the worst case.
+STEP_RENDER_CACHE_SIZE = 64
+# SendGrid v3 limits: personalizations per request, and substitution bytes per
+# personalization.
+MAX_PERSONALIZATIONS = 1000
+_SUBSTITUTIONS_MAX_BYTES = 10000
+SENDGRID_TIMEOUT = 30
+_RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+# A rejected batch is split until the rows SendGrid refuses stand alone.
+_BISECT_STATUSES = (400,)
+# Batch rows are committed as ``sending`` before the POST. Webhook events
+# settle the ones SendGrid accepted; any still ``sending`` after this long
+# belonged to a worker that died mid-request and are failed, never resent.
+INTERRUPTED_SEND_AFTER = timedelta(hours=1)
 _TEST_SUBJECT_PREFIX = '[Test] '
 _EMAIL_RE = re.compile(r'^[A-Z0-9._%+\-]+@[A-Z0-9.\-]+\.[A-Z]{2,}$', re.I)
 
 
 class SendError(Exception):
-    def __init__(self, message: str, *, retryable: bool = False):
+    def __init__(self, message: str, *, retryable: bool = False,
+                 status: Optional[int] = None):
         super().__init__(message)
         self.retryable = retryable
+        self.status = status
+
+
+_step_renders: OrderedDict = OrderedDict()
+_step_renders_lock = threading.Lock()
+_http: Optional[requests.Session] = None
+_http_lock = threading.Lock()
+
 
+def clear_step_renders() -> None:
+    with _step_renders_lock:
+        _step_renders.clear()
 
-def render_for_send(send: MarketingSend, campaign: MarketingCampaign) -> tuple[str, str, str]:
+
+def step_render(template: MarketingTemplate, org, agent) -> RenderedEmail:
+    """The shared render of ``template`` for this org and sending agent.
+
+    Keyed by template version and the full shell context rather than by step
+    id, so an edited template, a renamed brokerage, or a new agent phone number
+    each get a fresh render, while every recipient of an unchanged step reuses
+    the first one.
+    """
+    ctx = shell_for(
+        org,
+        agent,
+        preheader=template.preheader,
+        eyebrow=(template.category or '').replace('_', ' ') or None,
+    )
+    key = (
+        template.id,
+        template.version,
+        template.updated_at,
+        getattr(org, 'id', None),
+        getattr(agent, 'id', None),
+        astuple(ctx),
+    )
+    with _step_renders_lock:
+        cached = _step_renders.get(key)
+        if cached is not None:
+            _step_renders.move_to_end(key)
+            return cached
+
+    rendered = render_shared(template.blocks or [], ctx)
+    with _step_renders_lock:
+        _step_renders[key] = rendered
+        while len(_step_renders) > STEP_RENDER_CACHE_SIZE:
+            _step_renders.popitem(last=False)
+    return rendered
+
+
+def render_for_send(
+    send: MarketingSend,
+    campaign: MarketingCampaign,
+    *,
+    org: Optional[Organization] = None,
+) -> tuple[str, str, str]:
     """Return subject, html, text with merge fields filled.
 
     Raises SendError if a required merge field is missing.
     """
     contact = send.contact or db.session.get(Contact, send.contact_id)
     template = send.template or db.session.get(MarketingTemplate, send.template_id)
-    org = db.session.get(Organization, send.organization_id)
+    if org is None:
+        org = db.session.get(Organization, send.organization_id)
     agent = None
     if send.user_id:
         agent = db.session.get(User, send.user_id)
@@ -53,16 +136,12 @@ def render_for_send(send: MarketingSend, campaign: MarketingCampaign) -> tuple[s
     if contact is None or template is None or org is None:
         raise SendError('Send is missing its contact, template, or organization.')
 
-    ctx = shell_for(
-        org,
-        agent,
-        unsubscribe_token=send.unsubscribe_token,
-        preheader=template.preheader,
-        eyebrow=(template.category or '').replace('_', ' ') or None,
-    )
-    rendered = render(template.blocks or [], ctx, validate=False)
+    rendered = step_render(template, org, agent)
     values = mf.resolve_values(contact, agent, org)
-    subject, html, text, missing = personalize(rendered, template.subject, values)
+    subject, html, text, missing = personalize(
+        rendered, template.subject, values,
+        unsubscribe_url=unsubscribe_url(send.unsubscribe_token),
+    )
     if missing:
         raise SendError(
             'missing_merge_field:' + ','.join(sorted(missing)),
@@ -71,67 +150,88 @@ def render_for_send(send: MarketingSend, campaign: MarketingCampaign) -> tuple[s
     return subject, html, text
 
 
-def _provider_send(
-    *,
-    to_email: str,
-    subject: str,
-    html: str,
-    text: str,
-    sender,
-    headers: dict[str, str],
-    custom_args: dict,
-) -> str:
-    """Talk to SendGrid. Returns the provider message id when present."""
+def _http_session() -> requests.Session:
+    """One pooled session per process, so TLS connections to SendGrid stay warm."""
+    global _http
+    with _http_lock:
+        if _http is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http = session
+        return _http
+
+
+def _address(email: str, name: Optional[str] = None) -> dict:
+    return {'email': email, 'name': name} if name else {'email': email}
+
+
+def _content(html: str, text: str) -> list[dict]:
+    # SendGrid wants text/plain ahead of text/html.
+    content = []
+    if text:
+        content.append({'type': 'text/plain', 'value': text})
+    content.append({'type': 'text/html', 'value': html})
+    return content
+
+
+def _custom_args(custom_args: dict) -> dict[str, str]:
+    return {str(k): str(v) for k, v in custom_args.items() if v is not None}
+
+
+def _sendgrid_post(payload: dict) -> str:
+    """POST one v3 mail/send body. Returns the X-Message-Id when present."""
     api_key = Config.SENDGRID_API_KEY
     if not api_key:
         raise SendError('SENDGRID_API_KEY is not configured.', retryable=False)
 
     try:
-        from sendgrid import SendGridAPIClient
-        from sendgrid.helpers.mail import (
-            CustomArg, Email, Header, Mail, To,
-        )
-    except ImportError as exc:
-        raise SendError('SendGrid library is not installed.', retryable=False) from exc
-
-    message = Mail(
-        from_email=Email(sender.from_email, sender.from_name),
-        to_emails=To(to_email),
-        subject=subject,
-        html_content=html,
-        plain_text_content=text,
-    )
-    if sender.reply_to:
-        message.reply_to = Email(sender.reply_to)
-    for name, value in headers.items():
-        message.add_header(Header(name, value))
-    for key, value in custom_args.items():
-        if value is None:
-            continue
-        message.add_custom_arg(CustomArg(str(key), str(value)))
-
-    try:
-        response = SendGridAPIClient(api_key).send(message)
-    except Exception as exc:
-        status = getattr(exc, 'status_code', None) or getattr(
-            getattr(exc, 'http_error', None), 'status_code', None,
+        response = _http_session().post(
+            f'{Config.SENDGRID_API_BASE}/v3/mail/send',
+            json=payload,
+            headers={'Authorization': f'Bearer {api_key}'},
+            timeout=SENDGRID_TIMEOUT,
         )
-        retryable = status in (429, 500, 502, 503, 504) or status is None
-        raise SendError(str(exc)[:400], retryable=retryable) from exc
+    except requests.RequestException as exc:
+        raise SendError(str(exc)[:400], retryable=True) from exc
 
     if response.status_code not in (200, 201, 202):
-        retryable = response.status_code in (429, 500, 502, 503, 504)
         raise SendError(
             f'SendGrid returned {response.status_code}',
-            retryable=retryable,
+            retryable=response.status_code in _RETRYABLE_STATUSES,
+            status=response.status_code,
         )
+    return response.headers.get('X-Message-Id') or ''
 
-    headers_out = getattr(response, 'headers', None) or {}
-    return (
-        headers_out.get('X-Message-Id')
-        or headers_out.get('X-Message-ID')
-        or ''
-    )
+
+def _provider_send(
+    *,
+    to_email: str,
+    subject: str,
+    html: str,
+    text: str,
+    sender,
+    headers: dict[str, str],
+    custom_args: dict,
+) -> str:
+    """Talk to SendGrid. Returns the provider message id when present."""
+    personalization = {'to': [_address(to_email)]}
+    if headers:
+        personalization['headers'] = dict(headers)
+    args = _custom_args(custom_args)
+    if args:
+        personalization['custom_args'] = args
+
+    payload = {
+        'from': _address(sender.from_email, sender.from_name),
+        'personalizations': [personalization],
+        'subject': subject,
+        'content': _content(html, text),
+    }
+    if sender.reply_to:
+        payload['reply_to'] = _address(sender.reply_to)
+    return _sendgrid_post(payload)
 
 
 def parse_test_recipients(raw: str) -> list[str]:
@@ -262,7 +362,7 @@ def deliver(send: MarketingSend, *, now: Optional[datetime] = None) -> Marketing
     send.status = 'sending'
 
     try:
-        subject, html, text = render_for_send(send, campaign)
+        subject, html, text = render_for_send(send, campaign, org=org)
     except SendError as exc:
         if str(exc).startswith('missing_merge_field'):
             send.status = 'skipped'
@@ -308,3 +408,402 @@ def deliver(send: MarketingSend, *, now: Optional[datetime] = None) -> Marketing
     campaign.queued_count = max((campaign.queued_count or 1) - 1, 0)
     campaign.sent_count = (campaign.sent_count or 0) + 1
     return send
+
+
+# ---------------------------------------------------------------------------
+# Batch delivery
+# ---------------------------------------------------------------------------
+
+# Substitution keys for the unsubscribe link. HTML and text get separate keys
+# because only the HTML copy is escaped.
+_UNSUB_HTML_KEY = '-afuh-'
+_UNSUB_TEXT_KEY = '-afut-'
+
+# Every column deliver_batch may change, written back in one executemany.
+_ROW_FIELDS = (
+    'status', 'skip_reason', 'error', 'attempt_count', 'last_attempt_at',
+    'scheduled_for', 'subject_rendered', 'sent_at', 'provider_message_id',
+)
+
+
+@dataclass
+class _WireTemplate:
+    """A step render with merge tokens swapped for SendGrid substitution keys."""
+
+    html: str
+    text: str
+    html_keys: dict[str, str]
+    text_keys: dict[str, str]
+
+
+@dataclass
+class _Prepared:
+    """One claimed row, with everything the POST needs copied off the ORM
+    object so nothing reloads it once the claim is committed."""
+
+    claim: dict
+    campaign_id: int
+    to_email: str
+    unsubscribe_token: str
+    subject: str
+    substitutions: dict[str, str]
+    headers: dict[str, str]
+    custom_args: dict[str, str]
+
+
+def _wire_template(rendered: RenderedEmail) -> _WireTemplate:
+    def tokenize(body: str, kind: str) -> tuple[str, dict[str, str]]:
+        keys: dict[str, str] = {}
+
+        def repl(match) -> str:
+            token = match.group(0)
+            if token not in keys:
+                keys[token] = f'-af{kind}{len(keys)}-'
+            return keys[token]
+
+        return mf.TOKEN_RE.sub(repl, body), keys
+
+    html, html_keys = tokenize(
+        rendered.html.replace(UNSUBSCRIBE_SLOT, _UNSUB_HTML_KEY), 'h',
+    )
+    text, text_keys = tokenize(
+        rendered.text.replace(UNSUBSCRIBE_SLOT, _UNSUB_TEXT_KEY), 't',
+    )
+    return _WireTemplate(html, text, html_keys, text_keys)
+
+
+def _substitutions(
+    wire: _WireTemplate, values: dict, unsub: str,
+) -> tuple[dict[str, str], set[str]]:
+    """One recipient's substitution values, filled exactly as ``personalize`` would."""
+    subs = {
+        _UNSUB_HTML_KEY: html_escape(unsub, quote=True),
+        _UNSUB_TEXT_KEY: unsub,
+    }
+    missing: set[str] = set()
+    for token, key in wire.html_keys.items():
+        subs[key], gaps = mf.substitute(token, values, escape=html_escape)
+        missing |= gaps
+    for token, key in wire.text_keys.items():
+        subs[key], gaps = mf.substitute(token, values)
+        missing |= gaps
+    return subs, missing
+
+
+def _row(send: MarketingSend, **changes) -> dict:
+    row = {field: getattr(send, field) for field in _ROW_FIELDS}
+    row.update(changes)
+    row['id'] = send.id
+    return row
+
+
+def _batch_payload(wire: _WireTemplate, sender, chunk: list[_Prepared]) -> dict:
+    personalizations = []
+    for item in chunk:
+        personalization = {
+            'to': [_address(item.to_email)],
+            'subject': item.subject,
+            'substitutions': item.substitutions,
+            'custom_args': item.custom_args,
+        }
+        if item.headers:
+            personalization['headers'] = item.headers
+        personalizations.append(personalization)
+
+    payload = {
+        'from': _address(sender.from_email, sender.from_name),
+        'personalizations': personalizations,
+        'content': _content(wire.html, wire.text),
+    }
+    if sender.reply_to:
+        payload['reply_to'] = _address(sender.reply_to)
+    return payload
+
+
+def _recipient_message_id(message_id: Optional[str], send_id: int) -> Optional[str]:
+    # X-Message-Id is per request, so a batch shares it. The row id keeps the
+    # stored value unique per recipient; webhook events match rows on the
+    # ``send_id`` custom arg (see attribution.apply_event).
+    return f'{message_id}:{send_id}' if message_id else None
+
+
+def deliver_batch(
+    sends: Iterable[MarketingSend],
+    *,
+    now: Optional[datetime] = None,
+    checkpoint: Optional[Callable[[], None]] = None,
+) -> dict[str, int]:
+    """Attempt many queued rows with as few SendGrid requests as possible.
+
+    Rows that share a campaign, template, and sender go out as one request per
+    ``MAX_PERSONALIZATIONS``: one shared body with substitution keys where the
+    merge tokens were, and each recipient's subject, values, unsubscribe
+    headers, and ``send_id`` custom arg in its personalization. A chunk
+    SendGrid rejects as malformed is bisected, so only the rows it refuses
+    fail. Row outcomes match ``deliver`` and are written back in bulk UPDATEs.
+
+    Before any request, rows about to be posted are written as ``sending``
+    and ``checkpoint`` is called; the worker commits there, so a crash after
+    SendGrid accepts a batch cannot send it again (see
+    :func:`fail_interrupted_sends`). Otherwise the caller owns the
+    surrounding transaction.
+
+    Returns how many rows ended in each status.
+    """
+    now = now or datetime.utcnow()
+    sends = list(sends)
+    outcomes: Counter = Counter()
+    if not sends:
+        return outcomes
+
+    # Load everything the loop touches up front; holding the rows in these
+    # maps also keeps them alive in the session's weak identity map.
+    contacts = {
+        c.id: c for c in Contact.query.filter(
+            Contact.id.in_({s.contact_id for s in sends if s.contact_id})
+        )
+    }
+    campaigns = {
+        c.id: c for c in MarketingCampaign.query.filter(
+            MarketingCampaign.id.in_({s.campaign_id for s in sends})
+        )
+    }
+    templates = {
+        t.id: t for t in MarketingTemplate.query.filter(
+            MarketingTemplate.id.in_({s.template_id for s in sends if s.template_id})
+        )
+    }
+    user_ids = {s.user_id for s in sends if s.user_id}
+    user_ids |= {c.user_id for c in campaigns.values() if c.user_id}
+    users = {u.id: u for u in User.query.filter(User.id.in_(user_ids))}
+    orgs = {
+        o.id: o for o in Organization.query.filter(
+            Organization.id.in_({s.organization_id for s in sends})
+        )
+    }
+
+    rows: list[dict] = []
+    sent_delta: Counter = Counter()
+    failed_delta: Counter = Counter()
+    skipped_delta: Counter = Counter()
+    wires: dict[tuple, _WireTemplate] = {}
+    groups: dict[tuple, list[_Prepared]] = {}
+    senders: dict[tuple, object] = {}
+    singles: list[tuple[_Prepared, object, RenderedEmail, dict, str]] = []
+
+    for send in sends:
+        campaign = campaigns.get(send.campaign_id)
+        if campaign is None:
+            rows.append(_row(send, status='failed', error='missing_campaign'))
+            outcomes['failed'] += 1
+            continue
+        if campaign.status in ('paused', 'cancelled'):
+            if campaign.status == 'cancelled':
+                rows.append(_row(send, status='skipped', skip_reason='campaign_cancelled'))
+                outcomes['skipped'] += 1
+            else:
+                outcomes['queued'] += 1
+            continue
+
+        attempt = (send.attempt_count or 0) + 1
+        org = orgs.get(send.organization_id)
+        contact = contacts.get(send.contact_id)
+        template = templates.get(send.template_id)
+        agent = users.get(send.user_id) or users.get(campaign.user_id)
+        if contact is None or template is None or org is None:
+            rows.append(_row(
+                send, status='failed', attempt_count=attempt, last_attempt_at=now,
+                error='Send is missing its contact, template, or organization.',
+            ))
+            failed_delta[campaign.id] += 1
+            outcomes['failed'] += 1
+            continue
+
+        rendered = step_render(template, org, agent)
+        wire_key = (template.id, template.version, org.id, getattr(agent, 'id', None))
+        wire = wires.get(wire_key)
+        if wire is None:
+            wire = wires[wire_key] = _wire_template(rendered)
+
+        values = mf.resolve_values(contact, agent, org)
+        unsub = unsubscribe_url(send.unsubscribe_token)
+        subject, missing = mf.substitute(template.subject, values)
+        substitutions, body_missing = _substitutions(wire, values, unsub)
+        missing |= body_missing
+        if missing:
+            rows.append(_row(
+                send, status='skipped', skip_reason='missing_merge_field',
+                attempt_count=attempt, last_attempt_at=now,
+                error=('missing_merge_field:' + ','.join(sorted(missing)))[:500],
+            ))
+            skipped_delta[campaign.id] += 1
+            outcomes['skipped'] += 1
+            continue
+
+        sender = sending_config.sender_for(
+            users.get(send.user_id) if send.user_id else None,
+            org,
+            reply_to=campaign.reply_to,
+        )
+        item = _Prepared(
+            claim=_row(
+                send, status='sending', attempt_count=attempt,
+                last_attempt_at=now, subject_rendered=subject[:300],
+            ),
+            campaign_id=campaign.id,
+            to_email=send.to_email,
+            unsubscribe_token=send.unsubscribe_token,
+            subject=subject,
+            substitutions=substitutions,
+            headers=supp.unsubscribe_headers(
+                unsub, mailto=Config.MARKETING_UNSUBSCRIBE_MAILTO,
+            ),
+            custom_args=_custom_args({
+                'send_id': send.id,
+                'campaign_id': campaign.id,
+                'step_id': send.step_id,
+                'organization_id': send.organization_id,
+                'kind': 'marketing',
+            }),
+        )
+        rows.append(item.claim)
+        if len(json.dumps(substitutions).encode()) > _SUBSTITUTIONS_MAX_BYTES:
+            # Over SendGrid's cap the whole request would be rejected, so this
+            # recipient gets a fully substituted message of its own.
+            singles.append((item, sender, rendered, values, template.subject))
+            continue
+        group_key = (
+            campaign.id, wire_key,
+            sender.from_email, sender.from_name, sender.reply_to,
+        )
+        senders[group_key] = sender
+        groups.setdefault(group_key, []).append(item)
+
+    def write_rows():
+        if rows:
+            db.session.execute(update(MarketingSend), rows)
+            rows.clear()
+        for campaign in campaigns.values():
+            done = (
+                sent_delta[campaign.id] + failed_delta[campaign.id]
+                + skipped_delta[campaign.id]
+            )
+            if not done:
+                continue
+            campaign.queued_count = max((campaign.queued_count or 0) - done, 0)
+            campaign.sent_count = (campaign.sent_count or 0) + sent_delta[campaign.id]
+            campaign.failed_count = (campaign.failed_count or 0) + failed_delta[campaign.id]
+            campaign.skipped_count = (
+                (campaign.skipped_count or 0) + skipped_delta[campaign.id]
+            )
+        sent_delta.clear()
+        failed_delta.clear()
+        skipped_delta.clear()
+
+    # Claim before the wire: rows settled above and every row about to be
+    # posted are written now, and the caller's checkpoint commits them.
+    write_rows()
+    if checkpoint is not None and (groups or singles):
+        checkpoint()
+
+    def record(item: _Prepared, message_id: Optional[str], exc: Optional[SendError]):
+        if exc is None:
+            rows.append(dict(
+                item.claim, status='sent', sent_at=now, error=None,
+                provider_message_id=_recipient_message_id(message_id, item.claim['id']),
+            ))
+            sent_delta[item.campaign_id] += 1
+            outcomes['sent'] += 1
+        elif exc.retryable and item.claim['attempt_count'] < MarketingSend.MAX_ATTEMPTS:
+            rows.append(dict(
+                item.claim, status='queued', scheduled_for=now, error=str(exc)[:500],
+            ))
+            outcomes['queued'] += 1
+        else:
+            rows.append(dict(item.claim, status='failed', error=str(exc)[:500]))
+            failed_delta[item.campaign_id] += 1
+            outcomes['failed'] += 1
+
+    def post_chunk(wire: _WireTemplate, sender, chunk: list[_Prepared]) -> None:
+        try:
+            message_id = _sendgrid_post(_batch_payload(wire, sender, chunk))
+        except SendError as exc:
+            if exc.status in _BISECT_STATUSES and len(chunk) > 1:
+                middle = len(chunk) // 2
+                post_chunk(wire, sender, chunk[:middle])
+                post_chunk(wire, sender, chunk[middle:])
+                return
+            logger.warning(
+                'Marketing batch of %s failed for campaign %s: %s',
+                len(chunk), chunk[0].campaign_id, exc,
+            )
+            for item in chunk:
+                record(item, None, exc)
+            return
+        for item in chunk:
+            record(item, message_id, None)
+
+    for group_key, items in groups.items():
+        wire = wires[group_key[1]]
+        for start in range(0, len(items), MAX_PERSONALIZATIONS):
+            post_chunk(wire, senders[group_key], items[start:start + MAX_PERSONALIZATIONS])
+
+    for item, sender, rendered, values, template_subject in singles:
+        subject, html, text, _missing = personalize(
+            rendered, template_subject, values,
+            unsubscribe_url=unsubscribe_url(item.unsubscribe_token),
+        )
+        try:
+            message_id = _provider_send(
+                to_email=item.to_email,
+                subject=subject,
+                html=html,
+                text=text,
+                sender=sender,
+                headers=item.headers,
+                custom_args=item.custom_args,
+            )
+        except SendError as exc:
+            record(item, None, exc)
+            continue
+        record(item, message_id, None)
+
+    write_rows()
+    for send in sends:
+        db.session.expire(send)
+    return outcomes
+
+
+def fail_interrupted_sends(org_id: int, *, now: Optional[datetime] = None) -> dict[int, int]:
+    """Fail batch rows a dead worker left in ``sending``.
+
+    Rows still ``sending`` ``INTERRUPTED_SEND_AFTER`` after their attempt may
+    or may not have reached SendGrid, so they are failed rather than resent.
+    Caller owns the transaction. Returns failed row counts by campaign id.
+    """
+    now = now or datetime.utcnow()
+    stale = MarketingSend.query.with_entities(
+        MarketingSend.id, MarketingSend.campaign_id,
+    ).filter(
+        MarketingSend.organization_id == org_id,
+        MarketingSend.status == 'sending',
+        MarketingSend.last_attempt_at < now - INTERRUPTED_SEND_AFTER,
+    ).all()
+    if not stale:
+        return {}
+
+    db.session.execute(update(MarketingSend), [
+        {'id': row.id, 'status': 'failed', 'error': 'send_interrupted'}
+        for row in stale
+    ])
+    by_campaign = Counter(row.campaign_id for row in stale)
+    for campaign in MarketingCampaign.query.filter(
+        MarketingCampaign.id.in_(by_campaign),
+    ):
+        count = by_campaign[campaign.id]
+        campaign.queued_count = max((campaign.queued_count or 0) - count, 0)
+        campaign.failed_count = (campaign.failed_count or 0) + count
+    logger.warning(
+        'Failed %d interrupted marketing sends for org %s', len(stale), org_id,
+    )
+    return dict(by_campaign)
@@ -27,8 +27,9 @@ from services.ai_service import run_tool_conversation
 from services.bob_tools import (
     BobContext,
     confirm_action,
-    openai_tool_schemas,
+    parallel_safe as bob_parallel_safe,
     reject_action,
+    tool_bundle,
     undo_action,
 )
 from services.bob_tools.notifications import ActionCollector
@@ -551,13 +552,17 @@ def _run_tool_loop(
 
         return result.for_model(), result.for_client()
 
+    bundle = tool_bundle(ctx)
     try:
         for event, payload in run_tool_conversation(
             system_prompt=system,
             messages=messages,
-            tools=openai_tool_schemas(ctx),
+            tools=bundle.schemas,
             execute_tool=execute_tool,
             safety_identifier=f'org:{ctx.organization_id}:user:{ctx.user_id}',
+            parallel_safe=bob_parallel_safe,
+            prompt_cache_key=bundle.cache_key,
+            org_id=ctx.organization_id,
         ):
             if event == 'text':
                 text_parts.append(payload)
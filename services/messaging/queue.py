@@ -1,12 +1,13 @@
 """Enqueue Telegram turns onto the RQ ``bob_telegram`` queue.
 
-Falls back to an in-process background thread when Redis is unavailable
-(local SQLite dev), matching the document-extraction pattern.
+Falls back to the local job pool when Redis is unavailable (local SQLite
+dev), matching the document-extraction pattern. Telegram redelivers an
+update whose webhook call failed, so turns are keyed on the Telegram
+message or callback id and a redelivery collapses into the pending job.
 """
 from __future__ import annotations
 
 import logging
-import threading
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -29,6 +30,10 @@ def enqueue_telegram_message(
 ) -> None:
     _enqueue(
         'jobs.bob_telegram_reply.process_telegram_message_job',
+        idempotency_key=(
+            f'message:{channel_id}:{telegram_message_id}'
+            if telegram_message_id else None
+        ),
         org_id=org_id,
         channel_id=channel_id,
         text=text,
@@ -47,6 +52,7 @@ def enqueue_telegram_callback(*, org_id: int, channel_id: int,
                               message_id: str | None = None) -> None:
     _enqueue(
         'jobs.bob_telegram_reply.process_telegram_callback_job',
+        idempotency_key=f'callback:{callback_query_id}',
         org_id=org_id,
         channel_id=channel_id,
         callback_query_id=callback_query_id,
@@ -55,39 +61,23 @@ def enqueue_telegram_callback(*, org_id: int, channel_id: int,
     )
 
 
-def _enqueue(job_path: str, **kwargs: Any) -> None:
-    try:
-        from redis import Redis
-        from rq import Queue
-        from config import Config
+def _enqueue(job_path: str, *, idempotency_key: str | None, **kwargs: Any) -> None:
+    from jobs import dispatch
 
-        conn = Redis.from_url(
-            Config.REDIS_URL,
-            socket_connect_timeout=2,
-            socket_timeout=2,
-        )
-        conn.ping()
-        Queue(QUEUE_NAME, connection=conn).enqueue(
-            job_path,
-            **kwargs,
-            job_timeout=300,
-        )
+    if dispatch.enqueue(
+        QUEUE_NAME,
+        job_path,
+        idempotency_key=idempotency_key,
+        job_timeout=300,
+        **kwargs,
+    ):
         return
-    except Exception as exc:
-        logger.warning(
-            'RQ unavailable for %s (%s); running in a background thread',
-            job_path, exc,
-        )
-
-    def _run():
-        try:
-            if job_path.endswith('process_telegram_message_job'):
-                from jobs.bob_telegram_reply import process_telegram_message_job
-                process_telegram_message_job(**kwargs)
-            else:
-                from jobs.bob_telegram_reply import process_telegram_callback_job
-                process_telegram_callback_job(**kwargs)
-        except Exception:
-            logger.exception('Inline Telegram job failed: %s', job_path)
-
-    threading.Thread(target=_run, daemon=True).start()
+    logger.warning(
+        'RQ unavailable for %s; running on the local job pool', job_path,
+    )
+    dispatch.submit_local(
+        QUEUE_NAME,
+        job_path,
+        idempotency_key=idempotency_key,
+        **kwargs,
+    )
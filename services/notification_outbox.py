@@ -9,7 +9,9 @@ from __future__ import annotations
 from datetime import datetime, time, timedelta
 from typing import List, Optional
 
+from sqlalchemy import func, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager
 
 from models import (
     NotificationDelivery,
@@ -312,16 +314,41 @@ class NotificationOutboxService:
         return delivery
 
     @staticmethod
-    def list_pending_deliveries(
-        delivery_method: Optional[str] = None,
-    ) -> List[NotificationDelivery]:
-        """
-        List pending deliveries ready to send.
+    def mark_delivered_bulk(delivery_ids, *, now: Optional[datetime] = None) -> int:
+        """Mark many deliveries sent in one UPDATE, then roll up their events.
 
-        Skips deliveries whose parent event is cancelled, snoozed, or
-        ``not_before`` is still in the future.
+        Same outcome as calling ``mark_delivered`` per row: an event flips to
+        ``delivered`` once every one of its deliveries is ``sent``.
         """
-        now = datetime.utcnow()
+        delivery_ids = list(delivery_ids)
+        if not delivery_ids:
+            return 0
+        now = now or datetime.utcnow()
+        updated = (
+            NotificationDelivery.query
+            .filter(NotificationDelivery.id.in_(delivery_ids))
+            .update(
+                {'status': 'sent', 'delivered_at': now},
+                synchronize_session=False,
+            )
+        )
+        event_ids = select(NotificationDelivery.event_id).where(
+            NotificationDelivery.id.in_(delivery_ids)
+        )
+        unsent = select(NotificationDelivery.id).where(
+            NotificationDelivery.event_id == NotificationEvent.id,
+            NotificationDelivery.status != 'sent',
+        )
+        (
+            NotificationEvent.query
+            .filter(NotificationEvent.id.in_(event_ids))
+            .filter(~unsent.exists())
+            .update({'status': 'delivered'}, synchronize_session=False)
+        )
+        return updated
+
+    @staticmethod
+    def _pending_query(now: datetime, delivery_method: Optional[str] = None):
         query = (
             NotificationDelivery.query
             .join(NotificationEvent, NotificationDelivery.event_id == NotificationEvent.id)
@@ -343,5 +370,61 @@ class NotificationOutboxService:
 
         if delivery_method:
             query = query.filter(NotificationDelivery.delivery_method == delivery_method)
+        return query
+
+    @staticmethod
+    def list_pending_deliveries(
+        delivery_method: Optional[str] = None,
+    ) -> List[NotificationDelivery]:
+        """
+        List pending deliveries ready to send.
 
+        Skips deliveries whose parent event is cancelled, snoozed, or
+        ``not_before`` is still in the future.
+        """
+        query = NotificationOutboxService._pending_query(
+            datetime.utcnow(), delivery_method,
+        )
         return query.order_by(NotificationDelivery.created_at.asc()).all()
+
+    @staticmethod
+    def claim_pending_deliveries(
+        organization_id: Optional[int] = None,
+        *,
+        limit: int = 50,
+        delivery_method: Optional[str] = None,
+        now: Optional[datetime] = None,
+        delivery_ids: Optional[List[int]] = None,
+    ) -> List[NotificationDelivery]:
+        """
+        Lock a batch of ready deliveries for this worker, oldest due first.
+
+        ``FOR UPDATE SKIP LOCKED`` lets several worker processes drain the
+        outbox at once: each claims rows no other open transaction holds, and
+        the locks last until the caller commits. SQLite ignores the clause,
+        which is fine for a single local worker. The parent event is loaded
+        from the same join, so reading ``delivery.event`` costs no query.
+
+        ``delivery_ids`` re-claims rows this worker held before a mid-batch
+        commit; any that another worker has since taken are left out.
+        """
+        now = now or datetime.utcnow()
+        query = NotificationOutboxService._pending_query(now, delivery_method)
+        if organization_id is not None:
+            query = query.filter(NotificationDelivery.organization_id == organization_id)
+        if delivery_ids is not None:
+            query = query.filter(NotificationDelivery.id.in_(delivery_ids))
+        return (
+            query
+            .options(contains_eager(NotificationDelivery.event))
+            .order_by(
+                func.coalesce(
+                    NotificationDelivery.scheduled_for,
+                    NotificationDelivery.created_at,
+                ).asc(),
+                NotificationDelivery.id.asc(),
+            )
+            .limit(limit)
+            .with_for_update(skip_locked=True, of=NotificationDelivery)
+            .all()
+        )
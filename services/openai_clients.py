@@ -0,0 +1,219 @@
+"""
+Process-wide OpenAI clients over one pooled, keep-alive HTTP transport.
+
+Every AI helper used to build ``openai.OpenAI(api_key=key)`` per call, which
+threw away the TLS session and connection pool each time: streamed chat paid
+a fresh handshake before the first token and extraction workers paid one per
+page batch. :func:`get_client` hands out one client per (API key, timeout
+class), all sharing a single HTTP client whose idle connections are kept
+warm for ``KEEPALIVE_SECONDS``.
+
+Timeout classes:
+
+- ``INTERACTIVE``: chat, tool turns, transcription and small classifiers.
+  Someone is waiting, so a stuck connect fails fast.
+- ``BACKGROUND``: document extraction and vision work on the RQ worker,
+  which may legitimately take minutes.
+
+The transport times every request per model: connect (when a new
+connection had to be opened), time to response headers and total time to
+the end of the body. :func:`client_stats` reports them per process (see
+/health).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+
+import httpx2
+import openai
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+TIMEOUTS = {
+    INTERACTIVE: httpx2.Timeout(120.0, connect=5.0),
+    BACKGROUND: httpx2.Timeout(600.0, connect=10.0),
+}
+
+KEEPALIVE_SECONDS = 90
+POOL_LIMITS = httpx2.Limits(
+    max_connections=64,
+    max_keepalive_connections=16,
+    keepalive_expiry=KEEPALIVE_SECONDS,
+)
+
+_MODEL_RE = re.compile(rb'"model"\s*:\s*"([^"]{1,100})"')
+
+_lock = threading.Lock()
+_pid: int | None = None
+_http_client = None
+_clients: dict[tuple[str, str], openai.OpenAI] = {}
+_stats: dict[str, dict[str, float]] = {}
+
+
+def _request_model(request) -> str:
+    try:
+        match = _MODEL_RE.search(request.content[:4096])
+    except Exception:
+        match = None
+    if match:
+        return match.group(1).decode('utf-8', 'replace')
+    return request.url.path.rsplit('/', 1)[-1] or 'unknown'
+
+
+def _record(model: str, *, connect: float | None, ttfb: float | None,
+            total: float, ok: bool) -> None:
+    with _lock:
+        stats = _stats.setdefault(model, {
+            'requests': 0, 'errors': 0, 'new_connections': 0,
+            'connect_ms': 0.0, 'ttfb_ms': 0.0, 'total_ms': 0.0,
+        })
+        stats['requests'] += 1
+        if not ok:
+            stats['errors'] += 1
+        if connect is not None:
+            stats['new_connections'] += 1
+            stats['connect_ms'] += connect * 1000
+        if ttfb is not None:
+            stats['ttfb_ms'] += ttfb * 1000
+        stats['total_ms'] += total * 1000
+    logger.debug(
+        'openai %s connect=%s ttfb=%s total=%.3fs ok=%s',
+        model,
+        f'{connect:.3f}s' if connect is not None else '-',
+        f'{ttfb:.3f}s' if ttfb is not None else '-',
+        total, ok,
+    )
+
+
+class _RequestTimer:
+    """httpcore trace hook plus the clock for one request."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.started = time.perf_counter()
+        self.connect_started: float | None = None
+        self.connect: float | None = None
+        self.ttfb: float | None = None
+        self.done = False
+
+    def trace(self, event_name: str, info: dict) -> None:
+        if event_name == 'connection.connect_tcp.started':
+            self.connect_started = time.perf_counter()
+        elif event_name == 'connection.start_tls.complete' and self.connect_started:
+            self.connect = time.perf_counter() - self.connect_started
+
+    def finish(self, ok: bool) -> None:
+        if self.done:
+            return
+        self.done = True
+        _record(
+            self.model,
+            connect=self.connect,
+            ttfb=self.ttfb,
+            total=time.perf_counter() - self.started,
+            ok=ok,
+        )
+
+
+class _TimedStream(httpx2.SyncByteStream):
+    def __init__(self, stream, timer: _RequestTimer, ok: bool):
+        self._stream = stream
+        self._timer = timer
+        self._ok = ok
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            self._timer.finish(self._ok)
+
+
+class _MeteredTransport(httpx2.HTTPTransport):
+    def handle_request(self, request):
+        timer = _RequestTimer(_request_model(request))
+        request.extensions['trace'] = timer.trace
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            timer.finish(ok=False)
+            raise
+        timer.ttfb = time.perf_counter() - timer.started
+        return httpx2.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_TimedStream(response.stream, timer, ok=response.status_code < 400),
+            extensions=response.extensions,
+        )
+
+
+def _shared_http_client():
+    global _pid, _http_client
+    # Pooled sockets must not cross a fork (RQ work horses, worker pools).
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        _http_client = None
+        _clients.clear()
+    if _http_client is None:
+        _http_client = openai.DefaultHttpxClient(
+            transport=_MeteredTransport(limits=POOL_LIMITS),
+        )
+    return _http_client
+
+
+def get_client(api_key: str | None = None, *, timeout_class: str = INTERACTIVE) -> openai.OpenAI:
+    """Shared client for ``api_key`` (default ``Config.OPENAI_API_KEY``)."""
+    key = api_key or Config.OPENAI_API_KEY
+    if timeout_class not in TIMEOUTS:
+        raise ValueError(f'Unknown OpenAI timeout class: {timeout_class}')
+    with _lock:
+        http_client = _shared_http_client()
+        client = _clients.get((key, timeout_class))
+        if client is None:
+            client = openai.OpenAI(
+                api_key=key,
+                http_client=http_client,
+                timeout=TIMEOUTS[timeout_class],
+            )
+            _clients[(key, timeout_class)] = client
+        return client
+
+
+def client_stats() -> dict:
+    """Per-model request counts and average latencies for this process."""
+    with _lock:
+        snapshot = {}
+        for model, stats in _stats.items():
+            requests = stats['requests'] or 1
+            connections = stats['new_connections'] or 1
+            snapshot[model] = {
+                'requests': int(stats['requests']),
+                'errors': int(stats['errors']),
+                'new_connections': int(stats['new_connections']),
+                'avg_connect_ms': round(stats['connect_ms'] / connections, 1),
+                'avg_ttfb_ms': round(stats['ttfb_ms'] / requests, 1),
+                'avg_total_ms': round(stats['total_ms'] / requests, 1),
+            }
+        return snapshot
+
+
+def reset_clients() -> None:
+    """Drop cached clients and counters (tests)."""
+    global _http_client
+    with _lock:
+        _clients.clear()
+        _stats.clear()
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
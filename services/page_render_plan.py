@@ -0,0 +1,167 @@
+"""
+Decide which PDF pages the vision model sees, and at what resolution.
+
+Every page used to go out as a 150 DPI colour PNG at ``detail: high``. Most
+uploads are vector TAR/TREC forms with a full text layer, and the text is
+already sent alongside the images, so the image only has to carry checkbox
+marks, signatures and layout. Per page:
+
+- Pages with a text layer render as grayscale PNG at 110 DPI.
+- Scanned pages (little or no text) render as grayscale JPEG at 150 DPI.
+- Pages whose own footer or title fingerprints them as a different known
+  form than the schema being extracted (an IABS page inside a listing
+  agreement extraction, say) are context only. With a text layer they are
+  left to the text; without one they go out small at ``detail: low`` so
+  the model can still place them in ``detected_documents``.
+
+The rendered payload is capped at a byte budget: later and context pages are
+downgraded first, then left out. Left-out pages still reach the model
+through the text layer.
+"""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from services.pdf_pages import PdfPageSet
+
+# Selectable characters above which a page counts as having a text layer.
+TEXT_LAYER_MIN_CHARS = 200
+
+DEFAULT_IMAGE_BUDGET_BYTES = 15 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    dpi: int
+    fmt: str
+    detail: str
+    quality: Optional[int] = None
+
+    @property
+    def mime(self) -> str:
+        return 'image/jpeg' if self.fmt == 'jpeg' else 'image/png'
+
+
+TEXT_PAGE = RenderProfile(dpi=110, fmt='png', detail='high')
+SCANNED_PAGE = RenderProfile(dpi=150, fmt='jpeg', detail='high', quality=80)
+CONTEXT_PAGE = RenderProfile(dpi=72, fmt='jpeg', detail='low', quality=60)
+
+
+@dataclass
+class PagePlan:
+    index: int
+    profile: RenderProfile
+    context: bool = False
+
+
+@dataclass
+class RenderPlan:
+    """Pages to render (0-based, in page order) and what was left out."""
+
+    page_count: int
+    pages: list[PagePlan] = field(default_factory=list)
+    text_only: list[int] = field(default_factory=list)
+    omitted: list[int] = field(default_factory=list)
+    image_bytes: int = 0
+
+    @property
+    def pages_sent(self) -> int:
+        return len(self.pages)
+
+
+def _schema_page_types(schema_slug: Optional[str]) -> frozenset[str]:
+    """Known per-page form types that belong to ``schema_slug``."""
+    from services.listing_packet import LISTING_PACKET_FILING, UNKNOWN_TYPE
+
+    return frozenset(
+        page_type
+        for page_type, (slug, _name) in LISTING_PACKET_FILING.items()
+        if slug == schema_slug and page_type != UNKNOWN_TYPE
+    )
+
+
+def plan_page_renders(
+    pages: PdfPageSet,
+    *,
+    schema_slug: Optional[str] = None,
+    page_indices: Optional[Iterable[int]] = None,
+) -> RenderPlan:
+    """Pick a render profile for each page (all, or 0-based ``page_indices``)."""
+    from services.listing_packet import classify_page_text
+
+    plan = RenderPlan(page_count=pages.page_count)
+    targets = _schema_page_types(schema_slug)
+    indices = range(plan.page_count) if page_indices is None else page_indices
+    for index in indices:
+        text = pages.page_text(index)
+        has_text = len(''.join(text.split())) >= TEXT_LAYER_MIN_CHARS
+        page_type = classify_page_text(text) if targets else None
+        if page_type and page_type not in targets:
+            if has_text:
+                plan.text_only.append(index)
+            else:
+                plan.pages.append(PagePlan(index, CONTEXT_PAGE, context=True))
+            continue
+        plan.pages.append(PagePlan(index, TEXT_PAGE if has_text else SCANNED_PAGE))
+    return plan
+
+
+def _render(pages: PdfPageSet, page: PagePlan) -> bytes:
+    profile = page.profile
+    return pages.render_page(
+        page.index,
+        dpi=profile.dpi,
+        fmt=profile.fmt,
+        grayscale=True,
+        quality=profile.quality,
+    )
+
+
+def render_planned_pages(
+    pages: PdfPageSet,
+    plan: RenderPlan,
+    *,
+    budget_bytes: int = DEFAULT_IMAGE_BUDGET_BYTES,
+) -> list[dict]:
+    """Render ``plan`` within ``budget_bytes``.
+
+    Returns one ``{'data', 'mime', 'detail', 'page'}`` item per page sent
+    (base64 data, 1-based page). ``plan`` is updated with what was omitted
+    and the bytes sent.
+    """
+    rendered = {page.index: _render(pages, page) for page in plan.pages}
+    total = sum(len(data) for data in rendered.values())
+
+    # Context pages first, then later pages before earlier ones.
+    by_priority = sorted(plan.pages, key=lambda page: (not page.context, -page.index))
+    for page in by_priority:
+        if total <= budget_bytes:
+            break
+        if page.profile == CONTEXT_PAGE:
+            continue
+        smaller = _render(pages, PagePlan(page.index, CONTEXT_PAGE))
+        if len(smaller) < len(rendered[page.index]):
+            total -= len(rendered[page.index]) - len(smaller)
+            rendered[page.index] = smaller
+            page.profile = CONTEXT_PAGE
+    for page in by_priority:
+        if total <= budget_bytes:
+            break
+        total -= len(rendered.pop(page.index))
+        plan.omitted.append(page.index)
+
+    plan.omitted.sort()
+    plan.pages = [page for page in plan.pages if page.index in rendered]
+    plan.image_bytes = total
+    return [
+        {
+            'data': base64.b64encode(rendered[page.index]).decode('ascii'),
+            'mime': page.profile.mime,
+            'detail': page.profile.detail,
+            'page': page.index + 1,
+        }
+        for page in plan.pages
+    ]
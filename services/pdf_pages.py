@@ -0,0 +1,151 @@
+"""
+One PDF upload, opened once and read page by page on demand.
+
+Identity classification, AI extraction, listing-packet classification and
+splitting all read the same upload. Each used to open it with PyMuPDF and
+walk every page again. A ``PdfPageSet`` holds one open document for the
+length of a job and remembers per-page text, so those passes share a single
+parse. Rendered page images are large and needed once, so they are produced
+lazily and never kept.
+
+Helpers that take PDF bytes also accept a ``PdfPageSet``; wrap them with
+:func:`pdf_pages` so a caller's set is reused and bare bytes get a
+short-lived one.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, Union
+
+import fitz  # PyMuPDF
+
+
+class PdfPageSet:
+    """Lazily opened PDF with cached page count, per-page text and hashes."""
+
+    def __init__(self, data: Optional[bytes]):
+        self.data = data or b''
+        self._doc = None
+        self._texts: dict[int, str] = {}
+        self._fingerprints: dict[int, str] = {}
+        self._sha256: Optional[str] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.data)
+
+    def __enter__(self) -> 'PdfPageSet':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _document(self):
+        if self._doc is None:
+            self._doc = fitz.open(stream=self.data, filetype='pdf')
+        return self._doc
+
+    @property
+    def page_count(self) -> int:
+        if not self.data:
+            return 0
+        return self._document().page_count
+
+    @property
+    def sha256(self) -> Optional[str]:
+        """Content fingerprint of the whole file, or None when empty."""
+        if self._sha256 is None and self.data:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    def page_text(self, index: int) -> str:
+        """Selectable text of 0-based page ``index``."""
+        if index not in self._texts:
+            self._texts[index] = self._document()[index].get_text('text') or ''
+        return self._texts[index]
+
+    def page_texts(self, max_pages: Optional[int] = None) -> list[str]:
+        """Text of the first ``max_pages`` pages (all pages by default)."""
+        count = self.page_count
+        if max_pages is not None:
+            count = min(count, max_pages)
+        return [self.page_text(index) for index in range(count)]
+
+    def page_fingerprint(self, index: int) -> str:
+        """Content hash of 0-based page ``index``, stable across packets.
+
+        Hashes the text layer plus a small grayscale render, so filled form
+        fields and scanned pages are covered, while the same page re-saved
+        inside a different packet still hashes the same.
+        """
+        if index not in self._fingerprints:
+            page = self._document()[index]
+            digest = hashlib.sha256(self.page_text(index).encode('utf-8'))
+            digest.update(page.get_pixmap(dpi=36, colorspace=fitz.csGRAY).samples)
+            self._fingerprints[index] = digest.hexdigest()
+        return self._fingerprints[index]
+
+    def page_fingerprints(self) -> list[str]:
+        return [self.page_fingerprint(index) for index in range(self.page_count)]
+
+    def render_page(
+        self,
+        index: int,
+        *,
+        dpi: int = 150,
+        fmt: str = 'png',
+        grayscale: bool = False,
+        quality: Optional[int] = None,
+    ) -> bytes:
+        """Render 0-based page ``index``; ``quality`` applies to JPEG."""
+        colorspace = fitz.csGRAY if grayscale else fitz.csRGB
+        pix = self._document()[index].get_pixmap(dpi=dpi, colorspace=colorspace)
+        if fmt == 'jpeg' and quality is not None:
+            return pix.tobytes('jpeg', jpg_quality=quality)
+        return pix.tobytes(fmt)
+
+    def iter_rendered_pages(
+        self,
+        dpi: int = 150,
+        fmt: str = 'png',
+        indices: Optional[Iterable[int]] = None,
+    ) -> Iterator[bytes]:
+        """Yield pages (all, or 0-based ``indices``) rendered at ``dpi``.
+
+        Images are not cached.
+        """
+        if not self.data:
+            return
+        doc = self._document()
+        for index in (range(doc.page_count) if indices is None else indices):
+            yield doc[index].get_pixmap(dpi=dpi).tobytes(fmt)
+
+    def close(self) -> None:
+        """Release the PyMuPDF document; cached text stays available."""
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+
+PdfSource = Union[bytes, PdfPageSet, None]
+
+
+@contextmanager
+def pdf_pages(source: PdfSource) -> Iterator[PdfPageSet]:
+    """Yield ``source`` as a page set, closing it only if opened here."""
+    if isinstance(source, PdfPageSet):
+        yield source
+        return
+    pages = PdfPageSet(source)
+    try:
+        yield pages
+    finally:
+        pages.close()
+
+
+def pdf_bytes(source: PdfSource) -> bytes:
+    """The raw bytes behind ``source``."""
+    if isinstance(source, PdfPageSet):
+        return source.data
+    return source or b''
@@ -15,6 +15,8 @@ from typing import Iterable, List, Optional
 
 import fitz  # PyMuPDF
 
+from services.pdf_pages import PdfSource, pdf_pages
+
 logger = logging.getLogger(__name__)
 
 
@@ -48,15 +50,12 @@ def _coerce_page(raw: dict, *keys) -> Optional[int]:
     return None
 
 
-def get_pdf_page_count(file_data: bytes) -> int:
-    """Return the number of pages in a PDF byte stream."""
+def get_pdf_page_count(file_data: PdfSource) -> int:
+    """Return the number of pages in a PDF byte stream or page set."""
     if not file_data:
         return 0
-    doc = fitz.open(stream=file_data, filetype="pdf")
-    try:
-        return doc.page_count
-    finally:
-        doc.close()
+    with pdf_pages(file_data) as pages:
+        return pages.page_count
 
 
 def normalize_segments(
@@ -161,7 +160,7 @@ def _extract_page_range(file_data: bytes, start_page: int, end_page: int) -> byt
 
 
 def split_pdf_by_segments(
-    file_data: bytes,
+    file_data: PdfSource,
     segments: Iterable[SplitSegment],
 ) -> List[SplitResult]:
     """
@@ -169,7 +168,9 @@ def split_pdf_by_segments(
 
     Returns a list of ``SplitResult`` objects whose order matches the
     input segment order. Invalid segments are skipped silently and
-    logged.
+    logged. A ``PdfPageSet`` supplies its already-known page count; each
+    child is still cut from a fresh copy of the bytes (see
+    ``_extract_page_range``).
     """
     if not file_data:
         return []
@@ -178,11 +179,9 @@ def split_pdf_by_segments(
     if not seg_list:
         return []
 
-    source = fitz.open(stream=file_data, filetype="pdf")
-    try:
-        total_pages = source.page_count
-    finally:
-        source.close()
+    with pdf_pages(file_data) as pages:
+        total_pages = pages.page_count
+        file_data = pages.data
 
     results: List[SplitResult] = []
     for seg in seg_list:
@@ -209,7 +208,7 @@ def split_pdf_by_segments(
     return results
 
 
-def slice_pdf_pages(file_data: bytes, start_page: int, end_page: int) -> bytes:
+def slice_pdf_pages(file_data: PdfSource, start_page: int, end_page: int) -> bytes:
     """Return a PDF containing 1-based pages ``start_page`` through ``end_page``."""
     results = split_pdf_by_segments(
         file_data,
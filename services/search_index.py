@@ -0,0 +1,137 @@
+"""Matching and ranking over maintained ``search_document`` columns.
+
+Contacts, transactions, and transaction participants each keep one
+lowercased search document (see ``SearchDocumentMixin`` in models). Every
+query term must appear in it as a substring. On PostgreSQL those LIKEs are
+served by the pg_trgm GIN indexes instead of a scan over nine columns; on
+SQLite the terms go through each table's trigram FTS5 index.
+
+Trigram indexes cannot serve terms shorter than three characters, so a
+query made only of such terms ("jo", "al b") is a prefix match on the
+model's PREFIX_SEARCH_FIELDS, which PostgreSQL indexes with
+``lower(...) text_pattern_ops`` (add_search_prefix_indexes migration).
+"""
+from __future__ import annotations
+
+import re
+from functools import reduce
+
+from sqlalchemy import and_, case, func, literal_column, or_, select, table
+
+from models import SEARCH_FTS_SUFFIX, db
+
+MIN_QUERY_LENGTH = 2
+# Shortest term a trigram index (pg_trgm or FTS5 trigram) can serve.
+MIN_INDEXED_LENGTH = 3
+MAX_TERMS = 6
+
+_PHONE_TOKEN = re.compile(r'^[\d()+\-.]+$')
+
+
+def search_terms(query: str) -> list[str]:
+    """Split a query into lowercased terms matched against search documents.
+
+    Phone-looking tokens ("832-555", "(832)") become bare digits, which the
+    document carries alongside the formatted phone.
+    """
+    terms: list[str] = []
+    for token in (query or '').lower().split():
+        if _PHONE_TOKEN.match(token):
+            digits = re.sub(r'\D', '', token)
+            if len(digits) >= 3:
+                token = digits
+        if token not in terms:
+            terms.append(token)
+    return terms[:MAX_TERMS]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_query(terms: list[str]) -> str:
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def match_terms(column, terms: list[str]):
+    """All ``terms`` appear somewhere in ``column``."""
+    like_terms = terms
+    clauses = []
+    if db.session.get_bind().dialect.name == 'sqlite':
+        indexed = [term for term in terms if len(term) >= MIN_INDEXED_LENGTH]
+        if indexed:
+            fts = f'{column.table.name}{SEARCH_FTS_SUFFIX}'
+            clauses.append(column.table.c.id.in_(
+                select(literal_column('rowid'))
+                .select_from(table(fts))
+                .where(literal_column(fts).op('MATCH')(_fts_query(indexed)))
+            ))
+            like_terms = [term for term in terms if term not in indexed]
+    clauses.extend(
+        column.like(f'%{_escape_like(term)}%', escape='\\') for term in like_terms
+    )
+    return and_(*clauses)
+
+
+def match_prefix(columns, terms: list[str]):
+    """Every term starts one of ``columns``, case-insensitively."""
+    return and_(*[
+        or_(*[
+            func.lower(column).like(f'{_escape_like(term)}%', escape='\\')
+            for column in columns
+        ])
+        for term in terms
+    ])
+
+
+def _digits(column):
+    return reduce(lambda expr, char: func.replace(expr, char, ''), '()-. +', column)
+
+
+def match_fields(model, terms: list[str], fields):
+    """Every term appears in one of ``fields``; phone fields also match digits."""
+    columns = []
+    for name in fields:
+        column = getattr(model, name)
+        columns.append(func.lower(column))
+        if name in model.SEARCH_PHONE_FIELDS:
+            columns.append(_digits(column))
+    return and_(*[
+        or_(*[
+            column.like(f'%{_escape_like(term)}%', escape='\\')
+            for column in columns
+        ])
+        for term in terms
+    ])
+
+
+def search_filter(model, terms: list[str], fields=None):
+    """Filter matching ``terms`` against a SearchDocumentMixin ``model``.
+
+    Queries with a term of MIN_INDEXED_LENGTH or more use the indexed search
+    document; shorter ones fall back to a prefix match on the model's
+    PREFIX_SEARCH_FIELDS. ``fields`` narrows matches to those columns for
+    pages whose search never covered the whole document.
+    """
+    if any(len(term) >= MIN_INDEXED_LENGTH for term in terms):
+        clause = match_terms(model.search_document, terms)
+    else:
+        clause = match_prefix(
+            [getattr(model, name) for name in model.PREFIX_SEARCH_FIELDS], terms,
+        )
+    if fields:
+        clause = and_(clause, match_fields(model, terms, fields))
+    return clause
+
+
+def rank_terms(column, terms: list[str]):
+    """Sort key: 0 when the document starts with the first term (a name
+    prefix for contacts, a street-number prefix for transactions), 1 when a
+    word starts with it, 2 for any other substring match.
+    """
+    head = _escape_like(terms[0])
+    return case(
+        (column.like(f'{head}%', escape='\\'), 0),
+        (column.like(f'% {head}%', escape='\\'), 1),
+        else_=2,
+    )
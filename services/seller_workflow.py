@@ -229,16 +229,11 @@ def infer_offer_document_type_from_text(text='', filename='', explicit_type=None
 def infer_offer_document_type_from_pdf(file_data, filename='', explicit_type=None):
     """Infer upload type from PDF text, falling back to filename/dropdown metadata."""
     try:
-        import fitz
+        from services.pdf_pages import pdf_pages
 
-        chunks = []
-        doc = fitz.open(stream=file_data, filetype='pdf')
-        try:
-            for page in doc:
-                chunks.append(page.get_text('text') or '')
-        finally:
-            doc.close()
-        return infer_offer_document_type_from_text(' '.join(chunks), filename, explicit_type)
+        with pdf_pages(file_data) as pages:
+            text = ' '.join(pages.page_texts())
+        return infer_offer_document_type_from_text(text, filename, explicit_type)
     except Exception:
         return infer_offer_document_type(filename, explicit_type)
 
@@ -885,7 +880,8 @@ def split_offer_package_into_children(doc_id, file_data, *, split_source='ai_pac
     PDF using PyMuPDF, uploads each child PDF to Supabase, and links a
     matching ``TransactionDocument`` + ``SellerOfferDocument`` to the same
     offer. Skips when only one segment is detected (no real packet) or when
-    children already exist for this parent.
+    children already exist for this parent. ``file_data`` may be raw bytes
+    or the caller's open ``PdfPageSet``.
     """
     if not file_data:
         return []
@@ -0,0 +1,313 @@
+"""Off-request recording of daily ``session_started`` retention events.
+
+``app.set_tenant_context`` runs on every authenticated page load, so it must
+not query the database just to learn that today's session was already
+counted. Instead:
+
+- A "seen today" marker answers the common case with no I/O: a per-process
+  set of user ids for the current UTC day, backed by a Redis bitmap
+  (``SETBIT`` on the user id) when Redis is configured so only the first
+  process to see a user each day does any work.
+- First sightings go into a bounded in-memory buffer that a daemon thread
+  flushes in batches. The flush re-checks the database, so a restart or a
+  Redis outage can only cost a redundant check, never a duplicate row.
+
+Like the rest of activation tracking this is best-effort: a crash between
+enqueue and flush loses at most a few seconds of session events.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+SEEN_KEY_PREFIX = 'crm:sessions:seen:'
+# Bitmaps outlive their day long enough to cover clock skew between hosts.
+SEEN_KEY_TTL = 2 * 24 * 3600
+FLUSH_INTERVAL_SECONDS = 10
+FLUSH_BATCH_SIZE = 200
+MAX_PENDING = 10000
+
+
+@dataclass(frozen=True)
+class PendingSession:
+    user_id: int
+    organization_id: int
+    surface: str
+    seen_at: datetime
+
+    @property
+    def day(self) -> date:
+        return self.seen_at.date()
+
+
+class SeenToday:
+    """Which users already had their session counted this UTC day."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day: date | None = None
+        self._users: set[int] = set()
+
+    def first_sighting(self, user_id: int, day: date) -> bool:
+        """Mark ``user_id`` seen on ``day``; True only the first time."""
+        with self._lock:
+            if self._day != day:
+                self._day = day
+                self._users = set()
+            if user_id in self._users:
+                return False
+            self._users.add(user_id)
+
+        from services.cache_helpers import shared_redis
+
+        conn = shared_redis()
+        if conn is None:
+            return True
+        key = f'{SEEN_KEY_PREFIX}{day.isoformat()}'
+        try:
+            pipe = conn.pipeline(transaction=False)
+            pipe.setbit(key, user_id, 1)
+            pipe.expire(key, SEEN_KEY_TTL)
+            previous, _ = pipe.execute()
+        except Exception:
+            logger.warning('Session bitmap unavailable; using local marker only')
+            return True
+        return not previous
+
+    def forget(self, user_id: int) -> None:
+        with self._lock:
+            self._users.discard(user_id)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._day = None
+            self._users = set()
+
+
+class SessionEventBuffer:
+    """Bounded buffer of first sightings, flushed by a daemon thread."""
+
+    def __init__(self, *, interval: float = FLUSH_INTERVAL_SECONDS,
+                 batch_size: int = FLUSH_BATCH_SIZE, max_pending: int = MAX_PENDING):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: list[PendingSession] = []
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._app = None
+        self._pid = os.getpid()
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, item: PendingSession, app=None) -> bool:
+        if os.getpid() != self._pid:
+            # Forked after the parent buffered: its thread is not ours.
+            self._pid = os.getpid()
+            self._pending = []
+            self._thread = None
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending.append(item)
+            full = len(self._pending) >= self.batch_size
+        if app is not None and not app.config.get('TESTING'):
+            self._app = app
+            self._ensure_thread()
+            if full:
+                self._wake.set()
+        return True
+
+    def drain(self) -> list[PendingSession]:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=self._run, name='session-event-flush', daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._pending or self._app is None:
+                continue
+            try:
+                with self._app.app_context():
+                    write_session_events(self.drain())
+            except Exception:
+                logger.exception('Session event flush failed')
+
+
+_seen = SeenToday()
+_buffer = SessionEventBuffer()
+
+
+def note_session(user, *, surface=None) -> bool:
+    """Request-path hook: queue today's session for ``user`` without I/O.
+
+    Returns True when this call queued a new sighting.
+    """
+    user_id = getattr(user, 'id', None)
+    org_id = getattr(user, 'organization_id', None)
+    if not user_id or not org_id:
+        return False
+    now = datetime.utcnow()
+    if not _seen.first_sighting(user_id, now.date()):
+        return False
+
+    app = None
+    try:
+        from flask import current_app
+        app = current_app._get_current_object()
+    except Exception:
+        pass
+    queued = _buffer.add(
+        PendingSession(
+            user_id=user_id,
+            organization_id=org_id,
+            surface=surface or 'app',
+            seen_at=now,
+        ),
+        app=app,
+    )
+    if not queued:
+        # Let a later request retry once the buffer drains.
+        _seen.forget(user_id)
+    return queued
+
+
+def flush_session_events() -> int:
+    """Write everything buffered in this process now. Needs an app context."""
+    return write_session_events(_buffer.drain())
+
+
+def write_session_events(pending) -> int:
+    """Persist one ``session_started`` per user/day, skipping existing rows.
+
+    Sightings are written one organization at a time under that org's RLS
+    context, since users, tasks and activation events are all row-level
+    secured. Within an org the lookups are set-based. Events reach PostHog
+    only after their org's commit succeeds.
+    """
+    from jobs.base import set_job_org_context
+
+    first_by_key = {}
+    for item in pending:
+        first_by_key.setdefault((item.user_id, item.day), item)
+
+    by_org: dict[int, dict] = {}
+    for key, item in first_by_key.items():
+        by_org.setdefault(item.organization_id, {})[key] = item
+
+    written = 0
+    for org_id, org_items in by_org.items():
+        set_job_org_context(org_id)
+        written += _write_org_session_events(org_id, org_items)
+    return written
+
+
+def _write_org_session_events(org_id: int, first_by_key: dict) -> int:
+    from jobs.base import set_job_org_context
+    from models import ActivationEvent, Task, User, db
+    from services.activation_service import (
+        _account_age_days, is_customer_user, mirror_event, record_event,
+    )
+
+    user_ids = {user_id for user_id, _ in first_by_key}
+    earliest = datetime.combine(min(day for _, day in first_by_key), datetime.min.time())
+    latest = datetime.combine(max(day for _, day in first_by_key), datetime.min.time())
+
+    users = {
+        u.id: u for u in User.query.filter(
+            User.id.in_(user_ids), User.organization_id == org_id,
+        ).all()
+    }
+    recorded = {
+        (row.user_id, row.created_at.date())
+        for row in ActivationEvent.query.with_entities(
+            ActivationEvent.user_id, ActivationEvent.created_at,
+        ).filter(
+            ActivationEvent.event == ActivationEvent.SESSION_STARTED,
+            ActivationEvent.user_id.in_(user_ids),
+            ActivationEvent.created_at >= earliest,
+        )
+    }
+    due_by_user = {}
+    try:
+        for assignee_id, due_date in Task.query.with_entities(
+            Task.assigned_to_id, db.func.min(Task.due_date),
+        ).filter(
+            Task.assigned_to_id.in_(user_ids),
+            Task.status == 'pending',
+            Task.due_date.isnot(None),
+            Task.due_date < latest + timedelta(days=1),
+        ).group_by(Task.assigned_to_id):
+            due_by_user[assignee_id] = due_date
+    except Exception:
+        db.session.rollback()
+        set_job_org_context(org_id)
+
+    mirrors = []
+    for (user_id, day), item in sorted(first_by_key.items(), key=lambda kv: kv[1].seen_at):
+        user = users.get(user_id)
+        if user is None or (user_id, day) in recorded or not is_customer_user(user):
+            continue
+        end = datetime.combine(day, datetime.min.time()) + timedelta(days=1)
+        earliest_due = due_by_user.get(user_id)
+        entry = record_event(
+            ActivationEvent.SESSION_STARTED,
+            user=user,
+            surface=item.surface,
+            commit=False,
+            mirror=False,
+            data={
+                'day': day.isoformat(),
+                'days_since_signup': _account_age_days(user, now=item.seen_at),
+                'has_overdue_or_due_today': bool(earliest_due and earliest_due < end),
+            },
+        )
+        if entry is None:
+            continue
+        entry.created_at = item.seen_at
+        recorded.add((user_id, day))
+        mirrors.append((user, entry.event_data))
+
+    try:
+        db.session.commit()
+    except Exception:
+        logger.exception(
+            'Failed to commit %d session events for org %s', len(mirrors), org_id,
+        )
+        db.session.rollback()
+        return 0
+
+    # The commit ended the transaction that held the RLS setting; person
+    # property sync reads the (expired) users again.
+    set_job_org_context(org_id)
+    for user, payload in mirrors:
+        mirror_event(
+            ActivationEvent.SESSION_STARTED, user=user, user_id=user.id,
+            organization_id=org_id, properties=payload,
+        )
+    return len(mirrors)
+
+
+def reset_session_tracking() -> None:
+    """Forget markers and drop anything buffered (tests)."""
+    _seen.reset()
+    _buffer.drain()
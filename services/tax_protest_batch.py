@@ -0,0 +1,600 @@
+"""Tax protest runs over a whole contact group.
+
+The request stores a TaxProtestBatchJob and enqueues it on the
+``tax_protest`` RQ queue. The worker finds every contact's property, then
+groups the subjects by county and subdivision so market values and the
+comparables pool are fetched once per subdivision rather than once per
+contact. LLM subdivision extraction is memoized per legal description for
+the run. Each subject's export bundle is stored as the single-contact search
+would, so per-contact CSV/XLSX downloads are served from it, and the job
+keeps a combined XLSX workbook. Each lookup chunk commits its resolved
+subjects on the job and results are committed per subdivision, so a retried
+job neither repeats a lookup nor re-compares a contact already done. Without
+Redis (local SQLite) the job runs inline in the request.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+from io import BytesIO
+from itertools import islice
+from typing import Any, Callable
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill
+
+from jobs.base import set_job_org_context
+from models import Contact, TaxProtestBatchJob, db
+from services import tax_protest_service
+from services.tax_snapshot import value_stats
+
+logger = logging.getLogger(__name__)
+
+QUEUE_NAME = 'tax_protest'
+JOB_TIMEOUT_SECONDS = 3600
+MAX_ATTEMPTS = 3
+MAX_BATCH_CONTACTS = 1000
+# Property lookups run in chunks; each chunk's resolved subjects and the
+# contacts that cannot be compared are committed together.
+LOOKUP_CHUNK_SIZE = 50
+# Comparables per contact in the combined workbook; per-contact downloads
+# carry the full list.
+WORKBOOK_COMPARABLE_LIMIT = 250
+
+RESULT_FOUND = 'found'
+RESULT_ERROR = 'error'
+
+SUMMARY_HEADERS = [
+    'Contact',
+    'Address',
+    'County',
+    'Subdivision',
+    'Status',
+    'Market Value',
+    'Neighborhood Median',
+    'Percentile',
+    'Total Homes',
+    'Homes Valued Less',
+    'Comparables',
+    'Lowest Comparable',
+    'Notes',
+]
+
+
+class TaxProtestBatchError(Exception):
+    """Raised for user-facing batch validation failures."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+def create_batch_job(
+    contact_ids: list[int],
+    *,
+    group_id: int | None,
+    user_id: int,
+    org_id: int,
+) -> TaxProtestBatchJob:
+    """Persist a queued job over ``contact_ids`` (already authorized)."""
+    if not contact_ids:
+        raise TaxProtestBatchError('This group has no contacts to run.')
+    if len(contact_ids) > MAX_BATCH_CONTACTS:
+        raise TaxProtestBatchError(
+            f'Batch runs are limited to {MAX_BATCH_CONTACTS} contacts; '
+            f'this group has {len(contact_ids)}.'
+        )
+    job = TaxProtestBatchJob(
+        organization_id=org_id,
+        user_id=user_id,
+        group_id=group_id,
+        status=TaxProtestBatchJob.STATUS_QUEUED,
+        contact_ids=list(contact_ids),
+        total_contacts=len(contact_ids),
+        results=[],
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def enqueue_batch_job(job: TaxProtestBatchJob) -> bool:
+    """Queue ``job`` for the tax_protest worker.
+
+    Returns False when no queue is reachable; the caller then runs the job
+    inline with :func:`run_batch_job`.
+    """
+    from config import Config
+    from jobs import dispatch
+    from rq import Retry
+
+    if Config.SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        return False
+    return bool(dispatch.enqueue(
+        QUEUE_NAME,
+        'jobs.tax_protest_batch.process_tax_protest_batch_job',
+        idempotency_key=f'job:{job.id}',
+        job_id=job.id,
+        org_id=job.organization_id,
+        job_timeout=JOB_TIMEOUT_SECONDS,
+        retry=Retry(max=MAX_ATTEMPTS - 1, interval=[15, 60]),
+    ))
+
+
+def run_batch_job(job_id: int, org_id: int) -> TaxProtestBatchJob | None:
+    """Process (or resume) one batch job. Safe to call more than once.
+
+    Contacts that already have a result are skipped. Unexpected errors
+    re-raise with the committed results intact so RQ can retry; the final
+    attempt marks the job failed.
+    """
+    set_job_org_context(org_id)
+    job = TaxProtestBatchJob.query.filter_by(
+        id=job_id, organization_id=org_id,
+    ).first()
+    if job is None:
+        logger.error('Tax protest batch job %s was not found', job_id)
+        return None
+    if job.status in TaxProtestBatchJob.FINISHED_STATUSES:
+        return job
+
+    job.status = TaxProtestBatchJob.STATUS_RUNNING
+    job.attempts = (job.attempts or 0) + 1
+    job.started_at = job.started_at or datetime.utcnow()
+    db.session.commit()
+    set_job_org_context(org_id)
+
+    try:
+        _process(job)
+    except Exception:
+        db.session.rollback()
+        set_job_org_context(org_id)
+        logger.exception(
+            'Tax protest batch job %s failed after %s contacts (attempt %s)',
+            job.id, job.processed_contacts, job.attempts,
+        )
+        if job.attempts < MAX_ATTEMPTS:
+            raise
+        _finish(job, failed=True, error='Database error while running the batch.')
+    return job
+
+
+class _Subject:
+    """A contact whose property was found and whose subdivision is known."""
+
+    __slots__ = ('base', 'record', 'source', 'resolution', 'market_value')
+
+    def __init__(self, base, record, source, resolution, market_value):
+        # ``base`` is the result's contact fields, captured before any commit
+        # expires the Contact row.
+        self.base = base
+        self.record = record
+        self.source = source
+        self.resolution = resolution
+        self.market_value = market_value
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'base': self.base,
+            'record': self.record,
+            'source': self.source,
+            'resolution': self.resolution,
+            'market_value': self.market_value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> '_Subject':
+        return cls(
+            data['base'], data['record'], data['source'],
+            data['resolution'], data['market_value'],
+        )
+
+    @property
+    def group_key(self):
+        resolution = self.resolution
+        return (
+            self.source,
+            resolution['subdivision'],
+            resolution['fuzzy'],
+            self.record.get('subdivision_code'),
+            tuple(resolution['match_terms'] or ()),
+        )
+
+
+class _ExtractionMemo:
+    """Subdivision extraction answers for one run, keyed by legal description."""
+
+    def __init__(self):
+        self.answers: dict[tuple[str, str], str | None] = {}
+        self.hits = 0
+
+    def wrap(self, extract: Callable[[str], str | None], kind: str):
+        def _extract(legal_description):
+            key = (kind, ' '.join((legal_description or '').upper().split()))
+            if key in self.answers:
+                self.hits += 1
+            else:
+                self.answers[key] = extract(legal_description)
+            return self.answers[key]
+        return _extract
+
+
+def _process(job: TaxProtestBatchJob) -> None:
+    org_id = job.organization_id
+    done = {result['contact_id'] for result in job.results or []}
+    # Subjects a previous attempt resolved but did not get to compare.
+    subjects = [
+        _Subject.from_dict(data) for data in job.subjects or []
+        if data['base']['contact_id'] not in done
+    ]
+    resolved = {subject.base['contact_id'] for subject in subjects}
+    pending = [cid for cid in job.contact_ids if cid not in done and cid not in resolved]
+
+    memo = _ExtractionMemo()
+    extract_llm = memo.wrap(tax_protest_service.extract_subdivision_llm, 'llm')
+    extract_chambers = memo.wrap(
+        tax_protest_service.extract_chambers_subdivision, 'chambers',
+    )
+
+    ids = iter(pending)
+    while True:
+        chunk = list(islice(ids, LOOKUP_CHUNK_SIZE))
+        if not chunk:
+            break
+        contacts = {
+            contact.id: contact
+            for contact in Contact.query.filter(
+                Contact.organization_id == org_id,
+                Contact.id.in_(chunk),
+            ).all()
+        }
+        found = []
+        unmatched = []
+        for contact_id in chunk:
+            subject, failure = _lookup(
+                contact_id, contacts.get(contact_id), extract_llm, extract_chambers,
+            )
+            if subject is not None:
+                found.append(subject)
+            else:
+                unmatched.append(failure)
+        subjects.extend(found)
+        if found:
+            job.subjects = list(job.subjects or []) + [s.to_dict() for s in found]
+        _record_results(job, unmatched, commit=bool(found))
+
+    groups: dict[tuple, list[_Subject]] = defaultdict(list)
+    for subject in subjects:
+        groups[subject.group_key].append(subject)
+
+    exports: dict[int, tuple[dict, list[dict]]] = {}
+    for members in groups.values():
+        _record_results(job, _compare_group(members, exports))
+
+    logger.info(
+        'tax_protest_batch_complete job_id=%s contacts=%s subdivisions=%s '
+        'extractions=%s extraction_cache_hits=%s',
+        job.id, len(pending) + len(resolved), len(groups), len(memo.answers), memo.hits,
+    )
+    job.workbook_data = build_batch_workbook(job, exports)
+    _finish(job)
+
+
+def _lookup(contact_id, contact, extract_llm, extract_chambers):
+    """Find and classify one contact; returns (subject, None) or (None, result)."""
+    if contact is None:
+        return None, _failure(contact_id, None, 'Contact no longer exists')
+    if not (contact.street_address or '').strip():
+        return None, _failure(contact_id, contact, 'Contact has no street address on file')
+
+    record, source = tax_protest_service.find_property_in_tax_data(
+        contact.street_address, contact.city, contact.zip_code,
+    )
+    if not record:
+        return None, _failure(
+            contact_id, contact,
+            'No property found in Chambers, Harris, Liberty, or Fort Bend '
+            'County tax records',
+        )
+    try:
+        market_value = float(record.get('market_value'))
+    except (TypeError, ValueError):
+        market_value = 0
+    if market_value <= 0:
+        return None, _failure(
+            contact_id, contact, 'Property has no market value available in tax data',
+            source=source,
+        )
+
+    resolution = tax_protest_service.resolve_subdivision(
+        record,
+        source,
+        extract_llm=extract_llm,
+        extract_chambers=extract_chambers,
+    )
+    if resolution['error']:
+        return None, _failure(contact_id, contact, resolution['error'], source=source)
+    return _Subject(
+        _result_base(contact_id, contact), record, source, resolution, market_value,
+    ), None
+
+
+def _compare_group(members: list[_Subject], exports: dict) -> list[dict[str, Any]]:
+    """Stats and comparables for subjects sharing one subdivision.
+
+    The subdivision's market values and (for store-backed counties) its
+    comparables pool are read once; each subject is then scored in memory.
+    """
+    first = members[0]
+    source = first.source
+    resolution = first.resolution
+    subdivision_code = first.record.get('subdivision_code')
+    values = tax_protest_service.subdivision_market_values(
+        resolution['subdivision'],
+        source,
+        fuzzy_subdivision=resolution['fuzzy'],
+        subdivision_code=subdivision_code,
+        subdivision_match_terms=resolution['match_terms'],
+    )
+    pool = tax_protest_service.subdivision_comparable_pool(
+        source,
+        resolution['subdivision'],
+        fuzzy_subdivision=resolution['fuzzy'],
+        subdivision_match_terms=resolution['match_terms'],
+    )
+
+    results = []
+    for subject in members:
+        record = subject.record
+        if pool is not None:
+            comparables = tax_protest_service.comparables_from_pool(
+                pool,
+                source,
+                subject.market_value,
+                record.get('zip'),
+                main_sq_ft=record.get('sq_ft'),
+            )
+        else:
+            comparables = tax_protest_service.find_comparables(
+                resolution['subdivision'],
+                record.get('zip'),
+                subject.market_value,
+                source,
+                main_sq_ft=record.get('sq_ft'),
+                fuzzy_subdivision=resolution['fuzzy'],
+                subdivision_code=subdivision_code,
+                main_acreage=record.get('acreage'),
+                subdivision_match_terms=resolution['match_terms'],
+            )
+        stats = value_stats(values, subject.market_value) if values is not None else None
+
+        params = tax_protest_service.build_search_params(
+            source,
+            resolution['subdivision'],
+            record['id'],
+            subject.base['contact_id'],
+            record.get('zip'),
+            neighborhood_code=record.get('neighborhood_code'),
+            main_sq_ft=record.get('sq_ft'),
+            fuzzy_subdivision=resolution['fuzzy'],
+            subdivision_code=subdivision_code,
+            main_acreage=record.get('acreage'),
+            subdivision_match_terms=resolution['match_terms'],
+        )
+        tax_protest_service.store_result_bundle(
+            params,
+            main_property=record,
+            comparables=comparables,
+            subdivision_stats=stats,
+        )
+        exports[subject.base['contact_id']] = (record, comparables)
+
+        stats = stats or {}
+        results.append({
+            **subject.base,
+            'status': RESULT_FOUND,
+            'message': None,
+            'source': source,
+            'county': _county(source),
+            'subdivision': resolution['subdivision'],
+            'property_address': record.get('full_address'),
+            'market_value': subject.market_value,
+            'median_value': stats.get('median_value'),
+            'percentile': stats.get('percentile'),
+            'total_homes': stats.get('total_homes'),
+            'lower_values': stats.get('lower_values'),
+            'comparables_count': len(comparables),
+            'lowest_comparable_value': (
+                comparables[0].get('market_value') if comparables else None
+            ),
+            'params': params,
+        })
+    return results
+
+
+def _county(source):
+    return tax_protest_service.COUNTY_LABELS.get(source, (source or '').title())
+
+
+def _result_base(contact_id, contact):
+    return {
+        'contact_id': contact_id,
+        'name': (
+            f'{contact.first_name or ""} {contact.last_name or ""}'.strip()
+            if contact else ''
+        ),
+        'address': contact.street_address if contact else None,
+    }
+
+
+def _failure(contact_id, contact, message, source=None):
+    return {
+        **_result_base(contact_id, contact),
+        'status': RESULT_ERROR,
+        'message': message,
+        'source': source,
+        'county': _county(source) if source else None,
+    }
+
+
+def _record_results(
+    job: TaxProtestBatchJob, results: list[dict[str, Any]], *, commit: bool = False,
+) -> None:
+    if not results and not commit:
+        return
+    # Results move in one commit with the counters that summarize them.
+    if results:
+        job.results = list(job.results or []) + results
+        job.processed_contacts += len(results)
+        job.found_count += sum(1 for r in results if r['status'] == RESULT_FOUND)
+        job.error_count += sum(1 for r in results if r['status'] != RESULT_FOUND)
+    db.session.commit()
+    set_job_org_context(job.organization_id)
+
+
+def _finish(job: TaxProtestBatchJob, *, failed: bool = False, error: str | None = None) -> None:
+    job.status = (
+        TaxProtestBatchJob.STATUS_FAILED if failed else TaxProtestBatchJob.STATUS_COMPLETED
+    )
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    job.subjects = None
+    db.session.commit()
+    set_job_org_context(job.organization_id)
+
+
+def ordered_results(job: TaxProtestBatchJob) -> list[dict[str, Any]]:
+    """Results in the group's contact order."""
+    position = {cid: index for index, cid in enumerate(job.contact_ids or [])}
+    return sorted(
+        job.results or [],
+        key=lambda result: position.get(result['contact_id'], len(position)),
+    )
+
+
+def batch_result(job: TaxProtestBatchJob, contact_id: int) -> dict[str, Any] | None:
+    """The stored result for one contact of the job, or None."""
+    for result in job.results or []:
+        if result['contact_id'] == contact_id:
+            return result
+    return None
+
+
+def _export_parts(result, exports):
+    """Subject and comparables for a found result, from this run or its bundle."""
+    if result['contact_id'] in exports:
+        return exports[result['contact_id']]
+    params = result['params']
+    bundle = tax_protest_service.get_result_bundle(params) or {}
+    main_property = bundle.get('main_property') or tax_protest_service.get_main_property_by_id(
+        params['main_property_id'], params['source'],
+    )
+    if not main_property:
+        return None
+    comparables = bundle.get('comparables')
+    if comparables is None:
+        comparables = tax_protest_service.find_comparables(
+            params['subdivision'],
+            params['zip_code'],
+            main_property['market_value'],
+            params['source'],
+            main_sq_ft=params.get('main_sq_ft'),
+            fuzzy_subdivision=params.get('fuzzy_subdivision', False),
+            subdivision_code=params.get('subdivision_code'),
+            main_acreage=params.get('main_acreage'),
+            subdivision_match_terms=params.get('subdivision_match_terms'),
+        )
+    return main_property, comparables
+
+
+def build_batch_workbook(job: TaxProtestBatchJob, exports: dict | None = None) -> bytes:
+    """Combined XLSX: one summary row per contact plus every contact's comparables."""
+    exports = exports or {}
+    workbook = Workbook()
+    summary = workbook.active
+    summary.title = 'Summary'
+    comparables_sheet = workbook.create_sheet('Comparables')
+
+    header_font = Font(name='Aptos', size=11, bold=True, color='FFFFFF')
+    header_fill = PatternFill('solid', fgColor='0F172A')
+
+    summary.append(SUMMARY_HEADERS)
+    comparables_sheet.append(['Contact', *tax_protest_service.EXPORT_HEADERS])
+
+    for result in ordered_results(job):
+        found = result['status'] == RESULT_FOUND
+        pct = result.get('percentile')
+        summary.append([
+            result['name'],
+            result.get('address'),
+            result.get('county'),
+            result.get('subdivision'),
+            'Found' if found else 'Not compared',
+            result.get('market_value'),
+            result.get('median_value'),
+            round(pct) if pct is not None else None,
+            result.get('total_homes'),
+            result.get('lower_values'),
+            result.get('comparables_count'),
+            result.get('lowest_comparable_value'),
+            result.get('message'),
+        ])
+        if not found:
+            continue
+        parts = _export_parts(result, exports)
+        if parts is None:
+            continue
+        main_property, comparables = parts
+        rows = tax_protest_service.build_export_rows(
+            main_property,
+            comparables[:WORKBOOK_COMPARABLE_LIMIT],
+            result.get('subdivision') or '',
+            result.get('county'),
+        )
+        for row in rows:
+            comparables_sheet.append([result['name'], *row])
+
+    for sheet in (summary, comparables_sheet):
+        for cell in sheet[1]:
+            cell.font = header_font
+            cell.fill = header_fill
+        sheet.freeze_panes = 'A2'
+
+    for column, width in enumerate((24, 34, 12, 26, 14, 16, 18, 12, 12, 16, 12, 16, 48), start=1):
+        summary.column_dimensions[chr(64 + column)].width = width
+    for column, width in enumerate((24, 18, 34, 18, 12, 16, 12, 12, 22, 38, 16, 14), start=1):
+        comparables_sheet.column_dimensions[chr(64 + column)].width = width
+    for row in range(2, summary.max_row + 1):
+        for column in ('F', 'G', 'L'):
+            summary[f'{column}{row}'].number_format = '$#,##0'
+    for row in range(2, comparables_sheet.max_row + 1):
+        comparables_sheet[f'F{row}'].number_format = '$#,##0'
+        comparables_sheet[f'G{row}'].number_format = '#,##0'
+        comparables_sheet[f'H{row}'].number_format = '0.00'
+
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def batch_job_payload(job: TaxProtestBatchJob) -> dict[str, Any]:
+    """Status payload for polling; finished jobs include per-contact results."""
+    payload: dict[str, Any] = {
+        'job_id': job.id,
+        'status': job.status,
+        'total_contacts': job.total_contacts,
+        'processed_contacts': job.processed_contacts or 0,
+        'found_count': job.found_count or 0,
+        'error_count': job.error_count or 0,
+    }
+    if job.status not in TaxProtestBatchJob.FINISHED_STATUSES:
+        return payload
+    if job.status == TaxProtestBatchJob.STATUS_FAILED:
+        payload['message'] = job.error or 'Batch run failed.'
+    payload['results'] = [
+        {key: value for key, value in result.items() if key != 'params'}
+        for result in ordered_results(job)
+    ]
+    payload['has_workbook'] = job.workbook_data is not None
+    return payload
@@ -4,9 +4,15 @@ Handles address lookup in county tax data, LLM-based subdivision extraction,
 comparable property queries, and search result caching for CSV consistency.
 """
 
+import base64
+import hashlib
+import json
 import re
 import logging
 from flask import session
+from config import Config
+from services.cache_backend import KEY_PREFIX, build_cache
+from services.tax_snapshot import SNAPSHOT_SOURCES, load_snapshot, value_stats
 from models import (
     db,
     ChambersProperty,
@@ -16,6 +22,9 @@ from models import (
     LibertyProperty,
     LibertyCodeProfile,
     FortBendProperty,
+    TaxSubdivisionComparable,
+    TaxDatasetVersion,
+    normalize_subdivision_key,
 )
 
 logger = logging.getLogger(__name__)
@@ -68,6 +77,16 @@ def normalize_address(address):
     return addr
 
 
+# County lookup order for find_property_in_tax_data, with each county's
+# situs zip column. Every model carries an indexed normalized_site_addr.
+ADDRESS_KEY_SOURCES = (
+    ("chambers", ChambersProperty, ChambersProperty.prop_zip5),
+    ("hcad", HcadProperty, HcadProperty.site_addr_3),
+    ("liberty", LibertyProperty, LibertyProperty.situs_zip),
+    ("fort_bend", FortBendProperty, FortBendProperty.situs_zip),
+)
+ADDRESS_KEY_PROBE_LIMIT = 20
+
 DIRECTIONAL_PREFIXES = {
     "N",
     "S",
@@ -115,6 +134,15 @@ def find_property_in_tax_data(street_address, city, zip_code):
     zip_clean = (zip_code or "").strip()[:5]
     city_clean = (city or "").strip().upper()
 
+    if normalized_address:
+        result, source = _probe_address_key(normalized_address, zip_clean)
+        if result:
+            return result, source
+
+    # No exact key: the contact's address is written differently from the
+    # county roll (or the county was imported before it had keys), so fall
+    # back to the per-county street/number searches.
+
     # --- Chambers County ---
     chambers_result = _search_chambers(street_num, direction, street_name, zip_clean)
     if chambers_result:
@@ -144,6 +172,43 @@ def find_property_in_tax_data(street_address, city, zip_code):
     return None, None
 
 
+def _probe_address_key(normalized_address, zip_code):
+    """Look a normalized address up in every county in one round trip.
+
+    Each county contributes one equality probe on its indexed
+    normalized_site_addr, combined with UNION ALL. The first county in
+    ADDRESS_KEY_SOURCES order with a match wins, preferring a row in
+    ``zip_code`` within that county, like the per-county searches.
+    Returns (record_dict, source) or (None, None).
+    """
+    branches = []
+    for source, model, zip_column in ADDRESS_KEY_SOURCES:
+        query = db.select(
+            db.literal(source, db.String).label("source"),
+            model.id.label("id"),
+            zip_column.label("zip_code"),
+        ).where(model.normalized_site_addr == normalized_address)
+        if hasattr(model, "is_residential_home"):
+            query = query.where(model.is_residential_home.is_(True))
+        probe = query.limit(ADDRESS_KEY_PROBE_LIMIT).subquery()
+        branches.append(db.select(*probe.c))
+
+    matches = {}
+    for row in db.session.execute(db.union_all(*branches)):
+        matches.setdefault(row.source, []).append(row)
+
+    for source, model, _zip_column in ADDRESS_KEY_SOURCES:
+        rows = matches.get(source)
+        if not rows:
+            continue
+        best = next(
+            (row for row in rows if zip_code and row.zip_code == zip_code), rows[0]
+        )
+        record = db.session.get(model, best.id)
+        return ADDRESS_RECORD_DICTS[source](record), source
+    return None, None
+
+
 def _search_chambers(street_num, direction, street_name, zip_code):
     """Search Chambers County by address components.
     Matches street number, direction (if present), and first word of street name.
@@ -373,16 +438,24 @@ def _is_valid_subdivision(lgl_2):
     return True
 
 
-def _hcad_found(result):
-    """Helper to load sq_ft and return dict for a matched HCAD property."""
+def _hcad_sq_ft(record):
+    """Largest building sq ft for an HCAD account.
 
-    sq_ft = (
+    Uses the max_sq_ft precomputed by the import, and only aggregates
+    hcad_buildings for rows imported before that column existed.
+    """
+    if record.max_sq_ft is not None:
+        return record.max_sq_ft
+    return (
         db.session.query(db.func.max(HcadBuilding.im_sq_ft))
-        .filter(HcadBuilding.acct == result.acct)
+        .filter(HcadBuilding.acct == record.acct)
         .scalar()
     )
 
-    return _hcad_to_dict(result, sq_ft)
+
+def _hcad_found(result):
+    """Helper to load sq_ft and return dict for a matched HCAD property."""
+    return _hcad_to_dict(result, _hcad_sq_ft(result))
 
 
 def extract_subdivision_llm(legal_description):
@@ -555,6 +628,65 @@ def build_chambers_subdivision_match_terms(subdivision, legal_description=None):
     return terms
 
 
+def resolve_subdivision(
+    property_record, source, extract_llm=None, extract_chambers=None
+):
+    """Work out the subdivision a matched property is compared within.
+
+    Returns a dict with ``subdivision``, ``fuzzy`` (substring rather than
+    exact matching), ``match_terms`` (Chambers only), ``used_llm`` and
+    ``error``, which is set when no subdivision could be determined. The
+    extractors default to extract_subdivision_llm and
+    extract_chambers_subdivision; batch runs pass memoized ones.
+    """
+    extract_llm = extract_llm or extract_subdivision_llm
+    extract_chambers = extract_chambers or extract_chambers_subdivision
+    resolution = {
+        "subdivision": None,
+        "fuzzy": False,
+        "match_terms": None,
+        "used_llm": False,
+        "error": None,
+    }
+
+    if source == "hcad":
+        lgl_2 = property_record.get("legal2") or ""
+        if _is_valid_subdivision(lgl_2):
+            resolution["subdivision"] = lgl_2.strip()
+        else:
+            resolution["subdivision"] = extract_llm(property_record.get("legal1", ""))
+            resolution["fuzzy"] = True
+            resolution["used_llm"] = True
+        if not resolution["subdivision"]:
+            resolution["error"] = (
+                "Could not determine subdivision from property legal description"
+            )
+    elif source in ("liberty", "fort_bend"):
+        resolution["subdivision"] = property_record.get("subdivision")
+        if not resolution["subdivision"] or not property_record.get("subdivision_code"):
+            resolution["error"] = (
+                "Could not determine Liberty subdivision from tax data"
+                if source == "liberty"
+                else "Could not determine Fort Bend neighborhood from tax data"
+            )
+    else:
+        legal_desc = property_record.get("legal1", "")
+        resolution["used_llm"] = True
+        if source == "chambers":
+            resolution["subdivision"] = extract_chambers(legal_desc)
+            resolution["match_terms"] = build_chambers_subdivision_match_terms(
+                resolution["subdivision"],
+                legal_desc,
+            )
+        else:
+            resolution["subdivision"] = extract_llm(legal_desc)
+        if not resolution["subdivision"]:
+            resolution["error"] = (
+                "Could not extract subdivision from property legal description"
+            )
+    return resolution
+
+
 def get_neighborhood_name(neighborhood_code):
     """Resolve a neighborhood code to its description from the lookup table."""
     if not neighborhood_code:
@@ -563,6 +695,209 @@ def get_neighborhood_name(neighborhood_code):
     return nc.dscr if nc else None
 
 
+STORE_SOURCES = {"hcad": HcadProperty, "chambers": ChambersProperty}
+
+
+def _comparables_store_ready(source):
+    """True once scripts/import_tax_data.py has built the store for source."""
+    return (
+        db.session.query(TaxSubdivisionComparable.id)
+        .filter(TaxSubdivisionComparable.source == source)
+        .first()
+        is not None
+    )
+
+
+def _store_subdivision_filter(
+    source, subdivision, fuzzy_subdivision=False, subdivision_match_terms=None
+):
+    """Match rows in the comparables store by normalized subdivision key.
+
+    HCAD structured subdivisions are an exact key lookup; LLM-extracted HCAD
+    subdivisions and Chambers match terms stay substring matches, as with the
+    ILIKE they replace.
+    """
+    key_col = TaxSubdivisionComparable.subdivision_key
+    if source == "hcad":
+        key = normalize_subdivision_key(subdivision)
+        if fuzzy_subdivision:
+            return key_col.like(f"%{key}%")
+        return key_col == key
+
+    terms = [
+        normalize_subdivision_key(term)
+        for term in (
+            subdivision_match_terms
+            or build_chambers_subdivision_match_terms(subdivision)
+        )
+        if term
+    ] or [normalize_subdivision_key(subdivision)]
+    return db.or_(*[key_col.like(f"%{term}%") for term in terms])
+
+
+def _store_market_values(source, sub_filter):
+    return (
+        db.session.query(TaxSubdivisionComparable.market_value)
+        .filter(TaxSubdivisionComparable.source == source, sub_filter)
+        .order_by(TaxSubdivisionComparable.market_value.asc())
+        .all()
+    )
+
+
+def _store_comparables(
+    source, sub_filter, market_value, zip_code, main_sq_ft=None, limit=None
+):
+    """Comparables below market_value from the store as (record, sq_ft) rows.
+
+    Tries the subject's zip first and falls back to the whole subdivision,
+    matching the legacy per-county queries.
+    """
+    model = STORE_SOURCES[source]
+
+    def _query(use_zip):
+        q = (
+            db.session.query(model, TaxSubdivisionComparable.sq_ft)
+            .join(model, model.id == TaxSubdivisionComparable.property_id)
+            .filter(
+                TaxSubdivisionComparable.source == source,
+                sub_filter,
+                TaxSubdivisionComparable.market_value < market_value,
+            )
+        )
+        if use_zip:
+            q = q.filter(TaxSubdivisionComparable.zip_code == zip_code)
+        if main_sq_ft and main_sq_ft > 0:
+            q = q.filter(
+                TaxSubdivisionComparable.sq_ft.between(
+                    main_sq_ft - SQ_FT_RANGE,
+                    main_sq_ft + SQ_FT_RANGE,
+                )
+            )
+        return _limit_query(
+            q.order_by(TaxSubdivisionComparable.market_value.asc()),
+            limit,
+        ).all()
+
+    results = _query(use_zip=True) if zip_code else []
+    if not results:
+        results = _query(use_zip=False)
+    return results
+
+
+def subdivision_comparable_pool(
+    source, subdivision, fuzzy_subdivision=False, subdivision_match_terms=None
+):
+    """Every comparables-store row of a subdivision, cheapest first.
+
+    Rows are (record, zip_code, market_value, sq_ft). Batch runs fetch a
+    pool once per subdivision and pick each subject's comparables from it
+    with comparables_from_pool. Returns None for counties without a store,
+    or before the import has built it; callers use find_comparables then.
+    """
+    if source not in STORE_SOURCES or not subdivision:
+        return None
+    if not _comparables_store_ready(source):
+        return None
+    model = STORE_SOURCES[source]
+    return (
+        db.session.query(
+            model,
+            TaxSubdivisionComparable.zip_code,
+            TaxSubdivisionComparable.market_value,
+            TaxSubdivisionComparable.sq_ft,
+        )
+        .join(model, model.id == TaxSubdivisionComparable.property_id)
+        .filter(
+            TaxSubdivisionComparable.source == source,
+            _store_subdivision_filter(
+                source, subdivision, fuzzy_subdivision, subdivision_match_terms
+            ),
+        )
+        .order_by(TaxSubdivisionComparable.market_value.asc())
+        .all()
+    )
+
+
+def comparables_from_pool(
+    pool, source, market_value, zip_code, main_sq_ft=None, limit=None
+):
+    """find_comparables for one subject, answered from a subdivision pool.
+
+    Applies the same filters as _store_comparables: cheaper than the
+    subject, the subject's zip first with a whole-subdivision fallback,
+    and the HCAD square-footage band.
+    """
+    use_sq_ft = source == "hcad" and main_sq_ft and main_sq_ft > 0
+
+    def _select(use_zip):
+        rows = []
+        for record, row_zip, value, sq_ft in pool:
+            if value >= market_value:
+                break
+            if use_zip and row_zip != zip_code:
+                continue
+            if use_sq_ft and (
+                sq_ft is None
+                or not main_sq_ft - SQ_FT_RANGE <= sq_ft <= main_sq_ft + SQ_FT_RANGE
+            ):
+                continue
+            rows.append((record, sq_ft))
+            if limit is not None and len(rows) > limit:
+                break
+        return rows
+
+    results = _select(use_zip=True) if zip_code else []
+    if not results:
+        results = _select(use_zip=False)
+    if source == "hcad":
+        return [_hcad_to_dict(prop, sq_ft) for prop, sq_ft in results]
+    return [_chambers_to_dict(prop) for prop, _sq_ft in results]
+
+
+def _snapshot_market_values(
+    source,
+    subdivision,
+    fuzzy_subdivision=False,
+    subdivision_code=None,
+    sibling_codes=None,
+    subdivision_match_terms=None,
+):
+    """Sorted subdivision market values from the mapped county snapshot.
+
+    Returns None when no snapshot is available for the county's current
+    dataset version, so the caller queries the database instead. Keys follow the same rules as the database paths:
+    Liberty/Fort Bend codes plus siblings, exact or substring HCAD keys,
+    and Chambers match terms as substrings.
+    """
+    if source not in SNAPSHOT_SOURCES:
+        return None
+    if source not in ("liberty", "fort_bend") and not subdivision:
+        return None
+    if source in ("liberty", "fort_bend") and not subdivision_code:
+        return None
+    snapshot = load_snapshot(source, tax_dataset_version(source))
+    if snapshot is None:
+        return None
+
+    if source == "liberty":
+        keys = [subdivision_code, *(sibling_codes or _find_liberty_sibling_codes(subdivision_code))]
+    elif source == "fort_bend":
+        keys = [subdivision_code, *(sibling_codes or _find_fort_bend_sibling_codes(subdivision_code))]
+    elif source == "hcad" and not fuzzy_subdivision:
+        keys = [normalize_subdivision_key(subdivision)]
+    elif source == "hcad":
+        keys = snapshot.keys_containing([normalize_subdivision_key(subdivision)])
+    else:
+        terms = subdivision_match_terms or build_chambers_subdivision_match_terms(
+            subdivision
+        )
+        keys = snapshot.keys_containing(
+            [normalize_subdivision_key(term) for term in terms]
+            or [normalize_subdivision_key(subdivision)]
+        )
+    return snapshot.sorted_values(keys)
+
+
 def get_subdivision_stats(
     subdivision,
     zip_code,
@@ -582,6 +917,43 @@ def get_subdivision_stats(
       percentile: where the subject falls (e.g. 90 means 90% of homes are cheaper)
       value_distribution: list of {label, count} buckets for charting
     """
+    sorted_values = subdivision_market_values(
+        subdivision,
+        source,
+        fuzzy_subdivision=fuzzy_subdivision,
+        subdivision_code=subdivision_code,
+        sibling_codes=sibling_codes,
+        subdivision_match_terms=subdivision_match_terms,
+    )
+    if sorted_values is None:
+        return None
+    return value_stats(sorted_values, market_value)
+
+
+def subdivision_market_values(
+    subdivision,
+    source,
+    fuzzy_subdivision=False,
+    subdivision_code=None,
+    sibling_codes=None,
+    subdivision_match_terms=None,
+):
+    """Sorted market values of every home in the subdivision, or None.
+
+    The subject-independent half of get_subdivision_stats, so batch runs
+    can fetch a subdivision once and score each subject with value_stats.
+    """
+    snapshot_values = _snapshot_market_values(
+        source,
+        subdivision,
+        fuzzy_subdivision=fuzzy_subdivision,
+        subdivision_code=subdivision_code,
+        sibling_codes=sibling_codes,
+        subdivision_match_terms=subdivision_match_terms,
+    )
+    if snapshot_values is not None:
+        return snapshot_values
+
     if source == "liberty" and subdivision_code:
         codes = [subdivision_code]
         if not sibling_codes:
@@ -620,6 +992,13 @@ def get_subdivision_stats(
             .order_by(FortBendProperty.market_value.asc())
             .all()
         )
+    elif source in STORE_SOURCES and subdivision and _comparables_store_ready(source):
+        rows = _store_market_values(
+            source,
+            _store_subdivision_filter(
+                source, subdivision, fuzzy_subdivision, subdivision_match_terms
+            ),
+        )
     elif source == "hcad" and subdivision:
         if fuzzy_subdivision:
             sub_filter = HcadProperty.lgl_2.ilike(f"%{subdivision}%")
@@ -683,48 +1062,7 @@ def get_subdivision_stats(
     else:
         return None
 
-    values = [int(r[0]) for r in rows if r[0] is not None]
-    sorted_values = sorted(values)
-    total_homes = len(sorted_values)
-    lower_values = sum(1 for v in sorted_values if v < market_value)
-    higher_values = sum(1 for v in sorted_values if v > market_value)
-    percentile = (
-        round((lower_values / total_homes) * 100, 1) if total_homes > 0 else None
-    )
-
-    return {
-        "total_homes": total_homes,
-        "lower_values": lower_values,
-        "higher_values": higher_values,
-        "percentile": percentile,
-        "value_distribution": _bucket_values(sorted_values),
-        "min_value": sorted_values[0] if sorted_values else None,
-        "max_value": sorted_values[-1] if sorted_values else None,
-        "median_value": (
-            sorted_values[len(sorted_values) // 2] if sorted_values else None
-        ),
-    }
-
-
-def _bucket_values(values, num_buckets=8):
-    """Return evenly sized buckets across the full observed value range."""
-    if not values:
-        return []
-    min_val = min(values)
-    max_val = max(values)
-    if min_val == max_val:
-        return [{"label": f"${min_val / 1000:.0f}k", "count": len(values)}]
-    bucket_size = (max_val - min_val) / num_buckets
-    buckets = []
-    for i in range(num_buckets):
-        lo = min_val + i * bucket_size
-        hi = lo + bucket_size
-        if i == num_buckets - 1:
-            count = sum(1 for v in values if lo <= v <= hi)
-        else:
-            count = sum(1 for v in values if lo <= v < hi)
-        buckets.append({"label": f"${lo / 1000:.0f}k", "count": count})
-    return buckets
+    return sorted(int(r[0]) for r in rows if r[0] is not None)
 
 
 def _limit_query(query, limit):
@@ -747,12 +1085,29 @@ def find_comparables(
 ):
     """
     Find properties in the same subdivision and zip with lower market value.
+    HCAD and Chambers read the precomputed TaxSubdivisionComparable store once
+    the import has built it; the queries below are the fallback.
     For HCAD: matches on lgl_2 (exact when from structured data, ILIKE when
     from LLM extraction), requires a building, and filters to within 250 sq ft.
     For Chambers: uses ILIKE on legal1 (no sq ft band; HCAD still uses ±250).
     Returns list of property dicts.
     """
 
+    if source in STORE_SOURCES and subdivision and _comparables_store_ready(source):
+        results = _store_comparables(
+            source,
+            _store_subdivision_filter(
+                source, subdivision, fuzzy_subdivision, subdivision_match_terms
+            ),
+            market_value,
+            zip_code,
+            main_sq_ft=main_sq_ft if source == "hcad" else None,
+            limit=limit,
+        )
+        if source == "hcad":
+            return [_hcad_to_dict(prop, sq_ft) for prop, sq_ft in results]
+        return [_chambers_to_dict(prop) for prop, _sq_ft in results]
+
     if source == "chambers":
         if not subdivision:
             return []
@@ -1254,7 +1609,73 @@ def _fort_bend_to_dict(record):
     }
 
 
-def cache_search_result(
+ADDRESS_RECORD_DICTS = {
+    "chambers": _chambers_to_dict,
+    "hcad": _hcad_found,
+    "liberty": _liberty_to_dict,
+    "fort_bend": _fort_bend_to_dict,
+}
+
+
+COUNTY_LABELS = {
+    "chambers": "Chambers",
+    "hcad": "Harris",
+    "liberty": "Liberty",
+    "fort_bend": "Fort Bend",
+}
+EXPORT_HEADERS = [
+    "Type",
+    "Address",
+    "City",
+    "Zip",
+    "Market Value",
+    "Sq Ft",
+    "Acreage",
+    "Subdivision",
+    "Legal Description",
+    "Account",
+    "County",
+]
+
+
+def _has_positive_market_value(prop):
+    value = prop.get("market_value")
+    try:
+        return float(value) > 0
+    except (TypeError, ValueError):
+        return False
+
+
+def build_export_rows(main_property, comparables, subdivision, county):
+    """CSV/XLSX rows (EXPORT_HEADERS order): the subject, then comparables."""
+    rows = []
+
+    def build_row(prop, row_type):
+        if not _has_positive_market_value(prop):
+            return
+        rows.append(
+            [
+                row_type,
+                prop.get("full_address", ""),
+                prop.get("city", ""),
+                prop.get("zip", ""),
+                prop.get("market_value", ""),
+                prop.get("sq_ft", ""),
+                prop.get("acreage", ""),
+                subdivision,
+                prop.get("legal1", ""),
+                prop.get("account", ""),
+                county,
+            ]
+        )
+
+    build_row(main_property, "Subject Property")
+    for comp in comparables:
+        build_row(comp, "Comparable")
+    return rows
+
+
+def build_search_params(
     source,
     subdivision,
     main_property_id,
@@ -1267,8 +1688,8 @@ def cache_search_result(
     main_acreage=None,
     subdivision_match_terms=None,
 ):
-    """Store search params in Flask session for CSV download consistency."""
-    session["tax_protest_result"] = {
+    """The params that identify one search's results and key its bundle."""
+    return {
         "source": source,
         "subdivision": subdivision,
         "main_property_id": main_property_id,
@@ -1283,11 +1704,113 @@ def cache_search_result(
     }
 
 
+def cache_search_result(
+    source,
+    subdivision,
+    main_property_id,
+    contact_id,
+    zip_code,
+    neighborhood_code=None,
+    main_sq_ft=None,
+    fuzzy_subdivision=False,
+    subdivision_code=None,
+    main_acreage=None,
+    subdivision_match_terms=None,
+):
+    """Store search params in Flask session for CSV download consistency.
+
+    Returns the stored params so the caller can key the result bundle.
+    """
+    session["tax_protest_result"] = build_search_params(
+        source,
+        subdivision,
+        main_property_id,
+        contact_id,
+        zip_code,
+        neighborhood_code=neighborhood_code,
+        main_sq_ft=main_sq_ft,
+        fuzzy_subdivision=fuzzy_subdivision,
+        subdivision_code=subdivision_code,
+        main_acreage=main_acreage,
+        subdivision_match_terms=subdivision_match_terms,
+    )
+    return session["tax_protest_result"]
+
+
 def get_cached_search_result():
     """Retrieve cached search params from Flask session."""
     return session.get("tax_protest_result")
 
 
+# Export bundles: the subject property, full comparables list, stats and
+# rendered chart for one search, shared by CSV/XLSX downloads across workers.
+# The key hashes the search params with the county's dataset version, so a
+# bundle never changes once written and a new import simply stops reading it.
+RESULT_BUNDLE_TTL = 24 * 3600
+RESULT_BUNDLE_PARAMS = (
+    "source",
+    "subdivision",
+    "main_property_id",
+    "zip_code",
+    "subdivision_code",
+    "main_sq_ft",
+    "main_acreage",
+    "fuzzy_subdivision",
+    "subdivision_match_terms",
+)
+
+_bundle_cache = build_cache(
+    max_entries=Config.TAX_EXPORT_CACHE_MAX_ENTRIES,
+    max_bytes=Config.TAX_EXPORT_CACHE_MAX_BYTES,
+    key_prefix=f"{KEY_PREFIX}tax-bundle:",
+)
+
+
+def tax_dataset_version(source):
+    """Current dataset version for a county; 0 before the first tracked import."""
+    row = db.session.get(TaxDatasetVersion, source)
+    return row.version if row else 0
+
+
+def result_bundle_key(params):
+    """Content hash of the search params plus the county's dataset version."""
+    payload = {name: params.get(name) for name in RESULT_BUNDLE_PARAMS}
+    payload["dataset_version"] = tax_dataset_version(params.get("source"))
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def get_result_bundle(params):
+    """The cached bundle for these search params, or None.
+
+    ``chart_png`` comes back as bytes (None when the stats had no chart);
+    a missing key means the chart has not been rendered yet.
+    """
+    bundle = _bundle_cache.get(result_bundle_key(params))
+    if bundle is None:
+        return None
+    bundle = dict(bundle)
+    if bundle.get("chart_png"):
+        bundle["chart_png"] = base64.b64decode(bundle["chart_png"])
+    return bundle
+
+
+def store_result_bundle(params, **parts):
+    """Write a bundle for these params, merged over any existing parts.
+
+    Parts are main_property, comparables (the full, unlimited list),
+    subdivision_stats and chart_png.
+    """
+    key = result_bundle_key(params)
+    bundle = dict(_bundle_cache.get(key) or {})
+    for name, value in parts.items():
+        if name == "chart_png" and value is not None:
+            value = base64.b64encode(value).decode("ascii")
+        bundle[name] = value
+    _bundle_cache.set(key, bundle, RESULT_BUNDLE_TTL)
+
+
 def get_main_property_by_id(property_id, source):
     """Load a single property record by its ID and source."""
     if source == "chambers":
@@ -1297,12 +1820,7 @@ def get_main_property_by_id(property_id, source):
         record = HcadProperty.query.get(property_id)
         if not record:
             return None
-        sq_ft = (
-            db.session.query(db.func.max(HcadBuilding.im_sq_ft))
-            .filter(HcadBuilding.acct == record.acct)
-            .scalar()
-        )
-        return _hcad_to_dict(record, sq_ft)
+        return _hcad_to_dict(record, _hcad_sq_ft(record))
     elif source == "liberty":
         record = LibertyProperty.query.get(property_id)
         return _liberty_to_dict(record) if record else None
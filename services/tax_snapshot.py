@@ -0,0 +1,247 @@
+"""
+Read-only, memory-mapped market-value snapshots of county appraisal data.
+
+scripts/import_tax_data.py writes one file per county holding every
+comparable-eligible home's market value as a packed int32 column, sorted by
+(subdivision key, market value), plus a small index of where each
+subdivision's slice starts and ends. Web workers ``mmap`` the file, so the
+column lives once in the OS page cache and is shared zero-copy by every
+gunicorn worker instead of being rebuilt from ORM rows per request.
+
+Because each subdivision is a contiguous, already-sorted slice, subdivision
+stats are a handful of bisects: counts below/above the subject, min, max,
+median and histogram buckets never walk the values in Python.
+
+Only the market value column is stored, which is all subdivision stats
+need; comparables (sq ft, acreage, zip) are still queried from the
+database and the precomputed tax_subdivision_comparables store.
+
+Each snapshot records the tax_dataset_versions version it was built from,
+and readers ignore a file whose version no longer matches the database, so
+a missing or stale snapshot only costs the database query it replaces.
+Files are written to TAX_SNAPSHOT_DIR on the host running the importer:
+web hosts only benefit when they share that directory (a single-host
+deploy, or a shared volume mounted on every host); anywhere else the
+snapshot is simply absent and stats come from the database.
+
+File layout (native byte order, recorded in the index):
+    8 bytes   magic  b"TAXSNAP1"
+    4 bytes   uint32 value count
+    4 bytes   uint32 index length in bytes
+    index     UTF-8 JSON, space-padded to a 4-byte boundary
+    values    int32[count]
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SOURCES = ("hcad", "chambers", "liberty", "fort_bend")
+MAGIC = b"TAXSNAP1"
+_HEADER = struct.Struct("<8sII")
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def snapshot_path(source, directory=None):
+    directory = directory or current_app.config.get("TAX_SNAPSHOT_DIR")
+    if not directory:
+        return None
+    return os.path.join(directory, f"{source}.snap")
+
+
+def write_snapshot(path, source, rows, dataset_version):
+    """Write ``rows`` of (subdivision_key, market_value) to ``path``.
+
+    ``dataset_version`` is the county's tax_dataset_versions version the rows
+    were read from; load_snapshot only serves the file while it is current.
+
+    Rows must arrive grouped by key and ascending by value within each key
+    (the importer's ORDER BY); readers rely on that for bisecting. The file
+    is written beside ``path`` and renamed into place, so live readers never
+    see a partial snapshot.
+    Returns the number of values written.
+    """
+    values = array("i")
+    ranges = []
+    seen = set()
+    current_key = None
+    previous = None
+    for key, value in rows:
+        if key is None or value is None:
+            continue
+        value = int(value)
+        if key != current_key:
+            if key in seen:
+                raise ValueError(f"snapshot rows for {key!r} are not contiguous")
+            if current_key is not None:
+                ranges[-1][2] = len(values)
+            ranges.append([key, len(values), None])
+            seen.add(key)
+            current_key = key
+        elif value < previous:
+            raise ValueError(f"snapshot values are not sorted within {key!r}")
+        values.append(value)
+        previous = value
+    if ranges:
+        ranges[-1][2] = len(values)
+
+    index = json.dumps({
+        "source": source,
+        "dataset_version": dataset_version,
+        "built_at": int(time.time()),
+        "byteorder": sys.byteorder,
+        "itemsize": values.itemsize,
+        "keys": ranges,
+    }).encode("utf-8")
+    index += b" " * (-(_HEADER.size + len(index)) % 4)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(values), len(index)))
+        f.write(index)
+        values.tofile(f)
+    os.replace(tmp_path, path)
+    return len(values)
+
+
+class CountySnapshot:
+    """One mapped snapshot file. Slices are memoryviews into the mapping."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, index_len = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a tax snapshot")
+        index = json.loads(self._mmap[_HEADER.size:_HEADER.size + index_len])
+        if index["byteorder"] != sys.byteorder or index["itemsize"] != 4:
+            raise ValueError(f"{path} was written for a different platform")
+        start = _HEADER.size + index_len
+        self.source = index["source"]
+        self.dataset_version = index["dataset_version"]
+        self.built_at = index["built_at"]
+        self._values = memoryview(self._mmap)[start:start + 4 * count].cast("i")
+        self._ranges = {key: (lo, hi) for key, lo, hi in index["keys"]}
+
+    def __len__(self):
+        return len(self._values)
+
+    def keys_containing(self, terms):
+        """Subdivision keys containing any of ``terms`` (substring match)."""
+        terms = [term for term in terms if term]
+        return [key for key in self._ranges if any(term in key for term in terms)]
+
+    def sorted_values(self, keys):
+        """Ascending market values across ``keys``.
+
+        A single subdivision comes back as a zero-copy memoryview; several
+        (sibling sections, fuzzy matches) are merged into one sorted list.
+        """
+        slices = [
+            self._values[slice(*self._ranges[key])]
+            for key in dict.fromkeys(keys)
+            if key in self._ranges
+        ]
+        if not slices:
+            return []
+        if len(slices) == 1:
+            return slices[0]
+        return sorted(chain.from_iterable(slices))
+
+
+def load_snapshot(source, dataset_version):
+    """The mapped snapshot for ``source``, or None when none is usable.
+
+    A snapshot built from any version other than ``dataset_version`` (the
+    county's current tax_dataset_versions row) is stale and ignored.
+    Re-maps automatically after the importer replaces the file; the previous
+    mapping is released once no request still holds a slice of it.
+    """
+    path = snapshot_path(source)
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _loaded.get(path)
+    if not cached or cached[0] != stamp:
+        with _lock:
+            cached = _loaded.get(path)
+            if not cached or cached[0] != stamp:
+                try:
+                    snapshot = CountySnapshot(path)
+                except (OSError, ValueError, KeyError) as exc:
+                    logger.warning(
+                        "tax snapshot %s unusable, using database: %s", path, exc
+                    )
+                    snapshot = None
+                cached = _loaded[path] = (stamp, snapshot)
+    snapshot = cached[1]
+    if snapshot is None or snapshot.dataset_version != dataset_version:
+        return None
+    return snapshot
+
+
+def value_stats(sorted_values, market_value, num_buckets=8):
+    """Subdivision stats over ascending ``sorted_values`` using bisects only."""
+    total_homes = len(sorted_values)
+    lower_values = bisect_left(sorted_values, market_value)
+    higher_values = total_homes - bisect_right(sorted_values, market_value)
+    return {
+        "total_homes": total_homes,
+        "lower_values": lower_values,
+        "higher_values": higher_values,
+        "percentile": (
+            round((lower_values / total_homes) * 100, 1) if total_homes > 0 else None
+        ),
+        "value_distribution": bucket_values(sorted_values, num_buckets),
+        "min_value": sorted_values[0] if total_homes else None,
+        "max_value": sorted_values[-1] if total_homes else None,
+        "median_value": sorted_values[total_homes // 2] if total_homes else None,
+    }
+
+
+def bucket_values(sorted_values, num_buckets=8):
+    """Evenly sized buckets across the observed range of ascending values.
+
+    Buckets are half-open except the last, which includes the maximum.
+    """
+    if not len(sorted_values):
+        return []
+    min_val = sorted_values[0]
+    max_val = sorted_values[-1]
+    if min_val == max_val:
+        return [{"label": f"${min_val / 1000:.0f}k", "count": len(sorted_values)}]
+    bucket_size = (max_val - min_val) / num_buckets
+    buckets = []
+    for i in range(num_buckets):
+        lo = min_val + i * bucket_size
+        hi = lo + bucket_size
+        end = (
+            bisect_right(sorted_values, hi)
+            if i == num_buckets - 1
+            else bisect_left(sorted_values, hi)
+        )
+        buckets.append({
+            "label": f"${lo / 1000:.0f}k",
+            "count": end - bisect_left(sorted_values, lo),
+        })
+    return buckets
@@ -0,0 +1,64 @@
+"""A local stand-in for SendGrid's v3 mail/send endpoint.
+
+Runs a real HTTP server on a loopback port so the marketing sender exercises
+its pooled session, JSON body, and status handling end to end. Point
+``Config.SENDGRID_API_BASE`` at ``server.url`` and read back ``server.requests``.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeSendGrid:
+    def __init__(self):
+        self.requests: list[dict] = []
+        # Status codes to answer with, in order; 202 once exhausted.
+        self.statuses: list[int] = []
+        # Requests addressed to any of these are rejected with a 400.
+        self.bad_emails: set[str] = set()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def personalizations(self) -> list[dict]:
+        return [p for body in self.requests for p in body['personalizations']]
+
+    def __enter__(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                status = fake.statuses.pop(0) if fake.statuses else 202
+                recipients = {
+                    to['email'] for p in body.get('personalizations', [])
+                    for to in p['to']
+                }
+                if status == 202 and recipients & fake.bad_emails:
+                    status = 400
+                if status == 202:
+                    fake.requests.append(body)
+                self.send_response(status)
+                self.send_header('X-Message-Id', f'fake-{len(fake.requests)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -331,6 +331,86 @@ class TestContactImport:
             db.session.delete(contact)
             db.session.commit()
 
+    def test_preview_dedupes_a_phone_repeated_under_another_email(
+        self, app, seed, ctx_agent_a,
+    ):
+        with app.app_context():
+            tag = _unique('dup')
+            phone = '832' + tag[-7:].rjust(7, '0')
+            rows, _meta = parse_contact_rows(
+                (
+                    'first_name,last_name,email,phone\n'
+                    f'Casey,Card,{tag}-work@example.com,{phone}\n'
+                    f'Casey,Card,{tag}-home@example.com,{phone}\n'
+                ).encode('utf-8'),
+                'people.csv',
+                'text/csv',
+                max_rows=500,
+                use_ai_headers=False,
+            )
+            preview = preview_contact_import(
+                rows,
+                actor_user_id=ctx_agent_a.user_id,
+                owner_user_id=ctx_agent_a.user_id,
+                org_id=ctx_agent_a.organization_id,
+            )
+            assert preview.create_count == 1
+            assert preview.duplicate_count == 1
+            assert preview.rows_to_create[0]['email'] == f'{tag}-work@example.com'
+
+    def test_execute_dedupes_in_one_pass_and_links_groups_in_chunks(
+        self, app, seed, ctx_agent_a, monkeypatch,
+    ):
+        import services.contact_import as contact_import
+
+        monkeypatch.setattr(contact_import, 'IMPORT_CHUNK_SIZE', 2)
+        with app.app_context():
+            tag = _unique('bulk')
+            existing = Contact(
+                organization_id=ctx_agent_a.organization_id,
+                user_id=ctx_agent_a.user_id,
+                created_by_id=ctx_agent_a.user_id,
+                first_name='Already', last_name='Here',
+                email=f'{tag}-old@example.com',
+            )
+            db.session.add(existing)
+            db.session.commit()
+
+            rows = [
+                {'first_name': 'Ann', 'last_name': tag, 'email': f'{tag}-a@example.com',
+                 'groups': 'Buyers; Nope', '_row_number': 1},
+                {'first_name': 'Bo', 'last_name': tag, 'email': f'{tag}-b@example.com',
+                 'groups': 'Sellers;Buyers', '_row_number': 2},
+                {'first_name': 'Cy', 'last_name': tag, 'email': f'{tag}-c@example.com',
+                 '_row_number': 3},
+                {'first_name': 'Old', 'last_name': tag,
+                 'email': f'{tag}-OLD@example.com', '_row_number': 4},
+                {'first_name': 'Ann', 'last_name': tag,
+                 'email': f'{tag}-a@example.com', '_row_number': 5},
+            ]
+            calls = []
+            result = execute_contact_import(
+                rows,
+                actor_user_id=ctx_agent_a.user_id,
+                owner_user_id=ctx_agent_a.user_id,
+                org_id=ctx_agent_a.organization_id,
+                progress=lambda done, total: calls.append((done, total)),
+            )
+
+            assert [c.first_name for c in result.created] == ['Ann', 'Bo', 'Cy']
+            assert result.skipped_duplicates == 2
+            assert calls == [(2, 3), (3, 3)]
+            assert any('Nope' in detail for detail in result.error_details)
+            by_name = {c.first_name: c for c in result.created}
+            assert {g.name for g in by_name['Ann'].groups} == {'Buyers'}
+            assert {g.name for g in by_name['Bo'].groups} == {'Buyers', 'Sellers'}
+            assert by_name['Cy'].groups == []
+
+            for contact in result.created + [existing]:
+                contact.groups.clear()
+                db.session.delete(contact)
+            db.session.commit()
+
 
 # ---------------------------------------------------------------------------
 # Tool policy + import confirm/undo
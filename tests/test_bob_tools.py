@@ -7,9 +7,11 @@ the same activation events as manual ones.
 
 Run with: python -m pytest tests/test_bob_tools.py -v
 """
+import json
 import os
 import sys
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 import pytest
 
@@ -29,6 +31,7 @@ from services.bob_tools import (
     dispatch,
     openai_tool_schemas,
     reject_action,
+    tool_bundle,
     undo_action,
 )
 from services.bob_tools.common import ToolError, due_datetime_utc
@@ -180,6 +183,29 @@ class TestRegistryHygiene:
             assert schema['type'] == 'function'
             assert set(schema['function']) == {'name', 'description', 'parameters'}
 
+    def test_tool_bundles_are_prebuilt_and_byte_stable(self):
+        ctx = BobContext(user_id=1, organization_id=1, surface='bob_chat')
+        first = tool_bundle(ctx)
+        again = tool_bundle(BobContext(user_id=2, organization_id=1, surface='bob_chat'))
+
+        assert again is first
+        assert json.dumps(openai_tool_schemas(ctx)) == json.dumps(list(first.schemas))
+        assert first.cache_key.startswith('bob-tools-')
+
+    def test_selecting_a_transaction_only_appends_tools(self):
+        """Telegram's search-only set stays the cached prefix once a deal is picked."""
+        searching = tool_bundle(BobContext(
+            user_id=1, organization_id=1, surface='bob_telegram',
+        ))
+        selected = tool_bundle(BobContext(
+            user_id=1, organization_id=1, surface='bob_telegram',
+            selected_transaction_id=7,
+        ))
+
+        assert len(selected.schemas) > len(searching.schemas)
+        assert selected.schemas[:len(searching.schemas)] == searching.schemas
+        assert selected.cache_key != searching.cache_key
+
 
 class TestArgumentSanitization:
     def test_identity_arguments_are_dropped(self):
@@ -1673,9 +1699,10 @@ class _FakeResponseCall:
 
 
 class _FakeResponse:
-    def __init__(self, *, text='', output=None):
+    def __init__(self, *, text='', output=None, usage=None):
         self.output_text = text
         self.output = output or []
+        self.usage = usage
 
 
 class _FakeCompletions:
@@ -1738,8 +1765,8 @@ def fake_openai(monkeypatch):
     def factory(script):
         client = _FakeClient(script)
         created['client'] = client
-        monkeypatch.setattr(ai_service.openai, 'OpenAI',
-                            lambda api_key=None: client)
+        monkeypatch.setattr(ai_service, 'get_client',
+                            lambda api_key=None, **kwargs: client)
         return client
 
     return factory
@@ -1765,6 +1792,33 @@ class TestToolLoop:
         assert text == 'Here is your agenda.'
         assert events[-1][0] == 'messages'
 
+    def test_prompt_cache_key_and_usage_reach_telemetry(self, app, fake_openai):
+        def usage(input_tokens, cached):
+            return SimpleNamespace(
+                input_tokens=input_tokens, output_tokens=10,
+                total_tokens=input_tokens + 10,
+                input_tokens_details=SimpleNamespace(cached_tokens=cached),
+            )
+
+        client = fake_openai([
+            _FakeResponse(
+                output=[_FakeResponseCall('c1', 'get_agenda', '{}')],
+                usage=usage(1000, 0),
+            ),
+            _FakeResponse(text='All clear.', usage=usage(1200, 1000)),
+        ])
+        events = self._run(prompt_cache_key='bob-tools-abc')
+
+        assert [c['prompt_cache_key'] for c in client.responses.calls] == [
+            'bob-tools-abc', 'bob-tools-abc',
+        ]
+        telemetry = next(p for e, p in events if e == 'telemetry')
+        assert telemetry['usage']['cached_tokens'] == 1000
+        assert telemetry['prompt_cache'] == {
+            'key': 'bob-tools-abc', 'rounds': 2, 'input_tokens': 2200,
+            'cached_tokens': 1000, 'hit_rate': 0.455,
+        }
+
     def test_tool_call_then_answer(self, app, fake_openai):
         fake_openai([
             _FakeMessage(tool_calls=[
@@ -1812,6 +1866,47 @@ class TestToolLoop:
         self._run(execute=lambda n, a: (seen.append(a) or ({'status': 'ok'}, {'ok': True})))
         assert seen == [{}]
 
+    def test_reads_in_one_round_run_concurrently_and_writes_stay_in_order(
+        self, app, fake_openai,
+    ):
+        import threading
+
+        from services.bob_tools import parallel_safe
+
+        fake_openai([
+            _FakeMessage(tool_calls=[
+                _FakeToolCall('c1', 'search_contacts', '{"query": "Sarah"}'),
+                _FakeToolCall('c2', 'get_agenda', '{}'),
+                _FakeToolCall('c3', 'list_tasks', '{}'),
+                _FakeToolCall('c4', 'create_task', '{"subject": "Call"}'),
+                _FakeToolCall('c5', 'select_transaction_context', '{}'),
+                _FakeToolCall('c6', 'count_contacts', '{}'),
+            ]),
+            _FakeMessage(content='Done.'),
+        ])
+        # Only passes if the first three reads are in flight together.
+        barrier = threading.Barrier(3, timeout=5)
+        ran = []
+
+        def execute(name, args):
+            if name in ('search_contacts', 'get_agenda', 'list_tasks'):
+                barrier.wait()
+            ran.append(name)
+            return {'status': 'ok', 'tool': name}, {'ok': True, 'name': name}
+
+        with app.app_context():
+            events = self._run(execute=execute, parallel_safe=parallel_safe)
+
+        assert ran[3:] == ['create_task', 'select_transaction_context', 'count_contacts']
+        results = [p['name'] for e, p in events if e == 'tool_result']
+        assert results == [
+            'search_contacts', 'get_agenda', 'list_tasks',
+            'create_task', 'select_transaction_context', 'count_contacts',
+        ]
+        transcript = [p for e, p in events if e == 'messages'][0]
+        tool_rows = [m['tool_call_id'] for m in transcript if m['role'] == 'tool']
+        assert tool_rows == ['c1', 'c2', 'c3', 'c4', 'c5', 'c6']
+
     def test_round_cap_stops_a_runaway_model(self, app, fake_openai):
         client = fake_openai([
             _FakeMessage(tool_calls=[_FakeToolCall(f'c{i}', 'get_agenda', '{}')])
@@ -1989,3 +2084,83 @@ class TestToolLoopWithRealDispatch:
             results = [p['result'] for e, p in events if e == 'tool_result']
             assert results[0]['requires_confirmation'] is True
             assert results[0]['action_id'] is not None
+
+    def test_parallel_reads_each_get_their_own_session(self, app, seed,
+                                                       ctx_owner_a, fake_openai):
+        from services.ai_service import run_tool_conversation
+        from services.bob_tools import parallel_safe
+
+        fake_openai([
+            _FakeMessage(tool_calls=[
+                _FakeToolCall('c1', 'count_contacts', '{}'),
+                _FakeToolCall('c2', 'get_contact',
+                              '{"contact_id": %d}' % seed['contact_a']),
+                _FakeToolCall('c3', 'list_tasks', '{}'),
+            ]),
+            _FakeMessage(content='Here you go.'),
+        ])
+
+        with app.app_context():
+            request_session = id(db.session())
+            sessions = set()
+
+            def execute(name, args):
+                sessions.add(id(db.session()))
+                result = dispatch(name, args, ctx_owner_a)
+                return result.for_model(), result.for_client()
+
+            events = list(run_tool_conversation(
+                system_prompt='You are B.O.B.',
+                messages=[{'role': 'user', 'content': 'status?'}],
+                tools=openai_tool_schemas(),
+                execute_tool=execute,
+                parallel_safe=parallel_safe,
+            ))
+
+        results = [p['result'] for e, p in events if e == 'tool_result']
+        assert [r['ok'] for r in results] == [True, True, True]
+        assert request_session not in sessions
+
+    def test_parallel_reads_set_the_org_rls_context(self, app, seed,
+                                                    ctx_owner_a, fake_openai,
+                                                    monkeypatch):
+        """Fresh worker sessions must carry SET LOCAL app.current_org_id."""
+        import threading
+
+        import jobs.base
+        from services.ai_service import run_tool_conversation
+        from services.bob_tools import parallel_safe
+
+        scoped = {}
+
+        def set_context(org_id):
+            scoped[(threading.get_ident(), id(db.session()))] = org_id
+
+        monkeypatch.setattr(jobs.base, 'set_job_org_context', set_context)
+        fake_openai([
+            _FakeMessage(tool_calls=[
+                _FakeToolCall('c1', 'count_contacts', '{}'),
+                _FakeToolCall('c2', 'list_tasks', '{}'),
+            ]),
+            _FakeMessage(content='Here you go.'),
+        ])
+
+        with app.app_context():
+            seen = []
+
+            def execute(name, args):
+                key = (threading.get_ident(), id(db.session()))
+                seen.append(scoped.get(key))
+                result = dispatch(name, args, ctx_owner_a)
+                return result.for_model(), result.for_client()
+
+            list(run_tool_conversation(
+                system_prompt='You are B.O.B.',
+                messages=[{'role': 'user', 'content': 'status?'}],
+                tools=openai_tool_schemas(),
+                execute_tool=execute,
+                parallel_safe=parallel_safe,
+                org_id=seed['org_a'],
+            ))
+
+        assert seen == [seed['org_a'], seed['org_a']]
@@ -0,0 +1,113 @@
+"""Bounded, multi-process lookup cache (services/cache_backend)."""
+
+import json
+import time
+
+from services.cache_backend import CacheStats, LocalLRUCache, TieredCache
+
+
+def _tiered(**kwargs):
+    return TieredCache(LocalLRUCache(**kwargs))
+
+
+def test_lru_evicts_least_recently_used_by_count():
+    cache = LocalLRUCache(max_entries=2)
+    cache.set('a', [1], 60)
+    cache.set('b', [2], 60)
+    assert cache.get('a') == [1]  # touch a so b is the oldest
+    cache.set('c', [3], 60)
+
+    assert 'b' not in cache
+    assert cache.get('a') == [1]
+    assert cache.get('c') == [3]
+    assert cache.stats.snapshot()['evictions'] == 1
+
+
+def test_lru_evicts_by_bytes_and_skips_oversized_values():
+    cache = LocalLRUCache(max_entries=100, max_bytes=20)
+    cache.set('a', list(range(3)), 60)  # "[0,1,2]" = 7 bytes
+    cache.set('b', list(range(3)), 60)
+    cache.set('c', list(range(3)), 60)
+    assert len(cache) == 2
+    assert cache.size_bytes <= 20
+
+    cache.set('huge', list(range(100)), 60)
+    assert 'huge' not in cache
+
+
+def test_expired_entries_are_dropped_and_counted():
+    cache = LocalLRUCache()
+    cache.set('k', [1], 0.01)
+    time.sleep(0.02)
+    assert cache.get('k') is None
+    assert len(cache) == 0
+    assert cache.stats.snapshot()['expirations'] == 1
+
+
+def test_tiered_cache_counts_hits_and_misses():
+    cache = _tiered()
+    assert cache.get('missing') is None
+    cache.set('k', [1, 2], 60)
+    assert cache.get('k') == [1, 2]
+
+    stats = cache.stats_snapshot()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+    assert stats['redis_enabled'] is False
+
+
+def test_remote_invalidation_message_drops_local_entries():
+    cache = _tiered()
+    cache.set('contact_groups_1_2_active', [5], 60)
+    cache.set('contact_groups_1_2_all', [5, 6], 60)
+
+    cache.handle_invalidation({
+        'type': 'message',
+        'data': json.dumps(['contact_groups_1_2_active', 'contact_groups_1_2_all']).encode(),
+    })
+
+    assert cache.get('contact_groups_1_2_active') is None
+    assert cache.get('contact_groups_1_2_all') is None
+    assert cache.stats_snapshot()['remote_invalidations'] == 2
+
+
+def test_unreachable_redis_degrades_to_local_only():
+    cache = TieredCache(LocalLRUCache(), redis_url='redis://127.0.0.1:1/0')
+    cache.set('k', [1], 60)
+    assert cache.get('k') == [1]
+    cache.delete('k')
+    assert cache.get('k') is None
+
+    stats = cache.stats_snapshot()
+    assert stats['redis_errors'] == 1
+    assert stats['redis_connected'] is False
+
+
+def test_user_contact_groups_cache_tracks_stats(app, seed):
+    from services.cache_helpers import (
+        _cache,
+        cache_stats,
+        clear_user_contact_groups_cache,
+        get_user_contact_groups,
+    )
+
+    with app.app_context():
+        _cache.clear()
+        _cache.stats.reset()
+        clear_user_contact_groups_cache(seed['org_a'], seed['owner_a'])
+        first = get_user_contact_groups(seed['org_a'], seed['owner_a'])
+        second = get_user_contact_groups(seed['org_a'], seed['owner_a'])
+
+        assert [g.id for g in first] == [g.id for g in second]
+        stats = cache_stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 1
+        assert stats['invalidations'] == 2
+
+
+def test_stats_reset():
+    stats = CacheStats()
+    stats.incr('hits', 3)
+    stats.reset()
+    assert stats.snapshot()['hits'] == 0
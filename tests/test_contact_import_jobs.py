@@ -0,0 +1,328 @@
+"""Background Contacts page imports: streaming parse, checkpoints, status."""
+from __future__ import annotations
+
+import io
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Contact, ContactImportJob, db
+from services import contact_import_jobs
+from services.contact_import import count_contact_rows, open_contact_rows
+from services.contact_import_jobs import (
+    create_import_job,
+    enqueue_import_job,
+    import_job_payload,
+    recover_stalled_import,
+    recover_stalled_imports,
+    run_import_job,
+)
+
+
+def _unique(prefix='x'):
+    return f'{prefix}{datetime.utcnow().strftime("%H%M%S%f")}'
+
+
+def _csv(tag, names):
+    lines = ['First Name,Last Name,Email,Groups']
+    for first, email_key, groups in names:
+        email = f'{tag}-{email_key}@example.com' if email_key else ''
+        last = tag if first else ''
+        lines.append(f'{first},{last},{email},{groups}')
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _cleanup(tag):
+    for contact in Contact.query.filter_by(last_name=tag).all():
+        contact.groups.clear()
+        db.session.delete(contact)
+    ContactImportJob.query.filter(
+        ContactImportJob.filename.like(f'{tag}%')
+    ).delete(synchronize_session=False)
+    db.session.commit()
+
+
+class TestStreamingParse:
+    def test_xlsx_rows_stream_with_row_cap(self):
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        ws = wb.active
+        ws.append(['Name', 'E-mail', 'Favorite Color'])
+        ws.append(['Casey Card', 'casey@example.com', 'blue'])
+        ws.append([None, None, None])
+        ws.append(['Drew Deal', 'drew@example.com', None])
+        ws.append(['Eli Extra', 'eli@example.com', None])
+        buf = io.BytesIO()
+        wb.save(buf)
+        data = buf.getvalue()
+
+        rows, meta = open_contact_rows(
+            data, 'people.xlsx', max_rows=2, use_ai_headers=False,
+        )
+        first = next(rows)
+        assert first['first_name'] == 'Casey'
+        assert first['last_name'] == 'Card'
+        assert first['notes'] == 'Favorite Color: blue'
+        assert meta['warnings'] == []
+
+        rest = list(rows)
+        assert [row['first_name'] for row in rest] == ['Drew']
+        assert rest[0]['_row_number'] == 2
+        assert meta['warnings'] == ['Only the first 2 rows were imported.']
+        assert count_contact_rows(data, 'people.xlsx') == 4
+
+    def test_csv_falls_back_to_latin1_and_counts_rows(self):
+        data = 'first_name,last_name\nJos\xe9,Pe\xf1a\n\nAna,Ruiz\n'.encode('latin-1')
+        rows, meta = open_contact_rows(data, 'people.csv', use_ai_headers=False)
+        assert [row['first_name'] for row in rows] == ['Jos\xe9', 'Ana']
+        assert count_contact_rows(data, 'people.csv') == 2
+
+    def test_unmappable_headers_fail_before_reading_rows(self):
+        with pytest.raises(Exception) as exc:
+            open_contact_rows(b'foo,bar\n1,2\n', 'x.csv', use_ai_headers=False)
+        assert 'name columns' in exc.value.message
+
+
+class TestImportJob:
+    def test_no_queue_under_sqlite(self, app, seed):
+        with app.app_context():
+            tag = _unique('q')
+            job = create_import_job(
+                _csv(tag, [('Ann', 'a', '')]),
+                filename=f'{tag}.csv', mime='text/csv',
+                actor_user_id=seed['agent_a'], owner_user_id=seed['agent_a'],
+                org_id=seed['org_a'],
+            )
+            assert job.status == ContactImportJob.STATUS_QUEUED
+            assert job.total_rows == 1
+            assert enqueue_import_job(job) is False
+            _cleanup(tag)
+
+    def test_enqueue_hands_job_and_org_ids_to_the_worker(self, app, seed,
+                                                         monkeypatch):
+        """RQ reserves ``job_id``; the import's ids must travel as job kwargs."""
+        from unittest.mock import MagicMock, patch
+
+        from config import Config
+        from jobs import dispatch
+
+        monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', 'postgresql://queue-test')
+        dispatch.reset()
+        queue = MagicMock()
+        with app.app_context():
+            tag = _unique('q')
+            job = create_import_job(
+                _csv(tag, [('Ann', 'a', '')]),
+                filename=f'{tag}.csv', mime='text/csv',
+                actor_user_id=seed['agent_a'], owner_user_id=seed['agent_a'],
+                org_id=seed['org_a'],
+            )
+            with patch('redis.Redis.from_url', return_value=MagicMock()), \
+                 patch('rq.Queue', return_value=queue):
+                assert enqueue_import_job(job) is True
+
+            call = queue.enqueue.call_args
+            assert call.args == ('jobs.contact_import.process_contact_import_job',)
+            assert call.kwargs['kwargs'] == {
+                'job_id': job.id, 'org_id': seed['org_a'],
+            }
+            assert call.kwargs['job_id'] != job.id
+            _cleanup(tag)
+        dispatch.reset()
+
+    def test_resumes_from_last_committed_chunk(self, app, seed, monkeypatch):
+        monkeypatch.setattr(contact_import_jobs, 'IMPORT_CHUNK_SIZE', 2)
+        real_insert = contact_import_jobs.insert_contact_chunk
+        calls = {'n': 0}
+
+        def flaky_insert(*args, **kwargs):
+            calls['n'] += 1
+            if calls['n'] == 2:
+                raise RuntimeError('worker lost its connection')
+            return real_insert(*args, **kwargs)
+
+        monkeypatch.setattr(contact_import_jobs, 'insert_contact_chunk', flaky_insert)
+        with app.app_context():
+            tag = _unique('resume')
+            job = create_import_job(
+                _csv(tag, [
+                    ('Ann', 'a', 'Buyers'),
+                    ('Bo', 'b', ''),
+                    ('Cy', 'c', 'Nope'),
+                    ('Ann', 'a', ''),
+                    ('', '', 'Buyers'),
+                ]),
+                filename=f'{tag}.csv', mime='text/csv',
+                actor_user_id=seed['agent_a'], owner_user_id=seed['agent_a'],
+                org_id=seed['org_a'],
+            )
+
+            with pytest.raises(RuntimeError):
+                run_import_job(job.id, seed['org_a'])
+            job = db.session.get(ContactImportJob, job.id)
+            assert job.status == ContactImportJob.STATUS_RUNNING
+            assert job.processed_rows == 2
+            assert job.created_count == 2
+
+            job = run_import_job(job.id, seed['org_a'])
+            assert job.status == ContactImportJob.STATUS_COMPLETED
+            assert job.attempts == 2
+            assert job.processed_rows == job.total_rows == 5
+            assert job.created_count == 3
+            # Row 4 repeats row 1 from the chunk committed before the crash.
+            assert job.duplicate_count == 1
+            assert job.missing_name_count == 1
+            assert job.file_data is None
+            assert any('Nope' in detail for detail in job.error_details)
+
+            contacts = Contact.query.filter_by(last_name=tag).all()
+            assert sorted(c.first_name for c in contacts) == ['Ann', 'Bo', 'Cy']
+            ann = next(c for c in contacts if c.first_name == 'Ann')
+            assert [g.name for g in ann.groups] == ['Buyers']
+
+            payload = import_job_payload(job)
+            assert payload['status'] == 'partial_success'
+            assert payload['success_count'] == 3
+            assert payload['error_count'] == 1
+            _cleanup(tag)
+
+
+    def test_import_over_the_plan_limit_creates_nothing(self, app, seed, monkeypatch):
+        from models import Organization
+
+        # The first chunk alone would fit; the file as a whole does not.
+        monkeypatch.setattr(contact_import_jobs, 'IMPORT_CHUNK_SIZE', 2)
+        with app.app_context():
+            org = db.session.get(Organization, seed['org_a'])
+            original_limit = org.max_contacts
+            org.max_contacts = Contact.query.filter_by(
+                organization_id=seed['org_a'],
+            ).count() + 2
+            db.session.commit()
+            tag = _unique('cap')
+            try:
+                job = create_import_job(
+                    _csv(tag, [('Ann', 'a', ''), ('Bo', 'b', ''), ('Cy', 'c', '')]),
+                    filename=f'{tag}.csv', mime='text/csv',
+                    actor_user_id=seed['agent_a'], owner_user_id=seed['agent_a'],
+                    org_id=seed['org_a'],
+                )
+                job = run_import_job(job.id, seed['org_a'])
+
+                assert job.status == ContactImportJob.STATUS_FAILED
+                assert job.created_count == 0
+                assert 'No contacts were imported' in job.error
+                assert Contact.query.filter_by(last_name=tag).count() == 0
+            finally:
+                org = db.session.get(Organization, seed['org_a'])
+                org.max_contacts = original_limit
+                db.session.commit()
+                _cleanup(tag)
+
+
+    def test_stalled_running_job_is_requeued_once(self, app, seed, monkeypatch):
+        requeued = []
+        monkeypatch.setattr(
+            contact_import_jobs, 'enqueue_import_job',
+            lambda job: requeued.append(job.id) or True,
+        )
+        with app.app_context():
+            tag = _unique('stall')
+            try:
+                job = create_import_job(
+                    _csv(tag, [('Ann', 'a', '')]),
+                    filename=f'{tag}.csv', mime='text/csv',
+                    actor_user_id=seed['agent_a'], owner_user_id=seed['agent_a'],
+                    org_id=seed['org_a'],
+                )
+                # What a hard-killed worker leaves behind.
+                job.status = ContactImportJob.STATUS_RUNNING
+                job.attempts = 1
+                job.heartbeat_at = datetime.utcnow() - timedelta(minutes=30)
+                db.session.commit()
+
+                assert recover_stalled_import(job) is True
+                assert recover_stalled_import(job) is False
+                assert requeued == [job.id]
+                assert job.heartbeat_at > datetime.utcnow() - timedelta(minutes=1)
+
+                job = run_import_job(job.id, seed['org_a'])
+                assert job.status == ContactImportJob.STATUS_COMPLETED
+                assert job.created_count == 1
+            finally:
+                _cleanup(tag)
+
+    def test_stalled_job_on_its_last_attempt_fails(self, app, seed, monkeypatch):
+        monkeypatch.setattr(
+            contact_import_jobs, 'enqueue_import_job',
+            lambda job: pytest.fail('a spent job must not be requeued'),
+        )
+        with app.app_context():
+            tag = _unique('spent')
+            try:
+                job = create_import_job(
+                    _csv(tag, [('Ann', 'a', '')]),
+                    filename=f'{tag}.csv', mime='text/csv',
+                    actor_user_id=seed['agent_a'], owner_user_id=seed['agent_a'],
+                    org_id=seed['org_a'],
+                )
+                job.status = ContactImportJob.STATUS_RUNNING
+                job.attempts = contact_import_jobs.MAX_ATTEMPTS
+                job.heartbeat_at = datetime.utcnow() - timedelta(minutes=30)
+                db.session.commit()
+
+                assert recover_stalled_imports(seed['org_a']) == 1
+                db.session.refresh(job)
+                assert job.status == ContactImportJob.STATUS_FAILED
+                assert job.file_data is None
+            finally:
+                _cleanup(tag)
+
+
+class TestImportRoute:
+    def test_inline_import_and_status_endpoint(self, app, agent_a_client):
+        tag = _unique('route')
+        resp = agent_a_client.post('/import-contacts', data={
+            'file': (io.BytesIO(_csv(tag, [('Ann', 'a', ''), ('Bo', 'b', '')])),
+                     f'{tag}.csv'),
+        }, content_type='multipart/form-data')
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert body['status'] == 'success'
+        assert body['success_count'] == 2
+        assert body['state'] == ContactImportJob.STATUS_COMPLETED
+
+        status = agent_a_client.get(f"/import-contacts/{body['job_id']}")
+        assert status.status_code == 200
+        assert status.get_json()['success_count'] == 2
+
+        with app.app_context():
+            _cleanup(tag)
+
+    def test_bad_headers_fail_in_request(self, agent_a_client):
+        resp = agent_a_client.post('/import-contacts', data={
+            'file': (io.BytesIO(b'foo,bar\n1,2\n'), 'junk.csv'),
+        }, content_type='multipart/form-data')
+        assert resp.status_code == 400
+        assert resp.get_json()['status'] == 'error'
+
+    def test_status_is_scoped_to_the_uploader(self, app, seed, agent_a_client):
+        with app.app_context():
+            tag = _unique('scope')
+            job = create_import_job(
+                _csv(tag, [('Ann', 'a', '')]),
+                filename=f'{tag}.csv', mime='text/csv',
+                actor_user_id=seed['owner_a'], owner_user_id=seed['owner_a'],
+                org_id=seed['org_a'],
+            )
+            job_id = job.id
+
+        assert agent_a_client.get(f'/import-contacts/{job_id}').status_code == 403
+
+        with app.app_context():
+            _cleanup(tag)
@@ -5,6 +5,7 @@ from unittest.mock import patch
 from models import (
     ContractBootstrapSession,
     Transaction,
+    TransactionAddressToken,
     TransactionParticipant,
     TransactionRequirement,
     User,
@@ -119,6 +120,68 @@ def test_cb4_wrong_org_transaction_never_returned(app, seed):
         assert all(m['transaction_id'] for m in own)
 
 
+def test_address_index_is_maintained_on_write_and_bounds_matching(app, seed):
+    """
+    Given transactions whose addresses contain or are contained in the
+    contract address, matching finds them through the persisted key and
+    house-number tokens, and renaming a street re-indexes it on flush.
+    """
+    with app.app_context():
+        org_id = seed['org_a']
+        user = _user(seed)
+        exact = _make_tx(org_id, user.id, seed['tx_type_a'], '4417 Quail Hollow Ct.')
+        unit = _make_tx(org_id, user.id, seed['tx_type_a'], '4417 Quail Hollow Unit 2B')
+        other = _make_tx(org_id, user.id, seed['tx_type_a'], '4418 Quail Hollow Ct')
+
+        assert exact.address_match_key == '4417 quail hollow'
+        tokens = {
+            row.token for row in TransactionAddressToken.query.filter_by(
+                transaction_id=unit.id,
+            )
+        }
+        # Subset: SQLite does not cascade the bulk deletes other tests make,
+        # so a reused transaction id may still carry a stale row.
+        assert {'4417', 'quail', 'hollow', 'unit', '2b'} <= tokens
+
+        matches = find_transaction_matches(org_id=org_id, address='4417 Quail Hollow Court')
+        by_id = {m['transaction_id']: m for m in matches}
+        assert by_id[exact.id]['reason'] == 'exact_address_match'
+        assert by_id[unit.id]['reason'] == 'partial_address_match'
+        assert other.id not in by_id
+        assert matches[0]['transaction_id'] == exact.id
+
+        other.street_address = '4417 Quail Hollow Court'
+        db.session.flush()
+        assert other.address_match_key == '4417 quail hollow'
+        matches = find_transaction_matches(org_id=org_id, address='4417 Quail Hollow')
+        assert other.id in {m['transaction_id'] for m in matches}
+        assert TransactionAddressToken.query.filter_by(
+            transaction_id=other.id, token='4418',
+        ).count() == 0
+        db.session.rollback()
+
+
+def test_candidate_cap_keeps_exact_address_matches(app, seed, monkeypatch):
+    """
+    Given more same-number transactions than the candidate cap, exact
+    address matches created before and after them are still returned.
+    """
+    import services.contract_bootstrap as contract_bootstrap
+
+    monkeypatch.setattr(contract_bootstrap, 'MATCH_CANDIDATE_LIMIT', 2)
+    with app.app_context():
+        org_id = seed['org_a']
+        user = _user(seed)
+        older = _make_tx(org_id, user.id, seed['tx_type_a'], '9120 Cedar Ridge Dr')
+        for street in ('9120 Elm St', '9120 Oak St', '9120 Pine St'):
+            _make_tx(org_id, user.id, seed['tx_type_a'], street)
+        newer = _make_tx(org_id, user.id, seed['tx_type_a'], '9120 Cedar Ridge Dr.')
+
+        matches = find_transaction_matches(org_id=org_id, address='9120 Cedar Ridge Drive')
+        assert {m['transaction_id'] for m in matches} == {older.id, newer.id}
+        db.session.rollback()
+
+
 def test_cb10_classify_extract_does_not_mutate_transaction_before_approve(app, seed):
     """
     CB10: Given extraction finished and the agent has not approved,
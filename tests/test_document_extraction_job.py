@@ -76,7 +76,7 @@ class TestPostUploadEnqueue:
         assert resp.status_code == 200
         mock_queue_instance.enqueue.assert_called_once()
         call_kwargs = mock_queue_instance.enqueue.call_args
-        assert call_kwargs.kwargs['doc_id'] == seed['doc_a']
+        assert call_kwargs.kwargs['kwargs']['doc_id'] == seed['doc_a']
 
     def test_unknown_placeholder_slug_also_enqueues_universal_review(
         self, app, db, owner_a_client, seed,
@@ -117,7 +117,7 @@ class TestPostUploadEnqueue:
 
             assert response.status_code == 200
             mock_queue.enqueue.assert_called_once()
-            assert mock_queue.enqueue.call_args.kwargs['doc_id'] == doc_id
+            assert mock_queue.enqueue.call_args.kwargs['kwargs']['doc_id'] == doc_id
         finally:
             with app.app_context():
                 TransactionDocument.query.filter_by(id=doc_id).delete()
@@ -0,0 +1,256 @@
+"""Extraction pipeline: cached runs, shared pages and page windows."""
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import fitz
+
+from models import DocumentExtractionRun, Transaction, TransactionDocument, TransactionType, db
+from services.document_extractor import extract_document_data
+from services.extraction_merge import merge_results, remap_result
+
+
+def _pdf_from_pages(pages: list[str]) -> bytes:
+    doc = fitz.open()
+    try:
+        for index, text in enumerate(pages):
+            doc.insert_page(index, text=text)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def _doc(org_id, user_id, name):
+    tx_type = TransactionType.query.filter_by(organization_id=org_id, name='seller').first()
+    tx = Transaction(
+        organization_id=org_id,
+        created_by_id=user_id,
+        transaction_type_id=tx_type.id,
+        street_address='44 Cache Court',
+        city='Austin',
+        state='TX',
+        status='preparing_to_list',
+    )
+    db.session.add(tx)
+    db.session.flush()
+    doc = TransactionDocument(
+        organization_id=org_id,
+        transaction_id=tx.id,
+        template_slug='inspection-report',
+        template_name=name,
+        status='signed',
+        document_source='completed',
+        signed_file_path=f'test/{name}.pdf',
+        field_data={},
+        extraction_status='pending',
+    )
+    db.session.add(doc)
+    db.session.commit()
+    return doc.id
+
+
+@contextmanager
+def _extraction(result):
+    model_kwargs = {'side_effect': result} if callable(result) else {'return_value': result}
+    with patch(
+        'services.document_identity.resolve_upload_identity_for_extraction',
+        return_value=('inspection-report', None, False),
+    ), patch(
+        'services.ai_service.generate_document_extraction',
+        **model_kwargs,
+    ) as model, patch(
+        'services.document_review.finalize_document_review',
+        return_value=None,
+    ), patch(
+        'services.seller_workflow.split_offer_package_into_children',
+        return_value=[],
+    ), patch(
+        'services.seller_workflow.split_contract_package_into_children',
+        return_value=[],
+    ), patch(
+        'services.seller_workflow.split_listing_package_into_children',
+        return_value=[],
+    ):
+        yield model
+
+
+def _run_for(doc_id):
+    return DocumentExtractionRun.query.filter_by(document_id=doc_id).one()
+
+
+def test_identical_file_reuses_prior_run(app, seed):
+    pdf = _pdf_from_pages(['Survey for 44 Cache Court', 'Plumbing notes'])
+    result = {
+        'property_address': '44 Cache Court',
+        'document_summary': 'Inspection report.',
+        '_meta': {'property_address': {'page': 1, 'confidence': 0.9}},
+    }
+    with app.app_context():
+        first_id = _doc(seed['org_a'], seed['owner_a'], 'first')
+        second_id = _doc(seed['org_a'], seed['owner_a'], 'second')
+
+        with _extraction(result) as model:
+            extract_document_data(first_id, seed['org_a'], pdf)
+            extract_document_data(second_id, seed['org_a'], pdf)
+
+        assert model.call_count == 1
+        first, second = _run_for(first_id), _run_for(second_id)
+        assert second.cached_from_run_id == first.id
+        assert second.schema_version == first.schema_version
+        assert len(second.page_fingerprints) == 2
+        assert db.session.get(TransactionDocument, second_id).field_data['property_address'] == '44 Cache Court'
+
+        app.config['EXTRACTION_CACHE_ENABLED'] = False
+        try:
+            third_id = _doc(seed['org_a'], seed['owner_a'], 'third')
+            with _extraction(result) as model:
+                extract_document_data(third_id, seed['org_a'], pdf)
+            assert model.call_count == 1
+            assert _run_for(third_id).cached_from_run_id is None
+        finally:
+            app.config['EXTRACTION_CACHE_ENABLED'] = True
+
+
+def test_shared_pages_only_send_new_pages(app, seed):
+    first_pdf = _pdf_from_pages(['Inspection report for 44 Cache Court', 'Roof notes'])
+    packet_pdf = _pdf_from_pages([
+        'Repair amendment cover', 'Inspection report for 44 Cache Court', 'Roof notes',
+    ])
+    with app.app_context():
+        first_id = _doc(seed['org_a'], seed['owner_a'], 'report')
+        packet_id = _doc(seed['org_a'], seed['owner_a'], 'packet')
+
+        with _extraction({
+            'property_address': '44 Cache Court',
+            'sanity_flags': [{'code': 'roof', 'message': 'Roof damage', 'page': 2}],
+            '_meta': {'property_address': {'page': 1, 'confidence': 0.9}},
+        }):
+            extract_document_data(first_id, seed['org_a'], first_pdf)
+
+        with _extraction({
+            'document_title': 'Repair Amendment',
+            '_meta': {'document_title': {'page': 1, 'confidence': 0.8}},
+        }) as model:
+            extract_document_data(packet_id, seed['org_a'], packet_pdf)
+
+        assert model.call_count == 1
+        assert len(model.call_args.kwargs['images']) == 1
+        assert 'Only pages 1 are attached' in model.call_args.kwargs['user_prompt']
+
+        field_data = db.session.get(TransactionDocument, packet_id).field_data
+        assert field_data['property_address'] == '44 Cache Court'
+        assert field_data['_meta']['property_address']['page'] == 2
+        assert field_data['document_title'] == 'Repair Amendment'
+        assert field_data['sanity_flags'] == [
+            {'code': 'roof', 'message': 'Roof damage', 'page': 3},
+        ]
+        assert _run_for(packet_id).cached_from_run_id == _run_for(first_id).id
+
+
+def test_long_document_runs_page_windows_and_merges(app, seed):
+    pdf = _pdf_from_pages([f'Window packet page {page}' for page in range(1, 6)])
+    window_results = {
+        '1, 2': {
+            'document_title': 'Purchase Contract',
+            'detected_documents': [
+                {'document_type': 'contract', 'start_page': 1, 'end_page': 2},
+            ],
+            '_meta': {'document_title': {'page': 1, 'confidence': 0.9}},
+        },
+        '3, 4': {
+            'document_title': 'Page Three Heading',
+            'closing_date': '2026-11-20',
+            'detected_documents': [
+                {'document_type': 'contract', 'start_page': 1, 'end_page': 1},
+                {'document_type': 'hoa_addendum', 'start_page': 2, 'end_page': 2},
+            ],
+            '_meta': {
+                'document_title': {'page': 3, 'confidence': 0.99},
+                'closing_date': {'page': 2, 'confidence': 0.8},
+            },
+        },
+        '5': {
+            'sanity_flags': [{'code': 'blank', 'message': 'Blank page', 'page': 5}],
+        },
+    }
+
+    def fake_model(*, system_prompt, user_prompt, images):
+        for pages, result in window_results.items():
+            if f'Only pages {pages} are attached' in user_prompt:
+                return result
+        raise AssertionError(user_prompt)
+
+    with app.app_context():
+        doc_id = _doc(seed['org_a'], seed['owner_a'], 'windows')
+        app.config['EXTRACTION_WINDOW_PAGES'] = 2
+        try:
+            with _extraction(fake_model) as model:
+                extract_document_data(doc_id, seed['org_a'], pdf)
+        finally:
+            app.config['EXTRACTION_WINDOW_PAGES'] = 10
+
+        assert model.call_count == 3
+        field_data = db.session.get(TransactionDocument, doc_id).field_data
+        assert field_data['document_title'] == 'Purchase Contract'
+        assert field_data['closing_date'] == '2026-11-20'
+        assert field_data['_meta']['closing_date']['page'] == 4
+        assert field_data['sanity_flags'][0]['page'] == 5
+        run = _run_for(doc_id)
+        assert run.pages_sent == 5
+        assert run.raw_output['detected_documents'] == [
+            {'document_type': 'contract', 'start_page': 1, 'end_page': 3},
+            {'document_type': 'hoa_addendum', 'start_page': 4, 'end_page': 4},
+        ]
+
+
+def test_merge_prefers_earliest_page_and_unions_page_lists():
+    reused = remap_result({
+        'closing_date': '2026-09-01',
+        'option_fee': '200',
+        'unreadable_pages': [2, 5],
+        '_meta': {
+            'closing_date': {'page': 3, 'confidence': 0.9},
+            'option_fee': {'page': 9, 'confidence': 0.9},
+        },
+    }, {2: 4, 3: 5}, strict=True)
+    assert reused == {
+        'closing_date': '2026-09-01',
+        'unreadable_pages': [4],
+        '_meta': {'closing_date': {'page': 5, 'confidence': 0.9}},
+    }
+
+    merged = merge_results([reused, {
+        'closing_date': '2026-08-15',
+        'unreadable_pages': [1],
+        '_meta': {'closing_date': {'page': 1, 'confidence': 0.6}},
+    }])
+    assert merged['closing_date'] == '2026-08-15'
+    assert merged['_meta']['closing_date']['page'] == 1
+    assert merged['unreadable_pages'] == [1, 4]
+
+
+def test_merge_combines_addenda_found_in_different_windows():
+    merged = merge_results([
+        {
+            'addenda': {
+                'third_party_financing': {'present': True, 'page': 9},
+                'hoa_addendum': None,
+            },
+            'supporting_documents': {'survey': {'present': True}},
+        },
+        {
+            'addenda': {
+                'third_party_financing': {'present': False},
+                'hoa_addendum': {'present': True, 'page': 14},
+            },
+            'supporting_documents': {'seller_disclosure': {'present': True}},
+        },
+    ], join_at=[11])
+
+    assert merged['addenda'] == {
+        'third_party_financing': {'present': True, 'page': 9},
+        'hoa_addendum': {'present': True, 'page': 14},
+    }
+    assert merged['supporting_documents'] == {
+        'survey': {'present': True},
+        'seller_disclosure': {'present': True},
+    }
@@ -0,0 +1,195 @@
+"""Global search and contact list filtering over maintained search documents."""
+from __future__ import annotations
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import update
+
+from models import Contact, Transaction, TransactionParticipant, db
+from services.search_index import search_filter, search_terms
+
+
+def _unique(prefix='x'):
+    return f'{prefix}{datetime.utcnow().strftime("%H%M%S%f")}'
+
+
+def _titles(resp, label):
+    groups = {g['label']: g['items'] for g in resp.get_json()['groups']}
+    return [item['title'] for item in groups.get(label, [])]
+
+
+class TestSearchDocuments:
+    def test_document_tracks_orm_writes(self, app, seed):
+        with app.app_context():
+            tag = _unique('doc')
+            contact = Contact(
+                organization_id=seed['org_a'], user_id=seed['owner_a'],
+                created_by_id=seed['owner_a'],
+                first_name='Quinn', last_name=tag, phone='(832) 555-0199',
+                city='Katy',
+            )
+            db.session.add(contact)
+            db.session.commit()
+            assert contact.search_document == (
+                f'quinn {tag.lower()} katy (832) 555-0199 8325550199'
+            )
+
+            contact.email = 'Quinn@Example.com'
+            db.session.commit()
+            assert 'quinn@example.com' in contact.search_document
+
+            db.session.delete(contact)
+            db.session.commit()
+
+    def test_sqlite_matches_through_trigram_fts_index(self, app, seed):
+        with app.app_context():
+            tag = _unique('fts')
+            contact = Contact(
+                organization_id=seed['org_a'], user_id=seed['owner_a'],
+                created_by_id=seed['owner_a'], first_name='Fern', last_name=tag,
+            )
+            db.session.add(contact)
+            db.session.commit()
+
+            clause = search_filter(Contact, ['fern', tag])
+            assert 'contact_search_fts MATCH' in str(clause.compile(db.engine))
+            assert Contact.query.filter(clause).all() == [contact]
+
+            # Core writes skip the mapper event; the FTS triggers still follow.
+            db.session.execute(
+                update(Contact).where(Contact.id == contact.id)
+                .values(search_document=f'moved {tag}')
+            )
+            db.session.commit()
+            assert Contact.query.filter(search_filter(Contact, ['fern', tag])).all() == []
+            assert Contact.query.filter(search_filter(Contact, ['moved', tag])).all() == [contact]
+
+            db.session.delete(contact)
+            db.session.commit()
+            assert Contact.query.filter(search_filter(Contact, [tag])).all() == []
+
+    def test_search_terms_normalize_phone_tokens(self):
+        assert search_terms('  Jane  DOE jane ') == ['jane', 'doe']
+        assert search_terms('(832) 555-0199') == ['832', '5550199']
+        assert search_terms('a-b') == ['a-b']
+
+
+class TestGlobalSearch:
+    def test_multi_term_phone_and_prefix_ranking(self, app, seed, owner_a_client):
+        with app.app_context():
+            tag = _unique('rank')
+            contacts = [
+                Contact(
+                    organization_id=seed['org_a'], user_id=seed['owner_a'],
+                    created_by_id=seed['owner_a'],
+                    first_name=first, last_name=tag, phone=phone,
+                )
+                for first, phone in (
+                    ('Ann', None), ('Zed', '713-555-0142'),
+                )
+            ]
+            db.session.add_all(contacts)
+            db.session.commit()
+
+            resp = owner_a_client.get(f'/api/search?q={tag}')
+            assert _titles(resp, 'Contacts') == [f'Ann {tag}', f'Zed {tag}']
+
+            resp = owner_a_client.get(f'/api/search?q=zed {tag}')
+            assert _titles(resp, 'Contacts') == [f'Zed {tag}']
+
+            resp = owner_a_client.get('/api/search?q=7135550142')
+            assert f'Zed {tag}' in _titles(resp, 'Contacts')
+
+            for contact in contacts:
+                db.session.delete(contact)
+            db.session.commit()
+
+    def test_participant_match_is_scoped_to_org(self, app, seed, owner_a_client):
+        with app.app_context():
+            tag = _unique('party')
+            tx_b = Transaction.query.filter_by(organization_id=seed['org_b']).first()
+            participant = TransactionParticipant(
+                organization_id=seed['org_b'], transaction_id=tx_b.id,
+                role='title_company', name=f'Escrow {tag}',
+            )
+            tx_a = Transaction.query.filter_by(organization_id=seed['org_a']).first()
+            participant_a = TransactionParticipant(
+                organization_id=seed['org_a'], transaction_id=tx_a.id,
+                role='lender', name=f'Lender {tag}',
+            )
+            db.session.add_all([participant, participant_a])
+            db.session.commit()
+
+            resp = owner_a_client.get(f'/api/search?q=escrow {tag}')
+            assert _titles(resp, 'Transactions') == []
+
+            resp = owner_a_client.get(f'/api/search?q=lender {tag}')
+            assert _titles(resp, 'Transactions') == ['100 Main St']
+
+            db.session.delete(participant)
+            db.session.delete(participant_a)
+            db.session.commit()
+
+    def test_short_query_is_a_name_prefix_match(self, app, seed, owner_a_client):
+        with app.app_context():
+            tag = _unique('short')
+            contacts = [
+                Contact(
+                    organization_id=seed['org_a'], user_id=seed['owner_a'],
+                    created_by_id=seed['owner_a'],
+                    first_name=first, last_name=tag, email=email,
+                )
+                for first, email in (
+                    ('Qxana', None), ('Bo', f'aqx{tag}@example.com'),
+                )
+            ]
+            db.session.add_all(contacts)
+            db.session.commit()
+
+            resp = owner_a_client.get('/api/search?q=qx')
+            titles = _titles(resp, 'Contacts')
+            assert f'Qxana {tag}' in titles
+            assert f'Bo {tag}' not in titles
+
+            for contact in contacts:
+                db.session.delete(contact)
+            db.session.commit()
+
+    def test_like_wildcards_are_literal(self, owner_a_client, seed):
+        resp = owner_a_client.get('/api/search?q=%25%25')
+        assert resp.get_json()['total'] == 0
+
+
+class TestContactListSearch:
+    def test_list_filters_on_search_document(self, owner_a_client, seed):
+        resp = owner_a_client.get('/contacts?q=jane@test')
+        assert resp.status_code == 200
+        assert b'jane@test.com' in resp.data
+
+        resp = owner_a_client.get('/contacts?q=5551110000 nobody')
+        assert b'jane@test.com' not in resp.data
+
+    def test_list_search_keeps_name_email_phone_scope(self, app, seed, owner_a_client):
+        with app.app_context():
+            tag = _unique('scope')
+            contact = Contact(
+                organization_id=seed['org_a'], user_id=seed['owner_a'],
+                created_by_id=seed['owner_a'], first_name='Cora',
+                last_name=f'Lane{tag}', city=f'Town{tag}',
+            )
+            db.session.add(contact)
+            db.session.commit()
+
+            resp = owner_a_client.get(f'/contacts?q=town{tag}')
+            assert f'Lane{tag}'.encode() not in resp.data
+            resp = owner_a_client.get(f'/contacts?q=cora lane{tag}')
+            assert f'Lane{tag}'.encode() in resp.data
+            resp = owner_a_client.get(f'/api/search?q=town{tag}')
+            assert _titles(resp, 'Contacts') == [f'Cora Lane{tag}']
+
+            db.session.delete(contact)
+            db.session.commit()
@@ -0,0 +1,102 @@
+"""jobs.dispatch: shared connection, idempotent enqueue and the local pool."""
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from jobs import dispatch
+
+
+@pytest.fixture(autouse=True)
+def _fresh_dispatch():
+    dispatch.reset()
+    yield
+    dispatch.reset()
+
+
+def test_enqueue_shares_one_client_and_passes_job_kwargs_through():
+    conn = MagicMock()
+    queue = MagicMock()
+    with patch('redis.Redis.from_url', return_value=conn) as from_url, \
+         patch('rq.Queue', return_value=queue) as queue_cls:
+        first = dispatch.enqueue('tax_protest', 'jobs.x.run', job_id=7, org_id=1)
+        second = dispatch.enqueue('tax_protest', 'jobs.x.run', job_id=8, org_id=1)
+
+    assert first and second and first != second
+    assert from_url.call_count == 1
+    queue_cls.assert_called_with('tax_protest', connection=conn)
+    call = queue.enqueue.call_args
+    # job_id is the job's own argument, not RQ's job id option.
+    assert call.kwargs['kwargs'] == {'job_id': 8, 'org_id': 1}
+    assert call.kwargs['job_id'] == second
+
+
+def test_idempotency_key_collapses_into_pending_job():
+    from rq.job import JobStatus
+
+    conn = MagicMock()
+    conn.set.return_value = False
+    conn.get.return_value = b'pending-job'
+    pending = MagicMock()
+    pending.get_status.return_value = JobStatus.QUEUED
+    queue = MagicMock()
+    with patch('redis.Redis.from_url', return_value=conn), \
+         patch('rq.Queue', return_value=queue), \
+         patch('rq.job.Job.fetch', return_value=pending):
+        job_id = dispatch.enqueue(
+            'doc_extraction', 'jobs.x.run', idempotency_key='doc:5', doc_id=5,
+        )
+        assert job_id == 'pending-job'
+        queue.enqueue.assert_not_called()
+
+        pending.get_status.return_value = JobStatus.STARTED
+        job_id = dispatch.enqueue(
+            'doc_extraction', 'jobs.x.run', idempotency_key='doc:5', doc_id=5,
+        )
+    assert job_id not in (None, 'pending-job')
+    queue.enqueue.assert_called_once()
+
+
+def test_failed_enqueue_skips_redis_until_retry_window():
+    queue = MagicMock()
+    queue.enqueue.side_effect = ConnectionError('down')
+    with patch('redis.Redis.from_url', return_value=MagicMock()), \
+         patch('rq.Queue', return_value=queue):
+        assert dispatch.enqueue('apns', 'jobs.x.run', message_id=1) is None
+        assert dispatch.enqueue('apns', 'jobs.x.run', message_id=1) is None
+    assert queue.enqueue.call_count == 1
+
+
+def test_unknown_queue_is_rejected():
+    with pytest.raises(ValueError):
+        dispatch.enqueue('documents', 'jobs.x.run')
+    with pytest.raises(ValueError):
+        dispatch.submit_local('documents', 'jobs.x.run')
+
+
+def test_local_executor_bounds_threads_and_collapses_duplicates():
+    executor = dispatch.LocalExecutor('test', workers=1, backlog=1)
+    release = threading.Event()
+    started = threading.Event()
+    ran = []
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        ran.append('blocking')
+
+    assert executor.submit(blocking) == dispatch.STARTED
+    assert started.wait(5)
+    assert executor.submit(lambda: ran.append('queued'), idempotency_key='a') == dispatch.STARTED
+    assert executor.submit(lambda: ran.append('again'), idempotency_key='a') == dispatch.DUPLICATE
+
+    # Backlog full: the caller waits for the running slot and runs the job.
+    caller = threading.Thread(
+        target=lambda: ran.append(executor.submit(lambda: ran.append('inline'))),
+    )
+    caller.start()
+    release.set()
+    caller.join(5)
+    assert not caller.is_alive()
+    assert 'inline' in ran and dispatch.INLINE in ran
+    assert 'again' not in ran
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from config import Config
 from models import (
     MarketingCampaign, MarketingCampaignStep, MarketingEnrollment,
     MarketingSend, MarketingTemplate, db,
@@ -14,6 +15,7 @@ from services.marketing import launch as launchmod
 from services.marketing import send as sendmod
 from services.marketing import system_templates as st
 
+from fake_sendgrid import FakeSendGrid
 from marketing_helpers import (
     enable_campaigns, load_org_user, make_contact, ready_template,
 )
@@ -249,6 +251,223 @@ class TestDeliver:
             assert send.provider_message_id == 'sg-test-1'
             assert campaign.sent_count >= 1
 
+    def test_renders_blocks_once_per_step(self, app, seed, monkeypatch):
+        with app.app_context():
+            org, owner = load_org_user(seed)
+            enable_campaigns(org)
+            make_contact(org, owner, first='Ann', last='One', email='ann@test.com')
+            make_contact(org, owner, first='Bo', last='Two', email='bo@test.com')
+            template = ready_template(org, owner, name='Render once')
+            campaign = _draft(org, owner, template)
+            launchmod.launch(campaign, org, owner)
+            sends = MarketingSend.query.filter_by(
+                campaign_id=campaign.id, status='queued',
+            ).all()
+            assert len(sends) >= 2
+
+            sendmod.clear_step_renders()
+            renders = []
+            real_render = sendmod.render_shared
+            monkeypatch.setattr(
+                sendmod, 'render_shared',
+                lambda *a, **kw: renders.append(1) or real_render(*a, **kw),
+            )
+            captured = []
+            monkeypatch.setattr(
+                sendmod, '_provider_send',
+                lambda **kwargs: captured.append(kwargs) or 'sg-test',
+            )
+            for send in sends:
+                sendmod.deliver(send)
+
+            assert len(renders) == 1
+            assert {s.status for s in sends} == {'sent'}
+            for send, sent in zip(sends, captured):
+                assert f'/email/unsubscribe/{send.unsubscribe_token}' in sent['html']
+                assert f'/email/unsubscribe/{send.unsubscribe_token}' in sent['text']
+            assert 'Hi Ann' in ''.join(c['html'] for c in captured)
+
+
+class TestDeliverBatch:
+    def _launched(self, org, owner, name, count=3):
+        for i in range(count):
+            make_contact(
+                org, owner, first=f'Batch{i}', last=name,
+                email=f'batch{i}-{name.lower()}@example.com',
+            )
+        template = ready_template(org, owner, name=name)
+        campaign = _draft(org, owner, template)
+        launchmod.launch(campaign, org, owner)
+        sends = MarketingSend.query.filter_by(
+            campaign_id=campaign.id, status='queued',
+        ).order_by(MarketingSend.id).all()
+        return campaign, sends
+
+    def test_one_request_per_chunk_with_per_recipient_personalizations(
+        self, app, seed, monkeypatch,
+    ):
+        monkeypatch.setattr(Config, 'SENDGRID_API_KEY', 'SG.test')
+        monkeypatch.setattr(sendmod, 'MAX_PERSONALIZATIONS', 2)
+        with app.app_context(), FakeSendGrid() as server:
+            monkeypatch.setattr(Config, 'SENDGRID_API_BASE', server.url)
+            org, owner = load_org_user(seed)
+            enable_campaigns(org)
+            campaign, sends = self._launched(org, owner, 'Chunked')
+            expected = {
+                send.id: sendmod.render_for_send(send, campaign) for send in sends
+            }
+            sent_before = campaign.sent_count or 0
+
+            outcomes = sendmod.deliver_batch(sends)
+
+            assert outcomes['sent'] == len(sends)
+            assert len(server.requests) == (len(sends) + 1) // 2
+            assert campaign.sent_count == sent_before + len(sends)
+            for body in server.requests:
+                for personalization in body['personalizations']:
+                    send_id = int(personalization['custom_args']['send_id'])
+                    subject, html, text = expected[send_id]
+                    # What SendGrid does on its side, then compare with the
+                    # per-recipient render.
+                    out = {c['type']: c['value'] for c in body['content']}
+                    for key, value in personalization['substitutions'].items():
+                        out = {k: v.replace(key, value) for k, v in out.items()}
+                    assert personalization['subject'] == subject
+                    assert out['text/html'] == html
+                    assert out['text/plain'] == text
+                    assert 'List-Unsubscribe' in personalization['headers']
+            for send in sends:
+                assert send.status == 'sent'
+                assert send.attempt_count == 1
+                assert send.provider_message_id.startswith('fake-')
+                assert send.provider_message_id.endswith(f':{send.id}')
+            assert len({send.provider_message_id for send in sends}) == len(sends)
+
+    def test_rejected_chunk_is_bisected_down_to_the_bad_recipient(
+        self, app, seed, monkeypatch,
+    ):
+        monkeypatch.setattr(Config, 'SENDGRID_API_KEY', 'SG.test')
+        with app.app_context(), FakeSendGrid() as server:
+            monkeypatch.setattr(Config, 'SENDGRID_API_BASE', server.url)
+            org, owner = load_org_user(seed)
+            enable_campaigns(org)
+            _campaign, sends = self._launched(org, owner, 'Bisect', count=5)
+            bad = sends[2]
+            server.bad_emails = {bad.to_email}
+
+            outcomes = sendmod.deliver_batch(sends)
+
+            assert outcomes['sent'] == len(sends) - 1
+            assert outcomes['failed'] == 1
+            assert bad.status == 'failed'
+            assert '400' in bad.error
+            assert {s.status for s in sends if s is not bad} == {'sent'}
+            delivered = {p['to'][0]['email'] for p in server.personalizations}
+            assert delivered == {s.to_email for s in sends if s is not bad}
+
+    def test_rows_are_claimed_before_the_request(self, app, seed, monkeypatch):
+        monkeypatch.setattr(Config, 'SENDGRID_API_KEY', 'SG.test')
+        with app.app_context(), FakeSendGrid() as server:
+            monkeypatch.setattr(Config, 'SENDGRID_API_BASE', server.url)
+            org, owner = load_org_user(seed)
+            enable_campaigns(org)
+            _campaign, sends = self._launched(org, owner, 'Claim', count=2)
+            send_ids = [s.id for s in sends]
+            seen = []
+
+            def checkpoint():
+                seen.append((
+                    len(server.requests),
+                    {row.status for row in MarketingSend.query.filter(
+                        MarketingSend.id.in_(send_ids),
+                    )},
+                ))
+
+            sendmod.deliver_batch(sends, checkpoint=checkpoint)
+
+            assert seen == [(0, {'sending'})]
+            assert {s.status for s in sends} == {'sent'}
+
+    def test_worker_fails_rows_left_sending_by_a_dead_run(
+        self, app, seed, monkeypatch,
+    ):
+        from jobs.marketing_outbox_worker import run_marketing_outbox_worker
+
+        monkeypatch.setattr(Config, 'SENDGRID_API_KEY', 'SG.test')
+        with app.app_context(), FakeSendGrid() as server:
+            monkeypatch.setattr(Config, 'SENDGRID_API_BASE', server.url)
+            org, owner = load_org_user(seed)
+            enable_campaigns(org)
+            campaign, sends = self._launched(org, owner, 'Interrupted', count=2)
+            for send in sends:
+                send.status = 'sending'
+                send.attempt_count = 1
+                send.last_attempt_at = datetime.utcnow() - timedelta(hours=2)
+            campaign_id = campaign.id
+            send_ids = [s.id for s in sends]
+            db.session.commit()
+
+            totals = run_marketing_outbox_worker(
+                org_id=org.id, limit=1000, batch=True,
+            )
+
+            assert totals['errors'] == 0
+            rows = MarketingSend.query.filter(MarketingSend.id.in_(send_ids)).all()
+            assert {(row.status, row.error) for row in rows} == {
+                ('failed', 'send_interrupted'),
+            }
+            campaign = db.session.get(MarketingCampaign, campaign_id)
+            assert campaign.status == 'completed'
+            assert campaign.failed_count >= len(send_ids)
+
+    def test_retryable_provider_error_requeues_the_chunk(
+        self, app, seed, monkeypatch,
+    ):
+        monkeypatch.setattr(Config, 'SENDGRID_API_KEY', 'SG.test')
+        with app.app_context(), FakeSendGrid() as server:
+            monkeypatch.setattr(Config, 'SENDGRID_API_BASE', server.url)
+            server.statuses = [503]
+            org, owner = load_org_user(seed)
+            enable_campaigns(org)
+            _campaign, sends = self._launched(org, owner, 'Retry', count=2)
+
+            outcomes = sendmod.deliver_batch(sends)
+
+            assert outcomes['queued'] == len(sends)
+            assert server.requests == []
+            for send in sends:
+                assert send.status == 'queued'
+                assert send.attempt_count == 1
+                assert '503' in send.error
+
+    def test_worker_batch_mode_sends_and_completes_campaign(
+        self, app, seed, monkeypatch,
+    ):
+        from jobs.marketing_outbox_worker import run_marketing_outbox_worker
+
+        monkeypatch.setattr(Config, 'SENDGRID_API_KEY', 'SG.test')
+        with app.app_context(), FakeSendGrid() as server:
+            monkeypatch.setattr(Config, 'SENDGRID_API_BASE', server.url)
+            org, owner = load_org_user(seed)
+            enable_campaigns(org)
+            campaign, sends = self._launched(org, owner, 'Worker')
+            for send in sends:
+                send.scheduled_for = datetime.utcnow() - timedelta(minutes=1)
+            campaign_id = campaign.id
+            send_ids = [s.id for s in sends]
+            db.session.commit()
+
+            totals = run_marketing_outbox_worker(
+                org_id=org.id, limit=1000, batch=True,
+            )
+
+            assert totals['errors'] == 0
+            assert totals['sent'] >= len(send_ids)
+            assert len(server.requests) >= 1
+            rows = MarketingSend.query.filter(MarketingSend.id.in_(send_ids)).all()
+            assert {row.status for row in rows} == {'sent'}
+            assert db.session.get(MarketingCampaign, campaign_id).status == 'completed'
+
 
 class TestSendTest:
     def test_parse_recipients_splits_commas_and_dedupes(self):
@@ -17,7 +17,13 @@ from services.marketing.blocks import (
     normalize_blocks,
     validate_blocks,
 )
-from services.marketing.render import personalize, preview, render
+from services.marketing.render import (
+    UNSUBSCRIBE_SLOT,
+    personalize,
+    preview,
+    render,
+    render_shared,
+)
 from services.marketing.shell import ShellContext
 
 
@@ -656,6 +662,24 @@ class TestPersonalize:
         _, _, _, missing = personalize(rendered, 'x', {'agent.phone': None})
         assert 'agent.phone' in missing
 
+    def test_shared_render_matches_a_per_recipient_render(self):
+        # One render per campaign step has to produce exactly what rendering
+        # for each recipient used to, unsubscribe link included.
+        shared = render_shared(validate_blocks(SIMPLE), ctx(unsubscribe_url=None))
+        assert UNSUBSCRIBE_SLOT in shared.html
+        assert UNSUBSCRIBE_SLOT in shared.text
+
+        for url in ('https://app.example/u/7.abc', 'https://app.example/u/7.x&y'):
+            direct = personalize(
+                render(SIMPLE, ctx(unsubscribe_url=url)), 'Hi {{contact.first_name}}',
+                {'contact.first_name': 'Sarah'},
+            )
+            reused = personalize(
+                shared, 'Hi {{contact.first_name}}',
+                {'contact.first_name': 'Sarah'}, unsubscribe_url=url,
+            )
+            assert reused == direct
+
     def test_preview_uses_example_values(self):
         subject, html_out = preview(SIMPLE, ctx(), 'Hi {{contact.first_name}}')
         assert subject == 'Hi John'
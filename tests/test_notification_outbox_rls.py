@@ -1,8 +1,11 @@
 """Outbox worker must restore org RLS context after each commit."""
 
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, patch
 
 from jobs.notification_outbox_worker import run_notification_outbox_worker
+from models import Notification, NotificationDelivery, NotificationEvent, db
+from services.notification_outbox import NotificationOutboxService
 
 
 def test_outbox_worker_resets_org_context_after_commit(app, seed):
@@ -12,19 +15,21 @@ def test_outbox_worker_resets_org_context_after_commit(app, seed):
     delivery.delivery_method = 'in_app'
     delivery.error = None
     delivery.status = 'queued'
+    delivery.scheduled_for = None
+    delivery.created_at = datetime.utcnow()
 
     with app.app_context():
         with patch(
             'jobs.base.set_job_org_context',
         ) as mock_set_ctx, patch(
-            'services.notification_outbox.NotificationOutboxService.list_pending_deliveries',
-            return_value=[delivery],
+            'services.notification_outbox.NotificationOutboxService.claim_pending_deliveries',
+            side_effect=[[delivery], []],
         ), patch(
             'jobs.notification_outbox_worker._deliver_one',
             return_value=True,
         ), patch(
-            'services.notification_outbox.NotificationOutboxService.mark_delivered',
-        ), patch(
+            'services.notification_outbox.NotificationOutboxService.mark_delivered_bulk',
+        ) as mock_bulk, patch(
             'models.db.session.commit',
         ) as mock_commit, patch(
             'models.db.session.remove',
@@ -34,6 +39,7 @@ def test_outbox_worker_resets_org_context_after_commit(app, seed):
             totals = run_notification_outbox_worker(org_id=seed['org_a'], limit=10)
 
             assert totals['delivered'] == 1
+            assert mock_bulk.call_args.args[0] == [1]
             assert mock_commit.called
             # Initial set + post-commit restore (at minimum).
             assert mock_set_ctx.call_count >= 2
@@ -49,35 +55,176 @@ def test_outbox_worker_resets_org_context_after_error_commit(app, seed):
     delivery.delivery_method = 'in_app'
     delivery.error = None
     delivery.status = 'queued'
-
-    failed_row = MagicMock()
-    failed_row.status = 'queued'
-    failed_row.error = None
+    delivery.scheduled_for = None
+    delivery.created_at = datetime.utcnow()
 
     with app.app_context():
         with patch(
             'jobs.base.set_job_org_context',
         ) as mock_set_ctx, patch(
-            'services.notification_outbox.NotificationOutboxService.list_pending_deliveries',
-            return_value=[delivery],
+            'services.notification_outbox.NotificationOutboxService.claim_pending_deliveries',
+            side_effect=[[delivery], []],
         ), patch(
             'jobs.notification_outbox_worker._deliver_one',
             side_effect=RuntimeError('boom'),
         ), patch(
-            'models.NotificationDelivery.query',
-        ) as mock_nd_query, patch(
+            'services.notification_outbox.NotificationOutboxService.mark_delivered_bulk',
+        ), patch(
             'models.db.session.commit',
         ) as mock_commit, patch(
             'models.db.session.remove',
         ), patch(
             'models.db.session.rollback',
         ):
-            mock_nd_query.get.return_value = failed_row
-
             totals = run_notification_outbox_worker(org_id=seed['org_a'], limit=10)
 
             assert totals['errors'] >= 1
+            assert totals['failed'] == 1
+            assert delivery.status == 'failed'
+            assert delivery.error == 'boom'
             assert mock_commit.called
             assert mock_set_ctx.call_count >= 2
             # Last successful restore after error-path commit
             assert mock_set_ctx.call_args_list[-1].args[0] == seed['org_a']
+
+
+def _queue_in_app(seed, *, title, scheduled_for=None):
+    event = NotificationEvent(
+        organization_id=seed['org_a'],
+        user_id=seed['owner_a'],
+        event_type='document_review_ready',
+        payload={'title': title},
+        status='pending',
+        category='document_review',
+    )
+    db.session.add(event)
+    db.session.flush()
+    delivery = NotificationDelivery(
+        event_id=event.id,
+        organization_id=seed['org_a'],
+        delivery_method='in_app',
+        status='queued',
+        scheduled_for=scheduled_for,
+    )
+    db.session.add(delivery)
+    db.session.commit()
+    return event.id, delivery.id
+
+
+def test_outbox_worker_drains_in_batches_and_rolls_up_events(app, seed):
+    with app.app_context():
+        now = datetime.utcnow()
+        queued = [
+            _queue_in_app(
+                seed,
+                title=f'Outbox batch {i}',
+                scheduled_for=now - timedelta(minutes=10 - i),
+            )
+            for i in range(5)
+        ]
+
+        totals = run_notification_outbox_worker(
+            org_id=seed['org_a'], limit=100, batch_size=2,
+        )
+
+        assert totals['delivered'] >= 5
+        assert totals['batches'] >= 3
+        assert totals['max_lag_seconds'] >= 540
+        assert totals['rows_per_sec'] > 0
+        for event_id, delivery_id in queued:
+            delivery = db.session.get(NotificationDelivery, delivery_id)
+            assert delivery.status == 'sent'
+            assert delivery.delivered_at is not None
+            assert db.session.get(NotificationEvent, event_id).status == 'delivered'
+        assert Notification.query.filter(
+            Notification.title.like('Outbox batch %'),
+        ).count() == 5
+
+
+def test_sent_telegram_survives_an_in_app_failure_in_the_same_batch(app, seed):
+    """A rollback after in_app trouble must not re-queue Telegram already sent."""
+    import jobs.notification_outbox_worker as worker
+
+    with app.app_context():
+        now = datetime.utcnow()
+        in_app_event, in_app_id = _queue_in_app(
+            seed, title='Outbox mixed in_app', scheduled_for=now - timedelta(minutes=5),
+        )
+        event = NotificationEvent(
+            organization_id=seed['org_a'],
+            user_id=seed['owner_a'],
+            event_type='document_review_ready',
+            payload={'title': 'Outbox mixed telegram'},
+            status='pending',
+            category='document_review',
+        )
+        db.session.add(event)
+        db.session.flush()
+        telegram = NotificationDelivery(
+            event_id=event.id,
+            organization_id=seed['org_a'],
+            delivery_method='telegram',
+            status='queued',
+            scheduled_for=now - timedelta(minutes=10),
+        )
+        db.session.add(telegram)
+        db.session.commit()
+        telegram_id = telegram.id
+
+        real_deliver = worker._deliver_one
+        real_bulk = NotificationOutboxService.mark_delivered_bulk
+        sent = []
+
+        def deliver(delivery, prefs=None):
+            if delivery.delivery_method == 'telegram':
+                sent.append(delivery.id)
+                return True
+            return real_deliver(delivery, prefs=prefs)
+
+        def bulk(delivery_ids, *, now=None):
+            if in_app_id in delivery_ids:
+                raise RuntimeError('autoflush failed')
+            return real_bulk(delivery_ids, now=now)
+
+        with patch.object(worker, '_deliver_one', side_effect=deliver), patch.object(
+            NotificationOutboxService, 'mark_delivered_bulk', side_effect=bulk,
+        ):
+            totals = run_notification_outbox_worker(org_id=seed['org_a'], limit=100)
+
+        assert sent == [telegram_id]
+        assert totals['errors'] == 1
+        assert db.session.get(NotificationDelivery, telegram_id).status == 'sent'
+        assert db.session.get(NotificationDelivery, in_app_id).status == 'queued'
+
+        # (SQLite releases an outermost SAVEPOINT as a commit, so the bell
+        # row itself is only rolled back on Postgres.)
+        Notification.query.filter_by(title='Outbox mixed in_app').delete()
+        NotificationDelivery.query.filter(
+            NotificationDelivery.id.in_([telegram_id, in_app_id]),
+        ).update({'status': 'failed'}, synchronize_session=False)
+        db.session.commit()
+
+
+def test_claim_orders_by_due_time_and_respects_org(app, seed):
+    with app.app_context():
+        now = datetime.utcnow()
+        _, later_id = _queue_in_app(seed, title='Claim later', scheduled_for=now - timedelta(minutes=1))
+        _, sooner_id = _queue_in_app(seed, title='Claim sooner', scheduled_for=now - timedelta(hours=1))
+        _, future_id = _queue_in_app(seed, title='Claim future', scheduled_for=now + timedelta(hours=1))
+
+        claimed = [
+            d.id for d in NotificationOutboxService.claim_pending_deliveries(
+                seed['org_a'], limit=100, now=now,
+            )
+        ]
+        assert claimed.index(sooner_id) < claimed.index(later_id)
+        assert future_id not in claimed
+        assert NotificationOutboxService.claim_pending_deliveries(
+            seed['org_b'], limit=100, now=now,
+        ) == []
+        db.session.rollback()
+
+        NotificationDelivery.query.filter(
+            NotificationDelivery.id.in_([later_id, sooner_id, future_id]),
+        ).update({'status': 'failed'}, synchronize_session=False)
+        db.session.commit()
@@ -0,0 +1,110 @@
+"""Shared OpenAI clients and per-model latency (services/openai_clients)."""
+
+import json
+
+import httpx2
+import pytest
+
+from services import openai_clients
+from services.openai_clients import (
+    BACKGROUND,
+    INTERACTIVE,
+    client_stats,
+    get_client,
+    reset_clients,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    reset_clients()
+    yield
+    reset_clients()
+
+
+def _fake_upstream(monkeypatch, *, status=200, new_connection=True):
+    """Answer every request in-process, firing httpcore's connect trace."""
+
+    def handle_request(self, request):
+        trace = request.extensions.get('trace')
+        if trace and new_connection:
+            trace('connection.connect_tcp.started', {})
+            trace('connection.connect_tcp.complete', {})
+            trace('connection.start_tls.complete', {})
+        body = json.dumps({'ok': True}).encode()
+        return httpx2.Response(status, headers={'content-type': 'application/json'},
+                               stream=httpx2.ByteStream(body))
+
+    monkeypatch.setattr(httpx2.HTTPTransport, 'handle_request', handle_request)
+
+
+def test_clients_are_reused_per_key_and_timeout_class():
+    chat = get_client('key-a')
+    assert get_client('key-a') is chat
+    assert get_client('key-a', timeout_class=INTERACTIVE) is chat
+
+    background = get_client('key-a', timeout_class=BACKGROUND)
+    other_key = get_client('key-b')
+    assert background is not chat
+    assert other_key is not chat
+    assert background.timeout.read > chat.timeout.read
+    # One connection pool underneath every client.
+    assert chat._client is background._client is other_key._client
+
+
+def test_default_key_comes_from_config(monkeypatch):
+    monkeypatch.setattr(openai_clients.Config, 'OPENAI_API_KEY', 'cfg-key')
+    assert get_client().api_key == 'cfg-key'
+    assert get_client() is get_client('cfg-key')
+
+
+def test_unknown_timeout_class_is_rejected():
+    with pytest.raises(ValueError):
+        get_client('key-a', timeout_class='batch')
+
+
+def test_fork_drops_inherited_clients(monkeypatch):
+    client = get_client('key-a')
+    monkeypatch.setattr(openai_clients.os, 'getpid', lambda: -1)
+    assert get_client('key-a') is not client
+
+
+def test_latency_is_recorded_per_model(monkeypatch):
+    _fake_upstream(monkeypatch)
+    http = get_client('key-a')._client
+
+    response = http.post('https://api.openai.com/v1/responses',
+                         json={'model': 'gpt-test', 'input': 'hi'})
+    assert response.json() == {'ok': True}
+    response = http.post('https://api.openai.com/v1/responses',
+                         json={'model': 'gpt-test', 'input': 'again'})
+    response.close()
+
+    stats = client_stats()['gpt-test']
+    assert stats['requests'] == 2
+    assert stats['errors'] == 0
+    assert stats['new_connections'] == 2
+    assert stats['avg_total_ms'] >= stats['avg_ttfb_ms'] >= 0
+
+
+def test_errors_and_reused_connections_are_counted(monkeypatch):
+    _fake_upstream(monkeypatch, status=500, new_connection=False)
+    http = get_client('key-a')._client
+
+    http.post('https://api.openai.com/v1/chat/completions',
+              json={'model': 'gpt-test', 'messages': []}).close()
+
+    stats = client_stats()['gpt-test']
+    assert stats['errors'] == 1
+    assert stats['new_connections'] == 0
+    assert stats['avg_connect_ms'] == 0
+
+
+def test_requests_without_a_json_model_fall_back_to_the_endpoint(monkeypatch):
+    _fake_upstream(monkeypatch)
+    http = get_client('key-a')._client
+
+    http.post('https://api.openai.com/v1/audio/transcriptions',
+              files={'file': ('a.webm', b'\x00\x01')}).close()
+
+    assert client_stats()['transcriptions']['requests'] == 1
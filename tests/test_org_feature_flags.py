@@ -20,6 +20,8 @@ from feature_flags import (
     TIER_FEATURES,
     all_feature_names,
     describe_org_features,
+    get_org_features,
+    org_feature_snapshot,
     org_has_feature,
     set_org_feature_overrides,
     tier_default_for,
@@ -166,3 +168,62 @@ class TestDescribeOrgFeatures:
             assert rows['BOB_VTC_PILOT']['enabled'] is True
             assert rows['TRANSACTIONS']['overridden'] is False
             assert rows[killswitched]['locked'] is True
+
+
+class TestOrgFeatureSnapshot:
+    def test_snapshot_agrees_with_direct_lookup(self, app, org):
+        with app.app_context():
+            record = db.session.get(Organization, org.id)
+            set_org_feature_overrides(record, _desired(record, BOB_VTC_PILOT=True))
+            db.session.commit()
+
+            snapshot = org_feature_snapshot(record.id)
+            for name in all_feature_names():
+                assert snapshot.has(name) == org_has_feature(name, record)
+            assert snapshot.as_dict() == get_org_features(record)
+
+            record.feature_flags = {}
+            db.session.commit()
+
+    def test_snapshot_is_memoized_for_the_request(self, app, org):
+        with app.test_request_context():
+            first = org_feature_snapshot(org.id)
+            assert org_feature_snapshot(org.id) is first
+
+    def test_committed_flag_change_invalidates_the_snapshot(self, app, org):
+        with app.app_context():
+            assert org_feature_snapshot(org.id).has('BOB_VTC_PILOT') is False
+
+        with app.app_context():
+            record = db.session.get(Organization, org.id)
+            record.feature_flags = {'BOB_VTC_PILOT': True}
+            db.session.commit()
+
+        with app.app_context():
+            assert org_feature_snapshot(org.id).has('BOB_VTC_PILOT') is True
+            record = db.session.get(Organization, org.id)
+            record.feature_flags = {}
+            db.session.commit()
+
+    def test_flag_write_clears_a_snapshot_this_process_never_built(self, app, org):
+        """Another process cached it; this one only writes the flags."""
+        import feature_flags
+        from services.cache_helpers import _get_cached, _set_cached
+
+        assert feature_flags._listeners_registered
+        key = feature_flags._snapshot_cache_key(org.id)
+        with app.app_context():
+            record = db.session.get(Organization, org.id)
+            stale = feature_flags.OrgFeatureSnapshot.from_org(record)
+            _set_cached(key, stale.to_cache())
+
+            record.feature_flags = {'BOB_VTC_PILOT': True}
+            db.session.commit()
+            assert _get_cached(key) is None
+
+            record.feature_flags = {}
+            db.session.commit()
+
+    def test_unknown_org_has_no_snapshot(self, app, seed):
+        with app.app_context():
+            assert org_feature_snapshot(999999) is None
@@ -0,0 +1,71 @@
+"""Adaptive page rendering: schema-aware page choice, per-page format, budget."""
+import base64
+
+import fitz
+
+from services.page_render_plan import (
+    CONTEXT_PAGE,
+    SCANNED_PAGE,
+    TEXT_PAGE,
+    plan_page_renders,
+    render_planned_pages,
+)
+from services.pdf_pages import PdfPageSet
+
+_BODY = 'The parties agree to the terms in this paragraph.\n' * 8
+
+
+def _pdf_from_pages(pages: list[str]) -> bytes:
+    doc = fitz.open()
+    try:
+        for index, text in enumerate(pages):
+            doc.insert_page(index, text=text)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def _packet() -> bytes:
+    return _pdf_from_pages([
+        f'RESIDENTIAL REAL ESTATE LISTING AGREEMENT\n{_BODY}\n(TXR-1101) 01-05-26',
+        f'Information About Brokerage Services\n{_BODY}\n(TXR-2501) IABS 1-0',
+        'Handwritten note',
+    ])
+
+
+def test_plan_leaves_other_forms_to_the_text_layer():
+    with PdfPageSet(_packet()) as pages:
+        plan = plan_page_renders(pages, schema_slug='listing-agreement')
+        assert [(page.index, page.profile) for page in plan.pages] == [
+            (0, TEXT_PAGE), (2, SCANNED_PAGE),
+        ]
+        assert plan.text_only == [1]
+
+        images = render_planned_pages(pages, plan)
+        assert [image['page'] for image in images] == [1, 3]
+        assert images[0]['mime'] == 'image/png'
+        assert images[1]['mime'] == 'image/jpeg'
+        assert plan.image_bytes == sum(len(base64.b64decode(i['data'])) for i in images)
+
+        # Schemas without per-page fingerprints keep every page.
+        everything = plan_page_renders(pages, schema_slug='inspection-report')
+        assert [page.index for page in everything.pages] == [0, 1, 2]
+        assert not everything.text_only
+
+
+def test_budget_downgrades_then_omits_later_pages():
+    with PdfPageSet(_packet()) as pages:
+        full = plan_page_renders(pages)
+        render_planned_pages(pages, full)
+
+        tight = plan_page_renders(pages)
+        images = render_planned_pages(pages, tight, budget_bytes=full.image_bytes - 1)
+        assert len(images) == 3
+        assert tight.pages[-1].profile == CONTEXT_PAGE
+        assert images[-1]['detail'] == 'low'
+        assert tight.image_bytes < full.image_bytes
+
+        starved = plan_page_renders(pages)
+        images = render_planned_pages(pages, starved, budget_bytes=1)
+        assert images == []
+        assert starved.omitted == [0, 1, 2]
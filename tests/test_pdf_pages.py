@@ -0,0 +1,54 @@
+"""PdfPageSet: one parse shared by identity, extraction and splitting."""
+import hashlib
+from unittest.mock import patch
+
+import fitz
+
+from services.document_extractor import _extract_pdf_text, _file_sha256
+from services.document_identity import extract_pdf_text
+from services.listing_packet import extract_page_texts
+from services.pdf_pages import PdfPageSet, pdf_pages
+from services.pdf_splitter import get_pdf_page_count, slice_pdf_pages
+
+
+def _pdf_from_pages(pages: list[str]) -> bytes:
+    doc = fitz.open()
+    try:
+        for index, text in enumerate(pages):
+            doc.insert_page(index, text=text)
+        return doc.tobytes()
+    finally:
+        doc.close()
+
+
+def test_page_set_opens_once_across_helpers():
+    data = _pdf_from_pages(['First page', 'Second page', 'Third page'])
+    real_open = fitz.open
+
+    with patch('services.pdf_pages.fitz.open', side_effect=real_open) as opened:
+        with PdfPageSet(data) as pages:
+            assert get_pdf_page_count(pages) == 3
+            assert 'Second page' in extract_pdf_text(pages)
+            assert extract_page_texts(pages)[2].strip() == 'Third page'
+            assert '--- Page 1 ---' in _extract_pdf_text(pages)
+            assert _file_sha256(pages) == hashlib.sha256(data).hexdigest()
+            assert len(list(pages.iter_rendered_pages(dpi=36))) == 3
+
+    assert opened.call_count == 1
+
+
+def test_page_set_keeps_text_after_close_and_bytes_still_work():
+    data = _pdf_from_pages(['Alpha', 'Beta'])
+    pages = PdfPageSet(data)
+    assert pages.page_text(1).strip() == 'Beta'
+    pages.close()
+    assert pages.page_text(1).strip() == 'Beta'
+
+    with pdf_pages(pages) as same:
+        assert same is pages
+
+    assert get_pdf_page_count(data) == 2
+    child = slice_pdf_pages(pages, 2, 2)
+    assert get_pdf_page_count(child) == 1
+    assert not PdfPageSet(None)
+    assert get_pdf_page_count(PdfPageSet(b'')) == 0
@@ -18,6 +18,9 @@ from services.product_analytics import BLOCKED_KEY_PARTS, _safe_properties
 from services.retention_tokens import (
     make_churn_reason_token, parse_churn_reason_token,
 )
+from services.session_tracking import (
+    flush_session_events, note_session, reset_session_tracking,
+)
 
 
 def _new_user(seed, username, created_at=None, org_id=None):
@@ -196,6 +199,133 @@ def test_record_daily_session_is_idempotent(app, seed):
             _cleanup_user(user_id)
 
 
+def test_note_session_queues_once_and_flush_writes_one_event(app, seed):
+    with app.app_context():
+        reset_session_tracking()
+        user = _new_user(seed, 'ret_note_session')
+        user_id = user.id
+        try:
+            assert note_session(user, surface='contacts') is True
+            assert note_session(user, surface='tasks') is False
+            assert ActivationEvent.query.filter_by(
+                user_id=user_id,
+                event=ActivationEvent.SESSION_STARTED,
+            ).count() == 0
+
+            assert flush_session_events() == 1
+            rows = ActivationEvent.query.filter_by(
+                user_id=user_id,
+                event=ActivationEvent.SESSION_STARTED,
+            ).all()
+            assert len(rows) == 1
+            assert rows[0].event_data['surface'] == 'contacts'
+            assert rows[0].event_data['has_overdue_or_due_today'] is False
+        finally:
+            reset_session_tracking()
+            _cleanup_user(user_id)
+
+
+def test_session_flush_skips_users_already_recorded_today(app, seed):
+    with app.app_context():
+        reset_session_tracking()
+        user = _new_user(seed, 'ret_note_recorded')
+        user_id = user.id
+        try:
+            record_daily_session(user, surface='dashboard')
+            assert note_session(user, surface='contacts') is True
+            assert flush_session_events() == 0
+            assert ActivationEvent.query.filter_by(
+                user_id=user_id,
+                event=ActivationEvent.SESSION_STARTED,
+            ).count() == 1
+        finally:
+            reset_session_tracking()
+            _cleanup_user(user_id)
+
+
+def test_session_flush_sets_each_orgs_rls_context(app, seed, monkeypatch):
+    import jobs.base
+    import services.activation_service as activation_service
+
+    contexts = []
+    real_set = jobs.base.set_job_org_context
+    monkeypatch.setattr(
+        jobs.base, 'set_job_org_context',
+        lambda org_id: (contexts.append(org_id), real_set(org_id)),
+    )
+    mirrored = []
+    monkeypatch.setattr(
+        activation_service, 'mirror_event',
+        lambda event, **kwargs: mirrored.append(kwargs['user_id']),
+    )
+    with app.app_context():
+        reset_session_tracking()
+        user_a = _new_user(seed, 'ret_flush_org_a')
+        user_b = _new_user(seed, 'ret_flush_org_b', org_id=seed['org_b'])
+        ids = [user_a.id, user_b.id]
+        try:
+            assert note_session(user_a) is True
+            assert note_session(user_b) is True
+            assert flush_session_events() == 2
+            assert {seed['org_a'], seed['org_b']} <= set(contexts)
+            assert sorted(mirrored) == sorted(ids)
+        finally:
+            reset_session_tracking()
+            for user_id in ids:
+                _cleanup_user(user_id)
+
+
+def test_session_flush_mirrors_nothing_when_the_commit_fails(app, seed, monkeypatch):
+    import services.activation_service as activation_service
+
+    mirrored = []
+    monkeypatch.setattr(
+        activation_service, 'mirror_event',
+        lambda event, **kwargs: mirrored.append(kwargs['user_id']),
+    )
+    with app.app_context():
+        reset_session_tracking()
+        user = _new_user(seed, 'ret_flush_commit_fails')
+        user_id = user.id
+        try:
+            assert note_session(user) is True
+
+            def fail_commit():
+                raise RuntimeError('database went away')
+
+            with monkeypatch.context() as m:
+                m.setattr(db.session, 'commit', fail_commit)
+                assert flush_session_events() == 0
+            assert mirrored == []
+            assert ActivationEvent.query.filter_by(
+                user_id=user_id,
+                event=ActivationEvent.SESSION_STARTED,
+            ).count() == 0
+        finally:
+            reset_session_tracking()
+            _cleanup_user(user_id)
+
+
+def test_authenticated_page_load_queues_without_writing(app, seed, owner_a_client):
+    with app.app_context():
+        reset_session_tracking()
+        before = ActivationEvent.query.filter_by(
+            user_id=seed['owner_a'],
+            event=ActivationEvent.SESSION_STARTED,
+        ).count()
+    try:
+        assert owner_a_client.get('/contacts').status_code == 200
+        with app.app_context():
+            assert ActivationEvent.query.filter_by(
+                user_id=seed['owner_a'],
+                event=ActivationEvent.SESSION_STARTED,
+            ).count() == before
+            from services.session_tracking import _buffer
+            assert [item.user_id for item in _buffer.drain()] == [seed['owner_a']]
+    finally:
+        reset_session_tracking()
+
+
 def test_lifecycle_click_is_stage_aware(app, seed):
     with app.app_context():
         user = _new_user(seed, 'ret_lifecycle')
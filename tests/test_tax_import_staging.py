@@ -0,0 +1,457 @@
+"""Tests for scripts/import_tax_data.py staged COPY loading.
+
+Row builders and COPY encoding run against small county fixtures. The
+staging swap is driven by a scripted cursor that replays catalog rows, and
+end to end against PostgreSQL when TAX_IMPORT_TEST_DATABASE_URL points at a
+local database.
+"""
+
+from __future__ import annotations
+
+import csv
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+from models import (
+    ChambersProperty,
+    FortBendProperty,
+    HcadBuilding,
+    HcadProperty,
+    LibertyImprovement,
+    LibertyProperty,
+)
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPT_PATH = PROJECT_ROOT / 'scripts' / 'import_tax_data.py'
+PG_URL = os.getenv('TAX_IMPORT_TEST_DATABASE_URL')
+
+
+def _load_import_module():
+    spec = importlib.util.spec_from_file_location('import_tax_data', SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+imp = _load_import_module()
+
+
+def _write_csv(path, rows, delimiter=','):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]), delimiter=delimiter)
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def _fixed_line(fields, width=4479):
+    """A fixed-width record with ``{(start, end): text}`` at 1-based columns."""
+    line = [' '] * width
+    for (start, end), text in fields.items():
+        text = str(text)
+        assert len(text) <= end - start + 1
+        line[start - 1:start - 1 + len(text)] = text
+    return ''.join(line)
+
+
+# --- Column lists vs the tables they COPY into ---
+#
+# Staging twins are CREATE TABLE ... (LIKE live), so every listed column has
+# to exist on the model, once, and anything the COPY leaves out is either
+# the serial id or filled in after the load.
+
+@pytest.mark.parametrize('model, columns, filled_later', [
+    # sq_ft is written by scripts/scrape_chambers_sqft.py.
+    (ChambersProperty, imp.CHAMBERS_COLUMNS, {'sq_ft'}),
+    # max_sq_ft is filled from the staged buildings in prepare().
+    (HcadProperty, imp.HCAD_MAIN_COLUMNS, {'max_sq_ft'}),
+    (HcadBuilding, imp.HCAD_BUILDING_COLUMNS, set()),
+    (LibertyProperty, imp.LIBERTY_PROPERTY_COLUMNS, set()),
+    (LibertyImprovement, imp.LIBERTY_IMPROVEMENT_COLUMNS, set()),
+    (FortBendProperty, imp.FORT_BEND_PROPERTY_COLUMNS, set()),
+])
+def test_copy_columns_cover_the_live_table(model, columns, filled_later):
+    table_columns = {column.name for column in model.__table__.columns}
+
+    assert len(columns) == len(set(columns))
+    assert set(columns) <= table_columns
+    assert table_columns - set(columns) == {'id'} | filled_later
+
+
+def test_chambers_rows_follow_column_order(tmp_path):
+    path = _write_csv(tmp_path / 'chambers.csv', [{
+        'Parcel_ID': ' 12345 ', 'Account': 'R000123', 'Street': '1 OWNER WAY',
+        'Street_Overflow': '', 'City': 'ANAHUAC', 'Zip5': '77514',
+        'Prop_Street_Number': '402', 'Prop_Street_Dir': 'N',
+        'Prop_Street': 'Main Street', 'Prop_City': 'ANAHUAC', 'Prop_Zip5': '77514',
+        'Legal1': 'LOT 31 SEC 5 PLANTATION ON CB', 'Legal2': '', 'Legal3': '',
+        'Legal4': '', 'Acres': '1,250.5000', 'Market_Value': '315,000',
+        'Improvement_Hs': '210000', 'Improvement_Nhs': 'Pending',
+    }])
+
+    rows = list(imp._chambers_rows(path))
+
+    assert len(rows) == 1
+    assert len(rows[0]) == len(imp.CHAMBERS_COLUMNS)
+    row = dict(zip(imp.CHAMBERS_COLUMNS, rows[0]))
+    assert row['parcel_id'] == '12345'
+    assert row['street_overflow'] is None
+    assert row['prop_street_dir'] == 'N'
+    assert row['legal1'] == 'LOT 31 SEC 5 PLANTATION ON CB'
+    assert row['acres'] == 1250.5
+    assert row['market_value'] == 315000
+    assert row['improvement_hs_val'] == 210000
+    assert row['improvement_nhs_val'] is None
+    assert row['normalized_site_addr'] == '402 N MAIN ST'
+
+
+def test_hcad_row_builders_follow_column_order():
+    record = {
+        'acct': '0660640130020', 'str_num': '1234', 'str_num_sfx': '',
+        'str': 'OAK FOREST', 'str_sfx': 'DR', 'str_sfx_dir': '', 'str_unit': '',
+        'site_addr_1': '1234 Oak Forest Drive', 'site_addr_2': 'HOUSTON',
+        'site_addr_3': '77018', 'acreage': '.1722', 'assessed_val': '280000',
+        'tot_appr_val': '300000', 'tot_mkt_val': '325,000',
+        'lgl_1': 'LT 2 BLK 13', 'lgl_2': 'OAK FOREST SEC 2', 'lgl_3': '',
+        'lgl_4': '', 'Neighborhood_Code': '8301.01',
+    }
+
+    built = imp._hcad_property_row(record)
+
+    assert len(built) == len(imp.HCAD_MAIN_COLUMNS)
+    row = dict(zip(imp.HCAD_MAIN_COLUMNS, built))
+    assert row['acct'] == '0660640130020'
+    assert row['str_num_sfx'] is None
+    assert row['site_addr_3'] == '77018'
+    assert row['acreage'] == 0.1722
+    assert row['tot_mkt_val'] == 325000
+    assert row['lgl_2'] == 'OAK FOREST SEC 2'
+    assert row['neighborhood_code'] == '8301.01'
+    assert row['normalized_site_addr'] == '1234 OAK FOREST DR'
+
+    assert imp._hcad_property_row({**record, 'acct': ' '}) is None
+    assert imp._hcad_building_row({'acct': '0660640130020', 'im_sq_ft': '2,100'}) == (
+        '0660640130020', 2100,
+    )
+    assert imp._hcad_building_row({'acct': '', 'im_sq_ft': '2100'}) is None
+
+
+def test_hcad_parse_chunk_counts_skipped_records():
+    fieldnames = ['acct', 'im_sq_ft']
+    lines = ['0660640130020\t2100\n', '\t1800\n', '0660640130021\t\n']
+
+    block, skipped = imp._parse_chunk((imp._hcad_building_row, fieldnames, '\t', lines))
+
+    assert skipped == 1
+    assert block == b'0660640130020\t2100\n0660640130021\t\\N\n'
+
+
+def test_liberty_property_rows_follow_column_order(tmp_path):
+    line = _fixed_line({
+        (1, 12): '10042', (13, 17): 'R', (547, 596): '0042-0001-000',
+        (1040, 1049): 'N', (1050, 1099): 'Liberty Avenue', (1100, 1109): '',
+        (1110, 1139): 'DAYTON', (1140, 1149): '77535',
+        (1150, 1404): 'LIBERTY OAKS LOT 4', (1660, 1675): '00000000012500',
+        (1676, 1685): '007206', (1826, 1840): '180000', (1841, 1855): '0',
+        (1916, 1930): '240000', (1946, 1960): '230000',
+        (4214, 4227): '250000', (4460, 4474): '415', (4475, 4479): '2',
+    })
+    skipped = _fixed_line({(1, 12): '10043', (4214, 4227): '99000'})
+    path = tmp_path / 'liberty_county.txt'
+    path.write_text(f'{line}\r\n{skipped}\r\n', encoding='utf-8')
+
+    rows = list(imp._liberty_property_rows(
+        str(path), {'10042'}, {'007206': 'LIBERTY OAKS'}, {'10042': 1850},
+    ))
+
+    assert len(rows) == 1
+    assert len(rows[0]) == len(imp.LIBERTY_PROPERTY_COLUMNS)
+    row = dict(zip(imp.LIBERTY_PROPERTY_COLUMNS, rows[0]))
+    assert row['prop_id'] == '10042'
+    assert row['geo_id'] == '0042-0001-000'
+    assert row['situs_street_suffix'] is None
+    assert row['site_addr_1'] == '415 N Liberty Avenue UNIT 2'
+    assert row['normalized_site_addr'] == '415 N LIBERTY AVE'
+    assert row['legal_acreage'] == 1.25
+    assert row['abs_subdv_cd'] == '007206'
+    assert row['abs_subdv_desc'] == 'LIBERTY OAKS'
+    assert row['imprv_non_hstd_val'] == 0
+    assert row['market_value'] == 250000
+    assert row['sq_ft'] == 1850
+    assert row['is_residential_home'] is True
+
+
+def test_fort_bend_property_rows_follow_column_order(tmp_path):
+    base = {
+        'PropertyID': '', 'QuickRefID': 'R123456', 'PropertyNumber': '0001-02',
+        'LegalDesc': 'SIENNA PLANTATION SEC 4, BLOCK 1, LOT 9',
+        'LegalLocationCode': '', 'LegalLocationDesc': '', 'LegalAcres': '0.2100',
+        'CurrMarketValue': '', 'MarketValue': '410000',
+        'CurrAssessedValue': '400000', 'AssessedValue': '1',
+        'CurrLandValue': '', 'LandValue': '90000',
+        'CurrImprovmentValue': '320000', 'ImprovmentValue': '1',
+        'SquareFootage': '2,600', 'NbhdCode': '4100', 'NbhdDesc': 'SIENNA',
+        'Situs': '9 Lake Bend Court, MISSOURI CITY, TX 77459',
+        'SitusPreDirectional': '', 'SitusStreetNumber': '9',
+        'SitusStreetName': 'LAKE BEND', 'SitusStreetSuffix': 'CT',
+        'SitusPostDirectional': '', 'SitusCity': 'MISSOURI CITY',
+        'SitusState': 'TX', 'SitusZip': '77459',
+    }
+    path = _write_csv(tmp_path / 'property.txt', [
+        {**base, 'PropertyID': '5001'},
+        {**base, 'PropertyID': '5002'},
+    ])
+
+    rows = list(imp._fort_bend_property_rows(path, {'5001'}, {'5001': 0.25}))
+
+    assert len(rows) == 1
+    assert len(rows[0]) == len(imp.FORT_BEND_PROPERTY_COLUMNS)
+    row = dict(zip(imp.FORT_BEND_PROPERTY_COLUMNS, rows[0]))
+    assert row['property_id'] == '5001'
+    assert row['legal_acres'] == 0.21
+    assert row['market_value'] == 410000
+    assert row['assessed_value'] == 400000
+    assert row['land_value'] == 90000
+    assert row['improvement_value'] == 320000
+    assert row['sq_ft'] == 2600
+    assert row['site_addr_1'] == '9 Lake Bend Court'
+    assert row['normalized_site_addr'] == '9 LAKE BEND CT'
+    assert row['situs_pre_directional'] is None
+    assert row['acreage'] == 0.25
+    assert row['is_residential_home'] is True
+
+
+def test_copy_block_escapes_copy_text_format():
+    block = imp.copy_block([
+        ('a\tb', None, True, False, 'back\\slash', 'two\r\nlines', 12.5),
+    ])
+
+    assert block == b'a\\tb\t\\N\tt\tf\tback\\\\slash\ttwo\\r\\nlines\t12.5\n'
+    assert list(imp._row_blocks(iter([(1,), (2,), (3,)]), size=2)) == [
+        b'1\n2\n', b'3\n',
+    ]
+    assert imp._BlockReader([b'abc', b'', b'de']).read(4) == b'abcd'
+
+
+def test_staged_names_fit_postgres_identifier_limit():
+    long_name = 'ix_' + 'x' * 70
+
+    assert imp._staged('hcad_properties') == 'hcad_properties__new'
+    assert len(imp._staged(long_name)) == 63
+    assert imp._staged(long_name).endswith(imp.STAGING_SUFFIX)
+
+
+# --- Staging-to-live swap ---
+
+class _CatalogCursor:
+    """Records executed SQL and answers catalog queries from fixtures."""
+
+    def __init__(self, indexes=None, constraints=None, sequences=()):
+        self.indexes = indexes or {}
+        self.constraints = constraints or {}
+        self.sequences = list(sequences)
+        self.statements = []
+        self._result = []
+
+    def execute(self, sql, params=None):
+        sql = ' '.join(sql.split())
+        self.statements.append(sql)
+        if 'FROM pg_index' in sql:
+            self._result = self.indexes.get(params[0], [])
+        elif 'FROM pg_constraint' in sql:
+            self._result = self.constraints.get(params[0], [])
+        elif 'FROM pg_depend' in sql:
+            self._result = [row for row in self.sequences if row[1] in params[0]]
+        else:
+            self._result = []
+
+    def fetchall(self):
+        return list(self._result)
+
+    def ddl(self):
+        return [sql for sql in self.statements if not sql.startswith('SELECT')]
+
+
+HCAD_CATALOG = {
+    'indexes': {
+        'hcad_properties': [
+            ('ix_hcad_normalized_site_addr',
+             'CREATE INDEX ix_hcad_normalized_site_addr ON public.hcad_properties '
+             'USING btree (normalized_site_addr)'),
+            ('ix_hcad_properties_acct',
+             'CREATE UNIQUE INDEX ix_hcad_properties_acct ON public.hcad_properties '
+             'USING btree (acct)'),
+            ('ix_hcad_properties_lgl_2_trgm',
+             'CREATE INDEX ix_hcad_properties_lgl_2_trgm ON public.hcad_properties '
+             'USING gin (lgl_2 gin_trgm_ops)'),
+        ],
+        'hcad_buildings': [
+            ('ix_hcad_buildings_acct',
+             'CREATE INDEX ix_hcad_buildings_acct ON public.hcad_buildings '
+             'USING btree (acct)'),
+        ],
+    },
+    'constraints': {
+        'hcad_properties': [('hcad_properties_pkey', 'PRIMARY KEY (id)')],
+        'hcad_buildings': [
+            ('hcad_buildings_pkey', 'PRIMARY KEY (id)'),
+            ('hcad_buildings_acct_fkey',
+             'FOREIGN KEY (acct) REFERENCES hcad_properties(acct)'),
+        ],
+    },
+    'sequences': [
+        ('hcad_properties_id_seq', 'hcad_properties', 'id'),
+        ('hcad_buildings_id_seq', 'hcad_buildings', 'id'),
+    ],
+}
+
+
+def test_staging_indexes_rebuild_live_catalog_on_the_twin():
+    cursor = _CatalogCursor(**HCAD_CATALOG)
+    tables = ['hcad_properties', 'hcad_buildings']
+
+    renames = []
+    for table in tables:
+        renames.extend(imp._build_staging_indexes(cursor, table, tables))
+
+    assert cursor.ddl() == [
+        'CREATE INDEX ix_hcad_normalized_site_addr__new ON hcad_properties__new '
+        'USING btree (normalized_site_addr)',
+        'CREATE UNIQUE INDEX ix_hcad_properties_acct__new ON hcad_properties__new '
+        'USING btree (acct)',
+        'CREATE INDEX ix_hcad_properties_lgl_2_trgm__new ON hcad_properties__new '
+        'USING gin (lgl_2 gin_trgm_ops)',
+        'ALTER TABLE hcad_properties__new ADD CONSTRAINT hcad_properties_pkey__new '
+        'PRIMARY KEY (id)',
+        'CREATE INDEX ix_hcad_buildings_acct__new ON hcad_buildings__new USING btree (acct)',
+        'ALTER TABLE hcad_buildings__new ADD CONSTRAINT hcad_buildings_pkey__new '
+        'PRIMARY KEY (id)',
+        'ALTER TABLE hcad_buildings__new ADD CONSTRAINT hcad_buildings_acct_fkey__new '
+        'FOREIGN KEY (acct) REFERENCES hcad_properties__new(acct)',
+    ]
+    assert ('index', 'hcad_properties', 'ix_hcad_normalized_site_addr__new',
+            'ix_hcad_normalized_site_addr') in renames
+    assert ('constraint', 'hcad_buildings', 'hcad_buildings_acct_fkey__new',
+            'hcad_buildings_acct_fkey') in renames
+
+
+def test_staging_swap_renames_twins_and_keeps_live_names():
+    cursor = _CatalogCursor(**HCAD_CATALOG)
+    tables = ['hcad_properties', 'hcad_buildings']
+    renames = []
+    for table in tables:
+        renames.extend(imp._build_staging_indexes(cursor, table, tables))
+    cursor.statements.clear()
+
+    imp._swap_staged_tables(cursor, tables, renames)
+
+    ddl = cursor.ddl()
+    assert ddl[:8] == [
+        'ALTER TABLE hcad_properties RENAME TO hcad_properties__old',
+        'ALTER TABLE hcad_properties__new RENAME TO hcad_properties',
+        'ALTER TABLE hcad_buildings RENAME TO hcad_buildings__old',
+        'ALTER TABLE hcad_buildings__new RENAME TO hcad_buildings',
+        'ALTER SEQUENCE hcad_properties_id_seq OWNED BY hcad_properties.id',
+        'ALTER SEQUENCE hcad_buildings_id_seq OWNED BY hcad_buildings.id',
+        # Children drop first so the old foreign key goes with them.
+        'DROP TABLE hcad_buildings__old',
+        'DROP TABLE hcad_properties__old',
+    ]
+    assert ddl[8:] == [
+        'ALTER INDEX ix_hcad_normalized_site_addr__new RENAME TO ix_hcad_normalized_site_addr',
+        'ALTER INDEX ix_hcad_properties_acct__new RENAME TO ix_hcad_properties_acct',
+        'ALTER INDEX ix_hcad_properties_lgl_2_trgm__new RENAME TO ix_hcad_properties_lgl_2_trgm',
+        'ALTER TABLE hcad_properties RENAME CONSTRAINT hcad_properties_pkey__new '
+        'TO hcad_properties_pkey',
+        'ALTER INDEX ix_hcad_buildings_acct__new RENAME TO ix_hcad_buildings_acct',
+        'ALTER TABLE hcad_buildings RENAME CONSTRAINT hcad_buildings_pkey__new '
+        'TO hcad_buildings_pkey',
+        'ALTER TABLE hcad_buildings RENAME CONSTRAINT hcad_buildings_acct_fkey__new '
+        'TO hcad_buildings_acct_fkey',
+    ]
+
+
+@pytest.mark.skipif(not PG_URL, reason='TAX_IMPORT_TEST_DATABASE_URL not set')
+def test_load_staged_swaps_fixture_rows_into_postgres(monkeypatch):
+    """End to end against a scratch PostgreSQL database.
+
+    The live tables are created from the ORM models plus an index only a
+    migration knows about; after the swap the catalog must list the same
+    indexes and constraints and the tables must hold the fixture rows.
+    """
+    import psycopg2
+    from sqlalchemy import create_engine, text
+
+    from tests.browser_test_support import is_local_database_url
+
+    assert is_local_database_url(PG_URL), 'use a local scratch database'
+    engine = create_engine(PG_URL)
+    tables = [HcadProperty.__table__, HcadBuilding.__table__]
+
+    def catalog(conn):
+        indexes = conn.execute(text(
+            "SELECT tablename, indexname, "
+            "regexp_replace(indexdef, '^.* USING ', '') FROM pg_indexes "
+            "WHERE tablename IN ('hcad_properties', 'hcad_buildings') ORDER BY 1, 2"
+        )).all()
+        constraints = conn.execute(text(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) "
+            "FROM pg_constraint WHERE conrelid IN "
+            "('hcad_properties'::regclass, 'hcad_buildings'::regclass) ORDER BY 1, 2"
+        )).all()
+        return indexes, constraints
+
+    for table in reversed(tables):
+        table.drop(engine, checkfirst=True)
+    for table in tables:
+        table.create(engine)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE INDEX ix_hcad_lgl_2_upper ON hcad_properties (UPPER(lgl_2))"
+            ))
+            conn.execute(text(
+                "INSERT INTO hcad_properties (acct, lgl_2) VALUES ('OLD-1', 'OLD')"
+            ))
+            before = catalog(conn)
+
+        monkeypatch.setattr(imp, '_get_raw_conn', lambda app: psycopg2.connect(PG_URL))
+        properties = [
+            imp._hcad_property_row({'acct': acct, 'site_addr_1': '1 Main Street',
+                                    'lgl_2': 'OAK FOREST SEC 2'})
+            for acct in ('A-1', 'A-2', 'A-2')
+        ]
+        counts = imp.load_staged(
+            None,
+            [
+                ('hcad_properties', imp.HCAD_MAIN_COLUMNS, imp._row_blocks(properties)),
+                ('hcad_buildings', imp.HCAD_BUILDING_COLUMNS,
+                 imp._row_blocks([('A-1', 2000), ('A-2', 2100)])),
+            ],
+            prepare=lambda cursor: cursor.execute(
+                "DELETE FROM hcad_properties__new a USING hcad_properties__new b "
+                "WHERE a.acct = b.acct AND a.id > b.id"
+            ),
+        )
+
+        with engine.begin() as conn:
+            assert catalog(conn) == before
+            rows = conn.execute(text(
+                "SELECT acct, normalized_site_addr FROM hcad_properties ORDER BY acct"
+            )).all()
+            assert rows == [('A-1', '1 MAIN ST'), ('A-2', '1 MAIN ST')]
+            leftovers = conn.execute(text(
+                "SELECT relname FROM pg_class WHERE relname ~ '__(new|old)$'"
+            )).all()
+            assert leftovers == []
+            conn.execute(text("INSERT INTO hcad_properties (acct) VALUES ('A-3')"))
+        assert counts == {'hcad_properties': 3, 'hcad_buildings': 2}
+    finally:
+        for table in reversed(tables):
+            table.drop(engine, checkfirst=True)
+        engine.dispose()
+
@@ -10,6 +10,7 @@ from zipfile import ZipFile
 import feature_flags as feature_flags_module
 import routes.tax_protest as tax_protest_route
 import services.tax_protest_service as tax_protest_service
+import pytest
 from openpyxl import load_workbook
 
 
@@ -111,6 +112,209 @@ def test_build_chambers_subdivision_match_terms_broadens_truncated_name():
     assert "PLANTATION ON" in terms
 
 
+def test_subdivision_stats_read_memory_mapped_snapshot(app, monkeypatch, tmp_path):
+    from services import tax_snapshot
+
+    liberty_rows = [
+        ("007206", 390000), ("007206", 420000), ("007206", 590000),
+        ("007207", 450000), ("007207", 820000),
+        ("007300", 100000),
+    ]
+    hcad_rows = [
+        ("OAK FOREST SEC 1", 250000),
+        ("OAK FOREST SEC 2", 300000), ("OAK FOREST SEC 2", 350000),
+    ]
+    tax_snapshot.write_snapshot(
+        str(tmp_path / "liberty.snap"), "liberty", liberty_rows, 0,
+    )
+    tax_snapshot.write_snapshot(str(tmp_path / "hcad.snap"), "hcad", hcad_rows, 0)
+
+    with app.app_context():
+        monkeypatch.setitem(app.config, "TAX_SNAPSHOT_DIR", str(tmp_path))
+        monkeypatch.setattr(
+            tax_protest_service.LibertyProperty,
+            "query",
+            _QueryStub([]),
+        )
+
+        stats = tax_protest_service.get_subdivision_stats(
+            subdivision="LIBERTY OAKS",
+            zip_code="77327",
+            market_value=590000,
+            source="liberty",
+            subdivision_code="007206",
+            sibling_codes=["007207"],
+        )
+        assert stats["total_homes"] == 5
+        assert stats["lower_values"] == 3
+        assert stats["higher_values"] == 1
+        assert stats["median_value"] == 450000
+        assert [b["count"] for b in stats["value_distribution"]] == [
+            2, 1, 0, 1, 0, 0, 0, 1,
+        ]
+
+        stats = tax_protest_service.get_subdivision_stats(
+            "oak forest", None, 300000, "hcad", fuzzy_subdivision=True,
+        )
+        assert (stats["total_homes"], stats["lower_values"]) == (3, 1)
+        stats = tax_protest_service.get_subdivision_stats(
+            "OAK FOREST SEC 2", None, 300000, "hcad",
+        )
+        assert (stats["total_homes"], stats["min_value"]) == (2, 300000)
+
+
+def test_subdivision_stats_ignore_snapshot_from_older_dataset_version(
+    app, monkeypatch, tmp_path,
+):
+    from models import TaxDatasetVersion, db
+    from services import tax_snapshot
+
+    tax_snapshot.write_snapshot(
+        str(tmp_path / "liberty.snap"), "liberty", [("007206", 390000)], 1,
+    )
+
+    with app.app_context():
+        monkeypatch.setitem(app.config, "TAX_SNAPSHOT_DIR", str(tmp_path))
+        monkeypatch.setattr(
+            tax_protest_service.LibertyProperty,
+            "query",
+            _QueryStub([410000, 420000]),
+        )
+        db.session.add(TaxDatasetVersion(source="liberty", version=2))
+        db.session.commit()
+        try:
+            stats = tax_protest_service.get_subdivision_stats(
+                "LIBERTY OAKS", "77327", 410000, "liberty",
+                subdivision_code="007206", sibling_codes=["007207"],
+            )
+            assert stats["total_homes"] == 2
+
+            db.session.get(TaxDatasetVersion, "liberty").version = 1
+            db.session.commit()
+            stats = tax_protest_service.get_subdivision_stats(
+                "LIBERTY OAKS", "77327", 410000, "liberty",
+                subdivision_code="007206", sibling_codes=["007207"],
+            )
+            assert stats["total_homes"] == 1
+        finally:
+            db.session.delete(db.session.get(TaxDatasetVersion, "liberty"))
+            db.session.commit()
+
+
+def test_snapshot_writer_rejects_ungrouped_rows(tmp_path):
+    from services import tax_snapshot
+
+    with pytest.raises(ValueError):
+        tax_snapshot.write_snapshot(
+            str(tmp_path / "x.snap"), "hcad", [("A", 1), ("B", 2), ("A", 3)], 0,
+        )
+    with pytest.raises(ValueError):
+        tax_snapshot.write_snapshot(
+            str(tmp_path / "x.snap"), "hcad", [("A", 2), ("A", 1)], 0,
+        )
+
+
+def test_hcad_comparables_and_stats_read_precomputed_store(app):
+    from models import HcadProperty, TaxSubdivisionComparable, db
+
+    homes = [
+        # acct, lgl_2, zip, market value, max sq ft
+        ("STORE-1", "OAK  FOREST SEC 2", "77018", 300000, 2000),
+        ("STORE-2", "OAK FOREST SEC 2", "77018", 350000, 2100),
+        ("STORE-3", "OAK FOREST SEC 2", "77008", 320000, 2050),
+        ("STORE-4", "OAK FOREST SEC 2", "77018", 360000, 3200),
+        ("STORE-5", "OAK FOREST SEC 2", "77018", 500000, 2000),
+    ]
+    with app.app_context():
+        props = [
+            HcadProperty(
+                acct=acct, lgl_2=lgl_2, site_addr_1=f"{i} OAK ST",
+                site_addr_3=zip_code, str_num=str(i), tot_mkt_val=value,
+                max_sq_ft=sq_ft,
+            )
+            for i, (acct, lgl_2, zip_code, value, sq_ft) in enumerate(homes, 1)
+        ]
+        db.session.add_all(props)
+        db.session.flush()
+        db.session.add_all([
+            TaxSubdivisionComparable(
+                source="hcad",
+                subdivision_key=tax_protest_service.normalize_subdivision_key(p.lgl_2),
+                zip_code=p.site_addr_3, market_value=p.tot_mkt_val,
+                sq_ft=p.max_sq_ft, property_id=p.id,
+            )
+            for p in props
+        ])
+        db.session.commit()
+        try:
+            comps = tax_protest_service.find_comparables(
+                "OAK FOREST SEC 2", "77018", 400000, "hcad", main_sq_ft=2100,
+            )
+            assert [c["account"] for c in comps] == ["STORE-1", "STORE-2"]
+            assert comps[0]["sq_ft"] == 2000
+
+            comps = tax_protest_service.find_comparables(
+                "oak forest", "99999", 400000, "hcad", main_sq_ft=2100,
+                fuzzy_subdivision=True,
+            )
+            assert [c["account"] for c in comps] == ["STORE-1", "STORE-3", "STORE-2"]
+
+            stats = tax_protest_service.get_subdivision_stats(
+                "OAK FOREST SEC 2", "77018", 340000, "hcad",
+            )
+            assert stats["total_homes"] == 5
+            assert stats["lower_values"] == 2
+
+            main = tax_protest_service.get_main_property_by_id(props[3].id, "hcad")
+            assert main["sq_ft"] == 3200
+        finally:
+            TaxSubdivisionComparable.query.filter_by(source="hcad").delete()
+            HcadProperty.query.filter(HcadProperty.acct.like("STORE-%")).delete(
+                synchronize_session=False,
+            )
+            db.session.commit()
+
+
+def test_find_property_probes_normalized_address_keys(app):
+    from models import HcadProperty, LibertyProperty, db
+
+    with app.app_context():
+        db.session.add_all([
+            HcadProperty(
+                acct="KEY-1", site_addr_1="123 OAK ST", site_addr_3="77008",
+                normalized_site_addr="123 OAK ST", tot_mkt_val=310000,
+            ),
+            HcadProperty(
+                acct="KEY-2", site_addr_1="123 OAK ST", site_addr_3="77018",
+                normalized_site_addr="123 OAK ST", tot_mkt_val=320000,
+            ),
+            LibertyProperty(
+                prop_id="KEY-3", site_addr_1="123 OAK ST", situs_zip="77018",
+                normalized_site_addr="123 OAK ST", market_value=150000,
+                is_residential_home=True,
+            ),
+        ])
+        db.session.commit()
+        try:
+            record, source = tax_protest_service.find_property_in_tax_data(
+                "123 Oak Street", "Houston", "77018",
+            )
+            assert source == "hcad"
+            assert record["account"] == "KEY-2"
+
+            record, source = tax_protest_service.find_property_in_tax_data(
+                "123 oak st apt 4", "Houston", "",
+            )
+            assert source == "hcad"
+            assert record["account"] in {"KEY-1", "KEY-2"}
+        finally:
+            HcadProperty.query.filter(HcadProperty.acct.like("KEY-%")).delete(
+                synchronize_session=False,
+            )
+            LibertyProperty.query.filter_by(prop_id="KEY-3").delete()
+            db.session.commit()
+
+
 def test_extract_chambers_subdivision_prefers_llm_for_clean_name(monkeypatch):
     monkeypatch.setattr(
         tax_protest_service,
@@ -653,3 +857,288 @@ def test_download_xlsx_returns_report_with_embedded_chart(owner_a_client, monkey
             name for name in workbook_zip.namelist() if name.startswith("xl/media/")
         ]
     assert media_files
+
+
+def test_exports_reuse_result_bundle_until_dataset_version_changes(
+    app, owner_a_client, monkeypatch
+):
+    from models import TaxDatasetVersion, db
+
+    monkeypatch.setattr(feature_flags_module, "org_has_feature", lambda *args, **kwargs: True)
+    fake_contact = SimpleNamespace(id=998, street_address="12 Bundle Way")
+    fake_cached = {
+        "contact_id": fake_contact.id,
+        "main_property_id": "bundle-1",
+        "source": "fort_bend",
+        "subdivision": "BUNDLE PARK",
+        "zip_code": "77479",
+        "subdivision_code": "BP01",
+        "fuzzy_subdivision": False,
+    }
+    calls = {"property": 0, "comparables": 0, "stats": 0, "chart": 0}
+
+    def counted(name, value):
+        def _fn(*args, **kwargs):
+            calls[name] += 1
+            return value(*args, **kwargs) if callable(value) else value
+        return _fn
+
+    monkeypatch.setattr(tax_protest_route, "get_cached_search_result", lambda: fake_cached)
+    monkeypatch.setattr(tax_protest_route, "_authorized_contact", lambda contact_id: fake_contact)
+    monkeypatch.setattr(
+        tax_protest_route, "get_main_property_by_id",
+        counted("property", {"id": "bundle-1", "full_address": "12 Bundle Way", "market_value": 500000}),
+    )
+    monkeypatch.setattr(
+        tax_protest_route, "find_comparables",
+        counted("comparables", [{"id": "c1", "full_address": "10 Bundle Way", "market_value": 400000}]),
+    )
+    monkeypatch.setattr(
+        tax_protest_route, "get_subdivision_stats",
+        counted("stats", {
+            "total_homes": 2, "lower_values": 1, "higher_values": 0, "percentile": 50.0,
+            "value_distribution": [{"label": "$400k", "count": 1}, {"label": "$450k", "count": 1}],
+            "min_value": 400000, "max_value": 500000, "median_value": 500000,
+        }),
+    )
+    monkeypatch.setattr(
+        tax_protest_route, "_build_chart_image",
+        counted("chart", tax_protest_route._build_chart_image),
+    )
+
+    assert owner_a_client.get("/tax-protest/download-xlsx").status_code == 200
+    assert owner_a_client.get("/tax-protest/download-xlsx").status_code == 200
+    csv_response = owner_a_client.get("/tax-protest/download-csv")
+    assert b"10 Bundle Way" in csv_response.data
+    assert calls == {"property": 1, "comparables": 1, "stats": 1, "chart": 1}
+
+    with app.app_context():
+        db.session.add(TaxDatasetVersion(source="fort_bend", version=7))
+        db.session.commit()
+    try:
+        assert owner_a_client.get("/tax-protest/download-csv").status_code == 200
+        assert calls["comparables"] == 2
+    finally:
+        with app.app_context():
+            TaxDatasetVersion.query.filter_by(source="fort_bend").delete()
+            db.session.commit()
+
+
+def test_batch_run_groups_contacts_by_subdivision(app, owner_a_client, seed, monkeypatch):
+    from csv import reader
+    from io import StringIO
+    from models import (
+        Contact, ContactGroup, HcadProperty, TaxProtestBatchJob,
+        TaxSubdivisionComparable, db,
+    )
+
+    monkeypatch.setattr(feature_flags_module, "org_has_feature", lambda *args, **kwargs: True)
+    homes = [
+        ("BATCH-1", "77018", 300000, 2000),
+        ("BATCH-2", "77018", 350000, 2100),
+        ("BATCH-3", "77008", 310000, 2050),
+        ("BATCH-4", "77018", 450000, 2000),
+    ]
+    with app.app_context():
+        props = [
+            HcadProperty(
+                acct=acct, lgl_2="BATCH MEADOWS SEC 1", site_addr_1=f"{i} MEADOW LN",
+                site_addr_3=zip_code, str_num=str(i), tot_mkt_val=value, max_sq_ft=sq_ft,
+            )
+            for i, (acct, zip_code, value, sq_ft) in enumerate(homes, 1)
+        ]
+        db.session.add_all(props)
+        db.session.flush()
+        db.session.add_all([
+            TaxSubdivisionComparable(
+                source="hcad",
+                subdivision_key=tax_protest_service.normalize_subdivision_key(p.lgl_2),
+                zip_code=p.site_addr_3, market_value=p.tot_mkt_val,
+                sq_ft=p.max_sq_ft, property_id=p.id,
+            )
+            for p in props
+        ])
+        group = ContactGroup(
+            name="Protest Season", organization_id=seed["org_a"], user_id=seed["owner_a"],
+            category="general", sort_order=9, is_active=True,
+        )
+        contacts = [
+            Contact(
+                organization_id=seed["org_a"], user_id=seed["owner_a"],
+                created_by_id=seed["owner_a"], first_name=first, last_name="Batchrun",
+                street_address=street, city="Houston", zip_code="77018",
+            )
+            for first, street in [
+                ("Ava", "1 Meadow Ln"), ("Ben", "2 Meadow Ln"),
+                ("Cal", "9 Nowhere Rd"), ("Dee", None),
+            ]
+        ]
+        for contact in contacts:
+            contact.groups.append(group)
+        db.session.add_all([group, *contacts])
+        db.session.commit()
+        group_id = group.id
+        no_address_id = contacts[3].id
+        subjects = {
+            "1 Meadow Ln": {
+                "id": props[3].id, "account": "BATCH-4", "full_address": "1 MEADOW LN",
+                "zip": "77018", "market_value": 400000, "sq_ft": 2000,
+                "legal1": "LT 1 BLK 2 BATCH MEADOWS", "legal2": "",
+            },
+            "2 Meadow Ln": {
+                "id": props[1].id, "account": "BATCH-2", "full_address": "2 MEADOW LN",
+                "zip": "77018", "market_value": 320000, "sq_ft": 2100,
+                "legal1": "lt 1  blk 2 batch meadows", "legal2": "",
+            },
+        }
+
+    calls = {"llm": 0, "pool": 0}
+    original_pool = tax_protest_service.subdivision_comparable_pool
+
+    def fake_llm(legal_description):
+        calls["llm"] += 1
+        return "BATCH MEADOWS"
+
+    def counted_pool(*args, **kwargs):
+        calls["pool"] += 1
+        return original_pool(*args, **kwargs)
+
+    monkeypatch.setattr(
+        tax_protest_service, "find_property_in_tax_data",
+        lambda street, city, zip_code: (subjects.get(street), "hcad" if street in subjects else None),
+    )
+    monkeypatch.setattr(tax_protest_service, "extract_subdivision_llm", fake_llm)
+    monkeypatch.setattr(tax_protest_service, "subdivision_comparable_pool", counted_pool)
+
+    try:
+        response = owner_a_client.post("/tax-protest/batch", json={"group_id": group_id})
+        assert response.status_code == 200
+        payload = response.get_json()
+        assert payload["status"] == "completed"
+        assert (payload["processed_contacts"], payload["found_count"], payload["error_count"]) == (4, 2, 2)
+        assert calls == {"llm": 1, "pool": 1}
+
+        results = {r["name"]: r for r in payload["results"]}
+        assert [r["name"] for r in payload["results"]] == [
+            "Ava Batchrun", "Ben Batchrun", "Cal Batchrun", "Dee Batchrun",
+        ]
+        assert results["Ava Batchrun"]["comparables_count"] == 2
+        assert results["Ben Batchrun"]["comparables_count"] == 1
+        assert results["Dee Batchrun"]["message"] == "Contact has no street address on file"
+        assert "params" not in results["Ava Batchrun"]
+
+        workbook = load_workbook(BytesIO(owner_a_client.get(payload["download_url"]).data))
+        summary_rows = list(workbook["Summary"].iter_rows(min_row=2, values_only=True))
+        assert [row[0] for row in summary_rows] == [
+            "Ava Batchrun", "Ben Batchrun", "Cal Batchrun", "Dee Batchrun",
+        ]
+        comparable_rows = list(workbook["Comparables"].iter_rows(min_row=2, values_only=True))
+        assert [(row[0], row[1]) for row in comparable_rows] == [
+            ("Ava Batchrun", "Subject Property"),
+            ("Ava Batchrun", "Comparable"),
+            ("Ava Batchrun", "Comparable"),
+            ("Ben Batchrun", "Subject Property"),
+            ("Ben Batchrun", "Comparable"),
+        ]
+
+        csv_response = owner_a_client.get(results["Ben Batchrun"]["download_csv_url"])
+        assert csv_response.status_code == 200
+        csv_rows = list(reader(StringIO(csv_response.data.decode("utf-8"))))
+        assert [row[9] for row in csv_rows[1:]] == ["BATCH-2", "BATCH-1"]
+        assert owner_a_client.get(results["Ava Batchrun"]["download_xlsx_url"]).status_code == 200
+        assert owner_a_client.get(
+            f"/tax-protest/batch/{payload['job_id']}/contacts/{no_address_id}/download-csv"
+        ).status_code == 404
+    finally:
+        with app.app_context():
+            TaxProtestBatchJob.query.filter_by(group_id=group_id).delete()
+            for contact in Contact.query.filter_by(last_name="Batchrun").all():
+                contact.groups.clear()
+                db.session.delete(contact)
+            ContactGroup.query.filter_by(id=group_id).delete()
+            TaxSubdivisionComparable.query.filter_by(source="hcad").delete()
+            HcadProperty.query.filter(HcadProperty.acct.like("BATCH-%")).delete(
+                synchronize_session=False,
+            )
+            db.session.commit()
+
+
+def test_batch_enqueue_hands_job_and_org_ids_to_the_worker(monkeypatch):
+    """RQ reserves ``job_id``; the batch ids must travel as job kwargs."""
+    from unittest.mock import MagicMock, patch
+
+    from config import Config
+    from jobs import dispatch
+    from services.tax_protest_batch import enqueue_batch_job
+
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", "postgresql://queue-test")
+    dispatch.reset()
+    queue = MagicMock()
+    try:
+        with patch("redis.Redis.from_url", return_value=MagicMock()), \
+             patch("rq.Queue", return_value=queue):
+            assert enqueue_batch_job(SimpleNamespace(id=41, organization_id=3)) is True
+    finally:
+        dispatch.reset()
+
+    call = queue.enqueue.call_args
+    assert call.args == ("jobs.tax_protest_batch.process_tax_protest_batch_job",)
+    assert call.kwargs["kwargs"] == {"job_id": 41, "org_id": 3}
+    assert call.kwargs["job_id"] != 41
+
+
+def test_batch_retry_reuses_subjects_resolved_by_the_failed_attempt(app, seed, monkeypatch):
+    import services.tax_protest_batch as batch
+    from models import Contact, TaxProtestBatchJob, db
+
+    lookups = []
+
+    def fake_find(street, city, zip_code):
+        lookups.append(street)
+        return {
+            "id": len(lookups), "account": f"RETRY-{len(lookups)}",
+            "full_address": street.upper(), "zip": "77018", "market_value": 300000,
+            "sq_ft": 2000, "legal1": "LT 1 BLK 2 RETRY ACRES", "legal2": "",
+        }, "hcad"
+
+    monkeypatch.setattr(tax_protest_service, "find_property_in_tax_data", fake_find)
+    monkeypatch.setattr(tax_protest_service, "extract_subdivision_llm", lambda legal: "RETRY ACRES")
+    with app.app_context():
+        contacts = [
+            Contact(
+                organization_id=seed["org_a"], user_id=seed["owner_a"],
+                created_by_id=seed["owner_a"], first_name=first, last_name="Retryrun",
+                street_address=street, city="Houston", zip_code="77018",
+            )
+            for first, street in [("Ava", "1 Retry Ln"), ("Ben", "2 Retry Ln")]
+        ]
+        db.session.add_all(contacts)
+        db.session.commit()
+        job = batch.create_batch_job(
+            [c.id for c in contacts], group_id=None,
+            user_id=seed["owner_a"], org_id=seed["org_a"],
+        )
+        job_id = job.id
+        try:
+            with monkeypatch.context() as m:
+                def worker_killed(*args, **kwargs):
+                    raise RuntimeError("worker lost its database connection")
+
+                m.setattr(batch, "_compare_group", worker_killed)
+                with pytest.raises(RuntimeError):
+                    batch.run_batch_job(job_id, seed["org_a"])
+
+            job = db.session.get(TaxProtestBatchJob, job_id)
+            assert len(job.subjects) == 2
+            assert len(lookups) == 2
+
+            job = batch.run_batch_job(job_id, seed["org_a"])
+            assert job.status == TaxProtestBatchJob.STATUS_COMPLETED
+            assert job.found_count == 2
+            assert len(lookups) == 2
+            assert job.subjects is None
+        finally:
+            TaxProtestBatchJob.query.filter_by(id=job_id).delete()
+            for contact in Contact.query.filter_by(last_name="Retryrun").all():
+                db.session.delete(contact)
+            db.session.commit()
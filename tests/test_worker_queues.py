@@ -1,16 +1,90 @@
-"""Lock the RQ worker listen list to the queues producers actually use."""
+"""Lock the RQ worker listen list, per-queue pools and queue metrics."""
 
 
 def test_worker_listens_to_inbox_bootstrap_queue():
+    from services.contact_import_jobs import QUEUE_NAME as CONTACT_IMPORT_QUEUE
     from services.device_push import QUEUE_NAME as APNS_QUEUE
     from services.messaging.queue import QUEUE_NAME as TELEGRAM_QUEUE
+    from services.tax_protest_batch import QUEUE_NAME as TAX_PROTEST_QUEUE
     from worker import QUEUE_NAMES
 
+    # Priority order: interactive work ahead of bulk extraction and imports.
     assert QUEUE_NAMES == (
-        "doc_extraction",
         "bob_telegram",
-        "contract_bootstrap",
         "apns",
+        "contract_bootstrap",
+        "doc_extraction",
+        "contact_import",
+        "tax_protest",
     )
     assert TELEGRAM_QUEUE in QUEUE_NAMES
     assert APNS_QUEUE in QUEUE_NAMES
+    assert CONTACT_IMPORT_QUEUE in QUEUE_NAMES
+    assert TAX_PROTEST_QUEUE in QUEUE_NAMES
+
+
+def test_worker_concurrency_defaults_and_overrides():
+    import pytest
+
+    from worker import DEFAULT_CONCURRENCY, QUEUE_NAMES, parse_concurrency
+
+    assert set(DEFAULT_CONCURRENCY) == set(QUEUE_NAMES)
+    assert parse_concurrency("") == DEFAULT_CONCURRENCY
+
+    pools = parse_concurrency("doc_extraction=6, tax_protest=0")
+    assert pools["doc_extraction"] == 6
+    assert "tax_protest" not in pools
+    assert list(pools) == [name for name in QUEUE_NAMES if name != "tax_protest"]
+
+    with pytest.raises(ValueError):
+        parse_concurrency("documents=2")
+    with pytest.raises(ValueError):
+        parse_concurrency("apns=many")
+
+
+def test_worker_metrics_wait_and_throughput():
+    from datetime import datetime, timedelta, timezone
+
+    from jobs import worker_metrics
+
+    class FakeRedis:
+        def __init__(self):
+            self.hashes = {}
+
+        def pipeline(self):
+            return self
+
+        def hincrby(self, key, field, amount):
+            bucket = self.hashes.setdefault(key, {})
+            bucket[field] = bucket.get(field, 0) + amount
+
+        def expire(self, key, seconds):
+            pass
+
+        def execute(self):
+            pass
+
+        def hgetall(self, key):
+            return dict(self.hashes.get(key, {}))
+
+    started = datetime(2026, 10, 1, 12, 0, 30, tzinfo=timezone.utc)
+    assert worker_metrics.wait_seconds(None, started) == 0.0
+    # RQ can hand back naive UTC datetimes.
+    enqueued = (started - timedelta(seconds=12)).replace(tzinfo=None)
+    assert worker_metrics.wait_seconds(enqueued, started) == 12.0
+
+    conn = FakeRedis()
+    at = 1_800_000_000.0
+    worker_metrics.record_job(conn, "doc_extraction", wait=12, run=40, ok=True, at=at - 120)
+    worker_metrics.record_job(conn, "doc_extraction", wait=4, run=20, ok=False, at=at)
+    worker_metrics.record_job(conn, "doc_extraction", wait=1, run=1, ok=True, at=at - 3600)
+
+    stats = worker_metrics.snapshot(conn, ["doc_extraction", "apns"], minutes=5, at=at)
+    assert stats["doc_extraction"] == {
+        "jobs": 2,
+        "failed": 1,
+        "per_minute": 0.4,
+        "avg_wait_s": 8.0,
+        "avg_run_s": 30.0,
+    }
+    assert stats["apns"]["jobs"] == 0
@@ -1,15 +1,27 @@
 """
-RQ worker entry point for background document extraction.
+RQ worker entry point for background jobs.
 
 Boots the Flask app (reuses the module-level instance from app.py) so that
 SQLAlchemy, config, and all services are available inside jobs.
 
+The process is a small supervisor: it imports the app and the job modules
+once, then forks a pool of workers per queue (DEFAULT_CONCURRENCY, or
+WORKER_CONCURRENCY). Each worker listens on one queue, so a 300-second
+vision extraction no longer holds up Telegram replies and pushes. Children
+share the preloaded app copy-on-write, are restarted if they exit, and
+stop gracefully on SIGTERM. The supervisor logs per-queue wait time and
+throughput every WORKER_METRICS_INTERVAL seconds.
+
 Usage (local):
     python worker.py
 
 Railway: set as the custom start command for the worker service.
 """
+import gc
+import importlib
 import logging
+import os
+import signal
 import socket
 import time
 
@@ -19,22 +31,43 @@ load_dotenv()
 from redis import Redis
 from redis.exceptions import ConnectionError as RedisConnectionError
 from rq import Worker, Queue
+from rq.job import JobStatus
+from rq.utils import now
 from app import app
 from config import Config
+from jobs import dispatch, worker_metrics
 
 log = logging.getLogger("worker")
 logging.basicConfig(level=logging.INFO)
 
-# Queues this process must consume. Inbox identification enqueues onto
-# contract_bootstrap. PortalMessage push enqueues onto apns. Omitting a
-# name here leaves those jobs Queued forever.
-QUEUE_NAMES = (
-    "doc_extraction",
-    "bob_telegram",
-    "contract_bootstrap",
-    "apns",
+# Queues this process must consume, highest priority first (workers are
+# started in this order). Producers enqueue through jobs.dispatch, which
+# refuses a queue name missing from this list (a job on an unlistened queue
+# stays Queued forever).
+QUEUE_NAMES = dispatch.QUEUE_NAMES
+
+# Worker processes per queue. 0 leaves a queue to another deployment.
+DEFAULT_CONCURRENCY = {
+    "bob_telegram": 2,
+    "apns": 1,
+    "contract_bootstrap": 1,
+    "doc_extraction": 4,
+    "contact_import": 1,
+    "tax_protest": 1,
+}
+
+# Imported before forking so every child shares them copy-on-write.
+PRELOAD_MODULES = (
+    "jobs.apns_push",
+    "jobs.bob_telegram_reply",
+    "jobs.contact_import",
+    "jobs.contract_bootstrap",
+    "jobs.document_extraction",
+    "jobs.tax_protest_batch",
 )
 
+RESTART_DELAY_SECONDS = 5
+
 
 def _connect_redis(url: str, attempts: int = 12, delay: float = 2.5) -> Redis:
     """
@@ -66,13 +99,153 @@ def _connect_redis(url: str, attempts: int = 12, delay: float = 2.5) -> Redis:
     raise RuntimeError(f"could not connect to redis after {attempts} attempts") from last_err
 
 
-def main():
+def parse_concurrency(raw: str | None) -> dict[str, int]:
+    """DEFAULT_CONCURRENCY overridden by ``"queue=count,..."``."""
+    concurrency = dict(DEFAULT_CONCURRENCY)
+    for item in (raw or "").split(","):
+        if not item.strip():
+            continue
+        name, _, count = item.partition("=")
+        name = name.strip()
+        if name not in QUEUE_NAMES:
+            raise ValueError(f"WORKER_CONCURRENCY names unknown queue {name!r}")
+        try:
+            concurrency[name] = max(0, int(count))
+        except ValueError:
+            raise ValueError(f"WORKER_CONCURRENCY count for {name!r} is not a number") from None
+    return {name: concurrency[name] for name in QUEUE_NAMES if concurrency.get(name)}
+
+
+class MeteredWorker(Worker):
+    """RQ worker that records each job's queue wait and run time."""
+
+    def execute_job(self, job, queue):
+        wait = worker_metrics.wait_seconds(job.enqueued_at, now())
+        started = time.monotonic()
+        try:
+            super().execute_job(job, queue)
+        finally:
+            try:
+                ok = job.get_status(refresh=True) == JobStatus.FINISHED
+                worker_metrics.record_job(
+                    self.connection,
+                    queue.name,
+                    wait=wait,
+                    run=time.monotonic() - started,
+                    ok=ok,
+                )
+            except Exception:
+                log.warning("could not record metrics for job %s", job.id, exc_info=True)
+
+
+def preload() -> None:
+    """Import everything children need, then keep GC off the shared pages."""
+    for module in PRELOAD_MODULES:
+        importlib.import_module(module)
+    with app.app_context():
+        from models import db
+        # Connections must not be shared across the fork.
+        db.engine.dispose()
+    gc.collect()
+    gc.freeze()
+
+
+def run_worker(queue_name: str, index: int) -> None:
+    """Body of one forked child: consume ``queue_name`` until told to stop."""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    dispatch.reset()
     with app.app_context():
         conn = _connect_redis(Config.REDIS_URL)
-        queues = [Queue(name, connection=conn) for name in QUEUE_NAMES]
-        worker = Worker(queues, connection=conn)
+        worker = MeteredWorker(
+            [Queue(queue_name, connection=conn)],
+            connection=conn,
+            name=f"{socket.gethostname()}.{os.getpid()}.{queue_name}-{index}",
+        )
         worker.work(with_scheduler=True)
 
 
+class Supervisor:
+    """Fork ``concurrency`` workers per queue and keep them running."""
+
+    def __init__(self, concurrency: dict[str, int], metrics_interval: int = 60):
+        self.concurrency = concurrency
+        self.metrics_interval = metrics_interval
+        self.children: dict[int, tuple[str, int]] = {}
+        self.stopping = False
+
+    def spawn(self, queue_name: str, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(queue_name, index)
+            except Exception:
+                log.exception("worker %s-%d crashed", queue_name, index)
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = (queue_name, index)
+        log.info("started worker %s-%d (pid %d)", queue_name, index, pid)
+
+    def _forward(self, signum, _frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _log_metrics(self, conn: Redis) -> None:
+        try:
+            depths = {name: Queue(name, connection=conn).count for name in self.concurrency}
+            stats = worker_metrics.snapshot(conn, self.concurrency)
+        except Exception:
+            log.warning("could not read worker metrics", exc_info=True)
+            return
+        for name, stat in stats.items():
+            log.info(
+                "queue %s: depth=%d jobs/min=%.2f avg_wait=%.2fs avg_run=%.2fs failed=%d",
+                name, depths[name], stat["per_minute"], stat["avg_wait_s"],
+                stat["avg_run_s"], stat["failed"],
+            )
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._forward)
+        signal.signal(signal.SIGINT, self._forward)
+        for name, count in self.concurrency.items():
+            for index in range(count):
+                self.spawn(name, index)
+
+        conn = Redis.from_url(Config.REDIS_URL, socket_connect_timeout=5, socket_timeout=5)
+        next_metrics = time.monotonic() + self.metrics_interval
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                name, index = self.children.pop(pid)
+                if not self.stopping:
+                    log.warning(
+                        "worker %s-%d (pid %d) exited with %d; restarting",
+                        name, index, pid, os.waitstatus_to_exitcode(status),
+                    )
+                    time.sleep(RESTART_DELAY_SECONDS)
+                    if not self.stopping:
+                        self.spawn(name, index)
+                continue
+            if time.monotonic() >= next_metrics:
+                self._log_metrics(conn)
+                next_metrics = time.monotonic() + self.metrics_interval
+            time.sleep(1)
+
+
+def main():
+    concurrency = parse_concurrency(Config.WORKER_CONCURRENCY)
+    preload()
+    Supervisor(concurrency, Config.WORKER_METRICS_INTERVAL).run()
+
+
 if __name__ == "__main__":
     main()